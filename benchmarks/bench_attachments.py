@@ -0,0 +1,96 @@
+"""Benchmark streaming attachment embedding with large PDF documents.
+
+Usage:
+
+    python benchmarks/bench_attachments.py --size-mb 50 --count 1
+
+Reports throughput and the Python heap used on top of the final payload
+buffer. With streaming encoding the overhead stays close to the chunk
+size regardless of the document size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from elsterctl.application.attachments import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    AttachmentLimits,
+    embed_attachments,
+    inspect_attachments,
+)
+
+_XML = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b"<Elster><DatenTeil><Nutzdatenblock><Nutzdaten><Nachricht>"
+    b"<Betreff>Benchmark</Betreff><Text>Attachment benchmark</Text>"
+    b"</Nachricht></Nutzdaten></Nutzdatenblock></DatenTeil></Elster>"
+)
+
+
+def _write_pdf(path: Path, size: int) -> None:
+    block = os.urandom(1024 * 1024)
+    with path.open("wb") as handle:
+        handle.write(b"%PDF-1.7\n")
+        remaining = size - 9
+        while remaining > 0:
+            written = handle.write(block[: min(len(block), remaining)])
+            remaining -= written
+
+
+def _run(attachments, *, use_mmap: bool, chunk_size: int) -> tuple[float, int, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    payload = embed_attachments(_XML, attachments, use_mmap=use_mmap, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, len(payload), peak - len(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--chunk-kb", type=int, default=DEFAULT_CHUNK_SIZE // 1024)
+    arguments = parser.parse_args()
+
+    size = arguments.size_mb * 1024 * 1024
+    chunk_size = (arguments.chunk_kb * 1024) // 3 * 3
+    limits = AttachmentLimits(
+        max_count=arguments.count,
+        max_file_bytes=size,
+        max_total_bytes=size * arguments.count,
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(arguments.count):
+            path = Path(directory) / f"attachment-{index}.pdf"
+            _write_pdf(path, size)
+            paths.append(path)
+        attachments = inspect_attachments(paths, limits)
+
+        print(f"attachments={arguments.count} size={arguments.size_mb} MiB chunk={chunk_size} B")
+        for use_mmap in (True, False):
+            elapsed, payload_size, overhead = _run(
+                attachments, use_mmap=use_mmap, chunk_size=chunk_size
+            )
+            source_mib = size * arguments.count / (1024 * 1024)
+            print(
+                f"{'mmap' if use_mmap else 'read':>5}: {elapsed:.3f}s "
+                f"{source_mib / elapsed:.1f} MiB/s payload={payload_size} B "
+                f"overhead={overhead / 1024:.0f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Measure per-record memory of pending filings and results at batch scale.
+
+Usage:
+
+    python benchmarks/bench_domain_memory.py --records 100000 --response-kb 4
+
+Compares the request/result dataclasses the send path uses with their
+pre-`__slots__` versions. Results are measured with the server response
+held inline and spooled to a file (`XmlSpool`), as `send-batch` keeps them
+from the moment ERiC returns. Sizes come from
+`tracemalloc` and include every object a record keeps alive that is not
+shared with other records.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from elsterctl.application.message_send import (  # noqa: E402
+    MessageSendRequest,
+    MessageSendResult,
+)
+from elsterctl.domain.filings import InlineXml, XmlSpool  # noqa: E402
+
+
+@dataclass(frozen=True)
+class _DictRequest:
+    """`MessageSendRequest` as it was before it used `__slots__`."""
+
+    xml_path: Path
+    certificate_path: Path
+    pin_env_var: str
+    data_type_version: str
+    transfer_mode: str
+    validate_before_send: bool
+    attachment_paths: tuple[Path, ...] = ()
+    allow_resubmit: bool = False
+    priority_class: str = "normal"
+    deadline: date | None = None
+
+
+@dataclass(frozen=True)
+class _DictResult:
+    """`MessageSendResult` as it was before it used `__slots__`."""
+
+    result_code: int
+    transfer_ticket: str | None
+    eric_response_xml: str
+    server_response_xml: str
+    timings: dict[str, float] = field(default_factory=dict)
+    deduplicated: bool = False
+
+
+def _measure(build: Callable[[int], object], records: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(index) for index in range(records)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000, help="Records per variant.")
+    parser.add_argument("--response-kb", type=int, default=4, help="Server response size.")
+    args = parser.parse_args()
+
+    certificate = Path("/certs/company.pfx")
+    deadline = date(2026, 10, 10)
+    filler = "x" * (args.response_kb * 1024)
+
+    def response(index: int) -> str:
+        # Distinct strings, as every real response differs.
+        return f"<ServerAntwort id='{index}'>{filler}</ServerAntwort>"
+
+    def request_fields(index: int) -> dict:
+        return {
+            "xml_path": Path(f"/outbox/2026/filing-{index:07d}.xml"),
+            "certificate_path": certificate,
+            "pin_env_var": "ELSTER_CERT_PIN",
+            "data_type_version": "TH11",
+            "transfer_mode": "test",
+            "validate_before_send": True,
+            "deadline": deadline,
+        }
+
+    pending = {
+        "dataclass (dict)": lambda index: _DictRequest(**request_fields(index)),
+        "dataclass (slots)": lambda index: MessageSendRequest(**request_fields(index)),
+    }
+    print(f"pending filings, {args.records} records")
+    for name, build in pending.items():
+        print(f"  {name:28s} {_measure(build, args.records):9.0f} bytes/record")
+
+    with XmlSpool() as spool:
+        results = {
+            "dataclass (dict)": lambda index: _DictResult(
+                0, f"et-{index}", "", response(index), {"eric_seconds": 0.1}
+            ),
+            "dataclass (slots, inline)": lambda index: MessageSendResult(
+                0, f"et-{index}", None, InlineXml(response(index)), {"eric_seconds": 0.1}
+            ),
+            "dataclass (slots, spool)": lambda index: MessageSendResult(
+                0, f"et-{index}", None, spool.add(response(index)), {"eric_seconds": 0.1}
+            ),
+        }
+        print(f"results with {args.response_kb} KiB responses, {args.records} records")
+        for name, build in results.items():
+            print(f"  {name:28s} {_measure(build, args.records):9.0f} bytes/record")
+        print(f"  spool file: {spool.spooled_bytes / (1024 * 1024):.1f} MiB on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark dictionary compression of archived ERiC/server responses.
+
+Usage:
+
+    python benchmarks/bench_response_compression.py --responses 5000 --train 500
+
+Generates a synthetic corpus of responses that differ only in tickets,
+timestamps and status codes, trains a dictionary on the first `--train`
+responses and compares per-record compression with and without it on the
+rest. Reports compression ratio and decode throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from elsterctl.infrastructure.archive.dictionary import train_dictionary  # noqa: E402
+
+_SERVER_TEMPLATE = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<Elster xmlns="http://www.elster.de/elsterxml/schema/v11">
+  <TransferHeader version="11">
+    <Verfahren>ElsterAnmeldung</Verfahren>
+    <DatenArt>UStVA</DatenArt>
+    <Vorgang>send-Auth</Vorgang>
+    <TransferTicket>{ticket}</TransferTicket>
+    <Testmerker>700000004</Testmerker>
+    <Empfaenger id="F"><Ziel>{office}</Ziel></Empfaenger>
+    <HerstellerID>74931</HerstellerID>
+    <DatenLieferant>elsterctl</DatenLieferant>
+    <EingangsDatum>{timestamp}</EingangsDatum>
+    <Datei>
+      <Verschluesselung>CMSEncryptedData</Verschluesselung>
+      <Kompression>GZIP</Kompression>
+      <TransportSchluessel/>
+    </Datei>
+    <RC><Rueckgabe><Code>0</Code><Text>Daten wurden erfolgreich angenommen.</Text></Rueckgabe></RC>
+    <VersionClient>41.2.8</VersionClient>
+  </TransferHeader>
+  <DatenTeil>
+    <Nutzdatenblock>
+      <NutzdatenHeader version="11">
+        <NutzdatenTicket>{nutzdaten_ticket}</NutzdatenTicket>
+        <Empfaenger id="F">{office}</Empfaenger>
+        <RC><Rueckgabe><Code>{code}</Code><Text>{text}</Text></Rueckgabe></RC>
+      </NutzdatenHeader>
+      <Nutzdaten/>
+    </Nutzdatenblock>
+  </DatenTeil>
+</Elster>
+"""
+
+_ERIC_TEMPLATE = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<EricBearbeiteVorgang xmlns="http://www.elster.de/EricXML/1.1/EricBearbeiteVorgang">
+  <Erfolg>
+    <Telenummer>{telenumber}</Telenummer>
+    <Ordnungsbegriff>{tax_number}</Ordnungsbegriff>
+  </Erfolg>
+</EricBearbeiteVorgang>
+"""
+
+_STATUS = [
+    (0, "Nutzdaten wurden erfolgreich verarbeitet."),
+    (571003, "Nutzdaten abgelehnt: Steuernummer ungueltig."),
+]
+
+
+def _corpus(count: int, seed: int) -> list[bytes]:
+    rng = random.Random(seed)
+    responses = []
+    for _ in range(count):
+        code, text = _STATUS[0] if rng.random() < 0.9 else _STATUS[1]
+        responses.append(
+            _SERVER_TEMPLATE.format(
+                ticket=f"et{rng.getrandbits(64):016x}",
+                office=f"{rng.randint(1000, 9999)}",
+                timestamp=f"2026{rng.randint(10**9, 10**10 - 1)}",
+                nutzdaten_ticket=rng.randint(1, 10**6),
+                code=code,
+                text=text,
+            ).encode("utf-8")
+        )
+        responses.append(
+            _ERIC_TEMPLATE.format(
+                telenumber=f"{rng.getrandbits(40):x}",
+                tax_number=f"{rng.randint(10**12, 10**13 - 1)}",
+            ).encode("utf-8")
+        )
+    return responses
+
+
+def _measure(responses, compress, decompress) -> tuple[float, float]:
+    compressed = [compress(response) for response in responses]
+    raw_bytes = sum(len(response) for response in responses)
+    started = time.perf_counter()
+    for blob in compressed:
+        decompress(blob)
+    elapsed = time.perf_counter() - started
+    ratio = raw_bytes / sum(len(blob) for blob in compressed)
+    return ratio, raw_bytes / elapsed / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", type=int, default=5000, help="Filings in the corpus.")
+    parser.add_argument("--train", type=int, default=500, help="Filings used for training.")
+    parser.add_argument("--level", type=int, default=6, help="zlib compression level.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = _corpus(args.responses, args.seed)
+    training, evaluation = corpus[: args.train * 2], corpus[args.train * 2 :]
+
+    started = time.perf_counter()
+    dictionary = train_dictionary(training)
+    train_seconds = time.perf_counter() - started
+
+    plain_ratio, plain_throughput = _measure(
+        evaluation,
+        lambda data: zlib.compress(data, args.level),
+        zlib.decompress,
+    )
+    dict_ratio, dict_throughput = _measure(
+        evaluation,
+        lambda data: dictionary.compress(data, args.level),
+        dictionary.decompress,
+    )
+
+    print(f"responses:        {len(evaluation)} (trained on {len(training)})")
+    print(f"dictionary:       {len(dictionary.data)} bytes in {train_seconds * 1000:.1f} ms")
+    print(f"zlib per record:  ratio {plain_ratio:5.2f}x  decode {plain_throughput:8.1f} MiB/s")
+    print(f"with dictionary:  ratio {dict_ratio:5.2f}x  decode {dict_throughput:8.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark ERiC transport backends on the same workload.
+
+Usage:
+
+    python benchmarks/bench_transports.py --sends 2000 --latency-ms 0
+
+Every backend runs the full `EricClient` stack against a replay library
+that answers with a fixed response after `--latency-ms`, so the numbers
+show the per-send overhead each transport adds (IPC, pickling, pooling).
+The Unix socket daemon runs in a thread of this process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from elsterctl.infrastructure.eric.client import EricClient  # noqa: E402
+from elsterctl.infrastructure.eric.replay import (  # noqa: E402
+    REPLAY_PLUGIN_PATH,
+    ReplayLibrary,
+    ReplayRecord,
+)
+from elsterctl.infrastructure.eric.session import EricSession  # noqa: E402
+from elsterctl.infrastructure.transport.base import EricTransport  # noqa: E402
+from elsterctl.infrastructure.transport.daemon import (  # noqa: E402
+    EricDaemon,
+    UnixSocketTransport,
+)
+from elsterctl.infrastructure.transport.local import (  # noqa: E402
+    InProcessTransport,
+    WorkerProcessTransport,
+)
+
+_SERVER_XML = "<Elster><TransferHeader><TransferTicket>et-1</TransferTicket></TransferHeader></Elster>"
+_LATENCY_SECONDS = 0.0
+
+
+def _replay_client() -> EricClient:
+    library = ReplayLibrary([ReplayRecord(0, "", _SERVER_XML, _LATENCY_SECONDS)])
+    return EricClient(library=library, plugin_path=REPLAY_PLUGIN_PATH)
+
+
+def _run(transport: EricTransport, sends: int, payload: bytes) -> list[float]:
+    request = {
+        "xml_payload": payload,
+        "data_type_version": "TH11",
+        "certificate_path": Path("cert.pfx"),
+        "certificate_pin": "1234",
+        "validate_before_send": True,
+    }
+    # The first send pays for initialization; it is not part of the result.
+    transport.send_xml_with_certificate(**request)
+    durations = []
+    for _ in range(sends):
+        started = time.perf_counter()
+        transport.send_xml_with_certificate(**request)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _report(name: str, durations: list[float]) -> None:
+    ordered = sorted(durations)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(
+        f"{name:12s} sends/s {len(durations) / sum(durations):9.0f}  "
+        f"p50 {statistics.median(ordered) * 1e6:8.1f} us  p95 {p95 * 1e6:8.1f} us"
+    )
+
+
+def main() -> None:
+    global _LATENCY_SECONDS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sends", type=int, default=2000, help="Sends per backend.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated ERiC latency.")
+    parser.add_argument("--payload-kb", type=int, default=8, help="XML payload size.")
+    args = parser.parse_args()
+    _LATENCY_SECONDS = args.latency_ms / 1000
+    payload = b"<Elster>" + b"x" * (args.payload_kb * 1024) + b"</Elster>"
+
+    session = EricSession(client_factory=_replay_client)
+    _report("in-process", _run(InProcessTransport(session), args.sends, payload))
+    session.close()
+
+    # Forked so that the worker inherits the simulated latency set above.
+    worker = WorkerProcessTransport(client_factory=_replay_client, start_method="fork")
+    try:
+        _report("subprocess", _run(worker, args.sends, payload))
+    finally:
+        worker.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        daemon_session = EricSession(client_factory=_replay_client)
+        daemon = EricDaemon(Path(directory) / "eric.sock", daemon_session)
+        daemon.start()
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        transport = UnixSocketTransport(daemon.socket_path)
+        try:
+            _report("unix-socket", _run(transport, args.sends, payload))
+        finally:
+            transport.close()
+            daemon.shutdown()
+            thread.join(5)
+            daemon_session.close()
+
+
+if __name__ == "__main__":
+    main()
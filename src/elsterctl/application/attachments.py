@@ -0,0 +1,220 @@
+"""Attachment embedding for ELSTER transfer XML payloads.
+
+Attachments are inlined as Base64 into the transfer XML. Documents can be
+large, so encoding streams fixed-size chunks from the source file directly
+into a preallocated payload buffer. Peak working memory is bounded by the
+chunk size and does not grow with the document size.
+"""
+
+from __future__ import annotations
+
+import binascii
+import mmap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable
+from xml.sax.saxutils import escape
+
+# Must be a multiple of 3 so that Base64 output of consecutive chunks
+# concatenates without intermediate padding.
+DEFAULT_CHUNK_SIZE = 3 * 64 * 1024
+
+DEFAULT_ANCHOR = b"</Nachricht>"
+
+_PDF_MAGIC = b"%PDF-"
+
+
+class AttachmentError(ValueError):
+    """Raised when attachments are invalid or exceed ELSTER size limits."""
+
+
+@dataclass(frozen=True)
+class AttachmentLimits:
+    """Size limits enforced before any attachment is read."""
+
+    max_count: int = 20
+    max_file_bytes: int = 10 * 1024 * 1024
+    max_total_bytes: int = 50 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Attachment:
+    """Validated attachment source file."""
+
+    path: Path
+    file_name: str
+    size: int
+
+    @property
+    def encoded_size(self) -> int:
+        return base64_length(self.size)
+
+
+def base64_length(size: int) -> int:
+    """Return the Base64 length of `size` input bytes (padding included)."""
+    return 4 * ((size + 2) // 3)
+
+
+def inspect_attachments(
+    paths: Iterable[Path],
+    limits: AttachmentLimits | None = None,
+) -> tuple[Attachment, ...]:
+    """Validate attachment files against limits without reading their content."""
+    effective_limits = limits or AttachmentLimits()
+    attachments: list[Attachment] = []
+    total_size = 0
+
+    for path in paths:
+        if not path.is_file():
+            raise AttachmentError(f"Attachment file not found: {path}")
+
+        size = path.stat().st_size
+        if size == 0:
+            raise AttachmentError(f"Attachment file is empty: {path}")
+        if size > effective_limits.max_file_bytes:
+            raise AttachmentError(
+                f"Attachment exceeds size limit ({size} > "
+                f"{effective_limits.max_file_bytes} bytes): {path}"
+            )
+
+        with path.open("rb") as handle:
+            if handle.read(len(_PDF_MAGIC)) != _PDF_MAGIC:
+                raise AttachmentError(f"Attachment is not a PDF document: {path}")
+
+        total_size += size
+        attachments.append(Attachment(path=path, file_name=path.name, size=size))
+
+    if len(attachments) > effective_limits.max_count:
+        raise AttachmentError(
+            f"Too many attachments ({len(attachments)} > {effective_limits.max_count})."
+        )
+    if total_size > effective_limits.max_total_bytes:
+        raise AttachmentError(
+            f"Attachments exceed total size limit ({total_size} > "
+            f"{effective_limits.max_total_bytes} bytes)."
+        )
+
+    return tuple(attachments)
+
+
+def embed_attachments(
+    xml_payload: bytes,
+    attachments: tuple[Attachment, ...],
+    *,
+    anchor: bytes = DEFAULT_ANCHOR,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_mmap: bool = True,
+) -> bytearray:
+    """Return a NUL-terminated payload with attachments inserted before `anchor`.
+
+    The returned buffer is allocated once at its final size and can be
+    handed to ERiC without further copies.
+    """
+    if chunk_size <= 0 or chunk_size % 3 != 0:
+        raise ValueError("chunk_size must be a positive multiple of 3.")
+
+    anchor_position = xml_payload.rfind(anchor)
+    if anchor_position < 0:
+        raise AttachmentError(
+            f"Cannot embed attachments: {anchor.decode('utf-8')} not found in XML payload."
+        )
+
+    elements = [attachment_tags(attachment.file_name) for attachment in attachments]
+    total_size = (
+        len(xml_payload)
+        + len(b"<Anhaenge></Anhaenge>")
+        + sum(len(head) + attachment.encoded_size + len(tail)
+              for (head, tail), attachment in zip(elements, attachments))
+        + 1
+    )
+
+    payload = bytearray(total_size)
+    position = _write(payload, 0, memoryview(xml_payload)[:anchor_position])
+    position = _write(payload, position, b"<Anhaenge>")
+
+    for (head, tail), attachment in zip(elements, attachments):
+        position = _write(payload, position, head)
+        position = _encode_file_into(payload, position, attachment, chunk_size, use_mmap)
+        position = _write(payload, position, tail)
+
+    position = _write(payload, position, b"</Anhaenge>")
+    position = _write(payload, position, memoryview(xml_payload)[anchor_position:])
+    payload[position] = 0
+    return payload
+
+
+def attachment_tags(file_name: str) -> tuple[bytes, bytes]:
+    """Return the markup before and after the Base64 content of a PDF attachment."""
+    head = (
+        "<Anhang>"
+        f"<Dateiname>{escape(file_name)}</Dateiname>"
+        "<Dateityp>PDF</Dateityp>"
+        "<Dateiinhalt>"
+    ).encode("utf-8")
+    return head, b"</Dateiinhalt></Anhang>"
+
+
+def _write(buffer: bytearray, position: int, data: bytes | memoryview) -> int:
+    end = position + len(data)
+    buffer[position:end] = data
+    return end
+
+
+def _encode_file_into(
+    payload: bytearray,
+    position: int,
+    attachment: Attachment,
+    chunk_size: int,
+    use_mmap: bool,
+) -> int:
+    end = position + attachment.encoded_size
+    with attachment.path.open("rb") as handle:
+        if use_mmap:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if len(mapped) != attachment.size:
+                    raise AttachmentError(f"Attachment changed while reading: {attachment.path}")
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, attachment.size, chunk_size):
+                        position = _write(
+                            payload,
+                            position,
+                            binascii.b2a_base64(view[offset : offset + chunk_size], newline=False),
+                        )
+                finally:
+                    view.release()
+        else:
+            position = _encode_stream_into(payload, position, handle, attachment.size, chunk_size)
+            if handle.read(1):
+                raise AttachmentError(f"Attachment changed while reading: {attachment.path}")
+
+    if position != end:
+        raise AttachmentError(f"Attachment changed while reading: {attachment.path}")
+    return position
+
+
+def _encode_stream_into(
+    payload: bytearray,
+    position: int,
+    handle: BinaryIO,
+    size: int,
+    chunk_size: int,
+) -> int:
+    chunk = bytearray(chunk_size)
+    view = memoryview(chunk)
+    remaining = size
+    while remaining > 0:
+        wanted = min(chunk_size, remaining)
+        filled = 0
+        while filled < wanted:
+            read = handle.readinto(view[filled:wanted])
+            if not read:
+                break
+            filled += read
+        if filled == 0:
+            break
+        position = _write(payload, position, binascii.b2a_base64(view[:filled], newline=False))
+        remaining -= filled
+        if filled < wanted:
+            break
+    return position
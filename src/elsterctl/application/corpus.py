@@ -0,0 +1,353 @@
+"""Synthetic ELSTER payload corpora for load and memory tests.
+
+`generate_corpus` yields Testmerker-flagged transfer documents of the
+supported data types, round-robin, with sizes drawn from a fixed, uniform
+or log-normal distribution. A document is padded to its drawn size with
+free text (`sonstige_nachricht`) or an XML comment (tax data types), and
+a share of the messages carry a PDF attachment embedded like
+`embed_attachments` does. Every document holds a unique `NutzdatenTicket`
+and amounts from a seeded generator, so a corpus is reproducible and its
+filings have distinct ledger keys.
+
+Documents are written on a single line, so a streamed corpus holds one
+filing per line. They are well-formed and their TransferHeader is
+complete, but the Nutzdaten are only shaped like real filings; they are
+meant for elsterctl's own paths (reading, header rewrite, spooling,
+batching, archiving), not for ERiC's plausibility checks.
+"""
+
+from __future__ import annotations
+
+import binascii
+import math
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+from xml.sax.saxutils import escape
+
+from elsterctl.application.attachments import attachment_tags
+from elsterctl.shared.testmerker import DEFAULT_TESTMERKER
+
+SIZE_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+DEFAULT_FILES_PER_DIR = 1000
+DEFAULT_HERSTELLER_ID = "74931"
+TEST_STEUERNUMMER = "9198011310010"
+MANIFEST_NAME = "manifest.txt"
+
+_LOGNORMAL_SIGMA = 0.75
+_SIZE = re.compile(r"^\s*(\d+)\s*([kKmM]?)(?:i?[bB])?\s*$")
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 * 1024}
+_WORDS = (
+    "Umsatz Vorsteuer Erstattung Zeitraum Anmeldung Nachricht Finanzamt Frist "
+    "Bescheid Einspruch Belege Rechnung Steuernummer Zahlung Hinweis Antrag "
+).split()
+
+
+class CorpusError(ValueError):
+    """Raised when a corpus cannot be generated as specified."""
+
+
+@dataclass(frozen=True)
+class DataType:
+    """A data type the generator can produce."""
+
+    name: str
+    verfahren: str
+    daten_art: str
+    # Only messages have the `</Nachricht>` anchor attachments go before.
+    attachments: bool = False
+
+
+DATA_TYPES = {
+    data_type.name: data_type
+    for data_type in (
+        DataType("sonstige_nachricht", "ElsterAnmeldung", "sonstige_nachricht", attachments=True),
+        DataType("UStVA", "ElsterAnmeldung", "UStVA"),
+        DataType("USt", "ElsterErklaerung", "USt"),
+        DataType("ESt", "ElsterErklaerung", "ESt"),
+    )
+}
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as `512`, `4k` or `2M` (binary units)."""
+    match = _SIZE.match(text)
+    if match is None:
+        raise CorpusError(f"Invalid size {text!r}: expected e.g. 512, 4k or 2m.")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+
+
+@dataclass(frozen=True)
+class SizeDistribution:
+    """Document sizes in bytes, attachments excluded.
+
+    `size` is the fixed size or the median. Draws are clamped to
+    `min_size`..`max_size`; for `uniform` these default to 50% and 150% of
+    `size`. A document is never smaller than its content without padding.
+    """
+
+    kind: str = "lognormal"
+    size: int = 4 * 1024
+    min_size: int | None = None
+    max_size: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.kind not in SIZE_DISTRIBUTIONS:
+            raise CorpusError(f"Unsupported size distribution: {self.kind}")
+        if self.size < 1:
+            raise CorpusError("size must be positive.")
+        if self.lower > self.upper:
+            raise CorpusError(f"min_size {self.lower} exceeds max_size {self.upper}.")
+
+    @property
+    def lower(self) -> int:
+        if self.min_size is not None:
+            return self.min_size
+        return self.size // 2 if self.kind == "uniform" else 0
+
+    @property
+    def upper(self) -> int | float:
+        if self.max_size is not None:
+            return self.max_size
+        return self.size * 3 // 2 if self.kind == "uniform" else math.inf
+
+    def sample(self, rng: random.Random) -> int:
+        if self.kind == "fixed":
+            return self.size
+        if self.kind == "uniform":
+            return rng.randint(self.lower, int(self.upper))
+        drawn = round(self.size * math.exp(rng.gauss(0.0, _LOGNORMAL_SIGMA)))
+        return int(min(max(drawn, self.lower), self.upper))
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """What to generate; the same spec and seed give the same corpus."""
+
+    count: int
+    data_types: tuple[str, ...] = tuple(DATA_TYPES)
+    sizes: SizeDistribution = SizeDistribution()
+    attachment_ratio: float = 0.0
+    attachment_size: int = 64 * 1024
+    seed: int = 0
+    testmerker: str = DEFAULT_TESTMERKER
+    hersteller_id: str = DEFAULT_HERSTELLER_ID
+    daten_lieferant: str = "elsterctl"
+
+    def __post_init__(self) -> None:
+        if self.count < 0:
+            raise CorpusError("count must not be negative.")
+        if not self.data_types:
+            raise CorpusError("At least one data type is required.")
+        unknown = [name for name in self.data_types if name not in DATA_TYPES]
+        if unknown:
+            raise CorpusError(f"Unsupported data type: {', '.join(unknown)}")
+        if not 0.0 <= self.attachment_ratio <= 1.0:
+            raise CorpusError("attachment_ratio must be between 0 and 1.")
+        if self.attachment_ratio and not any(
+            DATA_TYPES[name].attachments for name in self.data_types
+        ):
+            raise CorpusError("Attachments need the sonstige_nachricht data type.")
+        if self.attachment_size < len(_PDF_HEAD) + len(_PDF_TAIL):
+            raise CorpusError("attachment_size is too small for a PDF document.")
+
+
+@dataclass(frozen=True)
+class SyntheticFiling:
+    """One generated document."""
+
+    index: int
+    data_type: str
+    payload: bytes
+    attachments: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.index:07d}-{self.data_type}.xml"
+
+    def relative_path(self, files_per_dir: int = DEFAULT_FILES_PER_DIR) -> str:
+        """Return `<dir>/<name>`; directories hold `files_per_dir` files."""
+        return f"{self.index // files_per_dir:04d}/{self.name}"
+
+
+@dataclass(frozen=True)
+class CorpusSummary:
+    """Totals of a written or streamed corpus."""
+
+    filings: int
+    bytes: int
+    attachments: int
+    data_types: dict[str, int]
+    manifest_path: Path | None = None
+
+
+_PDF_HEAD = b"%PDF-1.4\n"
+_PDF_TAIL = b"\n%%EOF\n"
+
+
+def _filler(length: int) -> str:
+    """Return `length` characters of ASCII text; safe in text and comments."""
+    if length <= 0:
+        return ""
+    block = " ".join(_WORDS) + " "
+    return (block * (length // len(block) + 1))[:length]
+
+
+def synthetic_pdf(size: int) -> bytes:
+    """Return a `size`-byte document with PDF header and trailer."""
+    body = _filler(size - len(_PDF_HEAD) - len(_PDF_TAIL)).encode("ascii")
+    return _PDF_HEAD + body + _PDF_TAIL
+
+
+class _Builder:
+    def __init__(self, spec: CorpusSpec) -> None:
+        self._spec = spec
+        self._headers = {
+            name: (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<Elster xmlns="http://www.elster.de/elsterxml/schema/v11">'
+                '<TransferHeader version="11">'
+                f"<Verfahren>{data_type.verfahren}</Verfahren>"
+                f"<DatenArt>{data_type.daten_art}</DatenArt>"
+                "<Vorgang>send-Auth</Vorgang>"
+                f"<Testmerker>{escape(spec.testmerker)}</Testmerker>"
+                f"<HerstellerID>{escape(spec.hersteller_id)}</HerstellerID>"
+                f"<DatenLieferant>{escape(spec.daten_lieferant)}</DatenLieferant>"
+                "</TransferHeader><DatenTeil><Nutzdatenblock>"
+                '<NutzdatenHeader version="11"><NutzdatenTicket>'
+            )
+            for name, data_type in DATA_TYPES.items()
+        }
+        self._attachment: str | None = None
+
+    def attachment(self, index: int) -> str:
+        if self._attachment is None:
+            # Encoded once: the content is the same for every filing.
+            content = synthetic_pdf(self._spec.attachment_size)
+            self._attachment = binascii.b2a_base64(content, newline=False).decode("ascii")
+        head, tail = attachment_tags(f"anlage-{index:07d}.pdf")
+        return f"<Anhaenge>{head.decode()}{self._attachment}{tail.decode()}</Anhaenge>"
+
+    def build(self, index: int, data_type: str, size: int, rng: random.Random, attach: bool) -> str:
+        opening = (
+            f"{self._headers[data_type]}{index:031d}</NutzdatenTicket></NutzdatenHeader>"
+            "<Nutzdaten>"
+        )
+        before, after = self._nutzdaten(data_type, index, rng)
+        closing = "</Nutzdaten></Nutzdatenblock></DatenTeil></Elster>\n"
+        padding = _filler(size - len(opening) - len(before) - len(after) - len(closing))
+        if attach:
+            # Before the `</Nachricht>` anchor, as `embed_attachments` inserts it.
+            after = after.replace("</Nachricht>", f"{self.attachment(index)}</Nachricht>")
+        return f"{opening}{before}{padding}{after}{closing}"
+
+    def _nutzdaten(self, data_type: str, index: int, rng: random.Random) -> tuple[str, str]:
+        """Return the Nutzdaten before and after the padding."""
+        if data_type == "sonstige_nachricht":
+            return (
+                f"<Nachricht><Betreff>Synthetic filing {index}</Betreff><Text>",
+                "</Text></Nachricht>",
+            )
+        amount = rng.randint(100, 250_000)
+        tax = f"{amount * 0.19:.2f}"
+        if data_type == "UStVA":
+            content = (
+                '<Anmeldungssteuern art="UStVA" version="202601">'
+                "<Erstellungsdatum>20260101</Erstellungsdatum><Steuerfall>"
+                "<Umsatzsteuervoranmeldung><Jahr>2026</Jahr>"
+                f"<Zeitraum>{index % 12 + 1:02d}</Zeitraum>"
+                f"<Steuernummer>{TEST_STEUERNUMMER}</Steuernummer>"
+                f"<Kz81>{amount}</Kz81><Kz83>{tax}</Kz83></Umsatzsteuervoranmeldung>"
+                "</Steuerfall></Anmeldungssteuern>"
+            )
+        else:
+            content = (
+                f'<Erklaerung art="{data_type}" version="2025"><Steuerfall>'
+                f"<Jahr>2025</Jahr><Steuernummer>{TEST_STEUERNUMMER}</Steuernummer>"
+                f"<Betrag>{amount}</Betrag><Steuer>{tax}</Steuer>"
+                "</Steuerfall></Erklaerung>"
+            )
+        return f"{content}<!-- ", " -->"
+
+
+def generate_corpus(spec: CorpusSpec) -> Iterator[SyntheticFiling]:
+    """Yield the documents of `spec`, one at a time."""
+    rng = random.Random(spec.seed)
+    builder = _Builder(spec)
+    for index in range(spec.count):
+        data_type = spec.data_types[index % len(spec.data_types)]
+        attach = DATA_TYPES[data_type].attachments and rng.random() < spec.attachment_ratio
+        size = spec.sizes.sample(rng)
+        payload = builder.build(index, data_type, size, rng, attach).encode("utf-8")
+        yield SyntheticFiling(index, data_type, payload, int(attach))
+
+
+class _Tally:
+    def __init__(self) -> None:
+        self.filings = 0
+        self.bytes = 0
+        self.attachments = 0
+        self.data_types: dict[str, int] = {}
+
+    def add(self, filing: SyntheticFiling) -> None:
+        self.filings += 1
+        self.bytes += len(filing.payload)
+        self.attachments += filing.attachments
+        self.data_types[filing.data_type] = self.data_types.get(filing.data_type, 0) + 1
+
+    def summary(self, manifest_path: Path | None = None) -> CorpusSummary:
+        return CorpusSummary(
+            self.filings, self.bytes, self.attachments, dict(self.data_types), manifest_path
+        )
+
+
+def write_corpus(
+    spec: CorpusSpec,
+    output_dir: Path,
+    *,
+    files_per_dir: int = DEFAULT_FILES_PER_DIR,
+    on_filing: Callable[[SyntheticFiling], None] | None = None,
+) -> CorpusSummary:
+    """Write one file per filing plus a `manifest.txt` for `send-batch --manifest`.
+
+    Files are spread over subdirectories of `files_per_dir` files, so a
+    corpus of a million filings does not end up in one directory.
+    """
+    if files_per_dir < 1:
+        raise CorpusError("files_per_dir must be positive.")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    tally = _Tally()
+    directory: Path | None = None
+    with manifest_path.open("w", encoding="utf-8") as manifest:
+        for filing in generate_corpus(spec):
+            relative_path = filing.relative_path(files_per_dir)
+            path = output_dir / relative_path
+            if path.parent != directory:
+                directory = path.parent
+                directory.mkdir(exist_ok=True)
+            path.write_bytes(filing.payload)
+            manifest.write(relative_path + "\n")
+            tally.add(filing)
+            if on_filing is not None:
+                on_filing(filing)
+    return tally.summary(manifest_path)
+
+
+def stream_corpus(
+    spec: CorpusSpec,
+    stream: BinaryIO,
+    *,
+    on_filing: Callable[[SyntheticFiling], None] | None = None,
+) -> CorpusSummary:
+    """Write the filings to `stream`, one document per line."""
+    tally = _Tally()
+    for filing in generate_corpus(spec):
+        stream.write(filing.payload)
+        tally.add(filing)
+        if on_filing is not None:
+            on_filing(filing)
+    stream.flush()
+    return tally.summary()
@@ -0,0 +1,204 @@
+"""Rate limiting and adaptive concurrency for outbound submissions.
+
+`SubmissionThrottle` combines a token bucket (upper bound on submissions
+per second) with an AIMD controller: every successful send raises the
+concurrency limit and the rate additively, every congestion signal
+(transfer errors that indicate an overloaded or unreachable ELSTER
+server) cuts both multiplicatively. Under sustained load this settles
+close to the highest throughput the server accepts without manual tuning.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from elsterctl.infrastructure.eric.error_catalog import ErrorClass
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+
+
+def is_congestion_signal(error: BaseException) -> bool:
+    """Return True if `error` should make the throttle back off."""
+    return isinstance(error, EricProcessingError) and error.error_class is ErrorClass.RETRYABLE
+
+
+# Refill arithmetic accumulates rounding errors; without a tolerance a
+# bucket can get stuck just below one token.
+_TOKEN_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an adjustable refill rate."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()
+            self._rate = rate
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1 - _TOKEN_EPSILON:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1 - _TOKEN_EPSILON:
+                    self._tokens -= 1
+                    return waited
+                delay = max((1 - self._tokens) / self._rate, _TOKEN_EPSILON)
+            self._sleep(delay)
+            waited += delay
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+
+@dataclass(frozen=True)
+class ThrottleMetrics:
+    """Snapshot of the throttle state."""
+
+    rate: float | None
+    max_rate: float | None
+    limit: float
+    max_limit: int
+    in_flight: int
+    successes: int
+    congestion_signals: int
+    throttled_seconds: float
+
+
+class SubmissionThrottle:
+    """Token bucket plus AIMD concurrency limit in front of ERiC sends."""
+
+    def __init__(
+        self,
+        *,
+        max_rate: float | None = None,
+        burst: float = 1.0,
+        max_concurrency: int = 1,
+        min_rate: float = 0.1,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1.")
+        self._bucket = (
+            TokenBucket(max_rate, burst, clock=clock, sleep=sleep) if max_rate else None
+        )
+        self._max_rate = max_rate
+        self._min_rate = min(min_rate, max_rate) if max_rate else min_rate
+        self._max_limit = max_concurrency
+        self._limit = float(max_concurrency)
+        self._additive_increase = additive_increase
+        self._decrease_factor = decrease_factor
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._successes = 0
+        self._congestion_signals = 0
+        self._throttled_seconds = 0.0
+        self._last_decrease_at = float("-inf")
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Admit one submission; the outcome of the block feeds the controller."""
+        started = self._acquire()
+        try:
+            yield
+        except BaseException as exc:
+            self._release(started, congested=is_congestion_signal(exc), succeeded=False)
+            raise
+        self._release(started, congested=False, succeeded=True)
+
+    def metrics(self) -> ThrottleMetrics:
+        with self._condition:
+            return ThrottleMetrics(
+                rate=self._bucket.rate if self._bucket else None,
+                max_rate=self._max_rate,
+                limit=self._limit,
+                max_limit=self._max_limit,
+                in_flight=self._in_flight,
+                successes=self._successes,
+                congestion_signals=self._congestion_signals,
+                throttled_seconds=self._throttled_seconds,
+            )
+
+    def _acquire(self) -> float:
+        waited_from = self._clock()
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        if self._bucket is not None:
+            self._bucket.acquire()
+        started = self._clock()
+        with self._condition:
+            self._throttled_seconds += started - waited_from
+        return started
+
+    def _release(self, started: float, *, congested: bool, succeeded: bool) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if congested:
+                self._congestion_signals += 1
+                # Requests that started before the last cut saw the old
+                # limit; one congestion episode only cuts once.
+                if started >= self._last_decrease_at:
+                    self._decrease()
+                    self._last_decrease_at = self._clock()
+            elif succeeded:
+                self._successes += 1
+                self._increase()
+            self._condition.notify_all()
+
+    def _increase(self) -> None:
+        # Classic AIMD: +1 per window, spread over `limit` successes.
+        self._limit = min(
+            float(self._max_limit), self._limit + self._additive_increase / max(self._limit, 1.0)
+        )
+        if self._bucket is not None and self._max_rate is not None:
+            step = self._additive_increase * self._max_rate / 100
+            self._bucket.set_rate(min(self._max_rate, self._bucket.rate + step))
+
+    def _decrease(self) -> None:
+        self._limit = max(1.0, self._limit * self._decrease_factor)
+        if self._bucket is not None:
+            self._bucket.set_rate(max(self._min_rate, self._bucket.rate * self._decrease_factor))
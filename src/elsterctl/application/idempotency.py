@@ -0,0 +1,63 @@
+"""Idempotency keys for ELSTER submissions.
+
+A submission key identifies *what* is filed, not the exact bytes: two
+payloads for the same data type, tax number, period, Testmerker and
+correction flag are the same filing even if regeneration changed
+whitespace, the NutzdatenTicket or the creation date. Payloads without a
+tax number and period (e.g. Sonstige Nachrichten) fall back to a digest of
+their canonicalized Nutzdaten.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import xml.etree.ElementTree as ET
+
+_KEY_FIELDS = {
+    "DatenArt": "data_type",
+    "Testmerker": "test_marker",
+    "Steuernummer": "tax_number",
+    "StNr": "tax_number",
+    "Jahr": "year",
+    "Zeitraum": "period",
+    "Kz10": "correction",
+}
+
+
+class DuplicateSubmissionError(ValueError):
+    """Raised when a submission with an unknown outcome would be repeated."""
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def submission_key(xml_payload: bytes | memoryview) -> str:
+    """Return the canonical idempotency key of a transfer XML payload."""
+    try:
+        root = ET.fromstring(xml_payload)
+    except ET.ParseError as exc:
+        raise ValueError(f"Cannot derive submission key from invalid XML: {exc}") from exc
+
+    fields: dict[str, str] = {}
+    nutzdaten: list[ET.Element] = []
+    for element in root.iter():
+        name = _local_name(element.tag)
+        if name == "Nutzdaten":
+            nutzdaten.append(element)
+        field_name = _KEY_FIELDS.get(name)
+        if field_name and field_name not in fields:
+            fields[field_name] = (element.text or "").strip()
+
+    if not any(fields.get(name) for name in ("tax_number", "year", "period")):
+        digest = hashlib.sha256()
+        for element in nutzdaten:
+            digest.update(
+                ET.canonicalize(ET.tostring(element, encoding="unicode"), strip_text=True).encode(
+                    "utf-8"
+                )
+            )
+        fields["content"] = digest.hexdigest()
+
+    canonical = "\n".join(f"{name}={fields[name]}" for name in sorted(fields))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,234 @@
+"""Application service for pipelined batch transmission of messages."""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable
+
+from elsterctl.application.message_send import (
+    MessageSendRequest,
+    MessageSendResult,
+    MessageSendService,
+    PreparedSubmission,
+)
+from elsterctl.application.pipeline import Pipeline, PipelineItem, Stage, StageStats
+from elsterctl.application.scheduling import (
+    ClassLatency,
+    PriorityClass,
+    ScheduledItem,
+    SubmissionScheduler,
+)
+from elsterctl.application.transfer_header import HeaderStamp, stamp_payload
+from elsterctl.infrastructure.metrics.instruments import unwatch_pipeline, watch_pipeline
+
+
+@dataclass(slots=True)
+class _BatchEntry:
+    index: int
+    request: MessageSendRequest
+    scheduled: ScheduledItem[_BatchEntry] | None = None
+    xml_payload: bytes | None = None
+    prepared: PreparedSubmission | None = None
+    result: MessageSendResult | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BatchOutcome:
+    """Outcome of a single filing within a batch."""
+
+    index: int
+    request: MessageSendRequest
+    result: MessageSendResult | None
+    error: BaseException | None = None
+    failed_stage: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.result is not None and self.result.result_code == 0
+
+
+@dataclass(frozen=True)
+class BatchReport:
+    """Summary of a finished batch run."""
+
+    succeeded: int
+    failed: int
+    elapsed_seconds: float
+    stages: list[StageStats]
+    priority_classes: list[ClassLatency] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestEntry:
+    """One manifest line: an XML path with optional scheduling hints."""
+
+    path: Path
+    priority_class: str | None = None
+    deadline: date | None = None
+
+
+_MANIFEST_HINT = re.compile(r"\s+(priority|deadline)=(\S+)$")
+
+
+def read_manifest_entries(manifest_path: Path) -> list[ManifestEntry]:
+    """Read XML paths and scheduling hints from a manifest file.
+
+    Each line holds a path, optionally followed by `priority=<class>` and
+    `deadline=<YYYY-MM-DD>`. Blank lines and lines starting with `#` are
+    ignored. Relative paths are resolved against the manifest's directory.
+    """
+    base_dir = manifest_path.parent
+    entries: list[ManifestEntry] = []
+    lines = manifest_path.read_text(encoding="utf-8").splitlines()
+    for number, line in enumerate(lines, start=1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        hints: dict[str, str] = {}
+        while match := _MANIFEST_HINT.search(text):
+            hints.setdefault(match.group(1), match.group(2))
+            text = text[: match.start()]
+        try:
+            priority_class = (
+                PriorityClass(hints["priority"]).value if "priority" in hints else None
+            )
+            deadline = date.fromisoformat(hints["deadline"]) if "deadline" in hints else None
+        except ValueError as exc:
+            raise ValueError(f"Invalid manifest entry {manifest_path}:{number}: {exc}") from exc
+        path = Path(text)
+        entries.append(
+            ManifestEntry(
+                path=path if path.is_absolute() else base_dir / path,
+                priority_class=priority_class,
+                deadline=deadline,
+            )
+        )
+    return entries
+
+
+def read_manifest(manifest_path: Path) -> list[Path]:
+    """Read XML paths from a manifest file (one path per line)."""
+    return [entry.path for entry in read_manifest_entries(manifest_path)]
+
+
+class MessageBatchService:
+    """Runs message submissions through a reader/preparer/ERiC/writer pipeline.
+
+    The ERiC stage uses a single worker by default so that native calls stay
+    on one thread; reading and preparing the next filings overlaps each send.
+    More ERiC workers only help with execution backends that isolate native
+    calls from each other.
+
+    With a scheduler, filings enter the pipeline by priority class and
+    deadline instead of in request order. With a header stamp, the reader
+    rewrites each payload's TransferHeader before it is validated.
+    """
+
+    def __init__(
+        self,
+        send_service: MessageSendService | None = None,
+        *,
+        queue_size: int = 4,
+        preparer_workers: int = 1,
+        eric_workers: int = 1,
+        scheduler: SubmissionScheduler[_BatchEntry] | None = None,
+        header_stamp: HeaderStamp | None = None,
+    ) -> None:
+        self._send_service = send_service or MessageSendService()
+        self._queue_size = queue_size
+        self._preparer_workers = preparer_workers
+        self._eric_workers = eric_workers
+        self._scheduler = scheduler
+        self._header_stamp = header_stamp
+        self._pipeline: Pipeline | None = None
+
+    def run(
+        self,
+        requests: Iterable[MessageSendRequest],
+        on_outcome: Callable[[BatchOutcome], None],
+    ) -> BatchReport:
+        counts = {"succeeded": 0, "failed": 0}
+
+        def write(item: PipelineItem) -> None:
+            entry: _BatchEntry = item.value
+            if entry.scheduled is not None:
+                self._scheduler.complete(entry.scheduled)
+            outcome = BatchOutcome(
+                index=entry.index,
+                request=entry.request,
+                result=entry.result,
+                error=item.error,
+                failed_stage=item.failed_stage,
+            )
+            counts["succeeded" if outcome.succeeded else "failed"] += 1
+            on_outcome(outcome)
+
+        self._pipeline = Pipeline(
+            [
+                Stage("reader", self._read),
+                Stage("preparer", self._prepare, workers=self._preparer_workers),
+                Stage("eric", self._execute, workers=self._eric_workers),
+            ],
+            Stage("writer", write),
+            queue_size=self._queue_size,
+        )
+        watch_pipeline(self._pipeline)
+
+        started = time.perf_counter()
+        entries = (
+            _BatchEntry(index=index, request=request) for index, request in enumerate(requests)
+        )
+        try:
+            stages = self._pipeline.run(self._schedule(entries))
+        finally:
+            unwatch_pipeline(self._pipeline)
+        return BatchReport(
+            succeeded=counts["succeeded"],
+            failed=counts["failed"],
+            elapsed_seconds=time.perf_counter() - started,
+            stages=stages,
+            priority_classes=(
+                self._scheduler.latency_by_class() if self._scheduler is not None else []
+            ),
+        )
+
+    def stage_stats(self) -> list[StageStats]:
+        """Return live per-stage statistics of the current or last run."""
+        if self._pipeline is None:
+            return []
+        return self._pipeline.stats()
+
+    def _schedule(self, entries: Iterable[_BatchEntry]) -> Iterable[_BatchEntry]:
+        if self._scheduler is None:
+            return entries
+        for entry in entries:
+            entry.scheduled = self._scheduler.push(
+                entry, entry.request.priority_class, entry.request.deadline
+            )
+        return (scheduled.value for scheduled in self._scheduler.drain())
+
+    def _read(self, entry: _BatchEntry) -> _BatchEntry:
+        if not entry.request.xml_path.exists():
+            raise ValueError(f"XML file not found: {entry.request.xml_path}")
+        entry.xml_payload = entry.request.xml_path.read_bytes()
+        if self._header_stamp is not None:
+            entry.xml_payload = stamp_payload(entry.xml_payload, self._header_stamp)
+        return entry
+
+    def _prepare(self, entry: _BatchEntry) -> _BatchEntry:
+        entry.prepared = self._send_service.prepare(entry.request, entry.xml_payload)
+        entry.xml_payload = None
+        return entry
+
+    def _execute(self, entry: _BatchEntry) -> _BatchEntry:
+        # The payload is released as soon as ERiC is done with it so that
+        # queued results do not pin large buffers.
+        prepared, entry.prepared = entry.prepared, None
+        if entry.scheduled is not None:
+            self._scheduler.dispatched(entry.scheduled)
+        entry.result = self._send_service.submit(prepared)
+        return entry
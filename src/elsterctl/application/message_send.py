@@ -2,14 +2,40 @@
 
 from __future__ import annotations
 
-import os
-from dataclasses import dataclass
+import hashlib
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date
 from pathlib import Path
 
+from elsterctl.application.attachments import (
+    AttachmentLimits,
+    embed_attachments,
+    inspect_attachments,
+)
+from elsterctl.application.flow_control import SubmissionThrottle
+from elsterctl.application.idempotency import DuplicateSubmissionError, submission_key
+from elsterctl.domain.filings import ArchivedXml, XmlRef, XmlSpool, inline_xml
+from elsterctl.infrastructure.archive.store import SubmissionArchive
 from elsterctl.infrastructure.eric.client import EricClient, EricSubmitResult
+from elsterctl.infrastructure.eric.error_catalog import ErrorClass
+from elsterctl.infrastructure.eric.errors import (
+    EricError,
+    EricProcessingError,
+    EricShutdownError,
+)
+from elsterctl.infrastructure.ledger.store import PENDING, SUCCEEDED, SubmissionLedger
+from elsterctl.infrastructure.metrics.instruments import record_failure, record_submission
+from elsterctl.infrastructure.pin.providers import (
+    EnvPinProvider,
+    PinCache,
+    PinProvider,
+    SecretPin,
+)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MessageSendRequest:
     """Input data for message transmission."""
 
@@ -19,55 +45,265 @@ class MessageSendRequest:
     data_type_version: str
     transfer_mode: str
     validate_before_send: bool
+    attachment_paths: tuple[Path, ...] = ()
+    allow_resubmit: bool = False
+    # Scheduling hints for batches: "urgent", "normal" or "bulk".
+    priority_class: str = "normal"
+    deadline: date | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MessageSendResult:
-    """Result of a message transmission."""
+    """Result of a message transmission.
+
+    Response documents are held as references (inline, spooled or archived)
+    and only read through `eric_response_xml`/`server_response_xml`.
+    """
 
     result_code: int
     transfer_ticket: str | None
-    eric_response_xml: str
-    server_response_xml: str
+    eric_response: XmlRef | None
+    server_response: XmlRef | None
+    timings: dict[str, float] = field(default_factory=dict)
+    deduplicated: bool = False
+
+    @property
+    def eric_response_xml(self) -> str:
+        return self.eric_response.read() if self.eric_response is not None else ""
+
+    @property
+    def server_response_xml(self) -> str:
+        return self.server_response.read() if self.server_response is not None else ""
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedSubmission:
+    """Validated request with its final payload, ready for transmission."""
+
+    request: MessageSendRequest
+    xml_payload: bytes | bytearray
+    certificate_pin: SecretPin = field(repr=False)
+    payload_digest: str
+    prepare_seconds: float = 0.0
+    submission_key: str | None = None
+
+
+def _refused_before_sending(error: EricProcessingError) -> bool:
+    """True if the filing cannot have reached ELSTER.
+
+    Transfer errors such as a timeout, and a failed shutdown after
+    processing succeeded, leave the outcome unknown; those keys stay
+    pending in the ledger.
+    """
+    if isinstance(error, EricShutdownError):
+        return False
+    return error.error_class is not ErrorClass.RETRYABLE
 
 
 class MessageSendService:
     """Coordinates message send workflow between CLI and ERiC client."""
 
-    def __init__(self, eric_client_factory: type[EricClient] = EricClient) -> None:
+    def __init__(
+        self,
+        eric_client_factory: type[EricClient] = EricClient,
+        attachment_limits: AttachmentLimits | None = None,
+        ledger: SubmissionLedger | None = None,
+        throttle: SubmissionThrottle | None = None,
+        archive: SubmissionArchive | None = None,
+        pin_provider: PinProvider | None = None,
+        pin_cache: PinCache | None = None,
+        response_spool: XmlSpool | None = None,
+    ) -> None:
         self._eric_client_factory = eric_client_factory
+        self._attachment_limits = attachment_limits
+        self._ledger = ledger
+        self._throttle = throttle
+        self._archive = archive
+        self._pin_provider = pin_provider
+        self._pin_cache = pin_cache
+        self._response_spool = response_spool
 
     def send(self, request: MessageSendRequest) -> MessageSendResult:
-        if not request.xml_path.exists():
+        return self.submit(self.prepare(request))
+
+    def prepare(
+        self,
+        request: MessageSendRequest,
+        xml_payload: bytes | None = None,
+    ) -> PreparedSubmission:
+        """Validate a request and build the final payload without calling ERiC.
+
+        `xml_payload` can be passed when the file was already read, e.g. by
+        the reader stage of a batch pipeline.
+        """
+        started = time.perf_counter()
+        if xml_payload is None and not request.xml_path.exists():
             raise ValueError(f"XML file not found: {request.xml_path}")
         if not request.certificate_path.exists():
             raise ValueError(f"Certificate file not found: {request.certificate_path}")
 
-        cert_pin = os.getenv(request.pin_env_var)
-        if not cert_pin:
-            raise ValueError(
-                f"Certificate PIN not set. Export environment variable: {request.pin_env_var}"
-            )
+        cert_pin = self.resolve_pin(request)
+
+        # Attachments are validated before the payload is read so that
+        # oversized submissions fail fast.
+        attachments = inspect_attachments(request.attachment_paths, self._attachment_limits)
 
-        xml_payload = request.xml_path.read_text(encoding="utf-8")
+        payload: bytes | bytearray = (
+            xml_payload if xml_payload is not None else request.xml_path.read_bytes()
+        )
 
-        if request.transfer_mode == "test" and "<Testmerker>" not in xml_payload:
+        if request.transfer_mode == "test" and b"<Testmerker>" not in payload:
             raise ValueError(
                 "Test transfer mode requires a <Testmerker> in the XML transfer header."
             )
 
-        eric_client = self._eric_client_factory()
-        submit_result: EricSubmitResult = eric_client.send_xml_with_certificate(
-            xml_payload=xml_payload,
-            data_type_version=request.data_type_version,
-            certificate_path=request.certificate_path,
+        if attachments:
+            payload = embed_attachments(payload, attachments)
+
+        # Key and digest cover the attachments; the NUL terminator is not content.
+        content = memoryview(payload)[:-1] if attachments else payload
+        payload_digest = hashlib.sha256(content).hexdigest()
+        key = submission_key(content) if self._ledger is not None else None
+
+        return PreparedSubmission(
+            request=request,
+            xml_payload=payload,
             certificate_pin=cert_pin,
-            validate_before_send=request.validate_before_send,
+            payload_digest=payload_digest,
+            prepare_seconds=time.perf_counter() - started,
+            submission_key=key,
         )
 
+    def resolve_pin(self, request: MessageSendRequest) -> SecretPin:
+        """Return the certificate PIN, from the session cache when available.
+
+        Without an explicit provider the PIN comes from `request.pin_env_var`.
+        """
+        provider = self._pin_provider or EnvPinProvider(request.pin_env_var)
+        if self._pin_cache is not None:
+            pin = self._pin_cache.resolve(request.certificate_path, provider)
+        else:
+            pin = provider.resolve(request.certificate_path)
+        if pin is None:
+            raise ValueError(f"Certificate PIN not set. {provider.hint}")
+        return pin
+
+    def submit(self, prepared: PreparedSubmission) -> MessageSendResult:
+        """Transmit a prepared submission via ERiC.
+
+        Accepted filings are appended to the archive, if one is configured.
+        With a ledger, a submission that already succeeded is answered from
+        the ledger without calling ERiC, and one whose outcome is unknown
+        (e.g. after a crash, a transfer timeout or a failed shutdown) is
+        refused unless `allow_resubmit` is set.
+        Responses of an archived filing are referenced in the archive, others
+        are written to the response spool, if one is configured.
+        PINs not owned by a session cache are wiped afterwards.
+        """
+        try:
+            return self._submit(prepared)
+        finally:
+            if self._pin_cache is None:
+                prepared.certificate_pin.wipe()
+
+    def _submit(self, prepared: PreparedSubmission) -> MessageSendResult:
+        request = prepared.request
+        key = prepared.submission_key
+        if self._ledger is not None and key is not None:
+            replayed = self._claim(prepared, key)
+            if replayed is not None:
+                return replayed
+
+        try:
+            eric_client = self._eric_client_factory()
+        except EricError:
+            # Nothing was sent; release the claim for a later retry.
+            if self._ledger is not None and key is not None:
+                self._ledger.fail(key, None)
+            raise
+
+        throttle_slot = self._throttle.slot() if self._throttle is not None else nullcontext()
+        try:
+            with throttle_slot:
+                submit_result: EricSubmitResult = eric_client.send_xml_with_certificate(
+                    xml_payload=prepared.xml_payload,
+                    data_type_version=request.data_type_version,
+                    certificate_path=request.certificate_path,
+                    certificate_pin=prepared.certificate_pin,
+                    validate_before_send=request.validate_before_send,
+                )
+        except EricProcessingError as exc:
+            record_failure(exc.result_code)
+            if self._pin_cache is not None and exc.error_class is ErrorClass.CERTIFICATE:
+                # A rejected PIN must not be reused for the rest of the session.
+                self._pin_cache.evict(request.certificate_path, prepared.certificate_pin)
+            if self._ledger is not None and key is not None and _refused_before_sending(exc):
+                self._ledger.fail(key, exc.result_code)
+            raise
+        except EricError:
+            record_failure(None)
+            raise
+        record_submission(submit_result.result_code, submit_result.timings)
+
+        if self._ledger is not None and key is not None:
+            self._ledger.complete(key, submit_result.result_code, submit_result.transfer_ticket)
+
+        timings = {"prepare": prepared.prepare_seconds, **submit_result.timings}
+        if self._archive is not None and submit_result.transfer_ticket:
+            archive_started = time.perf_counter()
+            self._archive.append(
+                submit_result.transfer_ticket,
+                prepared.xml_payload,
+                submit_result.eric_response_xml,
+                submit_result.server_response_xml,
+                result_code=submit_result.result_code,
+            )
+            timings["archive"] = time.perf_counter() - archive_started
+            return MessageSendResult(
+                result_code=submit_result.result_code,
+                transfer_ticket=submit_result.transfer_ticket,
+                eric_response=self._archived(submit_result, "eric"),
+                server_response=self._archived(submit_result, "server"),
+                timings=timings,
+            )
+
+        store = self._response_spool.add if self._response_spool is not None else inline_xml
         return MessageSendResult(
             result_code=submit_result.result_code,
             transfer_ticket=submit_result.transfer_ticket,
-            eric_response_xml=submit_result.eric_response_xml,
-            server_response_xml=submit_result.server_response_xml,
+            eric_response=store(submit_result.eric_response_xml),
+            server_response=store(submit_result.server_response_xml),
+            timings=timings,
         )
+
+    def _archived(self, submit_result: EricSubmitResult, kind: str) -> XmlRef | None:
+        """Reference a response of a filing that was just archived."""
+        if not getattr(submit_result, f"{kind}_response_xml"):
+            return None
+        return ArchivedXml(self._archive, submit_result.transfer_ticket, kind)
+
+    def _claim(self, prepared: PreparedSubmission, key: str) -> MessageSendResult | None:
+        force = prepared.request.allow_resubmit
+        if not force:
+            entry = self._ledger.lookup(key)
+            if entry is not None and entry.status == SUCCEEDED:
+                return MessageSendResult(
+                    result_code=entry.result_code or 0,
+                    transfer_ticket=entry.transfer_ticket,
+                    eric_response=None,
+                    server_response=None,
+                    deduplicated=True,
+                )
+            if entry is not None and entry.status == PENDING:
+                raise DuplicateSubmissionError(
+                    f"Submission {prepared.request.xml_path} was started before but its "
+                    "outcome is unknown. Check the transfer status and resubmit with "
+                    "--allow-resubmit if it did not reach ELSTER."
+                )
+
+        if not self._ledger.begin(key, prepared.payload_digest, force=force):
+            # Another process claimed the key between lookup and begin.
+            raise DuplicateSubmissionError(
+                f"Submission {prepared.request.xml_path} is already in progress or completed."
+            )
+        return None
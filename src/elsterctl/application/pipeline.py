@@ -0,0 +1,205 @@
+"""Staged pipeline with bounded queues between stages.
+
+Each stage runs in its own worker thread(s) and hands items to the next
+stage through a bounded queue. Blocking native ERiC calls release the GIL,
+so Python-side preparation of item N+1 overlaps the transmission of item N.
+Bounded queues provide back-pressure: a slow stage stalls its producers
+instead of letting pending payloads accumulate in memory.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+_DONE = object()
+
+
+@dataclass(slots=True)
+class PipelineItem:
+    """Item travelling through the pipeline.
+
+    Once a stage fails, `error` and `failed_stage` are set and the
+    remaining stages are skipped; the sink still receives the item.
+    """
+
+    index: int
+    value: Any
+    error: BaseException | None = None
+    failed_stage: str | None = None
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Pipeline stage definition.
+
+    Regular stages map a value to the value passed to the next stage. The
+    sink stage receives the whole `PipelineItem`, including failed ones.
+    """
+
+    name: str
+    handler: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass(frozen=True)
+class StageStats:
+    """Point-in-time statistics for one stage."""
+
+    name: str
+    workers: int
+    processed: int
+    failed: int
+    busy_seconds: float
+    queue_depth: int
+    max_queue_depth: int
+    occupancy: float
+
+
+class _StageRuntime:
+    def __init__(self, stage: Stage, queue_size: int) -> None:
+        self.stage = stage
+        self.inbox: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self.active_workers = stage.workers
+
+    def put(self, item: Any) -> None:
+        self.inbox.put(item)
+        depth = self.inbox.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        with self.lock:
+            self.processed += 1
+            self.busy_seconds += elapsed
+            if failed:
+                self.failed += 1
+
+    def retire_worker(self) -> bool:
+        """Return True when the last worker of this stage exits."""
+        with self.lock:
+            self.active_workers -= 1
+            return self.active_workers == 0
+
+    def stats(self, wall_seconds: float) -> StageStats:
+        with self.lock:
+            capacity = wall_seconds * self.stage.workers
+            return StageStats(
+                name=self.stage.name,
+                workers=self.stage.workers,
+                processed=self.processed,
+                failed=self.failed,
+                busy_seconds=self.busy_seconds,
+                queue_depth=self.inbox.qsize(),
+                max_queue_depth=self.max_queue_depth,
+                occupancy=min(1.0, self.busy_seconds / capacity) if capacity > 0 else 0.0,
+            )
+
+
+class Pipeline:
+    """Run items through a sequence of stages followed by a sink stage."""
+
+    def __init__(self, stages: list[Stage], sink: Stage, *, queue_size: int = 4) -> None:
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1.")
+        for stage in (*stages, sink):
+            if stage.workers < 1:
+                raise ValueError(f"Stage '{stage.name}' needs at least one worker.")
+        self._runtimes = [_StageRuntime(stage, queue_size) for stage in (*stages, sink)]
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        self._sink_errors: list[BaseException] = []
+
+    def run(self, values: Iterable[Any]) -> list[StageStats]:
+        """Feed `values` through all stages and block until the sink is done."""
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+        threads = []
+        for position, runtime in enumerate(self._runtimes):
+            downstream = (
+                self._runtimes[position + 1] if position + 1 < len(self._runtimes) else None
+            )
+            for worker in range(runtime.stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(runtime, downstream),
+                    name=f"pipeline-{runtime.stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        first = self._runtimes[0]
+        try:
+            for index, value in enumerate(values):
+                first.put(PipelineItem(index=index, value=value))
+        finally:
+            first.put(_DONE)
+            for thread in threads:
+                thread.join()
+            self._finished_at = time.perf_counter()
+
+        if self._sink_errors:
+            raise self._sink_errors[0]
+        return self.stats()
+
+    def stats(self) -> list[StageStats]:
+        """Return per-stage statistics. Safe to call while `run` is active."""
+        if self._started_at is None:
+            wall_seconds = 0.0
+        else:
+            end = self._finished_at if self._finished_at is not None else time.perf_counter()
+            wall_seconds = end - self._started_at
+        return [runtime.stats(wall_seconds) for runtime in self._runtimes]
+
+    def live_workers(self) -> int:
+        """Return the number of worker threads that have not exited yet."""
+        if self._started_at is None:
+            return 0
+        return sum(runtime.active_workers for runtime in self._runtimes)
+
+    def _work(self, runtime: _StageRuntime, downstream: _StageRuntime | None) -> None:
+        is_sink = downstream is None
+        while True:
+            item = runtime.inbox.get()
+            if item is _DONE:
+                # Let sibling workers see the marker too; the last one to
+                # leave signals the next stage.
+                if runtime.retire_worker():
+                    if downstream is not None:
+                        downstream.put(_DONE)
+                else:
+                    runtime.inbox.put(_DONE)
+                return
+
+            if item.error is not None and not is_sink:
+                downstream.put(item)
+                continue
+
+            started = time.perf_counter()
+            failed = False
+            try:
+                if is_sink:
+                    runtime.stage.handler(item)
+                else:
+                    item.value = runtime.stage.handler(item.value)
+            except Exception as exc:  # noqa: BLE001 - failures travel with the item
+                failed = True
+                if is_sink:
+                    self._sink_errors.append(exc)
+                else:
+                    item.error = exc
+                    item.failed_stage = runtime.stage.name
+            runtime.record(time.perf_counter() - started, failed)
+
+            if downstream is not None:
+                downstream.put(item)
@@ -0,0 +1,229 @@
+"""Live progress of multi-filing operations.
+
+`ProgressTracker` counts finished filings and keeps the native ERiC
+latency (`timings["process"]`) of those finished within a moving window;
+recording is a counter update and a deque append. Throughput, latency
+percentiles and ETA are only computed when a renderer draws, at most once
+per interval: a bar redrawn in place on a terminal, or one JSON line per
+interval when the stream is redirected.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, TextIO
+
+from elsterctl.application.scheduling import percentile
+
+PROGRESS_MODES = ("auto", "bar", "json", "none")
+_BAR_WIDTH = 24
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """Progress of an operation at one point in time."""
+
+    total: int
+    completed: int
+    failed: int
+    elapsed_seconds: float
+    rate_per_second: float
+    latency_p50_seconds: float | None
+    latency_p95_seconds: float | None
+    eta_seconds: float | None
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed
+
+
+class ProgressTracker:
+    """Thread-safe counters plus a moving window of recent latencies."""
+
+    def __init__(
+        self,
+        total: int,
+        *,
+        window_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive.")
+        self.total = total
+        self._window_seconds = window_seconds
+        self._clock = clock
+        self._started = clock()
+        self._completed = 0
+        self._failed = 0
+        # (finished_at, latency or None) of filings inside the window.
+        self._recent: deque[tuple[float, float | None]] = deque()
+        self._lock = threading.Lock()
+
+    def record(self, succeeded: bool, latency_seconds: float | None = None) -> None:
+        now = self._clock()
+        with self._lock:
+            if succeeded:
+                self._completed += 1
+            else:
+                self._failed += 1
+            self._recent.append((now, latency_seconds))
+
+    def snapshot(self) -> ProgressSnapshot:
+        now = self._clock()
+        with self._lock:
+            horizon = now - self._window_seconds
+            while self._recent and self._recent[0][0] < horizon:
+                self._recent.popleft()
+            recent = list(self._recent)
+            completed, failed = self._completed, self._failed
+        elapsed = now - self._started
+        window = min(self._window_seconds, elapsed)
+        rate = len(recent) / window if window > 0 else 0.0
+        latencies = sorted(latency for _, latency in recent if latency is not None)
+        remaining = max(0, self.total - completed - failed)
+        return ProgressSnapshot(
+            total=self.total,
+            completed=completed,
+            failed=failed,
+            elapsed_seconds=elapsed,
+            rate_per_second=rate,
+            latency_p50_seconds=percentile(latencies, 0.5) if latencies else None,
+            latency_p95_seconds=percentile(latencies, 0.95) if latencies else None,
+            eta_seconds=remaining / rate if rate > 0 else (0.0 if remaining == 0 else None),
+        )
+
+
+def _format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def _format_latency(seconds: float | None) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds is not None else "n/a"
+
+
+class BarRenderer:
+    """Single status line redrawn in place on a terminal."""
+
+    interval_seconds = 0.2
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._drawn = False
+
+    def render(self, snapshot: ProgressSnapshot) -> None:
+        fraction = snapshot.done / snapshot.total if snapshot.total else 1.0
+        filled = int(fraction * _BAR_WIDTH)
+        self._stream.write(
+            f"\r\x1b[K[{'#' * filled}{'-' * (_BAR_WIDTH - filled)}] "
+            f"{snapshot.done}/{snapshot.total} ok={snapshot.completed} "
+            f"failed={snapshot.failed} {snapshot.rate_per_second:.1f}/s "
+            f"p50={_format_latency(snapshot.latency_p50_seconds)} "
+            f"p95={_format_latency(snapshot.latency_p95_seconds)} "
+            f"eta={_format_duration(snapshot.eta_seconds)}"
+        )
+        self._stream.flush()
+        self._drawn = True
+
+    def clear(self) -> None:
+        """Remove the bar so that a regular line can be printed."""
+        if self._drawn:
+            self._stream.write("\r\x1b[K")
+            self._stream.flush()
+            self._drawn = False
+
+    def finish(self, snapshot: ProgressSnapshot) -> None:
+        self.render(snapshot)
+        self._stream.write("\n")
+        self._stream.flush()
+        self._drawn = False
+
+
+class JsonLinesRenderer:
+    """One JSON object per interval, for logs and CI consoles."""
+
+    interval_seconds = 5.0
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+
+    def render(self, snapshot: ProgressSnapshot) -> None:
+        self._stream.write(
+            json.dumps({"event": "progress", **asdict(snapshot)}, separators=(",", ":")) + "\n"
+        )
+        self._stream.flush()
+
+    def clear(self) -> None:
+        pass
+
+    def finish(self, snapshot: ProgressSnapshot) -> None:
+        self.render(snapshot)
+
+
+class ProgressReporter:
+    """Feeds a tracker and redraws its renderer at most once per interval."""
+
+    def __init__(
+        self,
+        tracker: ProgressTracker,
+        renderer: BarRenderer | JsonLinesRenderer | None,
+        *,
+        interval_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tracker = tracker
+        self._renderer = renderer
+        self._interval = (
+            interval_seconds
+            if interval_seconds is not None
+            else getattr(renderer, "interval_seconds", 1.0)
+        )
+        self._clock = clock
+        self._rendered_at = clock()
+        self._lock = threading.Lock()
+
+    def record(self, succeeded: bool, latency_seconds: float | None = None) -> None:
+        self.tracker.record(succeeded, latency_seconds)
+        if self._renderer is None:
+            return
+        now = self._clock()
+        if now - self._rendered_at < self._interval:
+            return
+        with self._lock:
+            if now - self._rendered_at < self._interval:
+                return
+            self._rendered_at = now
+            self._renderer.render(self.tracker.snapshot())
+
+    def clear(self) -> None:
+        if self._renderer is not None:
+            with self._lock:
+                self._renderer.clear()
+
+    def finish(self) -> ProgressSnapshot:
+        snapshot = self.tracker.snapshot()
+        if self._renderer is not None:
+            with self._lock:
+                self._renderer.finish(snapshot)
+        return snapshot
+
+
+def progress_reporter(mode: str, total: int, stream: TextIO) -> ProgressReporter:
+    """Return a reporter for a `--progress` mode; `auto` picks bar or JSON by TTY."""
+    if mode not in PROGRESS_MODES:
+        raise ValueError(f"Unsupported progress mode: {mode}")
+    if mode == "auto":
+        mode = "bar" if stream.isatty() else "json"
+    renderer: BarRenderer | JsonLinesRenderer | None = None
+    if mode == "bar":
+        renderer = BarRenderer(stream)
+    elif mode == "json":
+        renderer = JsonLinesRenderer(stream)
+    return ProgressReporter(ProgressTracker(total), renderer)
@@ -0,0 +1,165 @@
+"""Deadline and priority scheduling of pending submissions.
+
+Pending submissions are kept in a binary heap ordered by priority class,
+then by deadline, then by arrival. Strict priorities would let a steady
+stream of urgent filings starve everything else, so an item's class only
+offsets its arrival: time is counted in periods of `aging_seconds` since
+the scheduler started, and an item ranks at its arrival period plus its
+class rank (urgent 0, normal 1, bulk 2). A bulk item thus ranks with
+urgent items that arrive two periods later and ahead of those arriving
+after that. Items queued together keep strict class order however long
+they wait. Keys never change, so a pop stays O(log n).
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import Any, Callable, Generic, Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class PriorityClass(str, Enum):
+    """Scheduling class of a submission, most urgent first."""
+
+    URGENT = "urgent"
+    NORMAL = "normal"
+    BULK = "bulk"
+
+    @property
+    def rank(self) -> int:
+        return _RANKS[self]
+
+
+_RANKS = {PriorityClass.URGENT: 0, PriorityClass.NORMAL: 1, PriorityClass.BULK: 2}
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Return the `fraction` quantile (nearest rank) of non-empty sorted values."""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+@dataclass(frozen=True)
+class ClassLatency:
+    """Queue wait and end-to-end latency of one priority class."""
+
+    priority_class: str
+    completed: int
+    wait_p50_seconds: float
+    wait_p95_seconds: float
+    wait_max_seconds: float
+    latency_p50_seconds: float
+    latency_p95_seconds: float
+
+
+@dataclass(slots=True)
+class ScheduledItem(Generic[T]):
+    """A queued value with its scheduling attributes."""
+
+    value: T
+    priority_class: PriorityClass
+    deadline: date | None
+    sequence: int
+    enqueued_at: float
+    dispatched_at: float | None = None
+
+
+class SubmissionScheduler(Generic[T]):
+    """Thread-safe priority queue with deadline ordering and aging."""
+
+    def __init__(
+        self,
+        *,
+        aging_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if aging_seconds <= 0:
+            raise ValueError("aging_seconds must be positive.")
+        self._aging_seconds = aging_seconds
+        self._clock = clock
+        self._heap: list[tuple[Any, ...]] = []
+        self._sequence = itertools.count()
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._waits: dict[PriorityClass, list[float]] = {}
+        self._latencies: dict[PriorityClass, list[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(
+        self,
+        value: T,
+        priority_class: PriorityClass | str = PriorityClass.NORMAL,
+        deadline: date | None = None,
+    ) -> ScheduledItem[T]:
+        item = ScheduledItem(
+            value=value,
+            priority_class=PriorityClass(priority_class),
+            deadline=deadline,
+            sequence=next(self._sequence),
+            enqueued_at=self._clock(),
+        )
+        with self._lock:
+            heapq.heappush(self._heap, self._entry(item))
+        return item
+
+    def pop(self) -> ScheduledItem[T]:
+        """Remove and return the most urgent item; raises IndexError when empty."""
+        with self._lock:
+            return heapq.heappop(self._heap)[-1]
+
+    def drain(self) -> Iterator[ScheduledItem[T]]:
+        """Pop items until the queue is empty."""
+        while self._heap:
+            yield self.pop()
+
+    def dispatched(self, item: ScheduledItem[T]) -> None:
+        """Mark the start of processing; the wait until here is the queue wait."""
+        item.dispatched_at = self._clock()
+
+    def complete(self, item: ScheduledItem[T]) -> None:
+        """Record wait and latency of a finished item for `latency_by_class`."""
+        finished_at = self._clock()
+        dispatched_at = item.dispatched_at if item.dispatched_at is not None else finished_at
+        with self._lock:
+            self._waits.setdefault(item.priority_class, []).append(
+                dispatched_at - item.enqueued_at
+            )
+            self._latencies.setdefault(item.priority_class, []).append(
+                finished_at - item.enqueued_at
+            )
+
+    def latency_by_class(self) -> list[ClassLatency]:
+        with self._lock:
+            snapshot = {
+                priority_class: (sorted(waits), sorted(self._latencies[priority_class]))
+                for priority_class, waits in self._waits.items()
+            }
+        return [
+            ClassLatency(
+                priority_class=priority_class.value,
+                completed=len(waits),
+                wait_p50_seconds=percentile(waits, 0.5),
+                wait_p95_seconds=percentile(waits, 0.95),
+                wait_max_seconds=waits[-1],
+                latency_p50_seconds=percentile(latencies, 0.5),
+                latency_p95_seconds=percentile(latencies, 0.95),
+            )
+            for priority_class, (waits, latencies) in sorted(
+                snapshot.items(), key=lambda pair: pair[0].rank
+            )
+        ]
+
+    def _entry(self, item: ScheduledItem[T]) -> tuple[Any, ...]:
+        period = int((item.enqueued_at - self._started) // self._aging_seconds)
+        deadline = item.deadline.toordinal() if item.deadline is not None else math.inf
+        return (period + item.priority_class.rank, deadline, item.sequence, item)
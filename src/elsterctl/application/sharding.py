@@ -0,0 +1,176 @@
+"""Deterministic partitioning of batches across hosts, and merging results.
+
+`--shard i/n` keeps the filings whose key hashes to shard `i` of `n`.
+The key is the filing path relative to its manifest, so every host that
+reads the same manifest computes the same disjoint partition without a
+coordinator. The hash is BLAKE2b rather than `hash()`, which is salted per
+process. Each host writes its own `--output jsonl` file and ledger;
+`merge_results` combines the result files into one report.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+BATCH_OPERATION = "message.send-batch"
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Shard `index` (1-based) of `count`."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count < 1 or not 1 <= self.index <= self.count:
+            raise ValueError(f"Invalid shard {self.index}/{self.count}: expected 1 <= i <= n.")
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def contains(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+
+def parse_shard(text: str) -> ShardSpec:
+    """Parse `i/n`, e.g. `2/8`."""
+    index, separator, count = text.partition("/")
+    try:
+        if not separator:
+            raise ValueError
+        return ShardSpec(int(index), int(count))
+    except ValueError as exc:
+        detail = str(exc) or f"expected i/n, got {text!r}."
+        raise ValueError(f"Invalid shard: {detail}") from exc
+
+
+def shard_of(key: str, count: int) -> int:
+    """Return the 1-based shard of `key`; stable across hosts and Python versions."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def filing_key(path: Path, base_dir: Path | None = None) -> str:
+    """Return the host-independent key of a filing path.
+
+    Manifest entries are keyed relative to the manifest's directory, paths
+    given on the command line as typed.
+    """
+    if base_dir is not None:
+        try:
+            return path.relative_to(base_dir).as_posix()
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+@dataclass(frozen=True)
+class ShardSummary:
+    """Filings reported in one result file."""
+
+    source: str
+    shard: str | None
+    filings: int
+    succeeded: int
+    failed: int
+
+
+@dataclass(frozen=True)
+class MergedResults:
+    """Per-filing records of all shards and their totals."""
+
+    shards: list[ShardSummary]
+    records: list[dict[str, Any]]
+    result_codes: dict[str, int]
+    duplicates: list[str]
+    missing_shards: list[str] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for record in self.records if record.get("status") == "ok")
+
+    @property
+    def failed(self) -> int:
+        return len(self.records) - self.succeeded
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing_shards and not self.duplicates
+
+
+def _read_records(path: Path) -> Iterator[dict[str, Any]]:
+    text = path.read_text(encoding="utf-8")
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        document = None
+    if isinstance(document, dict):
+        # `--output json`: one summary carrying all results.
+        yield from document.get("results", [])
+        yield document
+        return
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON in {path}:{number}: {exc.msg}") from exc
+
+
+def merge_results(paths: Iterable[Path]) -> MergedResults:
+    """Combine `send-batch --output jsonl|json` files of several shards.
+
+    Filings are identified by their filing key (or path, without sharding)
+    and ordered by their position in the unsharded input. A filing reported
+    by more than one file is listed in `duplicates`; shards of an `i/n`
+    split with no result file are listed in `missing_shards`.
+    """
+    shards: list[ShardSummary] = []
+    by_key: dict[str, dict[str, Any]] = {}
+    duplicates: list[str] = []
+    shard_counts: set[int] = set()
+    seen_shards: set[str] = set()
+    for path in paths:
+        filings = succeeded = 0
+        shard: str | None = None
+        for record in _read_records(path):
+            if record.get("operation") != BATCH_OPERATION:
+                continue
+            shard = record.get("shard", shard)
+            if "index" not in record:
+                continue
+            key = record.get("filing_key") or record.get("xml_path", "")
+            if key in by_key:
+                duplicates.append(key)
+            by_key[key] = record
+            filings += 1
+            succeeded += record.get("status") == "ok"
+        shards.append(
+            ShardSummary(str(path), shard, filings, succeeded, filings - succeeded)
+        )
+        if shard is not None:
+            seen_shards.add(shard)
+            shard_counts.add(parse_shard(shard).count)
+
+    missing = [
+        str(ShardSpec(index, count))
+        for count in sorted(shard_counts)
+        for index in range(1, count + 1)
+        if str(ShardSpec(index, count)) not in seen_shards
+    ]
+    records = sorted(by_key.values(), key=lambda record: record["index"])
+    result_codes = Counter(str(record.get("result_code")) for record in records)
+    return MergedResults(
+        shards=shards,
+        records=records,
+        result_codes=dict(sorted(result_codes.items())),
+        duplicates=sorted(set(duplicates)),
+        missing_shards=missing,
+    )
@@ -0,0 +1,163 @@
+"""Streaming rewrite of TransferHeader fields.
+
+Switching a pre-generated corpus between test and production means
+injecting or stripping `<Testmerker>` and setting `<HerstellerID>` and
+`<DatenLieferant>`. All of them live in the `TransferHeader` at the start
+of the document, so only that element is rewritten, on bytes and without
+a DOM parse; everything after it is copied unchanged in large chunks.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import BinaryIO
+from xml.sax.saxutils import escape
+
+# The TransferHeader must start and end within this many bytes.
+MAX_HEADER_SEARCH_BYTES = 64 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Schema order of the TransferHeader children up to DatenLieferant; an
+# injected field goes after the last one of its predecessors present.
+_FIELD_ORDER = ("Verfahren", "DatenArt", "Vorgang", "Testmerker", "HerstellerID", "DatenLieferant")
+
+_HEADER_OPEN = re.compile(rb"<(?P<prefix>[A-Za-z_][\w.-]*:)?TransferHeader\b[^>]*?(?<!/)>")
+
+
+class HeaderRewriteError(ValueError):
+    """Raised when a payload has no TransferHeader that can be rewritten."""
+
+
+@dataclass(frozen=True)
+class HeaderStamp:
+    """Fields to set in a TransferHeader; None leaves a field unchanged.
+
+    `testmerker=""` removes the Testmerker, which makes a payload a
+    production filing.
+    """
+
+    testmerker: str | None = None
+    hersteller_id: str | None = None
+    daten_lieferant: str | None = None
+
+    @property
+    def fields(self) -> dict[str, str]:
+        values = {
+            "Testmerker": self.testmerker,
+            "HerstellerID": self.hersteller_id,
+            "DatenLieferant": self.daten_lieferant,
+        }
+        return {name: value for name, value in values.items() if value is not None}
+
+
+def _field_pattern(prefix: bytes, name: str) -> re.Pattern[bytes]:
+    tag = re.escape(prefix + name.encode("ascii"))
+    return re.compile(
+        rb"[ \t]*<" + tag + rb"\s*/>|[ \t]*<" + tag + rb"(?:\s[^>]*)?>[^<]*</" + tag + rb"\s*>"
+    )
+
+
+def _rewrite_fields(content: bytes, prefix: bytes, stamp: HeaderStamp) -> bytes:
+    for name, value in stamp.fields.items():
+        pattern = _field_pattern(prefix, name)
+        element = b""
+        if value:
+            tag = prefix + name.encode("ascii")
+            element = b"<" + tag + b">" + escape(value).encode("utf-8") + b"</" + tag + b">"
+        match = pattern.search(content)
+        if match is not None:
+            indent = match.group()[: len(match.group()) - len(match.group().lstrip())]
+            if element:
+                content = content[: match.start()] + indent + element + content[match.end() :]
+            else:
+                # Drop the element together with the line it was on.
+                end = match.end()
+                if content[end : end + 1] == b"\n":
+                    end += 1
+                elif content[end : end + 2] == b"\r\n":
+                    end += 2
+                start = match.start()
+                if end == match.end() and content[start - 1 : start] == b"\n":
+                    start -= 1
+                content = content[:start] + content[end:]
+            continue
+        if not element:
+            continue
+        anchor: re.Match[bytes] | None = None
+        for predecessor in _FIELD_ORDER[: _FIELD_ORDER.index(name)]:
+            previous = _field_pattern(prefix, predecessor).search(content)
+            if previous is not None and (anchor is None or previous.end() > anchor.end()):
+                anchor = previous
+        if anchor is not None:
+            # Pretty-printed headers keep one field per line.
+            indent = anchor.group()[: len(anchor.group()) - len(anchor.group().lstrip())]
+            separator = b"\n" + indent if indent else b""
+            content = content[: anchor.end()] + separator + element + content[anchor.end() :]
+        else:
+            leading = re.match(rb"\s*", content).group()
+            if b"\n" in leading:
+                content = leading + element + leading + content[len(leading) :]
+            else:
+                content = element + content
+    return content
+
+
+def _header_span(buffer: bytes) -> tuple[int, int, bytes] | None:
+    """Return start and end of the header content and the namespace prefix."""
+    opening = _HEADER_OPEN.search(buffer)
+    if opening is None:
+        return None
+    prefix = opening.group("prefix") or b""
+    closing = re.compile(rb"</" + re.escape(prefix) + rb"TransferHeader\s*>").search(
+        buffer, opening.end()
+    )
+    if closing is None:
+        return None
+    return opening.end(), closing.start(), prefix
+
+
+def stamp_payload(payload: bytes | bytearray, stamp: HeaderStamp) -> bytes:
+    """Return `payload` with its TransferHeader rewritten according to `stamp`."""
+    span = _header_span(bytes(payload[:MAX_HEADER_SEARCH_BYTES]))
+    if span is None:
+        raise HeaderRewriteError(
+            f"No TransferHeader within the first {MAX_HEADER_SEARCH_BYTES} bytes."
+        )
+    start, end, prefix = span
+    content = _rewrite_fields(bytes(payload[start:end]), prefix, stamp)
+    return b"".join((payload[:start], content, payload[end:]))
+
+
+def stamp_stream(
+    source: BinaryIO,
+    target: BinaryIO,
+    stamp: HeaderStamp,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Copy `source` to `target`, rewriting the TransferHeader on the way.
+
+    Only the bytes up to the end of the header are held in memory. Returns
+    the number of bytes written.
+    """
+    buffer = b""
+    while True:
+        span = _header_span(buffer)
+        if span is not None or len(buffer) >= MAX_HEADER_SEARCH_BYTES:
+            break
+        chunk = source.read(min(chunk_size, MAX_HEADER_SEARCH_BYTES))
+        if not chunk:
+            break
+        buffer += chunk
+    if span is None:
+        raise HeaderRewriteError(
+            f"No TransferHeader within the first {MAX_HEADER_SEARCH_BYTES} bytes."
+        )
+    start, end, prefix = span
+    written = target.write(buffer[:start])
+    written += target.write(_rewrite_fields(buffer[start:end], prefix, stamp))
+    written += target.write(buffer[end:])
+    while chunk := source.read(chunk_size):
+        written += target.write(chunk)
+    return written
@@ -1,7 +1,11 @@
 """Authentication commands."""
 
+from pathlib import Path
+
 import click
 
+from elsterctl.infrastructure.pin.providers import LocalPinStore, PinError
+
 
 @click.group()
 def auth() -> None:
@@ -12,3 +16,44 @@ def auth() -> None:
 def login() -> None:
     """Login placeholder command."""
     raise click.ClickException("Not implemented yet.")
+
+
+@auth.command("remember-pin")
+@click.option(
+    "--certificate",
+    "certificate_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    envvar="ELSTER_DEFAULT_CERTIFICATE",
+    required=True,
+    help="Certificate whose PIN should be stored.",
+)
+def remember_pin(certificate_path: Path) -> None:
+    """Store a certificate PIN in the local PIN store.
+
+    The PIN is saved unencrypted in a file only you can read (chmod 600).
+    """
+    pin = click.prompt("Certificate PIN", hide_input=True, confirmation_prompt=True)
+    store = LocalPinStore()
+    try:
+        store.store(certificate_path, pin)
+    except PinError as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo(f"PIN stored in {store.path}")
+
+
+@auth.command("forget-pin")
+@click.option(
+    "--certificate",
+    "certificate_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTER_DEFAULT_CERTIFICATE",
+    required=True,
+    help="Certificate whose stored PIN should be removed.",
+)
+def forget_pin(certificate_path: Path) -> None:
+    """Remove a certificate PIN from the local PIN store."""
+    try:
+        removed = LocalPinStore().forget(certificate_path)
+    except PinError as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo("PIN removed." if removed else "No PIN stored for this certificate.")
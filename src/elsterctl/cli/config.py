@@ -1,14 +1,179 @@
 """Configuration commands."""
 
+from __future__ import annotations
+
+import os
+from typing import Any
+
 import click
 
+from elsterctl.infrastructure.config.profiles import ConfigError, ProfileStore
+from elsterctl.infrastructure.eric.error_catalog import DEFAULT_ERROR_CATALOG
+from elsterctl.shared.output import get_output
+
+# Profile setting -> (command path, parameter name) receiving it as default.
+_DEFAULT_TARGETS: dict[str, tuple[tuple[tuple[str, ...], str], ...]] = {
+    "certificate": (
+        ((), "certificate"),
+        (("message", "send"), "certificate_path"),
+        (("message", "send-batch"), "certificate_path"),
+    ),
+    "hersteller_id": (((), "hersteller_id"), (("message", "create-template"), "hersteller_id")),
+    "transfer_mode": (((), "transfer_mode"),),
+    "output": (((), "output_format"),),
+    "ledger": (((), "ledger_path"),),
+    "archive": (((), "archive_dir"),),
+    "max_rss_mb": (((), "max_rss_mb"),),
+    "warmup": (((), "warmup_versions"),),
+    "transport": (((), "transport_name"),),
+    "transport_socket": (((), "transport_socket"),),
+    "metrics_port": (((), "metrics_port"),),
+    "metrics_file": (((), "metrics_file"),),
+    "data_type_version": (
+        (("message", "send"), "data_type_version"),
+        (("message", "send-batch"), "data_type_version"),
+    ),
+    "pin_file": (
+        (("message", "send"), "pin_file"),
+        (("message", "send-batch"), "pin_file"),
+    ),
+    "workers": ((("message", "send-batch"), "workers"),),
+    "queue_size": ((("message", "send-batch"), "queue_size"),),
+    "rate": ((("message", "send-batch"), "rate"),),
+    "burst": ((("message", "send-batch"), "burst"),),
+    "recycle_after": ((("message", "send-batch"), "recycle_after"),),
+    "recycle_minutes": ((("message", "send-batch"), "recycle_minutes"),),
+    "recycle_rss_mb": ((("message", "send-batch"), "recycle_rss_mb"),),
+}
+
+
+def build_default_map(settings: dict[str, Any]) -> dict[str, Any]:
+    """Translate profile settings into a click `default_map`.
+
+    Explicit options and environment variables still take precedence over
+    profile values.
+    """
+    default_map: dict[str, Any] = {}
+    for key, value in settings.items():
+        for command_path, parameter in _DEFAULT_TARGETS.get(key, ()):
+            target = default_map
+            for command_name in command_path:
+                target = target.setdefault(command_name, {})
+            target[parameter] = value
+    return default_map
+
+
+def apply_profile_environment(settings: dict[str, Any]) -> None:
+    """Apply settings that are not command options; the environment wins."""
+    if settings.get("eric_lib"):
+        os.environ.setdefault("ELSTER_ERIC_LIB", str(settings["eric_lib"]))
+    if settings.get("force_test_mode"):
+        os.environ.setdefault("ELSTERCTL_FORCE_TEST_MODE", "1")
+    if settings.get("error_cache_size"):
+        DEFAULT_ERROR_CATALOG.resize(int(settings["error_cache_size"]))
+
+
+def load_active_profile() -> tuple[str | None, dict[str, Any]]:
+    """Return the selected profile name and its settings.
+
+    `ELSTERCTL_CONFIG_PROFILE` overrides the profile chosen with `config use`.
+    A broken config file is reported and ignored so that `config set` can
+    still repair it.
+    """
+    try:
+        config_file = ProfileStore().load()
+    except ConfigError as exc:
+        click.echo(f"Warning: {exc}", err=True)
+        return None, {}
+    name = os.getenv("ELSTERCTL_CONFIG_PROFILE") or config_file.active_profile
+    return name, config_file.settings(name)
+
+
+def _store() -> ProfileStore:
+    return ProfileStore()
+
 
 @click.group()
 def config() -> None:
     """Local configuration management."""
 
 
+@config.command("set")
+@click.argument("key")
+@click.argument("value")
+@click.option("--profile-name", default=None, help="Profile to change (default: active profile).")
+def config_set(key: str, value: str, profile_name: str | None) -> None:
+    """Store a setting in a profile."""
+    try:
+        typed_value = _store().set(key, value, profile_name)
+    except ConfigError as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo(f"{key}={typed_value}")
+
+
+@config.command("unset")
+@click.argument("key")
+@click.option("--profile-name", default=None, help="Profile to change (default: active profile).")
+def config_unset(key: str, profile_name: str | None) -> None:
+    """Remove a setting from a profile."""
+    try:
+        _store().unset(key, profile_name)
+    except ConfigError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+@config.command("get")
+@click.argument("key")
+@click.option("--profile-name", default=None, help="Profile to read (default: active profile).")
+def config_get(key: str, profile_name: str | None) -> None:
+    """Print a setting of a profile."""
+    try:
+        value = _store().get(key, profile_name)
+    except ConfigError as exc:
+        raise click.ClickException(str(exc)) from exc
+    if value is None:
+        raise click.ClickException(f"Setting not set: {key}")
+    click.echo(value)
+
+
+@config.command("use")
+@click.argument("profile_name")
+def config_use(profile_name: str) -> None:
+    """Make a profile the active one."""
+    try:
+        _store().use(profile_name)
+    except ConfigError as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo(f"Active profile: {profile_name}")
+
+
 @config.command("show")
-def show_config() -> None:
-    """Show config placeholder command."""
-    raise click.ClickException("Not implemented yet.")
+@click.option("--profile-name", default=None, help="Profile to show (default: active profile).")
+@click.pass_context
+def show_config(ctx: click.Context, profile_name: str | None) -> None:
+    """Show the settings of a profile."""
+    store = _store()
+    try:
+        config_file = store.load()
+    except ConfigError as exc:
+        raise click.ClickException(str(exc)) from exc
+    name = profile_name or os.getenv("ELSTERCTL_CONFIG_PROFILE") or config_file.active_profile
+    settings = config_file.settings(name)
+
+    output = get_output(ctx)
+    if output.structured:
+        output.emit(
+            {
+                "operation": "config.show",
+                "config_path": str(store.path),
+                "profile": name,
+                "profiles": sorted(config_file.profiles),
+                "settings": settings,
+            }
+        )
+        return
+
+    click.echo(f"config_path={store.path}")
+    click.echo(f"profile={name}")
+    for key in sorted(settings):
+        click.echo(f"{key}={settings[key]}")
@@ -2,14 +2,75 @@
 
 from __future__ import annotations
 
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
 from pathlib import Path
 from textwrap import dedent
+from typing import Any
 
 import click
 
-from elsterctl.application.message_send import MessageSendRequest, MessageSendService
-from elsterctl.infrastructure.eric.errors import EricError
+from elsterctl.application.corpus import (
+    DATA_TYPES,
+    DEFAULT_FILES_PER_DIR,
+    DEFAULT_HERSTELLER_ID,
+    SIZE_DISTRIBUTIONS,
+    CorpusError,
+    CorpusSpec,
+    SizeDistribution,
+    parse_size,
+    stream_corpus,
+    write_corpus,
+)
+from elsterctl.application.flow_control import SubmissionThrottle
+from elsterctl.application.message_batch import (
+    BatchOutcome,
+    ManifestEntry,
+    MessageBatchService,
+    read_manifest_entries,
+)
+from elsterctl.application.message_send import (
+    MessageSendRequest,
+    MessageSendResult,
+    MessageSendService,
+)
+from elsterctl.application.progress import PROGRESS_MODES, progress_reporter
+from elsterctl.application.scheduling import PriorityClass, SubmissionScheduler
+from elsterctl.application.sharding import (
+    ShardSpec,
+    filing_key,
+    merge_results,
+    parse_shard,
+)
+from elsterctl.application.transfer_header import (
+    HeaderRewriteError,
+    HeaderStamp,
+    stamp_stream,
+)
+from elsterctl.cli.session import format_warmup, get_eric_session, get_transport, warmup_record
+from elsterctl.cli.transfer import get_archive
+from elsterctl.domain.filings import XmlRef, XmlSpool
+from elsterctl.infrastructure.eric.errors import EricError, EricProcessingError
+from elsterctl.infrastructure.eric.isolation import EricCrashError
+from elsterctl.infrastructure.eric.responses import parse_diagnostics
+from elsterctl.infrastructure.eric.worker import RecyclePolicy
+from elsterctl.infrastructure.ledger.store import SubmissionLedger
+from elsterctl.infrastructure.pin.providers import (
+    ChainPinProvider,
+    EnvPinProvider,
+    FilePinProvider,
+    LocalPinStore,
+    PinProvider,
+    PromptPinProvider,
+)
+from elsterctl.infrastructure.transport.base import EricTransport
 from elsterctl.shared.cli_context import get_effective_transfer_mode
+from elsterctl.shared.exit_codes import TRANSMISSION_FAILED
+from elsterctl.shared.output import OutputSink, get_output
+from elsterctl.shared.testmerker import DEFAULT_TESTMERKER
 
 
 @click.group()
@@ -17,6 +78,169 @@ def message() -> None:
     """Communication with German tax offices."""
 
 
+def _resolve_certificate_path(ctx: click.Context, certificate_path: Path | None) -> Path:
+    effective_certificate_path = certificate_path
+    if effective_certificate_path is None:
+        root_obj = ctx.find_root().obj or {}
+        global_certificate_path = root_obj.get("certificate_path")
+        if global_certificate_path:
+            effective_certificate_path = Path(str(global_certificate_path))
+
+    if effective_certificate_path is None:
+        raise click.ClickException(
+            "Missing certificate path. Provide --certificate either globally or for message send."
+        )
+    return effective_certificate_path
+
+
+def _build_pin_provider(pin_env: str, pin_file: Path | None) -> PinProvider:
+    providers: list[PinProvider] = [EnvPinProvider(pin_env)]
+    if pin_file is not None:
+        providers.append(FilePinProvider(pin_file))
+    providers.extend((LocalPinStore(), PromptPinProvider()))
+    return ChainPinProvider(providers)
+
+
+def _header_stamp(
+    ctx: click.Context,
+    transfer_mode: str,
+    testmerker: str = DEFAULT_TESTMERKER,
+    daten_lieferant: str | None = None,
+) -> HeaderStamp:
+    """Stamp for `transfer_mode`: test injects the Testmerker, prod strips it."""
+    root_obj = ctx.find_root().obj or {}
+    hersteller_id = root_obj.get("hersteller_id")
+    return HeaderStamp(
+        testmerker=testmerker if transfer_mode == "test" else "",
+        hersteller_id=str(hersteller_id) if hersteller_id else None,
+        daten_lieferant=daten_lieferant,
+    )
+
+
+def _parse_size(ctx: click.Context, param: click.Parameter, value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except CorpusError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def _parse_shard(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> ShardSpec | None:
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def _select_entries(
+    xml_paths: tuple[Path, ...],
+    manifest_path: Path | None,
+    shard: ShardSpec | None,
+) -> list[tuple[int, ManifestEntry, str]]:
+    """Return position, entry and filing key of each filing in `shard`.
+
+    Positions count all given filings, so they stay comparable across shards.
+    """
+    keyed = [(ManifestEntry(path=path), filing_key(path)) for path in xml_paths]
+    if manifest_path is not None:
+        try:
+            manifest_entries = read_manifest_entries(manifest_path)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        keyed.extend(
+            (entry, filing_key(entry.path, manifest_path.parent)) for entry in manifest_entries
+        )
+    if not keyed:
+        raise click.ClickException("No XML files given. Pass XML paths or --manifest.")
+    return [
+        (position, entry, key)
+        for position, (entry, key) in enumerate(keyed)
+        if shard is None or shard.contains(key)
+    ]
+
+
+def _get_ledger(ctx: click.Context) -> SubmissionLedger | None:
+    """Return the `--ledger` of this process, opening it on first use."""
+    root = ctx.find_root()
+    root_obj = root.obj or {}
+    ledger = root_obj.get("ledger")
+    if ledger is None and root_obj.get("ledger_path"):
+        ledger = SubmissionLedger(Path(str(root_obj["ledger_path"])))
+        root_obj["ledger"] = ledger
+        root.call_on_close(ledger.close)
+    return ledger
+
+
+def _build_send_service(
+    ctx: click.Context,
+    throttle: SubmissionThrottle | None = None,
+    pin_provider: PinProvider | None = None,
+    transport: EricTransport | None = None,
+    response_spool: XmlSpool | None = None,
+) -> MessageSendService:
+    eric_session = get_eric_session(ctx)
+    return MessageSendService(
+        eric_client_factory=(transport or get_transport(ctx)).client,
+        ledger=_get_ledger(ctx),
+        throttle=throttle,
+        archive=get_archive(ctx),
+        pin_provider=pin_provider,
+        pin_cache=eric_session.pins,
+        response_spool=response_spool,
+    )
+
+
+def _submission_record(
+    output: OutputSink,
+    operation: str,
+    request: MessageSendRequest,
+    result: MessageSendResult | None,
+    error: BaseException | None,
+) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "operation": operation,
+        "xml_path": str(request.xml_path),
+        "transfer_mode": request.transfer_mode,
+        "data_type_version": request.data_type_version,
+    }
+
+    if error is not None:
+        record["status"] = "error"
+        record["error"] = str(error)
+        record["result_code"] = getattr(error, "result_code", None)
+        if isinstance(error, EricProcessingError):
+            record["error_class"] = error.error_class.value
+            if error.error_text:
+                record["error_text"] = error.error_text
+        if isinstance(error, EricCrashError):
+            record["error_class"] = "crash"
+            record["crash"] = {"exit_code": error.exit_code, "signal": error.signal_name}
+        eric_response_xml = getattr(error, "eric_response_xml", "")
+        server_response_xml = getattr(error, "server_response_xml", "")
+    else:
+        record["status"] = "ok" if result.result_code == 0 else "error"
+        record["result_code"] = result.result_code
+        record["transfer_ticket"] = result.transfer_ticket
+        record["timings"] = result.timings
+        record["deduplicated"] = result.deduplicated
+        eric_response_xml = result.eric_response_xml
+        server_response_xml = result.server_response_xml
+
+    record["diagnostics"] = [
+        diagnostic.to_dict()
+        for diagnostic in parse_diagnostics(eric_response_xml, server_response_xml)
+    ]
+    record.update(
+        output.response_fields(request.xml_path.stem, eric_response_xml, server_response_xml)
+    )
+    return record
+
+
 @message.command("create-template")
 @click.option(
         "--output",
@@ -51,7 +275,7 @@ def message() -> None:
 )
 @click.option(
         "--testmerker",
-        default="700000004",
+        default=DEFAULT_TESTMERKER,
         show_default=True,
         help="Test marker for ELSTER test runs.",
 )
@@ -110,9 +334,191 @@ def create_template(
         )
 
         output_path.write_text(xml, encoding="utf-8")
+
+        output = get_output(ctx)
+        if output.structured:
+            output.emit(
+                {
+                    "operation": "message.create-template",
+                    "status": "ok",
+                    "output_path": str(output_path),
+                }
+            )
+            return
         click.echo(f"Template written: {output_path}")
 
 
+@message.command("generate-corpus")
+@click.option(
+    "--count",
+    type=click.IntRange(min=1),
+    required=True,
+    help="Number of filings to generate.",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for the XML files and their manifest.txt.",
+)
+@click.option(
+    "--stdout",
+    "to_stdout",
+    is_flag=True,
+    help="Stream the documents to stdout, one per line, instead of writing files.",
+)
+@click.option(
+    "--data-type",
+    "data_types",
+    type=click.Choice(tuple(DATA_TYPES)),
+    multiple=True,
+    help="Data type to generate; repeat for a mix (default: all, round-robin).",
+)
+@click.option(
+    "--size-distribution",
+    type=click.Choice(SIZE_DISTRIBUTIONS),
+    default="lognormal",
+    show_default=True,
+    help="Distribution of document sizes, attachments excluded.",
+)
+@click.option(
+    "--size",
+    callback=_parse_size,
+    default="4k",
+    show_default=True,
+    help="Fixed or median document size, e.g. 512, 4k, 1m.",
+)
+@click.option("--min-size", callback=_parse_size, default=None, help="Smallest document size.")
+@click.option("--max-size", callback=_parse_size, default=None, help="Largest document size.")
+@click.option(
+    "--attachment-ratio",
+    type=click.FloatRange(0.0, 1.0),
+    default=0.0,
+    show_default=True,
+    help="Share of sonstige_nachricht filings that carry a PDF attachment.",
+)
+@click.option(
+    "--attachment-size",
+    callback=_parse_size,
+    default="64k",
+    show_default=True,
+    help="Size of each PDF attachment before Base64 encoding.",
+)
+@click.option(
+    "--files-per-dir",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FILES_PER_DIR,
+    show_default=True,
+    help="Files per subdirectory of --output-dir.",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed.")
+@click.option(
+    "--testmerker",
+    default=DEFAULT_TESTMERKER,
+    show_default=True,
+    help="Test marker set in every filing.",
+)
+@click.option(
+    "--daten-lieferant",
+    default="elsterctl",
+    show_default=True,
+    help="Value for TransferHeader/DatenLieferant.",
+)
+@click.option(
+    "--progress",
+    "progress_mode",
+    type=click.Choice(PROGRESS_MODES),
+    default="none",
+    show_default=True,
+    help="Live progress on stderr: a bar, JSON lines, or auto (bar on a terminal).",
+)
+@click.pass_context
+def generate_corpus(
+    ctx: click.Context,
+    count: int,
+    output_dir: Path | None,
+    to_stdout: bool,
+    data_types: tuple[str, ...],
+    size_distribution: str,
+    size: int,
+    min_size: int | None,
+    max_size: int | None,
+    attachment_ratio: float,
+    attachment_size: int,
+    files_per_dir: int,
+    seed: int,
+    testmerker: str,
+    daten_lieferant: str,
+    progress_mode: str,
+) -> None:
+    """Generate synthetic test filings for load and memory tests.
+
+    Every filing carries the Testmerker; `message stamp` re-targets a
+    corpus. The same options and seed produce the same corpus. With
+    --stdout the summary goes to stderr.
+    """
+    if (output_dir is None) == (not to_stdout):
+        raise click.ClickException("Pass either --output-dir or --stdout.")
+    root_obj = ctx.find_root().obj or {}
+    try:
+        spec = CorpusSpec(
+            count=count,
+            data_types=data_types or tuple(DATA_TYPES),
+            sizes=SizeDistribution(size_distribution, size, min_size, max_size),
+            attachment_ratio=attachment_ratio,
+            attachment_size=attachment_size,
+            seed=seed,
+            testmerker=testmerker,
+            hersteller_id=str(root_obj.get("hersteller_id") or DEFAULT_HERSTELLER_ID),
+            daten_lieferant=daten_lieferant,
+        )
+    except CorpusError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    progress = progress_reporter(progress_mode, count, sys.stderr)
+    started = time.perf_counter()
+    try:
+        if output_dir is not None:
+            summary = write_corpus(
+                spec,
+                output_dir,
+                files_per_dir=files_per_dir,
+                on_filing=lambda filing: progress.record(True),
+            )
+        else:
+            summary = stream_corpus(
+                spec, sys.stdout.buffer, on_filing=lambda filing: progress.record(True)
+            )
+    except OSError as exc:
+        raise click.ClickException(str(exc)) from exc
+    elapsed = time.perf_counter() - started
+    if progress_mode != "none":
+        progress.finish()
+
+    output = get_output(ctx)
+    if output.structured and not to_stdout:
+        output.emit(
+            {
+                "operation": "message.generate-corpus",
+                "status": "ok",
+                "filings": summary.filings,
+                "bytes": summary.bytes,
+                "attachments": summary.attachments,
+                "data_types": summary.data_types,
+                "manifest_path": str(summary.manifest_path),
+                "elapsed_seconds": elapsed,
+            }
+        )
+        return
+    click.echo(
+        f"Generated {summary.filings} filings ({summary.bytes} bytes, "
+        f"{summary.attachments} with attachments) in {elapsed:.2f}s.",
+        err=to_stdout,
+    )
+    if summary.manifest_path is not None:
+        click.echo(f"Manifest: {summary.manifest_path}")
+
+
 @message.command("send")
 @click.option(
     "--xml",
@@ -135,6 +541,13 @@ def create_template(
     show_default=True,
     help="Environment variable name holding the certificate PIN.",
 )
+@click.option(
+    "--pin-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTER_CERT_PIN_FILE",
+    default=None,
+    help="Private file (chmod 600) holding the certificate PIN.",
+)
 @click.option(
     "--data-type-version",
     envvar="ELSTER_DEFAULT_DATA_TYPE_VERSION",
@@ -149,32 +562,38 @@ def create_template(
     show_default=True,
     help="Run ERiC validation before submission.",
 )
+@click.option(
+    "--allow-resubmit",
+    is_flag=True,
+    help="Send even if the idempotency ledger shows the filing as started or accepted.",
+)
+@click.option(
+    "--attachment",
+    "attachment_paths",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    multiple=True,
+    help="PDF document to attach to the message. Can be given multiple times.",
+)
 @click.pass_context
 def send_message(
     ctx: click.Context,
     xml_path: Path,
     certificate_path: Path | None,
     pin_env: str,
+    pin_file: Path | None,
     data_type_version: str,
     validate_before_send: bool,
+    allow_resubmit: bool,
+    attachment_paths: tuple[Path, ...],
 ) -> None:
     """Send a message XML via ERiC."""
+    output = get_output(ctx)
     transfer_mode = get_effective_transfer_mode(ctx)
-    click.echo(f"Effective transfer mode: {transfer_mode}")
+    output.info(f"Effective transfer mode: {transfer_mode}")
 
-    effective_certificate_path = certificate_path
-    if effective_certificate_path is None:
-        root_obj = ctx.find_root().obj or {}
-        global_certificate_path = root_obj.get("certificate_path")
-        if global_certificate_path:
-            effective_certificate_path = Path(str(global_certificate_path))
-
-    if effective_certificate_path is None:
-        raise click.ClickException(
-            "Missing certificate path. Provide --certificate either globally or for message send."
-        )
+    effective_certificate_path = _resolve_certificate_path(ctx, certificate_path)
 
-    service = MessageSendService()
+    service = _build_send_service(ctx, pin_provider=_build_pin_provider(pin_env, pin_file))
 
     request = MessageSendRequest(
         xml_path=xml_path,
@@ -183,19 +602,609 @@ def send_message(
         data_type_version=data_type_version,
         transfer_mode=transfer_mode,
         validate_before_send=validate_before_send,
+        attachment_paths=attachment_paths,
+        allow_resubmit=allow_resubmit,
     )
 
     try:
         result = service.send(request)
     except (ValueError, EricError) as exc:
+        if output.structured:
+            output.emit(_submission_record(output, "message.send", request, None, exc))
         raise click.ClickException(str(exc)) from exc
 
+    if output.structured:
+        output.emit(_submission_record(output, "message.send", request, result, None))
+        return
+
+    if result.deduplicated:
+        click.echo("Already submitted according to the idempotency ledger; ERiC was not called.")
     click.echo(f"ERiC result code: {result.result_code}")
     if result.transfer_ticket:
         click.echo(f"Transfer ticket: {result.transfer_ticket}")
     click.echo("Message submission completed.")
 
 
+@message.command("send-batch")
+@click.argument(
+    "xml_paths",
+    nargs=-1,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--manifest",
+    "manifest_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="File listing XML paths to send, one per line.",
+)
+@click.option(
+    "--certificate",
+    "certificate_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTER_DEFAULT_CERTIFICATE",
+    required=False,
+    help="Path to the ELSTER certificate file (pfx/p12).",
+)
+@click.option(
+    "--pin-env",
+    default="ELSTER_CERT_PIN",
+    show_default=True,
+    help="Environment variable name holding the certificate PIN.",
+)
+@click.option(
+    "--pin-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTER_CERT_PIN_FILE",
+    default=None,
+    help="Private file (chmod 600) holding the certificate PIN.",
+)
+@click.option(
+    "--data-type-version",
+    envvar="ELSTER_DEFAULT_DATA_TYPE_VERSION",
+    default="TH11",
+    show_default=True,
+    help="ERiC data type version to submit (e.g. TH11).",
+)
+@click.option(
+    "--validate/--no-validate",
+    "validate_before_send",
+    default=True,
+    show_default=True,
+    help="Run ERiC validation before submission.",
+)
+@click.option(
+    "--allow-resubmit",
+    is_flag=True,
+    help="Send even if the idempotency ledger shows the filing as started or accepted.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(1, 32),
+    default=1,
+    show_default=True,
+    help="Number of threads reading and preparing payloads ahead of ERiC.",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(1, 1024),
+    default=4,
+    show_default=True,
+    help="Capacity of the queues between pipeline stages.",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum submissions per second. Backs off automatically on ELSTER transfer errors.",
+)
+@click.option(
+    "--burst",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of submissions that may start back-to-back under --rate.",
+)
+@click.option(
+    "--priority",
+    "priority_class",
+    type=click.Choice([priority.value for priority in PriorityClass]),
+    default=PriorityClass.NORMAL.value,
+    show_default=True,
+    help="Priority class of filings without a priority= hint in the manifest.",
+)
+@click.option(
+    "--aging-seconds",
+    type=click.FloatRange(min=0, min_open=True),
+    default=60.0,
+    show_default=True,
+    help="Queue time after which a filing ranks one priority class above later arrivals.",
+)
+@click.option(
+    "--recycle-after",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Run ERiC in a worker process and replace it after this many submissions.",
+)
+@click.option(
+    "--recycle-minutes",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Run ERiC in a worker process and replace it after this many minutes.",
+)
+@click.option(
+    "--recycle-rss",
+    "recycle_rss_mb",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Run ERiC in a worker process and replace it when its RSS exceeds this many MiB.",
+)
+@click.option(
+    "--stamp-header",
+    is_flag=True,
+    help="Rewrite each TransferHeader for the transfer mode while reading: inject or strip "
+    "the Testmerker and set HerstellerID from --hersteller-id.",
+)
+@click.option(
+    "--progress",
+    "progress_mode",
+    type=click.Choice(PROGRESS_MODES),
+    default="none",
+    show_default=True,
+    help="Live progress on stderr: a bar, JSON lines, or auto (bar on a terminal).",
+)
+@click.option(
+    "--stats",
+    "show_stats",
+    is_flag=True,
+    help="Print per-stage queue depth and occupancy after the batch.",
+)
+@click.option(
+    "--shard",
+    callback=_parse_shard,
+    default=None,
+    metavar="I/N",
+    help="Only process the filings whose path hashes to shard I of N (1-based); "
+    "hosts given the same manifest and N process disjoint subsets.",
+)
+@click.pass_context
+def send_batch(
+    ctx: click.Context,
+    xml_paths: tuple[Path, ...],
+    manifest_path: Path | None,
+    certificate_path: Path | None,
+    pin_env: str,
+    pin_file: Path | None,
+    data_type_version: str,
+    validate_before_send: bool,
+    allow_resubmit: bool,
+    workers: int,
+    queue_size: int,
+    rate: float | None,
+    burst: int,
+    priority_class: str,
+    aging_seconds: float,
+    recycle_after: int | None,
+    recycle_minutes: float | None,
+    recycle_rss_mb: int | None,
+    stamp_header: bool,
+    progress_mode: str,
+    show_stats: bool,
+    shard: ShardSpec | None,
+) -> None:
+    """Send many message XML files through a pipelined ERiC batch.
+
+    Filings are sent by priority class, then deadline; manifest lines can
+    carry `priority=urgent|normal|bulk` and `deadline=YYYY-MM-DD` hints.
+    With a recycling option, ERiC runs in a worker process that is replaced
+    by a pre-warmed one when the limit is reached. `--stamp-header` sends a
+    corpus generated for the other transfer mode without regenerating it.
+    `--shard` splits a manifest across hosts; `merge-results` combines
+    their outputs.
+    """
+    output = get_output(ctx)
+    transfer_mode = get_effective_transfer_mode(ctx)
+    output.info(f"Effective transfer mode: {transfer_mode}")
+
+    effective_certificate_path = _resolve_certificate_path(ctx, certificate_path)
+
+    selected = _select_entries(xml_paths, manifest_path, shard)
+    if shard is not None:
+        output.info(f"Shard {shard}: {len(selected)} filings.")
+        if not selected:
+            if output.structured:
+                output.emit(
+                    {
+                        "operation": "message.send-batch",
+                        "status": "ok",
+                        "succeeded": 0,
+                        "failed": 0,
+                        "shard": str(shard),
+                    }
+                )
+            return
+
+    requests = [
+        MessageSendRequest(
+            xml_path=entry.path,
+            certificate_path=effective_certificate_path,
+            pin_env_var=pin_env,
+            data_type_version=data_type_version,
+            transfer_mode=transfer_mode,
+            validate_before_send=validate_before_send,
+            allow_resubmit=allow_resubmit,
+            priority_class=entry.priority_class or priority_class,
+            deadline=entry.deadline,
+        )
+        for _, entry, _ in selected
+    ]
+
+    progress = progress_reporter(progress_mode, len(requests), sys.stderr)
+    records: list[dict[str, Any]] = []
+    # `--output json` reports all results at the end; until then response
+    # documents wait in a spool file (or the archive) instead of in memory.
+    spool: XmlSpool | None = None
+    if output.output_format == "json" and output.response_dir is None:
+        spool = XmlSpool()
+        ctx.call_on_close(spool.close)
+
+    def echo_outcome(outcome: BatchOutcome) -> None:
+        if output.structured:
+            record = _submission_record(
+                output, "message.send-batch", outcome.request, outcome.result, outcome.error
+            )
+            position, _, key = selected[outcome.index]
+            record["index"] = position
+            if shard is not None:
+                record["shard"] = str(shard)
+                record["filing_key"] = key
+            if outcome.failed_stage:
+                record["failed_stage"] = outcome.failed_stage
+            if output.output_format == "jsonl":
+                output.emit(record)
+            else:
+                if spool is not None:
+                    for kind in ("eric", "server"):
+                        key = f"{kind}_response_xml"
+                        if key not in record:
+                            continue
+                        # Results already reference their responses; only
+                        # those attached to errors are spooled here.
+                        reference = (
+                            getattr(outcome.result, f"{kind}_response")
+                            if outcome.result is not None
+                            else None
+                        )
+                        record[key] = reference if reference is not None else spool.add(record[key])
+                records.append(record)
+            return
+
+        progress.clear()
+        path = outcome.request.xml_path
+        if outcome.error is not None:
+            click.echo(f"{path}: failed ({outcome.failed_stage}): {outcome.error}")
+            return
+        line = f"{path}: ERiC result code: {outcome.result.result_code}"
+        if outcome.result.transfer_ticket:
+            line += f", transfer ticket: {outcome.result.transfer_ticket}"
+        if outcome.result.deduplicated:
+            line += " (already submitted, skipped)"
+        click.echo(line)
+
+    def on_outcome(outcome: BatchOutcome) -> None:
+        echo_outcome(outcome)
+        timings = outcome.result.timings if outcome.result is not None else {}
+        progress.record(outcome.succeeded, timings.get("process"))
+
+    recycle_policy = RecyclePolicy(
+        max_submissions=recycle_after,
+        max_age_seconds=recycle_minutes * 60 if recycle_minutes is not None else None,
+        max_rss_bytes=recycle_rss_mb * 1024 * 1024 if recycle_rss_mb is not None else None,
+    )
+    transport = get_transport(ctx, recycle_policy)
+
+    throttle = SubmissionThrottle(max_rate=rate, burst=burst)
+    send_service = _build_send_service(
+        ctx,
+        throttle,
+        pin_provider=_build_pin_provider(pin_env, pin_file),
+        transport=transport,
+        response_spool=spool,
+    )
+    # Resolve the PIN once up front so that a prompt does not appear from a
+    # pipeline worker thread.
+    try:
+        send_service.resolve_pin(requests[0])
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    # Initialization and plugin loading happen before the batch clock
+    # starts, so the first filing is not an outlier.
+    try:
+        warmup = transport.warm_up()
+    except EricError as exc:
+        raise click.ClickException(str(exc)) from exc
+    service = MessageBatchService(
+        send_service,
+        queue_size=queue_size,
+        preparer_workers=workers,
+        scheduler=SubmissionScheduler(aging_seconds=aging_seconds),
+        header_stamp=_header_stamp(ctx, transfer_mode) if stamp_header else None,
+    )
+    report = service.run(requests, on_outcome)
+    if progress_mode != "none":
+        progress.finish()
+    throttle_metrics = throttle.metrics()
+
+    if output.structured:
+        summary: dict[str, Any] = {
+            "operation": "message.send-batch",
+            "status": "error" if report.failed else "ok",
+            "succeeded": report.succeeded,
+            "failed": report.failed,
+            "elapsed_seconds": report.elapsed_seconds,
+            "stages": [asdict(stage) for stage in report.stages],
+            "priority_classes": [asdict(latency) for latency in report.priority_classes],
+            "throttle": asdict(throttle_metrics),
+        }
+        summary["transport"] = transport.describe()
+        if shard is not None:
+            summary["shard"] = str(shard)
+        if warmup is not None:
+            summary["warmup"] = warmup_record(warmup)
+        if output.output_format == "json":
+            summary["results"] = [
+                {
+                    key: value.read() if isinstance(value, XmlRef) else value
+                    for key, value in record.items()
+                }
+                for record in records
+            ]
+        output.emit(summary)
+        if report.failed:
+            ctx.exit(TRANSMISSION_FAILED)
+        return
+
+    if show_stats:
+        for stage in report.stages:
+            click.echo(
+                f"stage={stage.name} processed={stage.processed} failed={stage.failed} "
+                f"max_queue_depth={stage.max_queue_depth} occupancy={stage.occupancy:.2f}"
+            )
+        for latency in report.priority_classes:
+            click.echo(
+                f"priority={latency.priority_class} completed={latency.completed} "
+                f"wait_p50={latency.wait_p50_seconds:.3f}s "
+                f"wait_p95={latency.wait_p95_seconds:.3f}s "
+                f"latency_p95={latency.latency_p95_seconds:.3f}s"
+            )
+        rate_text = (
+            f"{throttle_metrics.rate:.2f}/s" if throttle_metrics.rate is not None else "unlimited"
+        )
+        click.echo(
+            f"throttle rate={rate_text} limit={throttle_metrics.limit:.2f} "
+            f"congestion_signals={throttle_metrics.congestion_signals} "
+            f"throttled_seconds={throttle_metrics.throttled_seconds:.2f}"
+        )
+        click.echo(
+            " ".join(
+                f"{key}={value}"
+                for key, value in transport.describe().items()
+                if not isinstance(value, list)
+            )
+        )
+        if warmup is not None:
+            for line in format_warmup(warmup):
+                click.echo(line)
+
+    click.echo(
+        f"Batch completed: {report.succeeded} succeeded, {report.failed} failed "
+        f"in {report.elapsed_seconds:.2f}s."
+    )
+    if report.failed:
+        ctx.exit(TRANSMISSION_FAILED)
+
+
+@message.command("stamp")
+@click.argument(
+    "xml_paths",
+    nargs=-1,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--manifest",
+    "manifest_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="File listing XML paths to stamp, one per line.",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for the stamped copies (same file names).",
+)
+@click.option(
+    "--in-place",
+    is_flag=True,
+    help="Replace the files instead of writing copies.",
+)
+@click.option(
+    "--testmerker",
+    default=DEFAULT_TESTMERKER,
+    show_default=True,
+    help="Testmerker set in test transfer mode.",
+)
+@click.option(
+    "--daten-lieferant",
+    default=None,
+    help="Value for TransferHeader/DatenLieferant; unchanged if omitted.",
+)
+@click.option(
+    "--progress",
+    "progress_mode",
+    type=click.Choice(PROGRESS_MODES),
+    default="none",
+    show_default=True,
+    help="Live progress on stderr: a bar, JSON lines, or auto (bar on a terminal).",
+)
+@click.option(
+    "--shard",
+    callback=_parse_shard,
+    default=None,
+    metavar="I/N",
+    help="Only process the filings whose path hashes to shard I of N (1-based); "
+    "hosts given the same manifest and N process disjoint subsets.",
+)
+@click.pass_context
+def stamp_messages(
+    ctx: click.Context,
+    xml_paths: tuple[Path, ...],
+    manifest_path: Path | None,
+    output_dir: Path | None,
+    in_place: bool,
+    testmerker: str,
+    daten_lieferant: str | None,
+    progress_mode: str,
+    shard: ShardSpec | None,
+) -> None:
+    """Re-target message XML files to the effective transfer mode.
+
+    Test mode injects or sets the Testmerker, prod mode strips it; the
+    HerstellerID is set from --hersteller-id when given. Only the
+    TransferHeader is rewritten, the rest of each file is copied as is.
+    """
+    output = get_output(ctx)
+    transfer_mode = get_effective_transfer_mode(ctx)
+    output.info(f"Effective transfer mode: {transfer_mode}")
+    if (output_dir is None) == (not in_place):
+        raise click.ClickException("Pass either --output-dir or --in-place.")
+
+    paths = [entry.path for _, entry, _ in _select_entries(xml_paths, manifest_path, shard)]
+
+    stamp = _header_stamp(ctx, transfer_mode, testmerker, daten_lieferant)
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    progress = progress_reporter(progress_mode, len(paths), sys.stderr)
+    total_bytes = 0
+    started = time.perf_counter()
+    for path in paths:
+        file_started = time.perf_counter()
+        target_path = output_dir / path.name if output_dir is not None else path
+        temporary = target_path.with_name(f".{target_path.name}.stamp")
+        try:
+            with path.open("rb") as source, temporary.open("wb") as target:
+                total_bytes += stamp_stream(source, target, stamp)
+            os.replace(temporary, target_path)
+        except (OSError, HeaderRewriteError) as exc:
+            temporary.unlink(missing_ok=True)
+            raise click.ClickException(f"{path}: {exc}") from exc
+        if not output.structured:
+            progress.clear()
+            click.echo(f"{path} -> {target_path}")
+        progress.record(True, time.perf_counter() - file_started)
+    elapsed = time.perf_counter() - started
+    if progress_mode != "none":
+        progress.finish()
+
+    if output.structured:
+        output.emit(
+            {
+                "operation": "message.stamp",
+                "transfer_mode": transfer_mode,
+                "files": len(paths),
+                "bytes": total_bytes,
+                "elapsed_seconds": elapsed,
+            }
+        )
+        return
+    click.echo(f"Stamped {len(paths)} files ({total_bytes} bytes) in {elapsed:.2f}s.")
+
+
+@message.command("merge-results")
+@click.argument(
+    "result_paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--shard-ledger",
+    "shard_ledgers",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Ledger of one shard to merge into --ledger. Repeatable.",
+)
+@click.option(
+    "--results-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the merged per-filing records to this JSONL file, in input order.",
+)
+@click.pass_context
+def merge_batch_results(
+    ctx: click.Context,
+    result_paths: tuple[Path, ...],
+    shard_ledgers: tuple[Path, ...],
+    results_file: Path | None,
+) -> None:
+    """Combine the `send-batch --output jsonl` files of several shards.
+
+    Reports totals, result codes, filings reported twice and shards of an
+    i/n split without a result file. With --shard-ledger, the per-host
+    ledgers are merged into the global --ledger.
+    """
+    output = get_output(ctx)
+    ledger = _get_ledger(ctx)
+    if shard_ledgers and ledger is None:
+        raise click.ClickException("Pass --ledger to name the merged ledger.")
+    try:
+        merged = merge_results(result_paths)
+        merged_entries = sum(ledger.merge(path) for path in shard_ledgers)
+    except (ValueError, OSError) as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    if results_file is not None:
+        results_file.parent.mkdir(parents=True, exist_ok=True)
+        with results_file.open("w", encoding="utf-8") as handle:
+            for record in merged.records:
+                handle.write(json.dumps(record, sort_keys=True, separators=(",", ":")) + "\n")
+
+    failed = bool(merged.failed) or not merged.complete
+    if output.structured:
+        summary: dict[str, Any] = {
+            "operation": "message.merge-results",
+            "status": "error" if failed else "ok",
+            "filings": len(merged.records),
+            "succeeded": merged.succeeded,
+            "failed": merged.failed,
+            "result_codes": merged.result_codes,
+            "duplicates": merged.duplicates,
+            "missing_shards": merged.missing_shards,
+            "shards": [asdict(shard) for shard in merged.shards],
+        }
+        if shard_ledgers:
+            summary["ledger"] = {"path": str(ledger.path), "merged_entries": merged_entries}
+        output.emit(summary)
+    else:
+        for shard in merged.shards:
+            click.echo(
+                f"shard={shard.shard or '-'} source={shard.source} filings={shard.filings} "
+                f"succeeded={shard.succeeded} failed={shard.failed}"
+            )
+        for key in merged.duplicates:
+            click.echo(f"duplicate filing={key}")
+        if merged.missing_shards:
+            click.echo(f"missing shards: {', '.join(merged.missing_shards)}")
+        if shard_ledgers:
+            click.echo(f"ledger={ledger.path} merged_entries={merged_entries}")
+        click.echo(
+            f"Merged {len(merged.records)} filings: {merged.succeeded} succeeded, "
+            f"{merged.failed} failed."
+        )
+    if failed:
+        ctx.exit(TRANSMISSION_FAILED)
+
+
 @message.command("fetch-inbox")
 @click.option(
     "--limit",
@@ -212,6 +1221,6 @@ def send_message(
 @click.pass_context
 def fetch_inbox(ctx: click.Context, limit: int, unread_only: bool) -> None:
     """Fetch messages from the ELSTER inbox."""
-    click.echo(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
+    get_output(ctx).info(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
     _ = (limit, unread_only)
     raise click.ClickException("Not implemented yet.")
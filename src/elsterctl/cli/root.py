@@ -4,17 +4,79 @@ from __future__ import annotations
 
 import json
 import os
+import tempfile
+from pathlib import Path
 
 import click
 from click_shell import shell
 
 from elsterctl.cli.address import address
 from elsterctl.cli.auth import auth
-from elsterctl.cli.config import config
+from elsterctl.cli.config import (
+    apply_profile_environment,
+    build_default_map,
+    config,
+    load_active_profile,
+)
 from elsterctl.cli.message import message
+from elsterctl.cli.session import session
 from elsterctl.cli.transfer import transfer
 from elsterctl.cli.vat import vat
+from elsterctl.infrastructure.eric.tracing import NativeCallTracer, install_tracer
+from elsterctl.infrastructure.metrics.exposition import MetricsFileWriter, MetricsServer
+from elsterctl.infrastructure.transport.base import IN_PROCESS, TRANSPORTS
 from elsterctl.shared.cli_context import resolve_transfer_mode
+from elsterctl.shared.output import OUTPUT_FORMATS, OutputSink, get_output
+from elsterctl.shared.profiling import CommandProfiler
+
+
+def _isolate_replay_state(ctx: click.Context) -> None:
+    """Point `--ledger` and `--archive` at a scratch directory for `--replay`.
+
+    Replayed results were never sent to ELSTER, so they must not mark real
+    filings as accepted or land in the real archive. The scratch copies keep
+    ledger and archive overhead in replayed load tests and are deleted when
+    the root context closes.
+    """
+    if ctx.obj["ledger_path"] is None and ctx.obj["archive_dir"] is None:
+        return
+    scratch = Path(ctx.with_resource(tempfile.TemporaryDirectory(prefix="elsterctl-replay-")))
+    if ctx.obj["ledger_path"] is not None:
+        ctx.obj["ledger_path"] = scratch / "ledger.sqlite3"
+    if ctx.obj["archive_dir"] is not None:
+        ctx.obj["archive_dir"] = scratch / "archive"
+    ctx.obj["output"].info(
+        f"Replay mode: --ledger and --archive are replaced by temporary ones in {scratch}"
+    )
+
+
+def _start_profiling(ctx: click.Context, output_prefix: Path) -> None:
+    """Profile until the root context closes and print a summary to stderr."""
+    tracer = NativeCallTracer()
+    install_tracer(tracer)
+    profiler = CommandProfiler(output_prefix, native_frame=tracer.in_flight).start()
+
+    def finish() -> None:
+        install_tracer(None)
+        report = profiler.stop()
+        calls_path = output_prefix.with_name(output_prefix.name + ".eric.jsonl")
+        calls = tracer.write_jsonl(calls_path)
+        click.echo(
+            f"profile seconds={report.seconds:.3f} cprofile={report.cprofile_path} "
+            f"stacks={report.folded_path} samples={report.samples}",
+            err=True,
+        )
+        click.echo(f"profile eric_calls={calls_path} calls={calls}", err=True)
+        for summary in tracer.summary():
+            click.echo(
+                f"profile eric function={summary.function} calls={summary.calls} "
+                f"seconds={summary.seconds:.3f} bytes_in={summary.bytes_in} "
+                f"bytes_out={summary.bytes_out}",
+                err=True,
+            )
+
+    # Registered first, so it runs after sessions and transports closed.
+    ctx.call_on_close(finish)
 
 
 @shell(prompt="elsterctl> ", intro="elsterctl interactive shell")
@@ -42,6 +104,115 @@ from elsterctl.shared.cli_context import resolve_transfer_mode
     is_flag=True,
     help="Enable test-enabled transfer mode globally unless --transfer-mode is set.",
 )
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    envvar="ELSTERCTL_OUTPUT",
+    default="text",
+    show_default=True,
+    help="Output format: human text, one JSON document, or one JSON line per operation.",
+)
+@click.option(
+    "--response-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar="ELSTERCTL_RESPONSE_DIR",
+    default=None,
+    help="Write ERiC/server response XML to side files in this directory instead of inlining it.",
+)
+@click.option(
+    "--ledger",
+    "ledger_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTERCTL_LEDGER",
+    default=None,
+    help="Idempotency ledger file. Already accepted filings are not sent again.",
+)
+@click.option(
+    "--archive",
+    "archive_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar="ELSTERCTL_ARCHIVE",
+    default=None,
+    help="Archive directory for sent payloads and server responses.",
+)
+@click.option(
+    "--replay",
+    "replay_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    envvar="ELSTERCTL_REPLAY",
+    default=None,
+    help=(
+        "Serve ERiC results from a recorded --output jsonl file instead of calling ERiC. "
+        "--ledger and --archive are replaced by temporary ones deleted on exit."
+    ),
+)
+@click.option(
+    "--replay-speedup",
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="ELSTERCTL_REPLAY_SPEEDUP",
+    default=1.0,
+    show_default=True,
+    help="Divide recorded ERiC latencies by this factor during --replay.",
+)
+@click.option(
+    "--transport",
+    "transport_name",
+    type=click.Choice(TRANSPORTS),
+    envvar="ELSTERCTL_TRANSPORT",
+    default=IN_PROCESS,
+    show_default=True,
+    help="Where ERiC runs: in this process, in a worker process, in a local daemon "
+    "(elsterctl session serve), in a crash-isolated child per filing or replayed "
+    "from --replay.",
+)
+@click.option(
+    "--transport-socket",
+    "transport_socket",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTERCTL_TRANSPORT_SOCKET",
+    default=None,
+    help="Daemon socket for --transport unix-socket.",
+)
+@click.option(
+    "--max-rss",
+    "max_rss_mb",
+    type=click.IntRange(min=1),
+    envvar="ELSTERCTL_MAX_RSS_MB",
+    default=None,
+    help="Recycle the ERiC session when process memory (RSS, MiB) exceeds this limit.",
+)
+@click.option(
+    "--warmup",
+    "warmup_versions",
+    envvar="ELSTERCTL_WARMUP",
+    default=None,
+    help="Comma-separated data type versions (e.g. TH11,UStVA_2026) whose ERiC plugins "
+    "are loaded when the session opens.",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(min=0, max=65535),
+    envvar="ELSTERCTL_METRICS_PORT",
+    default=None,
+    help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while elsterctl runs.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTERCTL_METRICS_FILE",
+    default=None,
+    help="Write Prometheus metrics to this file periodically and on exit.",
+)
+@click.option(
+    "--profile",
+    "profile_prefix",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTERCTL_PROFILE",
+    default=None,
+    help="Profile the command. Writes PREFIX.prof (cProfile), PREFIX.folded (sampled "
+    "stacks for flamegraph tools) and PREFIX.eric.jsonl (every call into ERiC).",
+)
 @click.pass_context
 def cli(
     ctx: click.Context,
@@ -50,17 +221,62 @@ def cli(
     hersteller_id: str | None,
     transfer_mode: str | None,
     test_transfer_mode: bool,
+    output_format: str,
+    response_dir: Path | None,
+    ledger_path: Path | None,
+    archive_dir: Path | None,
+    replay_path: Path | None,
+    replay_speedup: float,
+    transport_name: str,
+    transport_socket: Path | None,
+    max_rss_mb: int | None,
+    warmup_versions: str | None,
+    metrics_port: int | None,
+    metrics_file: Path | None,
+    profile_prefix: Path | None,
 ) -> None:
     """Command-line interface for ELSTER workflows."""
     ctx.ensure_object(dict)
+    if profile_prefix is not None:
+        _start_profiling(ctx, profile_prefix)
+    ctx.obj["output"] = OutputSink(output_format.lower(), response_dir)
     ctx.obj["verbose"] = verbose
     ctx.obj["certificate_path"] = certificate
     ctx.obj["hersteller_id"] = hersteller_id
+    ctx.obj["ledger_path"] = ledger_path
+    ctx.obj["archive_dir"] = archive_dir
+    ctx.obj["replay_path"] = replay_path
+    ctx.obj["replay_speedup"] = replay_speedup
+    ctx.obj["transport_name"] = transport_name
+    ctx.obj["transport_socket"] = transport_socket
+    ctx.obj["max_rss_mb"] = max_rss_mb
+    ctx.obj["warmup_versions"] = tuple(
+        version.strip() for version in (warmup_versions or "").split(",") if version.strip()
+    )
     try:
         ctx.obj["transfer_mode"] = resolve_transfer_mode(transfer_mode, test_transfer_mode)
     except ValueError as exc:
         raise click.ClickException(str(exc)) from exc
     ctx.obj["test_transfer_mode"] = ctx.obj["transfer_mode"] == "test"
+    if replay_path is not None:
+        ctx.obj["output"].info(f"Replay mode: serving ERiC results from {replay_path}")
+        _isolate_replay_state(ctx)
+    if metrics_port is not None:
+        try:
+            server = MetricsServer(metrics_port).start()
+        except OSError as exc:
+            raise click.ClickException(
+                f"Cannot serve metrics on port {metrics_port}: {exc}"
+            ) from exc
+        ctx.call_on_close(server.close)
+        host, port = server.address
+        ctx.obj["output"].info(f"Metrics: http://{host}:{port}/metrics")
+    if metrics_file is not None:
+        try:
+            writer = MetricsFileWriter(metrics_file).start()
+        except OSError as exc:
+            raise click.ClickException(f"Cannot write metrics to {metrics_file}: {exc}") from exc
+        ctx.call_on_close(writer.close)
 
 
 @cli.command("show-config")
@@ -75,8 +291,14 @@ def show_config(ctx: click.Context, as_json: bool) -> None:
         "force_test_mode": os.getenv("ELSTERCTL_FORCE_TEST_MODE", ""),
         "hersteller_id": ctx.obj.get("hersteller_id") or "",
         "eric_lib": os.getenv("ELSTER_ERIC_LIB", ""),
+        "config_profile": ctx.obj.get("config_profile") or "",
+        "transport": ctx.obj.get("transport_name") or IN_PROCESS,
     }
 
+    output = get_output(ctx)
+    if output.structured:
+        output.emit(config_data)
+        return
     if as_json:
         click.echo(json.dumps(config_data, indent=2, sort_keys=True))
         return
@@ -87,6 +309,8 @@ def show_config(ctx: click.Context, as_json: bool) -> None:
     click.echo(f"force_test_mode={config_data['force_test_mode']}")
     click.echo(f"hersteller_id={config_data['hersteller_id']}")
     click.echo(f"eric_lib={config_data['eric_lib']}")
+    click.echo(f"config_profile={config_data['config_profile']}")
+    click.echo(f"transport={config_data['transport']}")
 
 
 cli.add_command(message)
@@ -95,8 +319,11 @@ cli.add_command(vat)
 cli.add_command(transfer)
 cli.add_command(auth)
 cli.add_command(config)
+cli.add_command(session)
 
 
 def main() -> None:
-    """Run the CLI."""
-    cli(obj={})
+    """Run the CLI with defaults from the active config profile."""
+    profile_name, settings = load_active_profile()
+    apply_profile_environment(settings)
+    cli(obj={"config_profile": profile_name}, default_map=build_default_map(settings))
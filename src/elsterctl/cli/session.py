@@ -0,0 +1,297 @@
+"""ERiC session commands and helpers."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import click
+
+from elsterctl.infrastructure.eric.errors import EricError
+from elsterctl.infrastructure.eric.replay import (
+    ReplayLibrary,
+    load_recording,
+    replay_client_factory,
+)
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.eric.warmup import WarmupReport
+from elsterctl.infrastructure.eric.watchdog import ResourceReport, ResourceWatchdog, WatchdogLimits
+from elsterctl.infrastructure.eric.worker import RecyclePolicy
+from elsterctl.infrastructure.metrics.instruments import watch_session, watch_transport
+from elsterctl.infrastructure.metrics.registry import DEFAULT_REGISTRY
+from elsterctl.infrastructure.transport.base import (
+    IN_PROCESS,
+    ISOLATED,
+    REPLAY,
+    SUBPROCESS,
+    UNIX_SOCKET,
+    EricTransport,
+)
+from elsterctl.infrastructure.transport.daemon import (
+    EricDaemon,
+    UnixSocketTransport,
+    default_socket_path,
+)
+from elsterctl.infrastructure.transport.local import (
+    InProcessTransport,
+    IsolatedTransport,
+    ReplayTransport,
+    WorkerProcessTransport,
+)
+from elsterctl.shared.output import get_output
+
+
+def get_eric_session(ctx: click.Context) -> EricSession:
+    """Return the ERiC session of this process, creating it on first use.
+
+    The session lives on the root context: a one-shot command closes it when
+    the command exits, the interactive shell keeps it until the shell ends.
+    With `--replay`, the session serves recorded results instead of ERiC
+    and skips warm-up, which would consume recorded results. On close, a
+    resource report is printed to stderr if native resources leaked
+    (always with `--verbose`).
+    """
+    root = ctx.find_root()
+    root.ensure_object(dict)
+    session = root.obj.get("eric_session")
+    if session is None:
+        max_rss_mb = root.obj.get("max_rss_mb")
+        watchdog = ResourceWatchdog(
+            WatchdogLimits(max_rss_bytes=int(max_rss_mb * 1024 * 1024) if max_rss_mb else None)
+        )
+        replay_path = root.obj.get("replay_path")
+        if replay_path:
+            try:
+                library = ReplayLibrary(
+                    load_recording(Path(str(replay_path))),
+                    speedup=float(root.obj.get("replay_speedup") or 1.0),
+                )
+            except EricError as exc:
+                raise click.ClickException(str(exc)) from exc
+            session = EricSession(
+                client_factory=replay_client_factory(library), watchdog=watchdog
+            )
+        else:
+            session = EricSession(
+                watchdog=watchdog, warmup_versions=root.obj.get("warmup_versions") or ()
+            )
+        root.obj["eric_session"] = session
+        watch_session(session)
+        root.call_on_close(lambda: _close_session(session, bool(root.obj.get("verbose"))))
+    return session
+
+
+def get_transport(ctx: click.Context, recycle_policy: RecyclePolicy | None = None) -> EricTransport:
+    """Return the transport selected with `--transport` (or the config profile).
+
+    The transport is shared by all commands of the process. A recycling
+    policy needs ERiC in a worker process, so it gets its own subprocess
+    transport that is closed with the calling command.
+    """
+    root = ctx.find_root()
+    root.ensure_object(dict)
+    name = root.obj.get("transport_name") or IN_PROCESS
+    replaying = bool(root.obj.get("replay_path"))
+    if replaying and name not in (IN_PROCESS, REPLAY):
+        raise click.ClickException(f"--replay cannot be combined with the {name} transport.")
+    if name == REPLAY and not replaying:
+        raise click.ClickException("The replay transport needs a recording. Pass --replay.")
+
+    if recycle_policy is not None and recycle_policy.enabled:
+        if replaying or name not in (IN_PROCESS, SUBPROCESS):
+            raise click.ClickException(
+                f"Worker process recycling is not available with the "
+                f"{REPLAY if replaying else name} transport."
+            )
+        transport = WorkerProcessTransport(recycle_policy)
+        ctx.call_on_close(transport.close)
+        watch_transport(transport)
+        return transport
+
+    transport = root.obj.get("transport")
+    if transport is None:
+        if replaying:
+            transport = ReplayTransport(get_eric_session(ctx))
+        elif name == SUBPROCESS:
+            transport = WorkerProcessTransport()
+        elif name == ISOLATED:
+            transport = IsolatedTransport()
+        elif name == UNIX_SOCKET:
+            socket_path = root.obj.get("transport_socket")
+            transport = UnixSocketTransport(Path(str(socket_path)) if socket_path else None)
+        else:
+            transport = InProcessTransport(get_eric_session(ctx))
+        root.obj["transport"] = transport
+        root.call_on_close(transport.close)
+        watch_transport(transport)
+    return transport
+
+
+def _close_session(session: EricSession, verbose: bool) -> None:
+    session.close()
+    report = session.resource_report()
+    if report.leaked or verbose:
+        for line in _format_report(report):
+            click.echo(line, err=True)
+
+
+def _format_megabytes(value: int | None) -> str:
+    return f"{value / (1024 * 1024):.1f}MiB" if value is not None else "n/a"
+
+
+def _format_report(report: ResourceReport) -> list[str]:
+    counters = report.counters
+    lines = [
+        f"eric_resources certificates={counters.certificates_opened}/"
+        f"{counters.certificates_closed} buffers={counters.buffers_created}/"
+        f"{counters.buffers_freed} (opened/closed)",
+        f"eric_memory rss_start={_format_megabytes(report.rss_start_bytes)} "
+        f"rss_peak={_format_megabytes(report.rss_peak_bytes)} "
+        f"rss_last={_format_megabytes(report.rss_last_bytes)} recycles={report.recycles}",
+    ]
+    lines.extend(f"eric_recycle reason={reason}" for reason in report.recycle_reasons)
+    if report.leaked:
+        lines.append(
+            f"eric_leaks buffers={report.leaked_buffers} certificates={report.leaked_certificates}"
+        )
+    return lines
+
+
+def format_warmup(report: WarmupReport) -> list[str]:
+    """Return text lines describing a session warm-up."""
+    lines = [
+        f"eric_warmup initialize={report.initialize_seconds:.3f}s "
+        f"total={report.total_seconds:.3f}s versions={len(report.versions)}"
+    ]
+    lines.extend(
+        f"eric_warmup version={version.data_type_version} "
+        f"result_code={version.result_code} seconds={version.seconds:.3f}"
+        for version in report.versions
+    )
+    return lines
+
+
+def warmup_record(report: WarmupReport) -> dict[str, Any]:
+    """Return a session warm-up as a structured output field."""
+    return {**asdict(report), "total_seconds": report.total_seconds}
+
+
+@click.group()
+def session() -> None:
+    """Persistent ERiC session (useful in the interactive shell)."""
+
+
+@session.command("status")
+@click.pass_context
+def session_status(ctx: click.Context) -> None:
+    """Show whether ERiC is initialized and which certificates are open."""
+    eric_session = get_eric_session(ctx)
+    status = eric_session.status()
+    report = eric_session.resource_report()
+    output = get_output(ctx)
+    if output.structured:
+        output.emit(
+            {
+                "operation": "session.status",
+                "active": status.active,
+                "uptime_seconds": status.uptime_seconds,
+                "sends": status.sends,
+                "open_certificates": [str(path) for path in status.open_certificates],
+                "resets": status.resets,
+                "cached_pins": status.cached_pins,
+                "resources": {
+                    **vars(report.counters),
+                    "leaked_buffers": report.leaked_buffers,
+                    "leaked_certificates": report.leaked_certificates,
+                    "rss_bytes": report.rss_last_bytes,
+                    "rss_peak_bytes": report.rss_peak_bytes,
+                    "recycles": report.recycles,
+                },
+                "warmup": warmup_record(status.warmup) if status.warmup is not None else None,
+            }
+        )
+        return
+
+    click.echo(f"active={status.active}")
+    click.echo(f"uptime_seconds={status.uptime_seconds:.1f}")
+    click.echo(f"sends={status.sends}")
+    click.echo(f"open_certificates={len(status.open_certificates)}")
+    for path in status.open_certificates:
+        click.echo(f"  {path}")
+    click.echo(f"resets={status.resets}")
+    click.echo(f"cached_pins={status.cached_pins}")
+    for line in _format_report(report):
+        click.echo(line)
+    if status.warmup is not None:
+        for line in format_warmup(status.warmup):
+            click.echo(line)
+
+
+@session.command("warmup")
+@click.option(
+    "--data-type-version",
+    "data_type_versions",
+    multiple=True,
+    help="Data type version to warm up in addition to --warmup. Repeatable.",
+)
+@click.pass_context
+def session_warmup(ctx: click.Context, data_type_versions: tuple[str, ...]) -> None:
+    """Initialize ERiC now and load the plugins of the warm-up data type versions."""
+    try:
+        report = get_eric_session(ctx).warm_up(data_type_versions)
+    except EricError as exc:
+        raise click.ClickException(str(exc)) from exc
+    output = get_output(ctx)
+    if output.structured:
+        output.emit({"operation": "session.warmup", **warmup_record(report)})
+        return
+    for line in format_warmup(report):
+        click.echo(line)
+
+
+@session.command("serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="ELSTERCTL_TRANSPORT_SOCKET",
+    default=None,
+    help="Unix socket to listen on. Defaults to $XDG_RUNTIME_DIR/elsterctl/eric.sock.",
+)
+@click.pass_context
+def session_serve(ctx: click.Context, socket_path: Path | None) -> None:
+    """Keep ERiC warm and serve sends from `--transport unix-socket` clients."""
+    effective_socket_path = socket_path or default_socket_path()
+    eric_session = get_eric_session(ctx)
+    daemon = EricDaemon(effective_socket_path, eric_session)
+    try:
+        # Clients should never pay for ERiC initialization or plugin loading.
+        eric_session.warm_up()
+        daemon.start()
+    except EricError as exc:
+        raise click.ClickException(str(exc)) from exc
+    get_output(ctx).info(f"ERiC daemon listening on {effective_socket_path} (Ctrl-C to stop).")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+
+
+@session.command("metrics")
+def session_metrics() -> None:
+    """Print the metrics of this process in the Prometheus text format."""
+    click.echo(DEFAULT_REGISTRY.render(), nl=False)
+
+
+@session.command("reset")
+@click.pass_context
+def session_reset(ctx: click.Context) -> None:
+    """Shut down ERiC, close cached certificates and forget PINs."""
+    try:
+        get_eric_session(ctx).reset()
+    except EricError as exc:
+        raise click.ClickException(str(exc)) from exc
+    get_output(ctx).info("ERiC session reset.")
@@ -2,9 +2,36 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from pathlib import Path
+
 import click
 
+from elsterctl.infrastructure.archive.dictionary import MAX_DICTIONARY_SIZE, train_dictionary
+from elsterctl.infrastructure.archive.store import SubmissionArchive
 from elsterctl.shared.cli_context import get_effective_transfer_mode
+from elsterctl.shared.output import get_output
+
+
+def _require_archive(ctx: click.Context) -> SubmissionArchive:
+    archive = get_archive(ctx)
+    if archive is None:
+        raise click.ClickException(
+            "No submission archive configured. Provide --archive or ELSTERCTL_ARCHIVE."
+        )
+    return archive
+
+
+def get_archive(ctx: click.Context) -> SubmissionArchive | None:
+    """Return the submission archive configured via `--archive`, if any."""
+    root = ctx.find_root()
+    root_obj = root.obj or {}
+    archive = root_obj.get("archive")
+    if archive is None and root_obj.get("archive_dir"):
+        archive = SubmissionArchive(Path(str(root_obj["archive_dir"])))
+        root_obj["archive"] = archive
+        root.call_on_close(archive.close)
+    return archive
 
 
 @click.group()
@@ -13,8 +40,88 @@ def transfer() -> None:
 
 
 @transfer.command("status")
+@click.argument("ticket", required=False)
 @click.pass_context
-def transfer_status(ctx: click.Context) -> None:
-    """Transfer status placeholder command."""
-    click.echo(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
-    raise click.ClickException("Not implemented yet.")
+def transfer_status(ctx: click.Context, ticket: str | None) -> None:
+    """Show the archived submission for a transfer ticket."""
+    output = get_output(ctx)
+    output.info(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
+    if ticket is None:
+        raise click.ClickException("Missing transfer ticket.")
+
+    submission = _require_archive(ctx).get(ticket)
+    if submission is None:
+        raise click.ClickException(f"Transfer ticket not found in archive: {ticket}")
+
+    archived_at = datetime.fromtimestamp(submission.archived_at_ns / 1e9, tz=timezone.utc)
+    if output.structured:
+        output.emit(
+            {
+                "operation": "transfer.status",
+                "transfer_ticket": submission.transfer_ticket,
+                "result_code": submission.result_code,
+                "archived_at": archived_at.isoformat(),
+                "payload_bytes": len(submission.payload),
+                **output.response_fields(
+                    submission.transfer_ticket,
+                    submission.eric_response_xml,
+                    submission.server_response_xml,
+                ),
+            }
+        )
+        return
+
+    click.echo(f"Transfer ticket: {submission.transfer_ticket}")
+    click.echo(f"Result code: {submission.result_code}")
+    click.echo(f"Archived at: {archived_at.isoformat()}")
+    click.echo(f"Payload size: {len(submission.payload)} bytes")
+    if submission.server_response_xml:
+        click.echo("Server response:")
+        click.echo(submission.server_response_xml)
+
+
+@transfer.command("train-dictionary")
+@click.option(
+    "--samples",
+    type=click.IntRange(min=2),
+    default=1000,
+    show_default=True,
+    help="Number of archived filings whose responses are used for training.",
+)
+@click.option(
+    "--max-size",
+    type=click.IntRange(min=1, max=MAX_DICTIONARY_SIZE),
+    default=MAX_DICTIONARY_SIZE,
+    show_default=True,
+    help="Maximum dictionary size in bytes.",
+)
+@click.pass_context
+def transfer_train_dictionary(ctx: click.Context, samples: int, max_size: int) -> None:
+    """Train a response dictionary from the archive and use it for new records."""
+    archive = _require_archive(ctx)
+    responses = [
+        document.encode("utf-8")
+        for documents in archive.response_samples(samples)
+        for document in documents
+        if document
+    ]
+    if len(responses) < 2:
+        raise click.ClickException("Not enough archived responses to train a dictionary.")
+
+    dictionary = train_dictionary(responses, max_size=max_size)
+    archive.install_dictionary(dictionary)
+
+    record = {
+        "operation": "transfer.train-dictionary",
+        "dictionary_id": dictionary.dictionary_id.hex(),
+        "dictionary_bytes": len(dictionary.data),
+        "samples": len(responses),
+    }
+    output = get_output(ctx)
+    if output.structured:
+        output.emit(record)
+        return
+    click.echo(
+        f"Installed dictionary {record['dictionary_id']} "
+        f"({record['dictionary_bytes']} bytes from {record['samples']} responses)"
+    )
@@ -5,6 +5,7 @@ from __future__ import annotations
 import click
 
 from elsterctl.shared.cli_context import get_effective_transfer_mode
+from elsterctl.shared.output import get_output
 
 
 @click.group()
@@ -16,7 +17,7 @@ def vat() -> None:
 @click.pass_context
 def submit_advance(ctx: click.Context) -> None:
     """Submit VAT advance return placeholder command."""
-    click.echo(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
+    get_output(ctx).info(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
     raise click.ClickException("Not implemented yet.")
 
 
@@ -24,5 +25,5 @@ def submit_advance(ctx: click.Context) -> None:
 @click.pass_context
 def submit_annual(ctx: click.Context) -> None:
     """Submit VAT annual return placeholder command."""
-    click.echo(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
+    get_output(ctx).info(f"Effective transfer mode: {get_effective_transfer_mode(ctx)}")
     raise click.ClickException("Not implemented yet.")
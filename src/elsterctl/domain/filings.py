@@ -0,0 +1,163 @@
+"""Response documents of large batches, held by reference.
+
+A batch reported with `--output json` keeps every result until the end;
+at 100k filings the inlined response XML dominates the process size.
+Results therefore hold their response documents as an `XmlRef` from the
+moment ERiC returns: a short inline string, a pointer into a spool file,
+or a pointer to the filing in the submission archive. The document is only
+read when it is reported.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Protocol
+
+# Documents up to this size are kept inline; a pointer plus an open spool
+# file is not worth it for an empty or tiny response.
+INLINE_XML_LIMIT = 256
+
+
+class XmlRef(ABC):
+    """A response document that is resolved on demand."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def read(self) -> str:
+        """Return the document text."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the document size in UTF-8 bytes."""
+
+
+class InlineXml(XmlRef):
+    """A document held in memory."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def read(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:
+        return len(self.text.encode("utf-8"))
+
+    def __repr__(self) -> str:
+        return f"InlineXml({len(self)} bytes)"
+
+
+class FileXml(XmlRef):
+    """A document stored at `offset` in a file, `length` bytes of UTF-8."""
+
+    __slots__ = ("path", "offset", "length")
+
+    def __init__(self, path: str, offset: int, length: int) -> None:
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    def read(self) -> str:
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offset)
+            data = handle.read(self.length)
+        if len(data) != self.length:
+            raise ValueError(f"Truncated XML reference {self.path}@{self.offset}.")
+        return data.decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"FileXml({self.path!r}, offset={self.offset}, length={self.length})"
+
+
+class ResponseArchive(Protocol):
+    def responses(self, transfer_ticket: str) -> tuple[str, str] | None: ...
+
+
+class ArchivedXml(XmlRef):
+    """The ERiC or server response of an archived submission."""
+
+    __slots__ = ("archive", "transfer_ticket", "kind")
+
+    def __init__(self, archive: ResponseArchive, transfer_ticket: str, kind: str) -> None:
+        if kind not in ("eric", "server"):
+            raise ValueError(f"Unknown response kind: {kind}")
+        self.archive = archive
+        self.transfer_ticket = transfer_ticket
+        self.kind = kind
+
+    def read(self) -> str:
+        responses = self.archive.responses(self.transfer_ticket)
+        if responses is None:
+            raise ValueError(f"Transfer ticket not in archive: {self.transfer_ticket}")
+        return responses[0] if self.kind == "eric" else responses[1]
+
+    def __len__(self) -> int:
+        return len(self.read().encode("utf-8"))
+
+    def __repr__(self) -> str:
+        return f"ArchivedXml({self.transfer_ticket!r}, {self.kind!r})"
+
+
+def inline_xml(text: str) -> XmlRef | None:
+    """Return `text` as an in-memory reference; None for an empty document."""
+    return InlineXml(text) if text else None
+
+
+class XmlSpool:
+    """Append-only file of response documents handing out `FileXml` refs.
+
+    Without a path a temporary file is used and removed on `close`.
+    """
+
+    def __init__(self, path: Path | None = None, *, inline_limit: int = INLINE_XML_LIMIT) -> None:
+        if path is None:
+            descriptor, name = tempfile.mkstemp(prefix="elsterctl-spool-", suffix=".xml")
+            self._handle = os.fdopen(descriptor, "w+b")
+            self._temporary = True
+        else:
+            self._handle = open(path, "a+b")
+            self._temporary = False
+            name = str(path)
+        self.path = name
+        self._inline_limit = inline_limit
+        self._lock = threading.Lock()
+        self.spooled_bytes = 0
+
+    def add(self, text: str) -> XmlRef | None:
+        """Store `text` and return a reference to it; None for an empty document."""
+        if not text:
+            return None
+        data = text.encode("utf-8")
+        if len(data) <= self._inline_limit:
+            return InlineXml(text)
+        with self._lock:
+            offset = self._handle.seek(0, os.SEEK_END)
+            self._handle.write(data)
+            # Readers open the file themselves and must see the data.
+            self._handle.flush()
+            self.spooled_bytes += len(data)
+        return FileXml(self.path, offset, len(data))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle.closed:
+                return
+            self._handle.close()
+            if self._temporary:
+                Path(self.path).unlink(missing_ok=True)
+
+    def __enter__(self) -> XmlSpool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
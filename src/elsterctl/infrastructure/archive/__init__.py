@@ -0,0 +1 @@
+"""Append-only archive of sent payloads and server responses."""
@@ -0,0 +1,100 @@
+"""Preset compression dictionaries for archived ERiC and server responses.
+
+Responses of different filings share almost all of their bytes: namespace
+declarations, the transfer header layout, status texts. Compressed one by
+one, every record pays for this boilerplate again. A preset dictionary
+built from past responses lets deflate reference it instead, so only the
+per-filing values (tickets, timestamps, codes) cost space.
+
+The standard library has no zstd, so dictionaries are raw deflate
+`zdict` presets; deflate only looks back 32 KiB, which bounds the useful
+dictionary size.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+# Runs of adjacent tags are the structural boilerplate; text nodes catch
+# repeated status messages.
+_TAG_RUN = re.compile(rb"(?:<[^<>]*>\s*)+")
+_TEXT_NODE = re.compile(rb">([^<>]{4,})<")
+
+
+@dataclass(frozen=True)
+class ResponseDictionary:
+    """Trained preset dictionary, identified by a short content digest."""
+
+    data: bytes
+
+    @property
+    def dictionary_id(self) -> bytes:
+        return hashlib.blake2b(self.data, digest_size=4).digest()
+
+    def compress(self, data: bytes, level: int = 6) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=self.data)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = self.decompressor()
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def decompressor(self) -> Any:
+        """Return a streaming decompressor for data compressed with `compress`."""
+        return zlib.decompressobj(-zlib.MAX_WBITS, zdict=self.data)
+
+
+def train_dictionary(
+    samples: Iterable[bytes],
+    *,
+    max_size: int = MAX_DICTIONARY_SIZE,
+    min_document_fraction: float = 0.1,
+) -> ResponseDictionary:
+    """Build a preset dictionary from sample responses.
+
+    Candidate fragments are tag runs and text nodes. A fragment qualifies if
+    it occurs in at least `min_document_fraction` of the samples (and at
+    least two); fragments are ranked by the bytes they would save and the
+    most valuable ones are placed at the end of the dictionary, where
+    deflate references are cheapest.
+    """
+    if not 0 < max_size <= MAX_DICTIONARY_SIZE:
+        raise ValueError(f"max_size must be between 1 and {MAX_DICTIONARY_SIZE}.")
+
+    document_frequency: Counter[bytes] = Counter()
+    sample_count = 0
+    for sample in samples:
+        if not sample:
+            continue
+        sample_count += 1
+        fragments = set(_TAG_RUN.findall(sample))
+        fragments.update(_TEXT_NODE.findall(sample))
+        document_frequency.update(fragment for fragment in fragments if len(fragment) >= 4)
+    if not sample_count:
+        raise ValueError("Cannot train a dictionary without samples.")
+
+    threshold = max(2, int(sample_count * min_document_fraction))
+    ranked = sorted(
+        (fragment for fragment, frequency in document_frequency.items() if frequency >= threshold),
+        key=lambda fragment: (document_frequency[fragment] * len(fragment), fragment),
+        reverse=True,
+    )
+
+    selected: list[bytes] = []
+    size = 0
+    for fragment in ranked:
+        if size + len(fragment) > max_size:
+            continue
+        if any(fragment in chosen for chosen in selected):
+            continue
+        selected.append(fragment)
+        size += len(fragment)
+
+    return ResponseDictionary(b"".join(reversed(selected)))
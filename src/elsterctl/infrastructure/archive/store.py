@@ -0,0 +1,543 @@
+"""Segmented, append-only archive of submissions.
+
+Each filing is appended as one compressed record (payload, ERiC response,
+server response) to the active segment file. A fixed-width index entry
+(ticket digest, timestamp, offset, length) is appended next to it. When a
+segment exceeds `max_segment_bytes` it is sealed: its index is rewritten
+sorted by ticket digest and later memory-mapped, so a lookup is a binary
+search per sealed segment and never touches the record data of other
+filings. Sealed segments are never modified again.
+
+Several processes may share an archive directory (parallel batches, a
+resident shell, shards on a shared path). Appends and roll-overs hold an
+exclusive `flock` on the archive's lock file, reads a shared one; under
+the lock each process first catches up with index entries and sealed
+segments written by the others, so offsets always come from the file.
+
+Once a response dictionary is installed, new records are compressed
+against it; older records keep referencing the dictionary they were
+written with, so dictionaries can be retrained at any time.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from elsterctl.infrastructure.archive.dictionary import ResponseDictionary
+
+# ticket digest, archived_at (ns since epoch), record offset, record length
+_INDEX_ENTRY = struct.Struct("<16sqQI")
+# result code, ticket length, payload length, ERiC response length, server response length
+_RECORD_HEADER = struct.Struct("<iHIII")
+_CODEC_ZLIB = 0
+_CODEC_ZLIB_DICTIONARY = 1
+_DICTIONARY_ID_SIZE = 4
+
+# Skipped record fields are inflated and dropped in pieces of this size.
+_SKIP_CHUNK = 64 * 1024
+
+_SEGMENT_PREFIX = "segment-"
+_DATA_SUFFIX = ".seg"
+_INDEX_SUFFIX = ".idx"
+_DICTIONARY_DIR = "dictionaries"
+_DICTIONARY_SUFFIX = ".zdict"
+_CURRENT_DICTIONARY = "current"
+_LOCK_FILE = "lock"
+
+_Found = TypeVar("_Found")
+
+
+class ArchiveError(ValueError):
+    """Raised when an archive record cannot be read."""
+
+
+@dataclass(frozen=True)
+class ArchivedSubmission:
+    """One archived filing."""
+
+    transfer_ticket: str
+    result_code: int
+    archived_at_ns: int
+    payload: bytes
+    eric_response_xml: str
+    server_response_xml: str
+
+
+def ticket_digest(transfer_ticket: str) -> bytes:
+    """Return the 16-byte index key of a transfer ticket."""
+    return hashlib.blake2b(transfer_ticket.encode("utf-8"), digest_size=16).digest()
+
+
+def _segment_path(directory: Path, number: int, suffix: str) -> Path:
+    return directory / f"{_SEGMENT_PREFIX}{number:06d}{suffix}"
+
+
+def _strip_terminator(payload: bytes | bytearray) -> bytes:
+    # Payloads with embedded attachments carry a NUL terminator for ERiC.
+    if payload.endswith(b"\0"):
+        return bytes(memoryview(payload)[:-1])
+    return bytes(payload)
+
+
+def _encode_record(
+    transfer_ticket: str,
+    result_code: int,
+    payload: bytes,
+    eric_response_xml: str,
+    server_response_xml: str,
+    compression_level: int,
+    dictionary: ResponseDictionary | None,
+) -> bytes:
+    ticket = transfer_ticket.encode("utf-8")
+    eric = eric_response_xml.encode("utf-8")
+    server = server_response_xml.encode("utf-8")
+    header = _RECORD_HEADER.pack(result_code, len(ticket), len(payload), len(eric), len(server))
+    frame = b"".join((header, ticket, payload, eric, server))
+    if dictionary is None:
+        return bytes((_CODEC_ZLIB,)) + zlib.compress(frame, compression_level)
+    return (
+        bytes((_CODEC_ZLIB_DICTIONARY,))
+        + dictionary.dictionary_id
+        + dictionary.compress(frame, compression_level)
+    )
+
+
+def _open_record(
+    record: bytes,
+    load_dictionary: Callable[[bytes], ResponseDictionary],
+) -> tuple[Any, bytes]:
+    """Return a decompressor for `record` and the compressed frame it reads."""
+    codec = record[0] if record else None
+    if codec == _CODEC_ZLIB:
+        return zlib.decompressobj(), record[1:]
+    if codec == _CODEC_ZLIB_DICTIONARY:
+        dictionary_id = record[1 : 1 + _DICTIONARY_ID_SIZE]
+        return load_dictionary(dictionary_id).decompressor(), record[1 + _DICTIONARY_ID_SIZE :]
+    raise ArchiveError("Unsupported archive record encoding.")
+
+
+class _FrameReader:
+    """Inflates a record frame field by field; skipped fields are never held whole."""
+
+    def __init__(self, decompressor: Any, data: bytes) -> None:
+        self._decompressor = decompressor
+        self._input = data
+
+    def read(self, size: int) -> bytes:
+        parts = []
+        while size > 0:
+            try:
+                chunk = self._decompressor.decompress(self._input, size)
+            except zlib.error as exc:
+                raise ArchiveError(f"Corrupt archive record: {exc}") from exc
+            self._input = self._decompressor.unconsumed_tail
+            if not chunk:
+                raise ArchiveError("Truncated archive record.")
+            parts.append(chunk)
+            size -= len(chunk)
+        return b"".join(parts)
+
+    def skip(self, size: int) -> None:
+        while size > 0:
+            size -= len(self.read(min(size, _SKIP_CHUNK)))
+
+
+def _decode_record(
+    record: bytes,
+    archived_at_ns: int,
+    load_dictionary: Callable[[bytes], ResponseDictionary],
+) -> ArchivedSubmission:
+    decompressor, data = _open_record(record, load_dictionary)
+    try:
+        frame = decompressor.decompress(data) + decompressor.flush()
+    except zlib.error as exc:
+        raise ArchiveError(f"Corrupt archive record: {exc}") from exc
+
+    result_code, ticket_len, payload_len, eric_len, server_len = _RECORD_HEADER.unpack_from(frame)
+    position = _RECORD_HEADER.size
+    fields = []
+    for length in (ticket_len, payload_len, eric_len, server_len):
+        fields.append(frame[position : position + length])
+        position += length
+    ticket, payload, eric, server = fields
+    return ArchivedSubmission(
+        transfer_ticket=ticket.decode("utf-8"),
+        result_code=result_code,
+        archived_at_ns=archived_at_ns,
+        payload=payload,
+        eric_response_xml=eric.decode("utf-8"),
+        server_response_xml=server.decode("utf-8"),
+    )
+
+
+def _decode_responses(
+    record: bytes,
+    load_dictionary: Callable[[bytes], ResponseDictionary],
+) -> tuple[str, str, str]:
+    """Return ticket, ERiC and server response of `record` without inflating its payload."""
+    reader = _FrameReader(*_open_record(record, load_dictionary))
+    _, ticket_len, payload_len, eric_len, server_len = _RECORD_HEADER.unpack(
+        reader.read(_RECORD_HEADER.size)
+    )
+    ticket = reader.read(ticket_len).decode("utf-8")
+    reader.skip(payload_len)
+    return ticket, reader.read(eric_len).decode("utf-8"), reader.read(server_len).decode("utf-8")
+
+
+class _SealedSegment:
+    """Read-only segment with a sorted, memory-mapped index."""
+
+    def __init__(self, data_path: Path, index_path: Path) -> None:
+        self._data = data_path.open("rb")
+        self._index_file = index_path.open("rb")
+        size = os.fstat(self._index_file.fileno()).st_size
+        self.count = size // _INDEX_ENTRY.size
+        self._index = (
+            mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        )
+
+    def find(self, digest: bytes) -> list[tuple[int, int, int]]:
+        """Return (archived_at_ns, offset, length) of all entries for `digest`."""
+        if self._index is None:
+            return []
+        entry_size = _INDEX_ENTRY.size
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * entry_size
+            if self._index[start : start + 16] < digest:
+                low = middle + 1
+            else:
+                high = middle
+
+        matches = []
+        while low < self.count:
+            key, archived_at_ns, offset, length = _INDEX_ENTRY.unpack_from(
+                self._index, low * entry_size
+            )
+            if key != digest:
+                break
+            matches.append((archived_at_ns, offset, length))
+            low += 1
+        return matches
+
+    def entries(self) -> list[tuple[int, int, int]]:
+        if self._index is None:
+            return []
+        return [
+            (archived_at_ns, offset, length)
+            for _, archived_at_ns, offset, length in _INDEX_ENTRY.iter_unpack(self._index)
+        ]
+
+    def read(self, offset: int, length: int) -> bytes:
+        return os.pread(self._data.fileno(), length, offset)
+
+    def close(self) -> None:
+        if self._index is not None:
+            self._index.close()
+        self._index_file.close()
+        self._data.close()
+
+
+class SubmissionArchive:
+    """Append-only store of sent payloads and responses, keyed by transfer ticket."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compression_level: int = 6,
+        clock: Callable[[], int] = time.time_ns,
+    ) -> None:
+        if max_segment_bytes < 1:
+            raise ValueError("max_segment_bytes must be positive.")
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self._max_segment_bytes = max_segment_bytes
+        self._compression_level = compression_level
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._dictionaries: dict[bytes, ResponseDictionary] = {}
+        self._dictionary = self._load_current_dictionary()
+        self._lock_file = (directory / _LOCK_FILE).open("a+b")
+
+        with self._file_lock(fcntl.LOCK_EX):
+            numbers = sorted(
+                int(path.name[len(_SEGMENT_PREFIX) : -len(_DATA_SUFFIX)])
+                for path in directory.glob(f"{_SEGMENT_PREFIX}*{_DATA_SUFFIX}")
+            )
+            self._sealed_numbers = numbers[:-1]
+            self._sealed: dict[int, _SealedSegment] = {}
+            self._open_active(numbers[-1] if numbers else 1)
+            self._sync(repair=True)
+
+    def __len__(self) -> int:
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._sync()
+            sealed = sum(
+                _segment_path(self.directory, number, _INDEX_SUFFIX).stat().st_size
+                // _INDEX_ENTRY.size
+                for number in self._sealed_numbers
+            )
+            return sealed + self._active_count
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._sealed_numbers) + 1
+
+    @property
+    def dictionary(self) -> ResponseDictionary | None:
+        return self._dictionary
+
+    def install_dictionary(self, dictionary: ResponseDictionary) -> None:
+        """Persist `dictionary` and compress all further records with it."""
+        dictionary_dir = self.directory / _DICTIONARY_DIR
+        dictionary_dir.mkdir(exist_ok=True)
+        name = dictionary.dictionary_id.hex()
+        path = dictionary_dir / f"{name}{_DICTIONARY_SUFFIX}"
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            if not path.exists():
+                self._write_atomically(path, dictionary.data)
+            self._write_atomically(dictionary_dir / _CURRENT_DICTIONARY, name.encode("ascii"))
+            self._dictionaries[dictionary.dictionary_id] = dictionary
+            self._dictionary = dictionary
+
+    def response_samples(self, limit: int) -> list[tuple[str, str]]:
+        """Return ERiC and server responses of up to `limit` filings, newest segments first.
+
+        Meant for dictionary training: payloads are skipped while inflating
+        and never held in memory.
+        """
+        found: list[tuple[str, str]] = []
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._sync()
+            active = [entry for values in self._active_entries.values() for entry in values]
+            for _, offset, length in sorted(active, reverse=True):
+                if len(found) >= limit:
+                    return found
+                record = os.pread(self._data.fileno(), length, offset)
+                found.append(_decode_responses(record, self._load_dictionary)[1:])
+            for number in reversed(self._sealed_numbers):
+                segment = self._sealed_segment(number)
+                for _, offset, length in segment.entries():
+                    if len(found) >= limit:
+                        return found
+                    record = segment.read(offset, length)
+                    found.append(_decode_responses(record, self._load_dictionary)[1:])
+        return found
+
+    def append(
+        self,
+        transfer_ticket: str,
+        payload: bytes | bytearray,
+        eric_response_xml: str,
+        server_response_xml: str,
+        result_code: int = 0,
+    ) -> None:
+        """Durably append one filing; the record is on disk before returning."""
+        record = _encode_record(
+            transfer_ticket,
+            result_code,
+            _strip_terminator(payload),
+            eric_response_xml,
+            server_response_xml,
+            self._compression_level,
+            self._dictionary,
+        )
+        digest = ticket_digest(transfer_ticket)
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            self._sync(repair=True)
+            offset = os.fstat(self._data.fileno()).st_size
+            if offset and offset + len(record) > self._max_segment_bytes:
+                self._roll_over()
+                offset = 0
+            archived_at_ns = self._clock()
+            self._data.write(record)
+            self._data.flush()
+            os.fsync(self._data.fileno())
+            # The index entry is written last: a crash in between leaves an
+            # unreferenced record, never an index entry without data.
+            self._index.write(_INDEX_ENTRY.pack(digest, archived_at_ns, offset, len(record)))
+            self._index.flush()
+            os.fsync(self._index.fileno())
+            self._index_read += _INDEX_ENTRY.size
+            self._active_count += 1
+            self._active_entries.setdefault(digest, []).append(
+                (archived_at_ns, offset, len(record))
+            )
+
+    def get(self, transfer_ticket: str) -> ArchivedSubmission | None:
+        """Return the latest archived filing for `transfer_ticket`, if any."""
+        return self._lookup(
+            transfer_ticket,
+            lambda record, archived_at_ns: self._match(transfer_ticket, record, archived_at_ns),
+        )
+
+    def responses(self, transfer_ticket: str) -> tuple[str, str] | None:
+        """Return ERiC and server response of the latest filing for `transfer_ticket`.
+
+        Like `get`, but the payload is skipped instead of inflated.
+        """
+
+        def decode(record: bytes, archived_at_ns: int) -> tuple[str, str] | None:
+            ticket, eric_response_xml, server_response_xml = _decode_responses(
+                record, self._load_dictionary
+            )
+            # Guards against digest collisions.
+            return (eric_response_xml, server_response_xml) if ticket == transfer_ticket else None
+
+        return self._lookup(transfer_ticket, decode)
+
+    def _lookup(
+        self,
+        transfer_ticket: str,
+        decode: Callable[[bytes, int], _Found | None],
+    ) -> _Found | None:
+        """Return the first record for `transfer_ticket`, newest first, that `decode` accepts."""
+        digest = ticket_digest(transfer_ticket)
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._sync()
+            for archived_at_ns, offset, length in reversed(self._active_entries.get(digest, [])):
+                found = decode(os.pread(self._data.fileno(), length, offset), archived_at_ns)
+                if found is not None:
+                    return found
+
+            for number in reversed(self._sealed_numbers):
+                segment = self._sealed_segment(number)
+                for archived_at_ns, offset, length in reversed(segment.find(digest)):
+                    found = decode(segment.read(offset, length), archived_at_ns)
+                    if found is not None:
+                        return found
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._sealed.values():
+                segment.close()
+            self._sealed.clear()
+            self._data.close()
+            self._index.close()
+            self._lock_file.close()
+
+    @contextmanager
+    def _file_lock(self, operation: int) -> Iterator[None]:
+        """Hold the archive lock shared with other processes (`LOCK_SH`/`LOCK_EX`)."""
+        fcntl.flock(self._lock_file.fileno(), operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _sync(self, *, repair: bool = False) -> None:
+        """Catch up with segments and index entries written by other processes.
+
+        Runs under the file lock. With `repair` (exclusive lock only), a torn
+        trailing index entry left by a crashed writer is cut off.
+        """
+        while _segment_path(self.directory, self._active_number + 1, _DATA_SUFFIX).exists():
+            # Another process sealed the active segment.
+            self._data.close()
+            self._index.close()
+            self._sealed_numbers.append(self._active_number)
+            self._open_active(self._active_number + 1)
+        size = os.fstat(self._index.fileno()).st_size
+        complete = size - size % _INDEX_ENTRY.size
+        if repair and complete != size:
+            os.ftruncate(self._index.fileno(), complete)
+        if complete <= self._index_read:
+            return
+        raw_index = os.pread(self._index.fileno(), complete - self._index_read, self._index_read)
+        for digest, archived_at_ns, offset, length in _INDEX_ENTRY.iter_unpack(raw_index):
+            self._active_entries.setdefault(digest, []).append((archived_at_ns, offset, length))
+        self._active_count += len(raw_index) // _INDEX_ENTRY.size
+        self._index_read = complete
+
+    def _match(
+        self,
+        transfer_ticket: str,
+        record: bytes,
+        archived_at_ns: int,
+    ) -> ArchivedSubmission | None:
+        submission = self._decode(record, archived_at_ns)
+        # Guards against digest collisions.
+        return submission if submission.transfer_ticket == transfer_ticket else None
+
+    def _decode(self, record: bytes, archived_at_ns: int) -> ArchivedSubmission:
+        return _decode_record(record, archived_at_ns, self._load_dictionary)
+
+    def _load_dictionary(self, dictionary_id: bytes) -> ResponseDictionary:
+        dictionary = self._dictionaries.get(dictionary_id)
+        if dictionary is None:
+            path = (
+                self.directory / _DICTIONARY_DIR / f"{dictionary_id.hex()}{_DICTIONARY_SUFFIX}"
+            )
+            if not path.exists():
+                raise ArchiveError(f"Archive dictionary missing: {path}")
+            dictionary = ResponseDictionary(path.read_bytes())
+            self._dictionaries[dictionary_id] = dictionary
+        return dictionary
+
+    def _load_current_dictionary(self) -> ResponseDictionary | None:
+        current = self.directory / _DICTIONARY_DIR / _CURRENT_DICTIONARY
+        if not current.exists():
+            return None
+        return self._load_dictionary(bytes.fromhex(current.read_text(encoding="ascii").strip()))
+
+    @staticmethod
+    def _write_atomically(path: Path, data: bytes) -> None:
+        temporary = path.with_name(path.name + ".tmp")
+        with temporary.open("wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    def _sealed_segment(self, number: int) -> _SealedSegment:
+        segment = self._sealed.get(number)
+        if segment is None:
+            segment = _SealedSegment(
+                _segment_path(self.directory, number, _DATA_SUFFIX),
+                _segment_path(self.directory, number, _INDEX_SUFFIX),
+            )
+            self._sealed[number] = segment
+        return segment
+
+    def _open_active(self, number: int) -> None:
+        self._active_number = number
+        data_path = _segment_path(self.directory, number, _DATA_SUFFIX)
+        index_path = _segment_path(self.directory, number, _INDEX_SUFFIX)
+        self._data = data_path.open("a+b")
+        self._index = index_path.open("a+b")
+        # Entries are read by `_sync`.
+        self._active_entries: dict[bytes, list[tuple[int, int, int]]] = {}
+        self._active_count = 0
+        self._index_read = 0
+
+    def _roll_over(self) -> None:
+        index_path = _segment_path(self.directory, self._active_number, _INDEX_SUFFIX)
+        entries = sorted(
+            (digest, archived_at_ns, offset, length)
+            for digest, values in self._active_entries.items()
+            for archived_at_ns, offset, length in values
+        )
+        self._data.close()
+        self._index.close()
+
+        self._write_atomically(
+            index_path, b"".join(_INDEX_ENTRY.pack(*entry) for entry in entries)
+        )
+
+        self._sealed_numbers.append(self._active_number)
+        self._open_active(self._active_number + 1)
@@ -0,0 +1,253 @@
+"""Named configuration profiles stored in a TOML file.
+
+Layout of the config file:
+
+    active_profile = "default"
+
+    [profiles.default]
+    certificate = "/path/to/cert.pfx"
+    transfer_mode = "test"
+    workers = 2
+
+Parsing TOML on every invocation is avoidable work, so the validated
+profiles are also written to a JSON cache next to the file. The cache is
+used as long as the file's size and modification time (in nanoseconds)
+are unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_PROFILE = "default"
+_CACHE_VERSION = 1
+
+
+class ConfigError(ValueError):
+    """Raised for unreadable config files and invalid settings."""
+
+
+def _parse_bool(value: str) -> bool:
+    normalized = value.strip().lower()
+    if normalized in {"1", "true", "yes", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "off"}:
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+def _choice(*choices: str) -> Callable[[str], str]:
+    def parse(value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in choices:
+            raise ValueError(f"expected one of {', '.join(choices)}, got {value!r}")
+        return normalized
+
+    return parse
+
+
+def _positive(parse: Callable[[str], int | float]) -> Callable[[str], int | float]:
+    def parse_positive(value: str) -> int | float:
+        number = parse(value)
+        if number <= 0:
+            raise ValueError(f"expected a positive number, got {value!r}")
+        return number
+
+    return parse_positive
+
+
+# Setting name -> parser for values given on the command line.
+SETTINGS: dict[str, Callable[[str], Any]] = {
+    "eric_lib": str,
+    "certificate": str,
+    "hersteller_id": str,
+    "data_type_version": str,
+    "pin_file": str,
+    "transfer_mode": _choice("prod", "test"),
+    "force_test_mode": _parse_bool,
+    "output": _choice("text", "json", "jsonl"),
+    "ledger": str,
+    "archive": str,
+    "workers": _positive(int),
+    "queue_size": _positive(int),
+    "rate": _positive(float),
+    "burst": _positive(int),
+    "error_cache_size": _positive(int),
+    "max_rss_mb": _positive(int),
+    "warmup": str,
+    "transport": _choice("in-process", "subprocess", "unix-socket", "isolated", "replay"),
+    "transport_socket": str,
+    "recycle_after": _positive(int),
+    "recycle_minutes": _positive(float),
+    "recycle_rss_mb": _positive(int),
+    "metrics_port": _positive(int),
+    "metrics_file": str,
+}
+
+
+def parse_setting_key(key: str) -> str:
+    """Validate a setting name."""
+    if key not in SETTINGS:
+        raise ConfigError(f"Unknown setting: {key}. Known settings: {', '.join(sorted(SETTINGS))}")
+    return key
+
+
+def parse_setting(key: str, value: str) -> Any:
+    """Convert a command-line value to the typed value of setting `key`."""
+    parse = SETTINGS[parse_setting_key(key)]
+    try:
+        return parse(value)
+    except ValueError as exc:
+        raise ConfigError(f"Invalid value for {key}: {exc}") from exc
+
+
+@dataclass(frozen=True)
+class ConfigFile:
+    """Parsed config file contents."""
+
+    active_profile: str = DEFAULT_PROFILE
+    profiles: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def settings(self, profile: str | None = None) -> dict[str, Any]:
+        return dict(self.profiles.get(profile or self.active_profile, {}))
+
+
+def default_config_path() -> Path:
+    """Return `$ELSTERCTL_CONFIG` or the XDG config location."""
+    explicit = os.getenv("ELSTERCTL_CONFIG")
+    if explicit:
+        return Path(explicit).expanduser()
+    config_home = os.getenv("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return Path(config_home) / "elsterctl" / "config.toml"
+
+
+def _validate(document: dict[str, Any]) -> ConfigFile:
+    active_profile = document.get("active_profile", DEFAULT_PROFILE)
+    if not isinstance(active_profile, str):
+        raise ConfigError("active_profile must be a string.")
+    raw_profiles = document.get("profiles", {})
+    if not isinstance(raw_profiles, dict):
+        raise ConfigError("profiles must be a table.")
+
+    profiles: dict[str, dict[str, Any]] = {}
+    for name, settings in raw_profiles.items():
+        if not isinstance(settings, dict):
+            raise ConfigError(f"Profile {name} must be a table.")
+        # Typed TOML values go through the same parsers as `config set`.
+        profiles[name] = {
+            key: parse_setting(key, str(value).lower() if isinstance(value, bool) else str(value))
+            for key, value in settings.items()
+        }
+    return ConfigFile(active_profile=active_profile, profiles=profiles)
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    # JSON string escapes are valid TOML basic string escapes.
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def _format_key(key: str) -> str:
+    if key and all(character.isalnum() or character in "-_" for character in key):
+        return key
+    return json.dumps(key, ensure_ascii=False)
+
+
+class ProfileStore:
+    """Reads and writes the config file, using the compiled cache when valid."""
+
+    def __init__(self, path: Path | None = None, cache_path: Path | None = None) -> None:
+        self.path = path or default_config_path()
+        self.cache_path = cache_path or self.path.with_name(f".{self.path.name}.cache.json")
+
+    def load(self) -> ConfigFile:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return ConfigFile()
+
+        cached = self._read_cache(stat.st_mtime_ns, stat.st_size)
+        if cached is not None:
+            return cached
+
+        try:
+            document = tomllib.loads(self.path.read_text(encoding="utf-8"))
+        except tomllib.TOMLDecodeError as exc:
+            raise ConfigError(f"Invalid config file {self.path}: {exc}") from exc
+        config = _validate(document)
+        self._write_cache(config, stat.st_mtime_ns, stat.st_size)
+        return config
+
+    def get(self, key: str, profile: str | None = None) -> Any:
+        parse_setting_key(key)
+        return self.load().settings(profile).get(key)
+
+    def set(self, key: str, value: str, profile: str | None = None) -> Any:
+        typed_value = parse_setting(key, value)
+        config = self.load()
+        name = profile or config.active_profile
+        profiles = {profile_name: dict(values) for profile_name, values in config.profiles.items()}
+        profiles.setdefault(name, {})[key] = typed_value
+        self.save(ConfigFile(active_profile=config.active_profile, profiles=profiles))
+        return typed_value
+
+    def unset(self, key: str, profile: str | None = None) -> None:
+        parse_setting_key(key)
+        config = self.load()
+        name = profile or config.active_profile
+        profiles = {profile_name: dict(values) for profile_name, values in config.profiles.items()}
+        profiles.get(name, {}).pop(key, None)
+        self.save(ConfigFile(active_profile=config.active_profile, profiles=profiles))
+
+    def use(self, profile: str) -> None:
+        config = self.load()
+        profiles = {name: dict(values) for name, values in config.profiles.items()}
+        profiles.setdefault(profile, {})
+        self.save(ConfigFile(active_profile=profile, profiles=profiles))
+
+    def save(self, config: ConfigFile) -> None:
+        lines = [f"active_profile = {_format_value(config.active_profile)}"]
+        for name in sorted(config.profiles):
+            lines.append("")
+            lines.append(f"[profiles.{_format_key(name)}]")
+            for key in sorted(config.profiles[name]):
+                lines.append(f"{key} = {_format_value(config.profiles[name][key])}")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        temporary.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temporary, self.path)
+        stat = self.path.stat()
+        self._write_cache(config, stat.st_mtime_ns, stat.st_size)
+
+    def _read_cache(self, mtime_ns: int, size: int) -> ConfigFile | None:
+        try:
+            cached = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if cached.get("version") != _CACHE_VERSION or cached.get("source") != [mtime_ns, size]:
+            return None
+        return ConfigFile(active_profile=cached["active_profile"], profiles=cached["profiles"])
+
+    def _write_cache(self, config: ConfigFile, mtime_ns: int, size: int) -> None:
+        document = {
+            "version": _CACHE_VERSION,
+            "source": [mtime_ns, size],
+            "active_profile": config.active_profile,
+            "profiles": config.profiles,
+        }
+        try:
+            temporary = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+            temporary.write_text(json.dumps(document), encoding="utf-8")
+            os.replace(temporary, self.cache_path)
+        except OSError:
+            # The cache is an optimization; a read-only config dir is fine.
+            pass
@@ -4,15 +4,26 @@ from __future__ import annotations
 
 import ctypes
 import os
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from elsterctl.infrastructure.eric.bindings import EricBoundSymbols, configure_base_signatures
-from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.infrastructure.eric.error_catalog import (
+    DEFAULT_ERROR_CATALOG,
+    RETRYABLE_RESULT_CODES,
+    VALIDATION_RESULT_CODES,
+    EricErrorCatalog,
+)
+from elsterctl.infrastructure.eric.errors import EricProcessingError, EricShutdownError
 from elsterctl.infrastructure.eric.loader import load_eric_library
+from elsterctl.infrastructure.eric.responses import parse_transfer_ticket
+from elsterctl.infrastructure.eric.tracing import active_tracer
+from elsterctl.infrastructure.pin.providers import SecretPin
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EricSubmitResult:
     """Structured outcome of an ERiC submission operation."""
 
@@ -20,6 +31,31 @@ class EricSubmitResult:
     transfer_ticket: str | None
     eric_response_xml: str
     server_response_xml: str
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class EricResourceCounters:
+    """Native resources acquired and released by a client."""
+
+    certificates_opened: int = 0
+    certificates_closed: int = 0
+    buffers_created: int = 0
+    buffers_freed: int = 0
+
+    @property
+    def outstanding_certificates(self) -> int:
+        return self.certificates_opened - self.certificates_closed
+
+    @property
+    def outstanding_buffers(self) -> int:
+        return self.buffers_created - self.buffers_freed
+
+    def add(self, other: EricResourceCounters) -> None:
+        self.certificates_opened += other.certificates_opened
+        self.certificates_closed += other.certificates_closed
+        self.buffers_created += other.buffers_created
+        self.buffers_freed += other.buffers_freed
 
 
 class EricClient:
@@ -35,9 +71,94 @@ class EricClient:
             ("pin", ctypes.c_char_p),
         ]
 
-    def __init__(self) -> None:
-        self._lib = load_eric_library()
+    def __init__(
+        self,
+        error_catalog: EricErrorCatalog | None = None,
+        *,
+        library: object | None = None,
+        plugin_path: bytes | None = None,
+    ) -> None:
+        """Load ERiC from `ELSTER_ERIC_LIB` unless `library` is given.
+
+        A preloaded library (e.g. a replay library) needs an explicit
+        `plugin_path`.
+        """
+        self._lib = library if library is not None else load_eric_library()
+        tracer = active_tracer()
+        if tracer is not None:
+            self._lib = tracer.wrap(self._lib)
+        self._plugin_path = plugin_path
+        self._resources = EricResourceCounters()
+        self._resources_lock = threading.Lock()
         self._symbols: EricBoundSymbols = configure_base_signatures(self._lib)
+        self._error_catalog = DEFAULT_ERROR_CATALOG if error_catalog is None else error_catalog
+        self._session_open = False
+        self._certificate_handles: dict[Path, ctypes.c_int] = {}
+        # Encryption parameters per certificate, reused while the same
+        # SecretPin and handle are passed (session mode only).
+        self._encryption_parameters: dict[
+            Path, tuple[EricClient._EricVerschluesselungsParameter, object, SecretPin]
+        ] = {}
+
+    @property
+    def is_open(self) -> bool:
+        """True while a long-lived session keeps the ERiC runtime initialized."""
+        return self._session_open
+
+    @property
+    def open_certificates(self) -> tuple[Path, ...]:
+        return tuple(self._certificate_handles)
+
+    def resource_counters(self) -> EricResourceCounters:
+        """Return a snapshot of native handles and buffers acquired so far.
+
+        Between sends, every response buffer should be freed and only the
+        certificates cached by an open session should remain open.
+        """
+        with self._resources_lock:
+            return EricResourceCounters(**vars(self._resources))
+
+    def _count(self, counter: str) -> None:
+        with self._resources_lock:
+            setattr(self._resources, counter, getattr(self._resources, counter) + 1)
+
+    def open(self) -> None:
+        """Initialize ERiC once and keep it running across sends.
+
+        While open, `send_xml_with_certificate` skips per-call
+        initialization/shutdown and reuses certificate handles.
+        """
+        if self._session_open:
+            return
+        init_code = self.initialize(self._resolve_plugin_path(), None)
+        if init_code != 0:
+            raise self._build_processing_error("ERiC initialization failed", init_code)
+        self._session_open = True
+
+    def close(self) -> None:
+        """Close cached certificate handles and shut down a session runtime."""
+        if not self._session_open:
+            return
+        self._encryption_parameters.clear()
+        for cert_handle in self._certificate_handles.values():
+            self._close_certificate_handle(cert_handle)
+        self._certificate_handles.clear()
+        self._session_open = False
+
+        shutdown_code = self.shutdown()
+        if shutdown_code != 0:
+            raise self._build_processing_error(
+                "ERiC shutdown failed", shutdown_code, EricShutdownError
+            )
+
+    def open_certificate(self, certificate_path: Path) -> None:
+        """Open and cache a certificate handle ahead of the first send."""
+        if not self._session_open:
+            raise EricProcessingError("ERiC session is not open.", -1)
+        if certificate_path not in self._certificate_handles:
+            self._certificate_handles[certificate_path] = self._get_certificate_handle(
+                certificate_path
+            )
 
     def initialize(self, *args: object) -> int:
         """Initialize ERiC runtime and return ERiC result code."""
@@ -54,71 +175,171 @@ class EricClient:
     def send_xml_with_certificate(
         self,
         *,
-        xml_payload: str,
+        xml_payload: str | bytes | bytearray,
         data_type_version: str,
         certificate_path: Path,
-        certificate_pin: str,
+        certificate_pin: str | SecretPin,
         validate_before_send: bool,
     ) -> EricSubmitResult:
         """Submit XML payload via ERiC using certificate-based authentication.
 
         This implementation uses a compatibility call strategy because ERiC
         signatures differ between wrapper generations.
+
+        A `bytearray` payload must be NUL-terminated; it is passed to ERiC
+        in place, without copying. A `SecretPin` is passed the same way.
         """
-        plugin_path = self._resolve_plugin_path()
-        init_code = self.initialize(plugin_path, None)
-        if init_code != 0:
-            raise self._build_processing_error("ERiC initialization failed", init_code)
+        timings: dict[str, float] = {}
+        started = time.perf_counter()
+
+        owns_runtime = not self._session_open
+        if owns_runtime:
+            plugin_path = self._resolve_plugin_path()
+            init_code = self.initialize(plugin_path, None)
+            timings["initialize"] = time.perf_counter() - started
+            if init_code != 0:
+                raise self._build_processing_error("ERiC initialization failed", init_code)
 
         process_code: int | None = None
         cert_handle: ctypes.c_int | None = None
         eric_response_buffer: ctypes.c_void_p | None = None
         server_response_buffer: ctypes.c_void_p | None = None
         try:
-            cert_handle = self._get_certificate_handle(certificate_path)
-            cert_params = self._EricVerschluesselungsParameter(
-                version=3,
-                zertifikatHandle=cert_handle.value,
-                pin=certificate_pin.encode("utf-8"),
+            if owns_runtime:
+                phase_started = time.perf_counter()
+                cert_handle = self._get_certificate_handle(certificate_path)
+                timings["certificate"] = time.perf_counter() - phase_started
+            else:
+                cert_handle = self._certificate_handles.get(certificate_path)
+                if cert_handle is None:
+                    phase_started = time.perf_counter()
+                    cert_handle = self._get_certificate_handle(certificate_path)
+                    timings["certificate"] = time.perf_counter() - phase_started
+                    self._certificate_handles[certificate_path] = cert_handle
+            cert_params_pointer = self._encryption_parameters_pointer(
+                certificate_path, cert_handle, certificate_pin, cache=not owns_runtime
             )
 
             eric_response_buffer = self._create_response_buffer()
             server_response_buffer = self._create_response_buffer()
 
             flags = self.ERIC_SENDE | (self.ERIC_VALIDIERE if validate_before_send else 0)
+            phase_started = time.perf_counter()
             process_code = self._process_send(
                 xml_payload=xml_payload,
                 data_type_version=data_type_version,
                 flags=flags,
-                cert_params=ctypes.pointer(cert_params),
+                cert_params=cert_params_pointer,
                 eric_response_buffer=eric_response_buffer,
                 server_response_buffer=server_response_buffer,
             )
-            if process_code != 0:
-                raise self._build_processing_error("ERiC processing failed", process_code)
+            timings["process"] = time.perf_counter() - phase_started
 
             eric_response_xml = self._read_response_buffer(eric_response_buffer)
             server_response_xml = self._read_response_buffer(server_response_buffer)
+            if process_code != 0:
+                error = self._build_processing_error("ERiC processing failed", process_code)
+                error.eric_response_xml = eric_response_xml
+                error.server_response_xml = server_response_xml
+                raise error
         finally:
             if eric_response_buffer:
                 self._free_response_buffer(eric_response_buffer)
             if server_response_buffer:
                 self._free_response_buffer(server_response_buffer)
-            if cert_handle is not None:
-                self._close_certificate_handle(cert_handle)
+            if owns_runtime:
+                if cert_handle is not None:
+                    self._close_certificate_handle(cert_handle)
+
+                phase_started = time.perf_counter()
+                shutdown_code = self.shutdown()
+                timings["shutdown"] = time.perf_counter() - phase_started
+                if shutdown_code != 0 and (process_code is None or process_code == 0):
+                    raise self._build_processing_error(
+                        "ERiC shutdown failed", shutdown_code, EricShutdownError
+                    )
+
+        timings["total"] = time.perf_counter() - started
+        return EricSubmitResult(
+            result_code=process_code,
+            transfer_ticket=parse_transfer_ticket(server_response_xml),
+            eric_response_xml=eric_response_xml,
+            server_response_xml=server_response_xml,
+            timings=timings,
+        )
 
-            shutdown_code = self.shutdown()
-            if shutdown_code != 0 and (process_code is None or process_code == 0):
-                raise self._build_processing_error("ERiC shutdown failed", shutdown_code)
+    def validate_xml(
+        self,
+        *,
+        xml_payload: str | bytes | bytearray,
+        data_type_version: str,
+    ) -> EricSubmitResult:
+        """Validate a payload locally without certificate or transmission.
 
+        Needs an open session. A failed validation is returned as the result
+        code instead of being raised; callers decide what it means.
+        """
+        if not self._session_open:
+            raise EricProcessingError("ERiC session is not open.", -1)
+        started = time.perf_counter()
+        eric_response_buffer = self._create_response_buffer()
+        server_response_buffer = self._create_response_buffer()
+        try:
+            process_code = self._process_send(
+                xml_payload=xml_payload,
+                data_type_version=data_type_version,
+                flags=self.ERIC_VALIDIERE,
+                cert_params=None,
+                eric_response_buffer=eric_response_buffer,
+                server_response_buffer=server_response_buffer,
+            )
+            eric_response_xml = self._read_response_buffer(eric_response_buffer)
+        finally:
+            if eric_response_buffer:
+                self._free_response_buffer(eric_response_buffer)
+            if server_response_buffer:
+                self._free_response_buffer(server_response_buffer)
         return EricSubmitResult(
             result_code=process_code,
             transfer_ticket=None,
             eric_response_xml=eric_response_xml,
-            server_response_xml=server_response_xml,
+            server_response_xml="",
+            timings={"process": time.perf_counter() - started},
         )
 
+    def _encryption_parameters_pointer(
+        self,
+        certificate_path: Path,
+        cert_handle: ctypes.c_int,
+        certificate_pin: str | SecretPin,
+        *,
+        cache: bool,
+    ) -> object:
+        if isinstance(certificate_pin, SecretPin):
+            cached = self._encryption_parameters.get(certificate_path)
+            if (
+                cached is not None
+                and cached[2] is certificate_pin
+                and cached[0].zertifikatHandle == cert_handle.value
+            ):
+                return cached[1]
+            pin = certificate_pin.c_pointer()
+        else:
+            pin = certificate_pin.encode("utf-8")
+
+        cert_params = self._EricVerschluesselungsParameter(
+            version=3,
+            zertifikatHandle=cert_handle.value,
+            pin=pin,
+        )
+        pointer = ctypes.pointer(cert_params)
+        if cache and isinstance(certificate_pin, SecretPin):
+            self._encryption_parameters[certificate_path] = (cert_params, pointer, certificate_pin)
+        return pointer
+
     def _resolve_plugin_path(self) -> bytes:
+        if self._plugin_path is not None:
+            return self._plugin_path
         lib_path = os.getenv("ELSTER_ERIC_LIB")
         if not lib_path:
             raise EricProcessingError("ELSTER_ERIC_LIB is not set.", -1)
@@ -152,6 +373,7 @@ class EricClient:
         )
         if result_code != 0:
             raise self._build_processing_error("Could not open certificate handle", result_code)
+        self._count("certificates_opened")
         return cert_handle
 
     def _close_certificate_handle(self, cert_handle: ctypes.c_int) -> None:
@@ -163,6 +385,7 @@ class EricClient:
         function.argtypes = [ctypes.c_int]
         function.restype = ctypes.c_int
         function(cert_handle)
+        self._count("certificates_closed")
 
     def _create_response_buffer(self) -> ctypes.c_void_p:
         try:
@@ -172,7 +395,10 @@ class EricClient:
 
         function.argtypes = []
         function.restype = ctypes.c_void_p
-        return function()
+        buffer = function()
+        if buffer:
+            self._count("buffers_created")
+        return buffer
 
     def _read_response_buffer(self, buffer: ctypes.c_void_p) -> str:
         try:
@@ -196,11 +422,12 @@ class EricClient:
         function.argtypes = [ctypes.c_void_p]
         function.restype = ctypes.c_int
         function(buffer)
+        self._count("buffers_freed")
 
     def _process_send(
         self,
         *,
-        xml_payload: str,
+        xml_payload: str | bytes | bytearray,
         data_type_version: str,
         flags: int,
         cert_params: ctypes.c_void_p,
@@ -221,7 +448,7 @@ class EricClient:
         process_function.restype = ctypes.c_int
 
         return self.process(
-            xml_payload.encode("utf-8"),
+            self._as_c_payload(xml_payload),
             data_type_version.encode("utf-8"),
             flags,
             None,
@@ -231,11 +458,32 @@ class EricClient:
             server_response_buffer,
         )
 
-    def _build_processing_error(self, prefix: str, result_code: int) -> EricProcessingError:
-        details = self._resolve_error_text(result_code)
+    @staticmethod
+    def _as_c_payload(xml_payload: str | bytes | bytearray) -> bytes | ctypes.Array:
+        if isinstance(xml_payload, str):
+            return xml_payload.encode("utf-8")
+        if isinstance(xml_payload, bytearray):
+            if not xml_payload or xml_payload[-1] != 0:
+                raise ValueError("bytearray XML payloads must be NUL-terminated.")
+            return (ctypes.c_char * len(xml_payload)).from_buffer(xml_payload)
+        return xml_payload
+
+    def preload_error_texts(self) -> None:
+        """Resolve texts of well-known result codes into the error catalog."""
+        self._error_catalog.preload(
+            sorted(RETRYABLE_RESULT_CODES | VALIDATION_RESULT_CODES), self._resolve_error_text
+        )
+
+    def _build_processing_error(
+        self,
+        prefix: str,
+        result_code: int,
+        error_type: type[EricProcessingError] = EricProcessingError,
+    ) -> EricProcessingError:
+        details = self._error_catalog.describe(result_code, self._resolve_error_text).text
         if details:
-            return EricProcessingError(f"{prefix}: {details}", result_code)
-        return EricProcessingError(f"{prefix}.", result_code)
+            return error_type(f"{prefix}: {details}", result_code, error_text=details)
+        return error_type(f"{prefix}.", result_code)
 
     def _resolve_error_text(self, result_code: int) -> str | None:
         try:
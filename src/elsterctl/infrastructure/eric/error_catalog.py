@@ -0,0 +1,143 @@
+"""Classification and cached error texts for ERiC result codes.
+
+Result codes are grouped the way ERiC's `eric_fehlercodes.h` groups them:
+`6100xxxxx` global, `6101xxxxx` transfer, `6102xxxxx` crypto/certificate,
+`6103xxxxx` input/output and XML reader errors. Error texts come from
+`EricHoleFehlerText`; they never change for a loaded library, so each code
+is resolved at most once per process while it stays in the bounded cache.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Iterable
+
+
+class ErrorClass(str, Enum):
+    """How callers should react to a failed ERiC call."""
+
+    RETRYABLE = "retryable"
+    VALIDATION = "validation"
+    CERTIFICATE = "certificate"
+    FATAL = "fatal"
+
+
+# Transfer errors caused by server load or connectivity; the same filing
+# may succeed later.
+RETRYABLE_RESULT_CODES = frozenset(
+    {
+        610101200,  # ERIC_TRANSFER_COM_ERROR
+        610101259,  # ERIC_TRANSFER_ERR_CONNECTSERVER
+        610101260,  # ERIC_TRANSFER_ERR_NORESPONSE
+        610101263,  # ERIC_TRANSFER_ERR_TIMEOUT
+    }
+)
+
+# Codes outside the IO range that still mean "the payload is wrong".
+VALIDATION_RESULT_CODES = frozenset(
+    {
+        610001002,  # ERIC_GLOBAL_PRUEF_FEHLER
+        610001003,  # ERIC_GLOBAL_HINWEISE
+        610101210,  # ERIC_TRANSFER_ERR_XML_THEADER
+        610101292,  # ERIC_TRANSFER_ERR_XML_NHEADER
+        610101293,  # ERIC_TRANSFER_ERR_XML_ENCODING
+    }
+)
+
+_CRYPT_RANGE = 6102
+_IO_RANGE = 6103
+
+
+def classify_result_code(result_code: int) -> ErrorClass:
+    """Return the error class of an ERiC result code."""
+    if result_code in RETRYABLE_RESULT_CODES:
+        return ErrorClass.RETRYABLE
+    if result_code in VALIDATION_RESULT_CODES:
+        return ErrorClass.VALIDATION
+    result_range = result_code // 100000
+    if result_range == _CRYPT_RANGE:
+        return ErrorClass.CERTIFICATE
+    if result_range == _IO_RANGE:
+        return ErrorClass.VALIDATION
+    return ErrorClass.FATAL
+
+
+@dataclass(frozen=True)
+class EricErrorInfo:
+    """Cached description of one result code."""
+
+    result_code: int
+    error_class: ErrorClass
+    text: str | None
+
+
+class EricErrorCatalog:
+    """Bounded LRU cache of error texts keyed by result code."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[int, EricErrorInfo] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def describe(
+        self,
+        result_code: int,
+        resolve_text: Callable[[int], str | None],
+    ) -> EricErrorInfo:
+        """Return cached info for `result_code`, resolving the text on a miss.
+
+        Codes without a text are cached as well, so repeated failures never
+        trigger another native lookup.
+        """
+        with self._lock:
+            info = self._entries.get(result_code)
+            if info is not None:
+                self._entries.move_to_end(result_code)
+                self.hits += 1
+                return info
+            self.misses += 1
+
+        info = EricErrorInfo(
+            result_code=result_code,
+            error_class=classify_result_code(result_code),
+            text=resolve_text(result_code),
+        )
+        with self._lock:
+            self._entries[result_code] = info
+            self._entries.move_to_end(result_code)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return info
+
+    def preload(self, result_codes: Iterable[int], resolve_text: Callable[[int], str | None]) -> None:
+        """Resolve texts for known codes up front, e.g. at session start."""
+        for result_code in result_codes:
+            self.describe(result_code, resolve_text)
+
+    def resize(self, max_entries: int) -> None:
+        """Change the capacity, evicting least recently used entries if needed."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        with self._lock:
+            self._max_entries = max_entries
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+DEFAULT_ERROR_CATALOG = EricErrorCatalog()
@@ -1,5 +1,11 @@
 """Custom exceptions for ERiC integration."""
 
+from __future__ import annotations
+
+import pickle
+
+from elsterctl.infrastructure.eric.error_catalog import ErrorClass, classify_result_code
+
 
 class EricError(Exception):
     """Base exception for ERiC related failures."""
@@ -14,13 +20,75 @@ class EricSymbolResolutionError(EricError):
 
 
 class EricProcessingError(EricError):
-    """Raised when ERiC processing returns a non-success result code."""
+    """Raised when ERiC processing returns a non-success result code.
 
-    def __init__(self, message: str, result_code: int) -> None:
+    Response documents are attached when ERiC produced them, so callers can
+    report the underlying rule violations. `error_text` is ERiC's own
+    description of the result code, without the message prefix.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        result_code: int,
+        *,
+        eric_response_xml: str = "",
+        server_response_xml: str = "",
+        error_text: str | None = None,
+    ) -> None:
         super().__init__(message)
         self.result_code = result_code
+        self.eric_response_xml = eric_response_xml
+        self.server_response_xml = server_response_xml
+        self.error_text = error_text
+
+    def __reduce__(self) -> tuple:
+        # Keeps result code and responses when raised in a worker process.
+        return (
+            _rebuild_processing_error,
+            (
+                type(self),
+                self.args[0] if self.args else "",
+                self.result_code,
+                self.eric_response_xml,
+                self.server_response_xml,
+                self.error_text,
+            ),
+        )
+
+    @property
+    def error_class(self) -> ErrorClass:
+        return classify_result_code(self.result_code)
 
     def __str__(self) -> str:
         return f"{super().__str__()} (result_code={self.result_code})"
 
 
+class EricShutdownError(EricProcessingError):
+    """Raised when ERiC fails to shut down, possibly after a filing was accepted."""
+
+
+def _rebuild_processing_error(
+    cls: type[EricProcessingError],
+    message: str,
+    result_code: int,
+    eric_response_xml: str,
+    server_response_xml: str,
+    error_text: str | None = None,
+) -> EricProcessingError:
+    return cls(
+        message,
+        result_code,
+        eric_response_xml=eric_response_xml,
+        server_response_xml=server_response_xml,
+        error_text=error_text,
+    )
+
+
+def portable_error(exc: BaseException) -> BaseException:
+    """Return `exc` if it can be pickled to another process, else a plain `EricError`."""
+    try:
+        pickle.loads(pickle.dumps(exc))
+    except Exception:
+        return EricError(f"{type(exc).__name__}: {exc}")
+    return exc
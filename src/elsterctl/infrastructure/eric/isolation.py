@@ -0,0 +1,212 @@
+"""Crash isolation for native ERiC calls.
+
+A segmentation fault inside `libericapi` ends the process that made the
+call. `IsolatedEricExecutor` runs every filing in its own short-lived
+child process. Children are forked from a forkserver that has already
+loaded the library and bound its signatures (see `preload`), and the next
+child is forked while the current one runs ERiC, so isolation costs a
+fork per filing rather than a library load, and the fork overlaps the
+transfer instead of adding to it. A child that dies is reported
+as `EricCrashError` for that filing only.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import threading
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable
+
+from elsterctl.infrastructure.eric.client import EricClient, EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricError, portable_error
+from elsterctl.infrastructure.pin.providers import SecretPin
+
+FORKSERVER_PRELOAD = "elsterctl.infrastructure.eric.preload"
+
+
+def default_start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class EricCrashError(EricError):
+    """Raised when the process running a native ERiC call died."""
+
+    def __init__(self, message: str, exit_code: int | None) -> None:
+        super().__init__(message)
+        self.exit_code = exit_code
+
+    @property
+    def signal_name(self) -> str | None:
+        return _signal_name(self.exit_code)
+
+
+def _signal_name(exit_code: int | None) -> str | None:
+    if exit_code is None or exit_code >= 0:
+        return None
+    try:
+        return signal.Signals(-exit_code).name
+    except ValueError:
+        return f"signal {-exit_code}"
+
+
+def preloaded_client() -> EricClient:
+    """Client on the library preloaded by the forkserver, if available."""
+    from elsterctl.infrastructure.eric.preload import preloaded_library
+
+    library = preloaded_library()
+    return EricClient(library=library) if library is not None else EricClient()
+
+
+def _isolated_main(connection: Connection, client_factory: Callable[[], EricClient]) -> None:
+    """Run exactly one send request, then exit."""
+    try:
+        request = connection.recv()
+    except EOFError:
+        return
+    if request is None:
+        return
+    try:
+        result = client_factory().send_xml_with_certificate(**request)
+    except Exception as exc:
+        connection.send(("error", portable_error(exc)))
+    else:
+        connection.send(("ok", result))
+    finally:
+        pin = request.get("certificate_pin")
+        if isinstance(pin, SecretPin):
+            pin.wipe()
+        connection.close()
+
+
+@dataclass
+class _Child:
+    process: multiprocessing.process.BaseProcess
+    connection: Connection
+
+
+@dataclass(frozen=True)
+class IsolationStatus:
+    """Child process statistics of an `IsolatedEricExecutor`."""
+
+    start_method: str
+    children_started: int
+    crashes: int
+    last_crash: str | None
+
+
+class IsolatedEricExecutor:
+    """Runs each send in a fresh child process; a crash fails only that send."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], EricClient] = preloaded_client,
+        *,
+        start_method: str | None = None,
+        join_timeout: float = 10.0,
+    ) -> None:
+        self._client_factory = client_factory
+        self._start_method = start_method or default_start_method()
+        self._context = multiprocessing.get_context(self._start_method)
+        if self._start_method == "forkserver":
+            self._context.set_forkserver_preload([FORKSERVER_PRELOAD])
+        self._join_timeout = join_timeout
+        self._lock = threading.Lock()
+        self._spare: _Child | None = None
+        self._sending: _Child | None = None
+        self._children_started = 0
+        self._crashes = 0
+        self._last_crash: str | None = None
+
+    def client(self) -> IsolatedEricExecutor:
+        return self
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        with self._lock:
+            child, self._spare = self._spare or self._fork(), None
+            self._sending = child
+            try:
+                try:
+                    child.connection.send(request)
+                except OSError as exc:
+                    raise self._crashed(child) from exc
+                # Fork the next child while this one runs ERiC.
+                try:
+                    self._spare = self._fork()
+                except OSError:
+                    # The filing is already running; the next send forks
+                    # its own child and reports the failure there.
+                    self._spare = None
+                try:
+                    status, value = child.connection.recv()
+                except (EOFError, OSError) as exc:
+                    raise self._crashed(child) from exc
+                self._reap(child)
+            finally:
+                self._sending = None
+        if status != "ok":
+            raise value
+        return value
+
+    def status(self) -> IsolationStatus:
+        with self._lock:
+            return IsolationStatus(
+                start_method=self._start_method,
+                children_started=self._children_started,
+                crashes=self._crashes,
+                last_crash=self._last_crash,
+            )
+
+    def live_workers(self) -> int:
+        """Return the number of running children; does not wait for a send."""
+        children = (self._sending, self._spare)
+        return sum(1 for child in children if child is not None and child.process.is_alive())
+
+    def close(self) -> None:
+        with self._lock:
+            spare, self._spare = self._spare, None
+        if spare is not None:
+            try:
+                spare.connection.send(None)
+            except OSError:
+                pass
+            self._reap(spare)
+
+    def _fork(self) -> _Child:
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_isolated_main,
+            args=(child_connection, self._client_factory),
+            name="elsterctl-eric-isolated",
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        self._children_started += 1
+        return _Child(process=process, connection=parent_connection)
+
+    def _crashed(self, child: _Child) -> EricCrashError:
+        exit_code = self._reap(child)
+        self._crashes += 1
+        error = EricCrashError(
+            f"ERiC process crashed ({_describe_exit(exit_code)}); "
+            "the filing may or may not have reached ELSTER.",
+            exit_code,
+        )
+        self._last_crash = str(error)
+        return error
+
+    def _reap(self, child: _Child) -> int | None:
+        child.connection.close()
+        child.process.join(self._join_timeout)
+        if child.process.is_alive():
+            child.process.terminate()
+            child.process.join(self._join_timeout)
+        return child.process.exitcode
+
+
+def _describe_exit(exit_code: int | None) -> str:
+    if exit_code is None:
+        return "did not exit"
+    return _signal_name(exit_code) or f"exit code {exit_code}"
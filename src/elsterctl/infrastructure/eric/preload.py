@@ -0,0 +1,34 @@
+"""ERiC library preloaded once for forked crash-isolation children.
+
+The forkserver of the isolated transport imports this module, so the
+shared library is mapped and its signatures are bound before any child is
+forked; children inherit both instead of loading the library per filing.
+Load errors are not raised here: a child then loads the library itself
+and reports the error with the failed filing.
+"""
+
+from __future__ import annotations
+
+import ctypes
+
+from elsterctl.infrastructure.eric.bindings import configure_base_signatures
+from elsterctl.infrastructure.eric.errors import EricError
+from elsterctl.infrastructure.eric.loader import load_eric_library
+
+_library: ctypes.CDLL | None = None
+
+
+def preloaded_library() -> ctypes.CDLL | None:
+    """Return the preloaded library, loading it on first call; None on errors."""
+    global _library
+    if _library is None:
+        try:
+            library = load_eric_library()
+            configure_base_signatures(library)
+        except EricError:
+            return None
+        _library = library
+    return _library
+
+
+preloaded_library()
@@ -0,0 +1,206 @@
+"""Replay of recorded ERiC results through a fake native library.
+
+`ReplayLibrary` implements the ERiC C functions used by `EricClient` in
+Python and answers each `EricBearbeiteVorgang` call with the next recorded
+result (round robin): result code, ERiC and server response XML, after
+sleeping for the recorded processing latency divided by `speedup`. The
+whole client stack above the library runs unchanged, so batch and worker
+settings can be load-tested without ERiC, certificates or network.
+
+Recordings are JSON lines as written by `--output jsonl` for `message send`
+and `message send-batch`; response side files from `--response-dir` are
+resolved relative to the recording.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from elsterctl.infrastructure.eric.client import EricClient
+from elsterctl.infrastructure.eric.error_catalog import EricErrorCatalog
+from elsterctl.infrastructure.eric.errors import EricLibraryLoadError
+
+# Replayed runs never touch a real ERiC installation.
+REPLAY_PLUGIN_PATH = b"replay"
+
+
+@dataclass(frozen=True)
+class ReplayRecord:
+    """One recorded ERiC processing result."""
+
+    result_code: int
+    eric_response_xml: str
+    server_response_xml: str
+    latency_seconds: float
+    error_text: str | None = None
+
+
+def _read_document(record: dict[str, Any], kind: str, base_dir: Path) -> str:
+    inline = record.get(f"{kind}_response_xml")
+    if inline:
+        return str(inline)
+    path = record.get(f"{kind}_response_path")
+    if path:
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            candidate = base_dir / candidate
+        return candidate.read_text(encoding="utf-8")
+    return ""
+
+
+def load_recording(path: Path) -> list[ReplayRecord]:
+    """Read replayable results from a JSON lines recording.
+
+    Summary lines, deduplicated results and failures without a result code
+    are skipped. Records without a measured latency get the median latency
+    of the recording.
+    """
+    records: list[dict[str, Any]] = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError as exc:
+        raise EricLibraryLoadError(f"Cannot read replay recording {path}: {exc}") from exc
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise EricLibraryLoadError(f"Invalid replay recording {path}:{number}: {exc}") from exc
+        if isinstance(record, dict) and isinstance(record.get("result_code"), int):
+            if not record.get("deduplicated"):
+                records.append(record)
+    if not records:
+        raise EricLibraryLoadError(f"Replay recording contains no results: {path}")
+
+    def latency(record: dict[str, Any]) -> float | None:
+        value = record.get("latency_seconds", (record.get("timings") or {}).get("process"))
+        return float(value) if value is not None else None
+
+    measured = [value for value in map(latency, records) if value is not None]
+    default_latency = statistics.median(measured) if measured else 0.0
+
+    replay_records = []
+    for record in records:
+        measured_latency = latency(record)
+        replay_records.append(
+            ReplayRecord(
+                result_code=record["result_code"],
+                eric_response_xml=_read_document(record, "eric", path.parent),
+                server_response_xml=_read_document(record, "server", path.parent),
+                latency_seconds=(
+                    measured_latency if measured_latency is not None else default_latency
+                ),
+                error_text=record.get("error_text") or None,
+            )
+        )
+    return replay_records
+
+
+class _ReplayFunction:
+    """Callable standing in for a ctypes function pointer."""
+
+    def __init__(self, implementation: Callable[..., Any]) -> None:
+        self.argtypes = None
+        self.restype = None
+        self._implementation = implementation
+
+    def __call__(self, *args: Any) -> Any:
+        return self._implementation(*args)
+
+
+class ReplayLibrary:
+    """Fake ERiC library serving recorded results."""
+
+    def __init__(
+        self,
+        records: Iterable[ReplayRecord],
+        *,
+        speedup: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.records = tuple(records)
+        if not self.records:
+            raise ValueError("Replay needs at least one record.")
+        if speedup <= 0:
+            raise ValueError("speedup must be positive.")
+        self._speedup = speedup
+        self._sleep = sleep
+        self._next_record = itertools.cycle(self.records)
+        self._error_texts = {
+            record.result_code: record.error_text for record in self.records if record.error_text
+        }
+        self._lock = threading.Lock()
+        self._buffers: dict[int, bytes] = {}
+        self._buffer_ids = itertools.count(1)
+        self.calls = 0
+
+        self.EricInitialisiere = _ReplayFunction(lambda *args: 0)
+        self.EricBeende = _ReplayFunction(lambda *args: 0)
+        self.EricBearbeiteVorgang = _ReplayFunction(self._process)
+        self.EricGetHandleToCertificate = _ReplayFunction(self._get_certificate)
+        self.EricCloseHandleToCertificate = _ReplayFunction(lambda *args: 0)
+        self.EricRueckgabepufferErzeugen = _ReplayFunction(self._create_buffer)
+        self.EricRueckgabepufferInhalt = _ReplayFunction(self._buffer_content)
+        self.EricRueckgabepufferFreigeben = _ReplayFunction(self._free_buffer)
+        self.EricHoleFehlerText = _ReplayFunction(self._error_text)
+
+    def _process(self, *args: Any) -> int:
+        eric_buffer, server_buffer = args[6], args[7]
+        with self._lock:
+            record = next(self._next_record)
+            self.calls += 1
+        if record.latency_seconds > 0:
+            self._sleep(record.latency_seconds / self._speedup)
+        with self._lock:
+            self._buffers[eric_buffer] = record.eric_response_xml.encode("utf-8")
+            self._buffers[server_buffer] = record.server_response_xml.encode("utf-8")
+        return record.result_code
+
+    @staticmethod
+    def _get_certificate(handle_pointer: Any, _unused: Any, _path: Any) -> int:
+        handle_pointer.contents.value = 1
+        return 0
+
+    def _create_buffer(self) -> int:
+        with self._lock:
+            buffer_id = next(self._buffer_ids)
+            self._buffers[buffer_id] = b""
+            return buffer_id
+
+    def _buffer_content(self, buffer_id: int) -> bytes:
+        with self._lock:
+            return self._buffers.get(buffer_id, b"")
+
+    def _free_buffer(self, buffer_id: int) -> int:
+        with self._lock:
+            self._buffers.pop(buffer_id, None)
+        return 0
+
+    def _error_text(self, result_code: int, buffer_id: int) -> int:
+        text = self._error_texts.get(result_code)
+        if text is None:
+            return 1
+        with self._lock:
+            self._buffers[buffer_id] = text.encode("utf-8")
+        return 0
+
+
+def replay_client_factory(library: ReplayLibrary) -> Callable[[], EricClient]:
+    """Return an `EricClient` factory whose clients all use `library`."""
+    # Recorded error texts must not end up in the catalog real ERiC uses.
+    error_catalog = EricErrorCatalog()
+
+    def create_client() -> EricClient:
+        return EricClient(
+            library=library, plugin_path=REPLAY_PLUGIN_PATH, error_catalog=error_catalog
+        )
+
+    return create_client
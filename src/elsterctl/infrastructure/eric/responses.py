@@ -0,0 +1,95 @@
+"""Parsers for ERiC and ELSTER server response XML.
+
+ERiC returns two documents per processing call: its own validation
+response (`EricBearbeiteVorgang`) and the ELSTER server response (an
+`Elster` document with `TransferHeader` and `RC` elements). Only the
+fields needed for structured output are extracted; unknown elements are
+ignored.
+"""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class EricDiagnostic:
+    """Single error or hint reported by ERiC or the ELSTER server."""
+
+    kind: str
+    code: str | None
+    text: str
+    field: str | None = None
+    rule: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> str | None:
+    for child in element:
+        if _local_name(child.tag) == name:
+            text = (child.text or "").strip()
+            return text or None
+    return None
+
+
+def _parse(xml_text: str) -> ET.Element | None:
+    if not xml_text or not xml_text.strip():
+        return None
+    try:
+        return ET.fromstring(xml_text)
+    except ET.ParseError:
+        return None
+
+
+def parse_transfer_ticket(server_response_xml: str) -> str | None:
+    """Return TransferHeader/TransferTicket from a server response, if present."""
+    root = _parse(server_response_xml)
+    if root is None:
+        return None
+    for element in root.iter():
+        if _local_name(element.tag) == "TransferTicket":
+            return (element.text or "").strip() or None
+    return None
+
+
+def parse_diagnostics(eric_response_xml: str, server_response_xml: str = "") -> list[EricDiagnostic]:
+    """Collect ERiC rule violations, hints and non-zero server return codes."""
+    diagnostics: list[EricDiagnostic] = []
+
+    eric_root = _parse(eric_response_xml)
+    if eric_root is not None:
+        for element in eric_root.iter():
+            name = _local_name(element.tag)
+            if name not in {"FehlerRegelpruefung", "Hinweis"}:
+                continue
+            diagnostics.append(
+                EricDiagnostic(
+                    kind="error" if name == "FehlerRegelpruefung" else "hint",
+                    code=_child_text(element, "FachlicheFehlerId"),
+                    text=_child_text(element, "Text") or "",
+                    field=_child_text(element, "Feldidentifikator"),
+                    rule=_child_text(element, "RegelName"),
+                )
+            )
+
+    server_root = _parse(server_response_xml)
+    if server_root is not None:
+        for element in server_root.iter():
+            if _local_name(element.tag) != "Rueckgabe":
+                continue
+            code = _child_text(element, "Code")
+            if code is None or code == "0":
+                continue
+            diagnostics.append(
+                EricDiagnostic(kind="server", code=code, text=_child_text(element, "Text") or "")
+            )
+
+    return diagnostics
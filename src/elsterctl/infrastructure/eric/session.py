@@ -0,0 +1,175 @@
+"""Long-lived ERiC session shared by commands of one elsterctl process.
+
+Initializing ERiC and opening certificates dominates the cost of a single
+send. A session keeps one `EricClient` open: the runtime is initialized on
+first use and certificate handles stay cached until the session is reset
+or closed. The interactive shell holds a session for its whole lifetime.
+Certificate PINs resolved during the session are cached alongside and
+wiped when the session is reset or closed. A `ResourceWatchdog` checks the
+client before each send and recycles it when native resources leak or
+memory grows beyond the configured limits. With warm-up versions, every
+newly opened client first loads the ERiC plugins of those data type
+versions; that cost is reported by `last_warmup`, not by the first send.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+from elsterctl.infrastructure.eric.client import EricClient, EricResourceCounters
+from elsterctl.infrastructure.eric.warmup import WarmupReport, warm_up
+from elsterctl.infrastructure.eric.watchdog import ResourceReport, ResourceWatchdog
+from elsterctl.infrastructure.pin.providers import PinCache
+
+
+@dataclass(frozen=True)
+class EricSessionStatus:
+    """Snapshot of a session for `session status`."""
+
+    active: bool
+    uptime_seconds: float
+    sends: int
+    open_certificates: tuple[Path, ...]
+    resets: int
+    cached_pins: int = 0
+    warmup: WarmupReport | None = None
+
+
+class EricSession:
+    """Owns one opened `EricClient` and hands it out to services."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], EricClient] = EricClient,
+        watchdog: ResourceWatchdog | None = None,
+        warmup_versions: Iterable[str] = (),
+    ) -> None:
+        self._client_factory = client_factory
+        self.watchdog = watchdog or ResourceWatchdog()
+        self.warmup_versions = tuple(dict.fromkeys(warmup_versions))
+        self.last_warmup: WarmupReport | None = None
+        self._retired_resources = EricResourceCounters()
+        self._client: EricClient | None = None
+        self._opened_at: float | None = None
+        self._sends = 0
+        self._resets = 0
+        self._lock = threading.Lock()
+        self.pins = PinCache()
+
+    def client(self) -> EricClient:
+        """Return the session client, initializing ERiC on first use.
+
+        Suitable as `eric_client_factory` for `MessageSendService`.
+        """
+        with self._lock:
+            if self._client is not None:
+                reason = self.watchdog.recycle_reason(
+                    self._client.resource_counters(),
+                    open_certificates=len(self._client.open_certificates),
+                    sends=self._sends,
+                )
+                if reason is not None:
+                    self.watchdog.record_recycle(reason)
+                    self._retire(self._detach())
+            client = self._open_client()
+            self._sends += 1
+            return client
+
+    def warm_up(self, data_type_versions: Iterable[str] = ()) -> WarmupReport:
+        """Open the session now, e.g. before a batch starts its clock.
+
+        Additional `data_type_versions` are kept for later clients and, if
+        the session is already open, warmed up on the current one.
+        """
+        with self._lock:
+            added = tuple(
+                version
+                for version in dict.fromkeys(data_type_versions)
+                if version not in self.warmup_versions
+            )
+            self.warmup_versions += added
+            if self._client is None:
+                self._open_client()
+            elif added:
+                self.last_warmup = WarmupReport(
+                    self.last_warmup.initialize_seconds,
+                    self.last_warmup.versions + warm_up(self._client, added),
+                )
+            return self.last_warmup
+
+    @property
+    def active(self) -> bool:
+        return self._client is not None
+
+    def status(self) -> EricSessionStatus:
+        with self._lock:
+            client = self._client
+            return EricSessionStatus(
+                active=client is not None,
+                uptime_seconds=(
+                    time.monotonic() - self._opened_at if self._opened_at is not None else 0.0
+                ),
+                sends=self._sends,
+                open_certificates=client.open_certificates if client is not None else (),
+                resets=self._resets,
+                cached_pins=len(self.pins),
+                warmup=self.last_warmup if client is not None else None,
+            )
+
+    def reset(self) -> None:
+        """Shut down ERiC, drop cached handles and PINs; the next send reinitializes."""
+        self.close()
+        with self._lock:
+            self._resets += 1
+
+    def close(self) -> None:
+        self.pins.clear()
+        with self._lock:
+            self._retire(self._detach())
+
+    def resource_report(self) -> ResourceReport:
+        """Return native resource counters and RSS samples of the whole session."""
+        with self._lock:
+            counters = EricResourceCounters(**vars(self._retired_resources))
+            open_certificates = 0
+            if self._client is not None:
+                counters.add(self._client.resource_counters())
+                open_certificates = len(self._client.open_certificates)
+            return self.watchdog.report(counters, open_certificates=open_certificates)
+
+    def _open_client(self) -> EricClient:
+        if self._client is not None:
+            return self._client
+        started = time.perf_counter()
+        client = self._client_factory()
+        client.open()
+        client.preload_error_texts()
+        initialize_seconds = time.perf_counter() - started
+        try:
+            versions = warm_up(client, self.warmup_versions)
+        except BaseException:
+            self._retire(client)
+            raise
+        self.last_warmup = WarmupReport(initialize_seconds, versions)
+        self._client = client
+        self._opened_at = time.monotonic()
+        self.watchdog.sample_rss(force=True)
+        return client
+
+    def _detach(self) -> EricClient | None:
+        client, self._client = self._client, None
+        self._opened_at = None
+        self._sends = 0
+        return client
+
+    def _retire(self, client: EricClient | None) -> None:
+        if client is None:
+            return
+        try:
+            client.close()
+        finally:
+            self._retired_resources.add(client.resource_counters())
@@ -0,0 +1,171 @@
+"""Trace of the ctypes calls elsterctl makes into the ERiC library.
+
+While a `NativeCallTracer` is installed, every new `EricClient` wraps its
+library so that each foreign function call is timed and recorded with the
+bytes passed in (payloads, paths) and returned (response buffers). The
+tracer also knows which native function each thread is currently in, so a
+sampling profiler can attribute time spent inside ERiC.
+
+Only clients created in this process are traced; ERiC running in worker
+processes, isolated children or a daemon is not.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+
+@dataclass(frozen=True, slots=True)
+class NativeCall:
+    """One call into the ERiC library."""
+
+    function: str
+    started_seconds: float
+    seconds: float
+    result: int | None
+    bytes_in: int
+    bytes_out: int
+    thread: str
+
+
+@dataclass(frozen=True)
+class NativeCallSummary:
+    """All calls of one ERiC function."""
+
+    function: str
+    calls: int
+    seconds: float
+    bytes_in: int
+    bytes_out: int
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, ctypes.Array):
+        return ctypes.sizeof(value)
+    return 0
+
+
+class NativeCallTracer:
+    """Records calls made through libraries it has wrapped."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._started = clock()
+        self._calls: list[NativeCall] = []
+        self._in_flight: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> list[NativeCall]:
+        with self._lock:
+            return list(self._calls)
+
+    def wrap(self, library: Any) -> Any:
+        """Return a proxy of `library` whose functions are traced."""
+        return _TracedLibrary(library, self)
+
+    def in_flight(self, thread_id: int) -> str | None:
+        """Return the ERiC function the thread is executing, if any."""
+        return self._in_flight.get(thread_id)
+
+    def call(self, name: str, function: Callable[..., Any], args: tuple[Any, ...]) -> Any:
+        thread_id = threading.get_ident()
+        self._in_flight[thread_id] = name
+        started = self._clock()
+        try:
+            result = function(*args)
+        finally:
+            elapsed = self._clock() - started
+            self._in_flight.pop(thread_id, None)
+        record = NativeCall(
+            function=name,
+            started_seconds=started - self._started,
+            seconds=elapsed,
+            result=result if isinstance(result, int) else None,
+            bytes_in=sum(_size(arg) for arg in args),
+            bytes_out=_size(result),
+            thread=threading.current_thread().name,
+        )
+        with self._lock:
+            self._calls.append(record)
+        return result
+
+    def summary(self) -> list[NativeCallSummary]:
+        """Return per-function totals, slowest first."""
+        totals: dict[str, list[float]] = {}
+        for call in self.calls:
+            entry = totals.setdefault(call.function, [0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += call.seconds
+            entry[2] += call.bytes_in
+            entry[3] += call.bytes_out
+        summaries = [
+            NativeCallSummary(name, int(calls), seconds, int(bytes_in), int(bytes_out))
+            for name, (calls, seconds, bytes_in, bytes_out) in totals.items()
+        ]
+        return sorted(summaries, key=lambda summary: summary.seconds, reverse=True)
+
+    def write_jsonl(self, path: Path) -> int:
+        """Write one JSON line per call; returns the number of calls."""
+        calls = self.calls
+        with path.open("w", encoding="utf-8") as handle:
+            for call in calls:
+                handle.write(json.dumps(asdict(call), separators=(",", ":")) + "\n")
+        return len(calls)
+
+
+class _TracedFunction:
+    __slots__ = ("_name", "_function", "_tracer")
+
+    def __init__(self, name: str, function: Callable[..., Any], tracer: NativeCallTracer) -> None:
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_function", function)
+        object.__setattr__(self, "_tracer", tracer)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._function, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # argtypes, restype and errcheck belong to the foreign function.
+        setattr(self._function, name, value)
+
+    def __call__(self, *args: Any) -> Any:
+        return self._tracer.call(self._name, self._function, args)
+
+
+class _TracedLibrary:
+    def __init__(self, library: Any, tracer: NativeCallTracer) -> None:
+        self._library = library
+        self._tracer = tracer
+        self._functions: dict[str, _TracedFunction] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        function = self._functions.get(name)
+        if function is None:
+            # Missing symbols raise AttributeError, as on the library itself.
+            function = _TracedFunction(name, getattr(self._library, name), self._tracer)
+            self._functions[name] = function
+        return function
+
+
+_active_tracer: NativeCallTracer | None = None
+
+
+def install_tracer(tracer: NativeCallTracer | None) -> None:
+    """Trace clients created from now on; None stops tracing new clients."""
+    global _active_tracer
+    _active_tracer = tracer
+
+
+def active_tracer() -> NativeCallTracer | None:
+    return _active_tracer
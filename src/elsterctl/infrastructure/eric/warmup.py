@@ -0,0 +1,82 @@
+"""Session warm-up: load ERiC plugins before the first real filing.
+
+ERiC loads the plugin and schemas of a data type version lazily on the
+first `EricBearbeiteVorgang` call for it, which makes the first filing of
+every batch an outlier. Warming up validates a tiny built-in payload per
+configured data type version right after the session opens. The payload
+is not expected to pass validation; the call only has to reach the plugin.
+Nothing is signed or transmitted.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from elsterctl.infrastructure.eric.client import EricClient
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.shared.testmerker import DEFAULT_TESTMERKER
+
+# Data type version prefix -> (Verfahren, DatenArt) of the warm-up payload.
+_DATA_TYPES = (
+    ("UStVA", ("ElsterAnmeldung", "UStVA")),
+    ("USt", ("ElsterErklaerung", "USt")),
+    ("ESt", ("ElsterErklaerung", "ESt")),
+)
+_DEFAULT_DATA_TYPE = ("ElsterAnmeldung", "sonstige_nachricht")
+
+
+def warmup_payload(data_type_version: str) -> bytes:
+    """Return the minimal TransferHeader-only document for `data_type_version`."""
+    verfahren, daten_art = next(
+        (data_type for prefix, data_type in _DATA_TYPES if data_type_version.startswith(prefix)),
+        _DEFAULT_DATA_TYPE,
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Elster xmlns="http://www.elster.de/elsterxml/schema/v11">'
+        '<TransferHeader version="11">'
+        f"<Verfahren>{verfahren}</Verfahren><DatenArt>{daten_art}</DatenArt>"
+        f"<Vorgang>send-Auth</Vorgang><Testmerker>{DEFAULT_TESTMERKER}</Testmerker>"
+        "</TransferHeader></Elster>"
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class VersionWarmup:
+    """Warm-up of one data type version."""
+
+    data_type_version: str
+    result_code: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class WarmupReport:
+    """Cost of opening a session, kept apart from the timings of filings."""
+
+    initialize_seconds: float
+    versions: tuple[VersionWarmup, ...] = ()
+
+    @property
+    def total_seconds(self) -> float:
+        return self.initialize_seconds + sum(version.seconds for version in self.versions)
+
+
+def warm_up(client: EricClient, data_type_versions: Iterable[str]) -> tuple[VersionWarmup, ...]:
+    """Validate the warm-up payload of each version on an open client."""
+    results = []
+    for data_type_version in data_type_versions:
+        started = time.perf_counter()
+        try:
+            result_code = client.validate_xml(
+                xml_payload=warmup_payload(data_type_version),
+                data_type_version=data_type_version,
+            ).result_code
+        except EricProcessingError as exc:
+            result_code = exc.result_code
+        results.append(
+            VersionWarmup(data_type_version, result_code, time.perf_counter() - started)
+        )
+    return tuple(results)
@@ -0,0 +1,178 @@
+"""Native resource and memory watchdog for long-lived ERiC sessions.
+
+When ERiC stays resident (interactive shell, batches), a certificate
+handle that is never closed or a response buffer that is not freed on an
+error path grows the process for the rest of the run. The watchdog
+compares the client's resource counters against what should be
+outstanding between two sends, samples the process RSS at most once per
+`sample_interval_seconds`, and tells the session to recycle ERiC (shut
+down and reinitialize) when a limit is crossed.
+
+Reinitializing ERiC in the same process rarely returns memory to the
+operating system, so RSS stays above the limit after an RSS recycle. The
+reading that triggered it becomes the new baseline: the next RSS recycle
+needs the process to grow by the original headroom (limit minus starting
+RSS) again. Worker recycling (`RecyclePolicy`) replaces the process and
+does lower RSS.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from elsterctl.infrastructure.eric.client import EricResourceCounters
+
+
+def read_rss_bytes() -> int | None:
+    """Return the resident set size of this process, if it can be determined.
+
+    Uses `/proc/self/statm` where available. Elsewhere the peak RSS from
+    `getrusage` is the closest portable value.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass(frozen=True)
+class WatchdogLimits:
+    """Thresholds that trigger a session recycle; None disables a limit."""
+
+    max_rss_bytes: int | None = None
+    max_leaked_buffers: int | None = 64
+    max_leaked_certificates: int | None = 8
+    max_sends: int | None = None
+    sample_interval_seconds: float = 5.0
+
+
+@dataclass(frozen=True)
+class ResourceReport:
+    """Resource usage of a session, e.g. printed on exit."""
+
+    counters: EricResourceCounters
+    leaked_buffers: int
+    leaked_certificates: int
+    rss_start_bytes: int | None
+    rss_peak_bytes: int | None
+    rss_last_bytes: int | None
+    rss_samples: int
+    recycles: int
+    recycle_reasons: tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def leaked(self) -> bool:
+        return self.leaked_buffers > 0 or self.leaked_certificates > 0
+
+
+class ResourceWatchdog:
+    """Decides when a long-lived ERiC session has to be recycled."""
+
+    def __init__(
+        self,
+        limits: WatchdogLimits | None = None,
+        *,
+        rss_reader: Callable[[], int | None] = read_rss_bytes,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = limits or WatchdogLimits()
+        self._rss_reader = rss_reader
+        self._clock = clock
+        self._last_sample_at: float | None = None
+        self._rss_start: int | None = None
+        self._rss_peak: int | None = None
+        self._rss_last: int | None = None
+        self._rss_samples = 0
+        self._rss_threshold: int | None = None
+        self._rss_trigger: int | None = None
+        self._recycle_reasons: list[str] = []
+
+    def sample_rss(self, *, force: bool = False) -> int | None:
+        """Sample RSS unless the last sample is more recent than the interval."""
+        now = self._clock()
+        if (
+            not force
+            and self._last_sample_at is not None
+            and now - self._last_sample_at < self.limits.sample_interval_seconds
+        ):
+            return self._rss_last
+        self._last_sample_at = now
+        rss = self._rss_reader()
+        if rss is not None:
+            self._rss_samples += 1
+            if self._rss_start is None:
+                self._rss_start = rss
+            self._rss_peak = max(self._rss_peak or 0, rss)
+            self._rss_last = rss
+        return rss
+
+    def recycle_reason(
+        self,
+        counters: EricResourceCounters,
+        *,
+        open_certificates: int,
+        sends: int,
+    ) -> str | None:
+        """Return why the session should be recycled now, or None.
+
+        Must be called between sends, when no buffer is legitimately in use.
+        """
+        limits = self.limits
+        leaked_buffers = counters.outstanding_buffers
+        leaked_certificates = counters.outstanding_certificates - open_certificates
+        if limits.max_leaked_buffers is not None and leaked_buffers > limits.max_leaked_buffers:
+            return f"{leaked_buffers} response buffers not freed"
+        if (
+            limits.max_leaked_certificates is not None
+            and leaked_certificates > limits.max_leaked_certificates
+        ):
+            return f"{leaked_certificates} certificate handles not closed"
+        if limits.max_sends is not None and sends >= limits.max_sends:
+            return f"{sends} sends since initialization"
+        rss = self.sample_rss()
+        if limits.max_rss_bytes is not None and rss is not None:
+            threshold = self._rss_threshold or limits.max_rss_bytes
+            if rss > threshold:
+                self._rss_trigger = rss
+                return f"RSS {rss // (1024 * 1024)} MiB above limit"
+        return None
+
+    def record_recycle(self, reason: str) -> None:
+        if self._rss_trigger is not None and self.limits.max_rss_bytes is not None:
+            headroom = self.limits.max_rss_bytes - (self._rss_start or 0)
+            if headroom <= 0:
+                headroom = self.limits.max_rss_bytes
+            self._rss_threshold = self._rss_trigger + headroom
+        self._rss_trigger = None
+        self._recycle_reasons.append(reason)
+
+    def report(
+        self,
+        counters: EricResourceCounters,
+        *,
+        open_certificates: int = 0,
+    ) -> ResourceReport:
+        self.sample_rss(force=True)
+        return ResourceReport(
+            counters=counters,
+            leaked_buffers=counters.outstanding_buffers,
+            leaked_certificates=counters.outstanding_certificates - open_certificates,
+            rss_start_bytes=self._rss_start,
+            rss_peak_bytes=self._rss_peak,
+            rss_last_bytes=self._rss_last,
+            rss_samples=self._rss_samples,
+            recycles=len(self._recycle_reasons),
+            recycle_reasons=tuple(self._recycle_reasons),
+        )
@@ -0,0 +1,352 @@
+"""ERiC in worker processes, recycled according to a policy.
+
+A native library used for hours in one process slowly degrades: memory
+grows and calls get slower. `RecyclingEricExecutor` runs `EricClient` in a
+child process and replaces that process after a number of submissions, a
+maximum age or when its RSS crosses a threshold. The replacement is
+started in the background and fully warmed up (library loaded, ERiC
+initialized, error texts preloaded, certificates opened) while the old
+process keeps serving; the switch happens between two sends, so a batch
+never waits for a cold start.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from elsterctl.infrastructure.eric.client import EricClient, EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricError, portable_error
+from elsterctl.infrastructure.eric.watchdog import read_rss_bytes
+from elsterctl.infrastructure.pin.providers import SecretPin
+
+# "spawn" gives each worker a clean interpreter; forking a process that
+# already holds threads or an initialized ERiC is not safe.
+DEFAULT_START_METHOD = "spawn"
+
+
+class EricWorkerError(EricError):
+    """Raised when an ERiC worker process fails to start or dies."""
+
+
+def _worker_main(
+    connection: Connection,
+    client_factory: Callable[[], EricClient],
+    certificate_paths: tuple[Path, ...],
+) -> None:
+    """Warm up a client, report readiness and serve send requests until told to stop."""
+    try:
+        client = client_factory()
+        client.open()
+        client.preload_error_texts()
+        for certificate_path in certificate_paths:
+            client.open_certificate(certificate_path)
+    except BaseException as exc:
+        connection.send(("error", portable_error(exc), None))
+        connection.close()
+        return
+
+    try:
+        connection.send(("ready", None, read_rss_bytes()))
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            try:
+                result = client.send_xml_with_certificate(**request)
+            except Exception as exc:
+                connection.send(("error", portable_error(exc), read_rss_bytes()))
+            else:
+                connection.send(("ok", result, read_rss_bytes()))
+            finally:
+                pin = request.get("certificate_pin")
+                if isinstance(pin, SecretPin):
+                    pin.wipe()
+    except OSError:
+        # The parent went away, e.g. a standby stopped before it took over.
+        pass
+    finally:
+        client.close()
+        connection.close()
+
+
+class EricWorkerProcess:
+    """One child process owning an opened `EricClient`."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], EricClient] = EricClient,
+        certificate_paths: Iterable[Path] = (),
+        *,
+        start_method: str = DEFAULT_START_METHOD,
+    ) -> None:
+        self._client_factory = client_factory
+        self._certificate_paths = tuple(certificate_paths)
+        self._context = multiprocessing.get_context(start_method)
+        self._process: multiprocessing.process.BaseProcess | None = None
+        self._connection: Connection | None = None
+        self._ready = False
+        self.started_at: float | None = None
+        self.submissions = 0
+        self.rss_bytes: int | None = None
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process is not None else None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+
+    def start(self) -> None:
+        """Start the process; warm-up continues in the background."""
+        parent_connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child_connection, self._client_factory, self._certificate_paths),
+            name="elsterctl-eric-worker",
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+        self._connection = parent_connection
+        self.started_at = time.monotonic()
+
+    def ready(self, timeout: float | None = 0.0) -> bool:
+        """Return True once warm-up finished; raise if it failed.
+
+        `timeout=None` blocks until the worker reports.
+        """
+        if self._ready:
+            return True
+        if self._connection is None:
+            raise EricWorkerError("ERiC worker process was not started.")
+        if not self._connection.poll(timeout):
+            return False
+        status, error, rss_bytes = self._receive()
+        if status != "ready":
+            self.stop()
+            raise EricWorkerError(f"ERiC worker process failed to start: {error}") from error
+        self._ready = True
+        self.rss_bytes = rss_bytes
+        return True
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        """Run `EricClient.send_xml_with_certificate` in the worker process."""
+        self.ready(timeout=None)
+        try:
+            self._connection.send(request)
+        except (OSError, ValueError) as exc:
+            raise EricWorkerError(f"ERiC worker process is not reachable: {exc}") from exc
+        status, value, rss_bytes = self._receive()
+        self.submissions += 1
+        self.rss_bytes = rss_bytes
+        if status != "ok":
+            raise value
+        return value
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Shut down ERiC in the worker and wait for the process to exit."""
+        if self._connection is not None:
+            try:
+                self._connection.send(None)
+            except (OSError, ValueError):
+                pass
+            self._connection.close()
+            self._connection = None
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout)
+            self._process = None
+        self._ready = False
+
+    def _receive(self) -> tuple[str, Any, int | None]:
+        try:
+            return self._connection.recv()
+        except (EOFError, OSError) as exc:
+            exit_code = None
+            if self._process is not None:
+                self._process.join(1.0)
+                exit_code = self._process.exitcode
+            raise EricWorkerError(
+                f"ERiC worker process exited unexpectedly (exit code {exit_code})."
+            ) from exc
+
+
+@dataclass(frozen=True)
+class RecyclePolicy:
+    """When to replace a worker process; None disables a criterion."""
+
+    max_submissions: int | None = None
+    max_age_seconds: float | None = None
+    max_rss_bytes: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.max_submissions, self.max_age_seconds, self.max_rss_bytes)
+        )
+
+    def reason(self, worker: EricWorkerProcess) -> str | None:
+        """Return why `worker` is due for replacement, or None."""
+        if self.max_submissions is not None and worker.submissions >= self.max_submissions:
+            return f"{worker.submissions} submissions"
+        if self.max_age_seconds is not None and worker.age_seconds >= self.max_age_seconds:
+            return f"age {worker.age_seconds / 60:.1f} min"
+        if (
+            self.max_rss_bytes is not None
+            and worker.rss_bytes is not None
+            and worker.rss_bytes > self.max_rss_bytes
+        ):
+            return f"RSS {worker.rss_bytes // (1024 * 1024)} MiB"
+        return None
+
+
+@dataclass(frozen=True)
+class ExecutorStatus:
+    """Worker process statistics of a `RecyclingEricExecutor`."""
+
+    workers_started: int
+    recycles: int
+    failed_warmups: int
+    recycle_reasons: tuple[str, ...]
+    current_pid: int | None
+    current_submissions: int
+
+
+class RecyclingEricExecutor:
+    """Sends through a warm worker process and replaces it according to a policy.
+
+    `client` can be passed as `eric_client_factory` to `MessageSendService`;
+    the executor itself offers `send_xml_with_certificate`. Sends are
+    serialized, one worker process serves at a time.
+    """
+
+    def __init__(
+        self,
+        policy: RecyclePolicy | None = None,
+        client_factory: Callable[[], EricClient] = EricClient,
+        *,
+        start_method: str = DEFAULT_START_METHOD,
+        worker_factory: Callable[..., EricWorkerProcess] | None = None,
+    ) -> None:
+        self.policy = policy or RecyclePolicy()
+        self._worker_factory = worker_factory or (
+            lambda certificate_paths: EricWorkerProcess(
+                client_factory, certificate_paths, start_method=start_method
+            )
+        )
+        self._lock = threading.Lock()
+        self._worker: EricWorkerProcess | None = None
+        self._standby: EricWorkerProcess | None = None
+        self._retiring: list[threading.Thread] = []
+        self._certificate_paths: dict[Path, None] = {}
+        self._workers_started = 0
+        self._failed_warmups = 0
+        self._recycles = 0
+        self._recycle_reasons: list[str] = []
+
+    def client(self) -> RecyclingEricExecutor:
+        return self
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        with self._lock:
+            self._certificate_paths.setdefault(Path(request["certificate_path"]), None)
+            worker = self._current_worker()
+            try:
+                return worker.send_xml_with_certificate(**request)
+            except EricWorkerError:
+                # The process is gone; the next send starts or promotes another.
+                self._worker = None
+                worker.stop()
+                raise
+            finally:
+                if self._worker is not None:
+                    self._prewarm_if_due()
+
+    def status(self) -> ExecutorStatus:
+        with self._lock:
+            worker = self._worker
+            return ExecutorStatus(
+                workers_started=self._workers_started,
+                recycles=self._recycles,
+                failed_warmups=self._failed_warmups,
+                recycle_reasons=tuple(self._recycle_reasons),
+                current_pid=worker.pid if worker is not None else None,
+                current_submissions=worker.submissions if worker is not None else 0,
+            )
+
+    def live_workers(self) -> int:
+        """Return the number of running worker processes, retiring ones included.
+
+        Does not wait for a send in progress.
+        """
+        workers = (self._worker, self._standby)
+        retiring = sum(1 for thread in self._retiring if thread.is_alive())
+        return sum(1 for worker in workers if worker is not None and worker.alive) + retiring
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in (self._standby, self._worker):
+                if worker is not None:
+                    worker.stop()
+            self._standby = self._worker = None
+            retiring, self._retiring = self._retiring, []
+        for thread in retiring:
+            thread.join()
+
+    def _start_worker(self) -> EricWorkerProcess:
+        worker = self._worker_factory(tuple(self._certificate_paths))
+        worker.start()
+        self._workers_started += 1
+        return worker
+
+    def _current_worker(self) -> EricWorkerProcess:
+        if self._standby is not None:
+            # Without a serving worker the standby is awaited; otherwise it
+            # only takes over once its warm-up is complete.
+            try:
+                promote = self._standby.ready(timeout=None if self._worker is None else 0.0)
+            except EricWorkerError:
+                self._failed_warmups += 1
+                self._standby = None
+                promote = False
+            if promote:
+                if self._worker is not None:
+                    self._retire(self._worker)
+                    self._recycles += 1
+                self._worker, self._standby = self._standby, None
+        if self._worker is None:
+            worker = self._start_worker()
+            worker.ready(timeout=None)
+            self._worker = worker
+        return self._worker
+
+    def _prewarm_if_due(self) -> None:
+        if self._standby is not None:
+            return
+        reason = self.policy.reason(self._worker)
+        if reason is not None:
+            self._recycle_reasons.append(reason)
+            self._standby = self._start_worker()
+
+    def _retire(self, worker: EricWorkerProcess) -> None:
+        thread = threading.Thread(target=worker.stop, name="elsterctl-eric-retire", daemon=True)
+        thread.start()
+        self._retiring = [pending for pending in self._retiring if pending.is_alive()]
+        self._retiring.append(thread)
@@ -0,0 +1 @@
+"""Local submission ledger adapters."""
@@ -0,0 +1,148 @@
+"""SQLite-backed idempotency ledger for submissions.
+
+Each submission key is stored once. The primary key index keeps lookups
+at a handful of page reads even with years of history, and every state
+change is a single committed transaction, so a crash never leaves a
+half-written entry behind.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+PENDING = "pending"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload_digest TEXT NOT NULL,
+    result_code INTEGER,
+    transfer_ticket TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+# Precedence of statuses when ledgers are merged.
+_RANK = (
+    f"CASE {{table}}.status WHEN '{SUCCEEDED}' THEN 2 WHEN '{PENDING}' THEN 1 ELSE 0 END"
+)
+
+
+@dataclass(frozen=True)
+class LedgerEntry:
+    """Recorded state of one submission key."""
+
+    key: str
+    status: str
+    payload_digest: str
+    result_code: int | None
+    transfer_ticket: str | None
+    created_at: float
+    updated_at: float
+
+
+class SubmissionLedger:
+    """Persistent map from submission key to submission outcome."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.execute(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def lookup(self, key: str) -> LedgerEntry | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT key, status, payload_digest, result_code, transfer_ticket, "
+                "created_at, updated_at FROM submissions WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return LedgerEntry(*row) if row else None
+
+    def begin(self, key: str, payload_digest: str, *, force: bool = False) -> bool:
+        """Mark `key` as pending before it is sent.
+
+        Returns False if another run already holds or completed the key.
+        With `force`, any existing entry is taken over.
+        """
+        now = time.time()
+        condition = "" if force else f" WHERE submissions.status = '{FAILED}'"
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO submissions (key, status, payload_digest, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET status = excluded.status, "
+                "payload_digest = excluded.payload_digest, result_code = NULL, "
+                "transfer_ticket = NULL, updated_at = excluded.updated_at" + condition,
+                (key, PENDING, payload_digest, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def merge(self, other_path: Path) -> int:
+        """Copy the entries of another ledger file into this one.
+
+        For a key present in both, an accepted submission wins over one with
+        an unknown outcome, which wins over a failed one, so that a merged
+        ledger never allows a resubmission that one of its sources refused;
+        within the same status the later update wins. Returns the number of
+        entries inserted or replaced.
+        """
+        if not other_path.is_file():
+            raise ValueError(f"Ledger file not found: {other_path}")
+        with self._lock:
+            before = self._connection.total_changes
+            self._connection.execute("ATTACH DATABASE ? AS other", (str(other_path),))
+            try:
+                self._connection.execute(
+                    "INSERT INTO submissions SELECT key, status, payload_digest, result_code, "
+                    "transfer_ticket, created_at, updated_at FROM other.submissions WHERE 1 "
+                    "ON CONFLICT(key) DO UPDATE SET status = excluded.status, "
+                    "payload_digest = excluded.payload_digest, "
+                    "result_code = excluded.result_code, "
+                    "transfer_ticket = excluded.transfer_ticket, "
+                    "created_at = min(submissions.created_at, excluded.created_at), "
+                    "updated_at = excluded.updated_at "
+                    f"WHERE ({_RANK.format(table='excluded')}, excluded.updated_at) > "
+                    f"({_RANK.format(table='submissions')}, submissions.updated_at)"
+                )
+            finally:
+                self._connection.execute("DETACH DATABASE other")
+            return self._connection.total_changes - before
+
+    def complete(self, key: str, result_code: int, transfer_ticket: str | None) -> None:
+        """Record a successful submission."""
+        self._finish(key, SUCCEEDED, result_code, transfer_ticket)
+
+    def fail(self, key: str, result_code: int | None) -> None:
+        """Record a submission that definitely did not reach ELSTER."""
+        self._finish(key, FAILED, result_code, None)
+
+    def _finish(
+        self,
+        key: str,
+        status: str,
+        result_code: int | None,
+        transfer_ticket: str | None,
+    ) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE submissions SET status = ?, result_code = ?, transfer_ticket = ?, "
+                "updated_at = ? WHERE key = ?",
+                (status, result_code, transfer_ticket, time.time(), key),
+            )
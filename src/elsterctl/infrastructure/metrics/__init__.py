@@ -0,0 +1 @@
+"""Process metrics in the Prometheus text exposition format."""
@@ -0,0 +1,133 @@
+"""Expose a metrics registry over HTTP or through a text file.
+
+`MetricsServer` answers `GET /metrics` on a local port from a daemon
+thread. `MetricsFileWriter` rewrites a file atomically at an interval and
+once more on close, for node_exporter's textfile collector or for a batch
+run that is gone before the next scrape.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from elsterctl.infrastructure.metrics.registry import DEFAULT_REGISTRY, MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_HOST = "127.0.0.1"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = DEFAULT_REGISTRY
+
+    def do_GET(self) -> None:  # noqa: N802 - name required by BaseHTTPRequestHandler
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        # Scrapes every few seconds would flood stderr.
+        pass
+
+
+class MetricsServer:
+    """Serves the registry on `http://host:port/metrics`; port 0 picks a free one."""
+
+    def __init__(
+        self,
+        port: int,
+        *,
+        host: str = DEFAULT_HOST,
+        registry: MetricsRegistry = DEFAULT_REGISTRY,
+    ) -> None:
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> MetricsServer:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="elsterctl-metrics", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class MetricsFileWriter:
+    """Writes the registry to `path` every `interval_seconds` and on close."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        interval_seconds: float = 15.0,
+        registry: MetricsRegistry = DEFAULT_REGISTRY,
+    ) -> None:
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive.")
+        self.path = path
+        self._interval = interval_seconds
+        self._registry = registry
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self) -> None:
+        """Replace the file with the current metrics; readers never see a partial file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+            prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+                handle.write(self._registry.render())
+            os.replace(temporary, self.path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    def start(self) -> MetricsFileWriter:
+        if self._thread is None:
+            self.write()
+            self._thread = threading.Thread(
+                target=self._run, name="elsterctl-metrics-file", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._interval):
+            try:
+                self.write()
+            except OSError:
+                # A full or vanished directory must not stop the process;
+                # the next interval tries again.
+                continue
@@ -0,0 +1,113 @@
+"""The metrics elsterctl records and the objects that feed them.
+
+Submissions and ERiC phase timings are recorded where a result comes
+back. Queue depth, open certificate handles, live workers and cache hit
+ratios are read from their owners at scrape time through `watch_*`
+callbacks; watching a new owner replaces the previous one.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Mapping
+
+from elsterctl.infrastructure.eric.error_catalog import DEFAULT_ERROR_CATALOG, EricErrorCatalog
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.metrics.registry import DEFAULT_REGISTRY
+from elsterctl.infrastructure.transport.base import EricTransport
+
+if TYPE_CHECKING:
+    from elsterctl.application.pipeline import Pipeline
+
+# Label value for failures that carry no ERiC result code (crashed worker,
+# unreachable daemon).
+NO_RESULT_CODE = "error"
+
+SUBMISSIONS = DEFAULT_REGISTRY.counter(
+    "elsterctl_submissions_total",
+    "ERiC submissions by result code; 0 means accepted.",
+    ("result_code",),
+)
+ERIC_PHASE_SECONDS = DEFAULT_REGISTRY.histogram(
+    "elsterctl_eric_phase_seconds",
+    "Duration of ERiC call phases: initialize, certificate, process, shutdown and total.",
+    ("phase",),
+)
+QUEUE_DEPTH = DEFAULT_REGISTRY.gauge(
+    "elsterctl_queue_depth",
+    "Items waiting in front of each stage of the running batch pipeline.",
+    ("stage",),
+)
+OPEN_CERTIFICATES = DEFAULT_REGISTRY.gauge(
+    "elsterctl_open_certificate_handles",
+    "Certificate handles held open by the ERiC session of this process.",
+)
+LIVE_WORKERS = DEFAULT_REGISTRY.gauge(
+    "elsterctl_live_workers",
+    "Live workers: batch pipeline threads and ERiC worker processes.",
+    ("pool",),
+)
+CACHE_HIT_RATIO = DEFAULT_REGISTRY.gauge(
+    "elsterctl_cache_hit_ratio",
+    "Share of cache lookups answered from the cache; NaN before the first lookup.",
+    ("cache",),
+)
+
+
+def hit_ratio(hits: int, misses: int) -> float:
+    lookups = hits + misses
+    return hits / lookups if lookups else math.nan
+
+
+def record_submission(result_code: int, timings: Mapping[str, float]) -> None:
+    """Count a result returned by ERiC and observe its phase timings."""
+    SUBMISSIONS.labels(result_code).inc()
+    for phase, seconds in timings.items():
+        ERIC_PHASE_SECONDS.labels(phase).observe(seconds)
+
+
+def record_failure(result_code: int | None) -> None:
+    """Count a send that raised, by ERiC result code if there is one."""
+    SUBMISSIONS.labels(NO_RESULT_CODE if result_code is None else result_code).inc()
+
+
+def watch_error_catalog(catalog: EricErrorCatalog) -> None:
+    CACHE_HIT_RATIO.labels("error_texts").set_function(
+        lambda: hit_ratio(catalog.hits, catalog.misses)
+    )
+
+
+def watch_session(session: EricSession) -> None:
+    """Report open certificates and PIN cache hits of a session."""
+    OPEN_CERTIFICATES.set_function(lambda: len(session.status().open_certificates))
+    pins = session.pins
+    CACHE_HIT_RATIO.labels("pins").set_function(lambda: hit_ratio(pins.hits, pins.misses))
+
+
+def watch_pipeline(pipeline: Pipeline) -> None:
+    """Report queue depth per stage and worker threads of a `Pipeline`."""
+
+    def depth(stage: str) -> float:
+        for stats in pipeline.stats():
+            if stats.name == stage:
+                return stats.queue_depth
+        return 0
+
+    for stats in pipeline.stats():
+        QUEUE_DEPTH.labels(stats.name).set_function(lambda stage=stats.name: depth(stage))
+    LIVE_WORKERS.labels("pipeline").set_function(pipeline.live_workers)
+
+
+def unwatch_pipeline(pipeline: Pipeline) -> None:
+    """Stop reading a finished `Pipeline`, so the gauges do not keep it alive."""
+    for stats in pipeline.stats():
+        QUEUE_DEPTH.labels(stats.name).set_function(None)
+    LIVE_WORKERS.labels("pipeline").set_function(None)
+
+
+def watch_transport(transport: EricTransport) -> None:
+    """Report the ERiC worker processes of a transport."""
+    LIVE_WORKERS.labels("eric").set_function(transport.live_workers)
+
+
+watch_error_catalog(DEFAULT_ERROR_CATALOG)
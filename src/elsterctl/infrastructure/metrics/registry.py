@@ -0,0 +1,310 @@
+"""Counters, gauges and histograms rendered in the Prometheus text format.
+
+Every label combination is a child with its own small lock, so recording
+is one dict lookup plus one uncontended lock; nothing is formatted until
+a scrape calls `MetricsRegistry.render`. Gauges can also read their value
+from a callback at scrape time, which keeps values such as queue depth
+off the hot path entirely.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Generic, Iterator, TypeVar
+
+# Latency buckets in seconds, from a cached validation to a slow transfer.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+ChildT = TypeVar("ChildT")
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "_value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _GaugeChild:
+    __slots__ = ("_lock", "_value", "_function")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        """Read the value from `function` at scrape time; None goes back to `set`."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        function = self._function
+        return float(function()) if function is not None else self._value
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "_counts", "_sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        # One slot per bucket plus +Inf; made cumulative when rendered.
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        slot = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[slot] += 1
+            self._sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric(ABC, Generic[ChildT]):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], ChildT] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Without labels the single series exists from the start.
+            self._children[()] = self._new_child()
+
+    def labels(self, *values: object, **labelvalues: object) -> ChildT:
+        if labelvalues:
+            if values:
+                raise ValueError("Pass label values either by position or by name.")
+            try:
+                values = tuple(labelvalues[name] for name in self.labelnames)
+            except KeyError as exc:
+                raise ValueError(f"Missing label {exc} for metric {self.name}.") from exc
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"Unexpected labels for metric {self.name}.")
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}.")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> ChildT:
+        """Return a fresh series for one label combination."""
+
+    def _unlabelled(self) -> ChildT:
+        if self.labelnames:
+            raise ValueError(f"Metric {self.name} needs labels {self.labelnames}.")
+        return self.labels()
+
+    def _items(self) -> list[tuple[tuple[str, ...], ChildT]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Yield the exposition lines of all series."""
+
+
+class Counter(_Metric[_CounterChild]):
+    """Monotonically increasing count."""
+
+    kind = COUNTER
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._items():
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class Gauge(_Metric[_GaugeChild]):
+    """Value that goes up and down, set directly or read from a callback."""
+
+    kind = GAUGE
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().dec(amount)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self._unlabelled().set_function(function)
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._items():
+            try:
+                value = child.value
+            except Exception:  # noqa: BLE001 - a failing callback must not break the scrape
+                continue
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+
+class Histogram(_Metric[_HistogramChild]):
+    """Observations counted into cumulative buckets, with sum and count."""
+
+    kind = HISTOGRAM
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        if "le" in labelnames:
+            raise ValueError("Histograms cannot use the label 'le'.")
+        bounds = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        if not bounds:
+            raise ValueError("Histograms need at least one finite bucket.")
+        self.buckets = bounds
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"), (*values, _format_value(bound))
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Named metrics of one process.
+
+    Asking for an existing name returns the registered metric, so modules
+    can declare the metrics they record at import time.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric[object]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> _Metric[object] | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format 0.0.4."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: list[str] = []
+        for metric in metrics:
+            documentation = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _register(self, metric: MetricT) -> MetricT:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(
+                f"Metric {metric.name} is already registered as a {existing.kind} "
+                f"with labels {existing.labelnames}."
+            )
+        return existing  # type: ignore[return-value]
+
+
+DEFAULT_REGISTRY = MetricsRegistry()
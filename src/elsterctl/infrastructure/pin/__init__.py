@@ -0,0 +1 @@
+"""Certificate PIN sources and in-memory PIN handling."""
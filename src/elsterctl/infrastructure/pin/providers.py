@@ -0,0 +1,255 @@
+"""Certificate PIN providers and the per-session PIN cache.
+
+A PIN is resolved from the first provider that knows it (environment
+variable, PIN file, local PIN store, interactive prompt) and kept in a
+`SecretPin`: a mutable, NUL-terminated buffer that ERiC reads in place and
+that is overwritten with zeros when the session ends.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import getpass
+import json
+import os
+import stat
+import sys
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+class PinError(ValueError):
+    """Raised when a PIN source exists but cannot be used safely."""
+
+
+class SecretPin:
+    """PIN bytes in a wipeable buffer, passed to ERiC without copying."""
+
+    __slots__ = ("_buffer", "_c_buffer", "_c_pointer")
+
+    def __init__(self, value: str | bytes | bytearray) -> None:
+        raw = value.encode("utf-8") if isinstance(value, str) else value
+        if b"\0" in raw:
+            raise PinError("PIN must not contain NUL bytes.")
+        self._buffer = bytearray(len(raw) + 1)
+        self._buffer[: len(raw)] = raw
+        if isinstance(value, bytearray):
+            value[:] = bytes(len(value))
+        self._c_buffer = (ctypes.c_char * len(self._buffer)).from_buffer(self._buffer)
+        self._c_pointer = ctypes.cast(self._c_buffer, ctypes.c_char_p)
+
+    def __repr__(self) -> str:
+        return "SecretPin(****)"
+
+    def __len__(self) -> int:
+        return len(self._buffer) - 1
+
+    def __reduce__(self) -> tuple:
+        # Only pickled to hand the PIN to an ERiC worker process over a
+        # private pipe; the receiving side gets a SecretPin again.
+        return (SecretPin, (bytes(self._buffer[:-1]),))
+
+    def __del__(self) -> None:
+        self.wipe()
+
+    @property
+    def wiped(self) -> bool:
+        return not any(self._buffer)
+
+    def c_pointer(self) -> ctypes.c_char_p:
+        """Return a `char*` into the buffer; valid as long as this object lives."""
+        return self._c_pointer
+
+    def reveal(self) -> str:
+        """Return the PIN as text (creates an immutable copy; use sparingly)."""
+        return bytes(self._buffer[:-1]).decode("utf-8")
+
+    def wipe(self) -> None:
+        buffer = getattr(self, "_buffer", None)
+        if buffer is not None:
+            buffer[:] = bytes(len(buffer))
+
+
+class PinProvider(ABC):
+    """Source of certificate PINs."""
+
+    hint = "Provide a certificate PIN."
+
+    @abstractmethod
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        """Return the PIN for `certificate_path`, or None if unknown."""
+
+
+class EnvPinProvider(PinProvider):
+    """Reads the PIN from an environment variable."""
+
+    def __init__(self, variable: str) -> None:
+        self.variable = variable
+        self.hint = f"Export environment variable: {variable}"
+
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        value = os.getenv(self.variable)
+        return SecretPin(value) if value else None
+
+
+def _check_private(path: Path) -> None:
+    if os.name == "posix" and stat.S_IMODE(path.stat().st_mode) & 0o077:
+        raise PinError(f"{path} is accessible by other users. Restrict it with: chmod 600 {path}")
+
+
+class FilePinProvider(PinProvider):
+    """Reads the PIN from a private file (first line, without line break)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.hint = f"Write the PIN to {path}"
+
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        if not self.path.exists():
+            return None
+        _check_private(self.path)
+        raw = bytearray(self.path.read_bytes())
+        end = len(raw)
+        for index, byte in enumerate(raw):
+            if byte in (0x0A, 0x0D):
+                end = index
+                break
+        try:
+            return SecretPin(raw[:end]) if end else None
+        finally:
+            raw[:] = bytes(len(raw))
+
+
+def default_pin_store_path() -> Path:
+    data_home = os.getenv("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    return Path(data_home) / "elsterctl" / "pins.json"
+
+
+class LocalPinStore(PinProvider):
+    """PINs per certificate in a JSON file only the user can read.
+
+    The PINs are stored unencrypted; the file permissions are the only
+    protection.
+    """
+
+    hint = "Store it with: elsterctl auth remember-pin"
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_pin_store_path()
+
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        value = self._load().get(self._key(certificate_path))
+        return SecretPin(value) if value else None
+
+    def store(self, certificate_path: Path, pin: str) -> None:
+        entries = self._load()
+        entries[self._key(certificate_path)] = pin
+        self._save(entries)
+
+    def forget(self, certificate_path: Path) -> bool:
+        entries = self._load()
+        removed = entries.pop(self._key(certificate_path), None) is not None
+        if removed:
+            self._save(entries)
+        return removed
+
+    @staticmethod
+    def _key(certificate_path: Path) -> str:
+        return str(certificate_path.expanduser().resolve())
+
+    def _load(self) -> dict[str, str]:
+        if not self.path.exists():
+            return {}
+        _check_private(self.path)
+        try:
+            document = json.loads(self.path.read_text(encoding="utf-8"))
+        except ValueError as exc:
+            raise PinError(f"Invalid PIN store {self.path}: {exc}") from exc
+        return dict(document.get("certificates", {}))
+
+    def _save(self, entries: dict[str, str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            json.dump({"certificates": entries}, handle, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+class PromptPinProvider(PinProvider):
+    """Asks for the PIN on the terminal; does nothing when not interactive."""
+
+    hint = "Run interactively to be prompted for it"
+
+    def __init__(
+        self,
+        prompt: Callable[[str], str] = getpass.getpass,
+        is_interactive: Callable[[], bool] = lambda: sys.stdin.isatty(),
+    ) -> None:
+        self._prompt = prompt
+        self._is_interactive = is_interactive
+
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        if not self._is_interactive():
+            return None
+        value = self._prompt(f"PIN for {certificate_path.name}: ")
+        return SecretPin(value) if value else None
+
+
+class ChainPinProvider(PinProvider):
+    """Tries providers in order and returns the first PIN found."""
+
+    def __init__(self, providers: Iterable[PinProvider]) -> None:
+        self.providers = tuple(providers)
+        self.hint = "; ".join(provider.hint for provider in self.providers)
+
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        for provider in self.providers:
+            pin = provider.resolve(certificate_path)
+            if pin is not None:
+                return pin
+        return None
+
+
+class PinCache:
+    """Resolved PINs per certificate for the lifetime of a session."""
+
+    def __init__(self) -> None:
+        self._pins: dict[Path, SecretPin] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._pins)
+
+    def resolve(self, certificate_path: Path, provider: PinProvider) -> SecretPin | None:
+        with self._lock:
+            pin = self._pins.get(certificate_path)
+            if pin is not None and not pin.wiped:
+                self.hits += 1
+                return pin
+            self.misses += 1
+            pin = provider.resolve(certificate_path)
+            if pin is not None:
+                self._pins[certificate_path] = pin
+            return pin
+
+    def evict(self, certificate_path: Path, pin: SecretPin) -> None:
+        """Forget `pin` for `certificate_path`, e.g. after ERiC rejected it.
+
+        The next `resolve` asks the provider again. Sends still holding the
+        PIN keep their buffer; it is wiped once the last reference is gone.
+        """
+        with self._lock:
+            if self._pins.get(certificate_path) is pin:
+                del self._pins[certificate_path]
+
+    def clear(self) -> None:
+        """Wipe and forget all cached PINs."""
+        with self._lock:
+            for pin in self._pins.values():
+                pin.wipe()
+            self._pins.clear()
@@ -1 +1 @@
-"""Transfer status and receipt retrieval adapters."""
+"""Transports executing ERiC submissions in-process, in child processes or in a local daemon."""
@@ -0,0 +1,66 @@
+"""Transport interface shared by all execution backends.
+
+A transport decides where `EricClient.send_xml_with_certificate` runs: in
+this process, in a worker process, in a local daemon or in a child process
+per filing. Services only see the send method, so backends are
+interchangeable and can be compared on the same workload.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricError
+from elsterctl.infrastructure.eric.warmup import WarmupReport
+from elsterctl.infrastructure.pin.providers import SecretPin
+
+IN_PROCESS = "in-process"
+SUBPROCESS = "subprocess"
+UNIX_SOCKET = "unix-socket"
+ISOLATED = "isolated"
+REPLAY = "replay"
+TRANSPORTS = (IN_PROCESS, SUBPROCESS, UNIX_SOCKET, ISOLATED, REPLAY)
+
+
+class TransportError(EricError):
+    """Raised when a transport cannot reach its ERiC backend."""
+
+
+class EricTransport(ABC):
+    """Executes ERiC submissions."""
+
+    name = "abstract"
+
+    def client(self) -> EricTransport:
+        """Return the object services call; suitable as `eric_client_factory`."""
+        return self
+
+    @abstractmethod
+    def send_xml_with_certificate(
+        self,
+        *,
+        xml_payload: str | bytes | bytearray,
+        data_type_version: str,
+        certificate_path: Path,
+        certificate_pin: str | SecretPin,
+        validate_before_send: bool,
+    ) -> EricSubmitResult:
+        """Send one filing, with the keyword arguments of `EricClient`."""
+
+    def warm_up(self) -> WarmupReport | None:
+        """Initialize the backend ahead of the first send, if it supports it."""
+        return None
+
+    def live_workers(self) -> int:
+        """Return the number of ERiC worker processes owned by the transport."""
+        return 0
+
+    def describe(self) -> dict[str, Any]:
+        """Return transport name and statistics for status output."""
+        return {"transport": self.name}
+
+    def close(self) -> None:
+        """Release processes and connections owned by the transport."""
@@ -0,0 +1,251 @@
+"""Local ERiC daemon and the Unix socket transport talking to it.
+
+`EricDaemon` keeps one `EricSession` warm and serves send requests from
+other elsterctl processes on the same host. Connections are authenticated
+with a random key stored next to the socket; both files are private to
+the user, and server and client refuse a socket directory that another
+user owns or that is open to group or others. `UnixSocketTransport` keeps
+a small pool of open connections so that a send costs one round trip
+instead of a connect and handshake.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import secrets
+import socket
+import stat
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any
+
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+from elsterctl.infrastructure.eric.errors import portable_error
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.metrics.instruments import record_failure, record_submission
+from elsterctl.infrastructure.pin.providers import SecretPin
+from elsterctl.infrastructure.transport.base import UNIX_SOCKET, EricTransport, TransportError
+
+_FAMILY = "AF_UNIX"
+
+
+def default_socket_path() -> Path:
+    """Return the daemon socket under `$XDG_RUNTIME_DIR` or a per-user temp dir."""
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "elsterctl" / "eric.sock"
+    return Path("/tmp") / f"elsterctl-{os.getuid()}" / "eric.sock"
+
+
+def key_path_for(socket_path: Path) -> Path:
+    return socket_path.with_name(f"{socket_path.name}.key")
+
+
+def _check_private_directory(directory: Path) -> None:
+    """Refuse a socket directory that someone else could have planted or can modify."""
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise TransportError(
+            f"Refusing to use {directory} for the ERiC daemon: it must be a directory "
+            "owned by the current user without group or other permissions (chmod 700)."
+        )
+
+
+def _read_key(socket_path: Path) -> bytes:
+    try:
+        _check_private_directory(socket_path.parent)
+        return key_path_for(socket_path).read_bytes()
+    except OSError as exc:
+        raise TransportError(
+            f"No ERiC daemon at {socket_path}. Start one with: "
+            f"elsterctl session serve --socket {socket_path}"
+        ) from exc
+
+
+class EricDaemon:
+    """Serves an `EricSession` to local clients; sends are serialized."""
+
+    def __init__(self, socket_path: Path, session: EricSession) -> None:
+        self.socket_path = socket_path
+        self.session = session
+        self._listener: Listener | None = None
+        self._send_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._serving = False
+        self._connections: set[Connection] = set()
+        self._connections_lock = threading.Lock()
+        self.requests = 0
+
+    def start(self) -> None:
+        """Create the socket and key file; `serve_forever` accepts clients."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        _check_private_directory(self.socket_path.parent)
+        if self.socket_path.exists():
+            try:
+                Client(
+                    str(self.socket_path), family=_FAMILY, authkey=_read_key(self.socket_path)
+                ).close()
+            except (OSError, EOFError, AuthenticationError, TransportError):
+                self.socket_path.unlink()
+            else:
+                raise TransportError(f"An ERiC daemon is already listening on {self.socket_path}.")
+        authkey = secrets.token_bytes(32)
+        key_path = key_path_for(self.socket_path)
+        descriptor = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "wb") as handle:
+            handle.write(authkey)
+        self._listener = Listener(str(self.socket_path), family=_FAMILY, authkey=authkey)
+        os.chmod(self.socket_path, 0o600)
+
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.start()
+        self._serving = True
+        try:
+            while not self._stopping.is_set():
+                try:
+                    connection = self._listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    if self._stopping.is_set():
+                        break
+                    # Failed handshake (wrong key) or a client that went away.
+                    continue
+                if self._stopping.is_set():
+                    connection.close()
+                    break
+                with self._connections_lock:
+                    self._connections.add(connection)
+                threading.Thread(
+                    target=self._handle, args=(connection,), name="elsterctl-daemon", daemon=True
+                ).start()
+        finally:
+            self._serving = False
+
+    def shutdown(self) -> None:
+        """Stop accepting clients, drop connections and remove socket and key."""
+        self._stopping.set()
+        if self._listener is not None and self._serving:
+            # Closing the socket does not interrupt a blocked accept(); a
+            # last connection does. It skips the handshake, which would
+            # wait forever if the accept loop has already stopped.
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wake:
+                try:
+                    wake.connect(str(self.socket_path))
+                except OSError:
+                    pass
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        for path in (self.socket_path, key_path_for(self.socket_path)):
+            path.unlink(missing_ok=True)
+
+    def _handle(self, connection: Connection) -> None:
+        try:
+            while True:
+                try:
+                    command, payload = connection.recv()
+                except (EOFError, OSError):
+                    break
+                connection.send(self._execute(command, payload))
+        except OSError:
+            pass
+        finally:
+            with self._connections_lock:
+                self._connections.discard(connection)
+            connection.close()
+
+    def _execute(self, command: str, payload: Any) -> tuple[str, Any]:
+        if command == "ping":
+            status = self.session.status()
+            return "ok", {"active": status.active, "sends": status.sends, "pid": os.getpid()}
+        if command != "send":
+            return "error", TransportError(f"Unknown daemon command: {command}")
+        try:
+            with self._send_lock:
+                self.requests += 1
+                result = self.session.client().send_xml_with_certificate(**payload)
+        except Exception as exc:
+            record_failure(getattr(exc, "result_code", None))
+            return "error", portable_error(exc)
+        else:
+            record_submission(result.result_code, result.timings)
+            return "ok", result
+        finally:
+            pin = payload.get("certificate_pin")
+            if isinstance(pin, SecretPin):
+                pin.wipe()
+
+
+class UnixSocketTransport(EricTransport):
+    """Sends through a local `EricDaemon` using pooled connections."""
+
+    name = UNIX_SOCKET
+
+    def __init__(self, socket_path: Path | None = None, *, pool_size: int = 4) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1.")
+        self.socket_path = socket_path or default_socket_path()
+        self._pool: queue.LifoQueue[Connection] = queue.LifoQueue(maxsize=pool_size)
+        self.connects = 0
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        return self._call("send", request)
+
+    def ping(self) -> dict[str, Any]:
+        return self._call("ping", None)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "transport": self.name,
+            "socket": str(self.socket_path),
+            "connects": self.connects,
+            "pooled_connections": self._pool.qsize(),
+        }
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _call(self, command: str, payload: Any) -> Any:
+        connection = self._acquire()
+        try:
+            connection.send((command, payload))
+            status, value = connection.recv()
+        except (EOFError, OSError) as exc:
+            connection.close()
+            raise TransportError(f"Lost connection to ERiC daemon at {self.socket_path}.") from exc
+        self._release(connection)
+        if status != "ok":
+            raise value
+        return value
+
+    def _acquire(self) -> Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        authkey = _read_key(self.socket_path)
+        try:
+            connection = Client(str(self.socket_path), family=_FAMILY, authkey=authkey)
+        except (OSError, EOFError, AuthenticationError) as exc:
+            raise TransportError(
+                f"Cannot connect to ERiC daemon at {self.socket_path}: {exc}"
+            ) from exc
+        self.connects += 1
+        return connection
+
+    def _release(self, connection: Connection) -> None:
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
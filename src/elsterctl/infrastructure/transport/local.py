@@ -0,0 +1,109 @@
+"""Transports running ERiC in this process or in a worker process."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any, Callable
+
+from elsterctl.infrastructure.eric.client import EricClient, EricSubmitResult
+from elsterctl.infrastructure.eric.isolation import IsolatedEricExecutor, preloaded_client
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.eric.warmup import WarmupReport
+from elsterctl.infrastructure.eric.worker import (
+    DEFAULT_START_METHOD,
+    RecyclePolicy,
+    RecyclingEricExecutor,
+)
+from elsterctl.infrastructure.transport.base import (
+    IN_PROCESS,
+    ISOLATED,
+    REPLAY,
+    SUBPROCESS,
+    EricTransport,
+)
+
+
+class InProcessTransport(EricTransport):
+    """Calls ERiC through the long-lived session of this process.
+
+    Lowest latency; a crash in native code takes the process down.
+    """
+
+    name = IN_PROCESS
+
+    def __init__(self, session: EricSession) -> None:
+        self.session = session
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        return self.session.client().send_xml_with_certificate(**request)
+
+    def warm_up(self) -> WarmupReport:
+        return self.session.warm_up()
+
+    def describe(self) -> dict[str, Any]:
+        status = self.session.status()
+        return {"transport": self.name, "active": status.active, "sends": status.sends}
+
+
+class ReplayTransport(InProcessTransport):
+    """In-process transport whose session serves recorded results."""
+
+    name = REPLAY
+
+
+class WorkerProcessTransport(EricTransport):
+    """Runs ERiC in a child process, optionally recycled by a policy."""
+
+    name = SUBPROCESS
+
+    def __init__(
+        self,
+        policy: RecyclePolicy | None = None,
+        client_factory: Callable[[], EricClient] = EricClient,
+        *,
+        start_method: str = DEFAULT_START_METHOD,
+    ) -> None:
+        self.executor = RecyclingEricExecutor(policy, client_factory, start_method=start_method)
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        return self.executor.send_xml_with_certificate(**request)
+
+    def live_workers(self) -> int:
+        return self.executor.live_workers()
+
+    def describe(self) -> dict[str, Any]:
+        status = asdict(self.executor.status())
+        status["recycle_reasons"] = list(status["recycle_reasons"])
+        return {"transport": self.name, **status}
+
+    def close(self) -> None:
+        self.executor.close()
+
+
+class IsolatedTransport(EricTransport):
+    """Runs every filing in a child forked from a preloaded forkserver.
+
+    A native crash fails only the filing that caused it.
+    """
+
+    name = ISOLATED
+
+    def __init__(
+        self,
+        client_factory: Callable[[], EricClient] = preloaded_client,
+        *,
+        start_method: str | None = None,
+    ) -> None:
+        self.executor = IsolatedEricExecutor(client_factory, start_method=start_method)
+
+    def send_xml_with_certificate(self, **request: Any) -> EricSubmitResult:
+        return self.executor.send_xml_with_certificate(**request)
+
+    def live_workers(self) -> int:
+        return self.executor.live_workers()
+
+    def describe(self) -> dict[str, Any]:
+        return {"transport": self.name, **asdict(self.executor.status())}
+
+    def close(self) -> None:
+        self.executor.close()
@@ -0,0 +1,98 @@
+"""Output helpers for human-readable and machine-readable CLI output.
+
+Commands print through an `OutputSink` stored in the root click context.
+In `text` mode they behave like plain `click.echo`. In `json`/`jsonl` mode
+informational lines are suppressed and each operation emits one structured
+record, so scripts never have to parse human text.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+import click
+
+OUTPUT_FORMATS = ("text", "json", "jsonl")
+
+_UNSAFE_FILE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class OutputSink:
+    """Writes command output in the globally selected format."""
+
+    def __init__(self, output_format: str = "text", response_dir: Path | None = None) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        self.output_format = output_format
+        self.response_dir = response_dir
+        self._sequence = 0
+
+    @property
+    def structured(self) -> bool:
+        return self.output_format != "text"
+
+    def info(self, message: str) -> None:
+        """Print a human-readable line; suppressed in structured modes."""
+        if not self.structured:
+            click.echo(message)
+
+    def emit(self, record: dict[str, Any]) -> None:
+        """Print one structured record (indented JSON or a single JSON line)."""
+        if self.output_format == "jsonl":
+            click.echo(json.dumps(record, sort_keys=True, separators=(",", ":")))
+        else:
+            click.echo(json.dumps(record, indent=2, sort_keys=True))
+
+    def response_fields(
+        self,
+        name: str,
+        eric_response_xml: str,
+        server_response_xml: str,
+    ) -> dict[str, str]:
+        """Return response XML inline, or as side-file paths when configured.
+
+        Side files are never overwritten: when a number is taken, e.g. by an
+        earlier run into the same directory, the next free one is used.
+        """
+        fields: dict[str, str] = {}
+        documents = (("eric", eric_response_xml), ("server", server_response_xml))
+
+        if self.response_dir is None:
+            for kind, document in documents:
+                if document:
+                    fields[f"{kind}_response_xml"] = document
+            return fields
+
+        self.response_dir.mkdir(parents=True, exist_ok=True)
+        safe_name = _UNSAFE_FILE_CHARS.sub("_", name)
+        while True:
+            self._sequence += 1
+            stem = f"{self._sequence:06d}-{safe_name}"
+            created: list[Path] = []
+            try:
+                for kind, document in documents:
+                    if not document:
+                        continue
+                    path = self.response_dir / f"{stem}.{kind}.xml"
+                    with path.open("x", encoding="utf-8") as handle:
+                        created.append(path)
+                        handle.write(document)
+                    fields[f"{kind}_response_path"] = str(path)
+            except FileExistsError:
+                for path in created:
+                    path.unlink()
+                fields.clear()
+                continue
+            return fields
+
+
+def get_output(ctx: click.Context) -> OutputSink:
+    """Return the output sink configured on the root context."""
+    root_obj = ctx.find_root().obj or {}
+    sink = root_obj.get("output")
+    if isinstance(sink, OutputSink):
+        return sink
+    return OutputSink()
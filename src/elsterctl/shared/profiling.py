@@ -0,0 +1,108 @@
+"""CPU profiles of an elsterctl command.
+
+`CommandProfiler` runs cProfile on the calling thread and, in parallel, a
+sampler that records the wall-clock stacks of all threads every few
+milliseconds. The samples are written in the collapsed ("folded") stack
+format read by flamegraph.pl, inferno and speedscope. Frames are labelled
+`module:function`, so click, XML handling and elsterctl code are told
+apart at a glance; a `native_frame` callback can add the foreign function
+a thread is blocked in as the innermost frame.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+from typing import Callable
+
+DEFAULT_INTERVAL_SECONDS = 0.005
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """Files written by a `CommandProfiler`."""
+
+    cprofile_path: Path
+    folded_path: Path
+    samples: int
+    seconds: float
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class CommandProfiler:
+    """Writes `<prefix>.prof` (cProfile) and `<prefix>.folded` (sampled stacks)."""
+
+    def __init__(
+        self,
+        output_prefix: Path,
+        *,
+        interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+        native_frame: Callable[[int], str | None] | None = None,
+    ) -> None:
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive.")
+        self.output_prefix = output_prefix
+        self._interval = interval_seconds
+        self._native_frame = native_frame
+        self._profile = cProfile.Profile()
+        self._stacks: Counter[str] = Counter()
+        self._samples = 0
+        self._stopping = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._started = 0.0
+
+    def start(self) -> CommandProfiler:
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self._sample, name="elsterctl-profiler", daemon=True
+        )
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def stop(self) -> ProfileReport:
+        """Stop profiling and write both files."""
+        self._profile.disable()
+        self._stopping.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        seconds = time.perf_counter() - self._started
+
+        prefix = self.output_prefix
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        cprofile_path = prefix.with_name(prefix.name + ".prof")
+        folded_path = prefix.with_name(prefix.name + ".folded")
+        self._profile.dump_stats(str(cprofile_path))
+        with folded_path.open("w", encoding="utf-8") as handle:
+            for stack, count in sorted(self._stacks.items()):
+                handle.write(f"{stack} {count}\n")
+        return ProfileReport(cprofile_path, folded_path, self._samples, seconds)
+
+    def _sample(self) -> None:
+        own_thread = threading.get_ident()
+        while not self._stopping.wait(self._interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack: list[str] = []
+                current: FrameType | None = frame
+                while current is not None:
+                    stack.append(_frame_label(current))
+                    current = current.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                stack.reverse()
+                native = self._native_frame(thread_id) if self._native_frame else None
+                if native is not None:
+                    stack.append(f"[native] {native}")
+                self._stacks[";".join(stack)] += 1
+            self._samples += 1
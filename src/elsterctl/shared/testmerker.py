@@ -0,0 +1,3 @@
+"""Testmerker shared by every path that marks a filing as a test case."""
+
+DEFAULT_TESTMERKER = "700000004"
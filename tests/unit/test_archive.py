@@ -0,0 +1,175 @@
+"""Tests for the segmented submission archive."""
+
+from __future__ import annotations
+
+import threading
+from itertools import count
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.cli.root import cli
+from elsterctl.domain.filings import ArchivedXml
+from elsterctl.infrastructure.archive.store import SubmissionArchive
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+
+
+def _archive(directory: Path, **kwargs) -> SubmissionArchive:
+    ticks = count(1_000)
+    return SubmissionArchive(directory, clock=lambda: next(ticks), **kwargs)
+
+
+def test_archive_returns_appended_submission(tmp_path: Path) -> None:
+    archive = _archive(tmp_path / "archive")
+    archive.append("ticket-1", b"<Elster>1</Elster>\0", "<Eric />", "<Server />", result_code=0)
+
+    submission = archive.get("ticket-1")
+    missing = archive.get("unknown")
+    archive.close()
+
+    assert submission is not None
+    assert submission.payload == b"<Elster>1</Elster>"
+    assert submission.eric_response_xml == "<Eric />"
+    assert submission.server_response_xml == "<Server />"
+    assert submission.archived_at_ns == 1_000
+    assert missing is None
+
+
+def test_archive_rolls_over_and_finds_filings_in_sealed_segments(tmp_path: Path) -> None:
+    archive = _archive(tmp_path / "archive", max_segment_bytes=256)
+    for number in range(50):
+        archive.append(f"ticket-{number}", f"<Elster>{number}</Elster>".encode(), "", "")
+
+    assert archive.segment_count > 1
+    assert len(archive) == 50
+    for number in (0, 17, 49):
+        submission = archive.get(f"ticket-{number}")
+        assert submission is not None
+        assert submission.payload == f"<Elster>{number}</Elster>".encode()
+    assert archive.get("ticket-50") is None
+    archive.close()
+
+
+def test_archive_survives_reopen_and_torn_index_entry(tmp_path: Path) -> None:
+    directory = tmp_path / "archive"
+    archive = _archive(directory, max_segment_bytes=256)
+    for number in range(20):
+        archive.append(f"ticket-{number}", b"<Elster />", "", "")
+    archive.close()
+
+    active_index = sorted(directory.glob("segment-*.idx"))[-1]
+    with active_index.open("ab") as index_file:
+        index_file.write(b"\x01\x02\x03")
+
+    reopened = _archive(directory, max_segment_bytes=256)
+    assert len(reopened) == 20
+    assert reopened.get("ticket-3") is not None
+    reopened.append("ticket-20", b"<Elster />", "", "")
+    assert reopened.get("ticket-20") is not None
+    reopened.close()
+
+
+def test_archives_sharing_a_directory_see_each_others_filings(tmp_path: Path) -> None:
+    directory = tmp_path / "archive"
+    first = _archive(directory, max_segment_bytes=512)
+    second = _archive(directory, max_segment_bytes=512)
+
+    for number in range(40):
+        writer = first if number % 3 else second
+        writer.append(f"ticket-{number}", f"<Elster>{number}</Elster>".encode(), "", "")
+
+    def append_many(archive: SubmissionArchive, prefix: str) -> None:
+        for number in range(50):
+            payload = f"<Elster>{prefix}{number}</Elster>".encode()
+            archive.append(f"{prefix}-{number}", payload, "", "")
+
+    threads = [
+        threading.Thread(target=append_many, args=(archive, prefix))
+        for archive, prefix in ((first, "a"), (second, "b"))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = _archive(directory, max_segment_bytes=512)
+    tickets = [f"ticket-{n}" for n in range(40)] + [f"{p}-{n}" for p in "ab" for n in range(50)]
+    for archive in (first, second, reader):
+        assert len(archive) == 140
+        for ticket in tickets:
+            submission = archive.get(ticket)
+            assert submission is not None and submission.transfer_ticket == ticket
+    assert reader.segment_count > 1
+    for archive in (first, second, reader):
+        archive.close()
+
+
+def test_archive_returns_latest_entry_for_repeated_ticket(tmp_path: Path) -> None:
+    archive = _archive(tmp_path / "archive")
+    archive.append("ticket", b"<first />", "", "")
+    archive.append("ticket", b"<second />", "", "")
+
+    submission = archive.get("ticket")
+    archive.close()
+
+    assert submission is not None
+    assert submission.payload == b"<second />"
+
+
+class _FakeEricClient:
+    def send_xml_with_certificate(self, **kwargs):
+        _ = kwargs
+        return EricSubmitResult(
+            result_code=0,
+            transfer_ticket="et-archived",
+            eric_response_xml="<EricAntwort />",
+            server_response_xml="<ServerAntwort />",
+        )
+
+
+def test_message_send_service_archives_accepted_filings(tmp_path: Path, monkeypatch) -> None:
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+
+    archive = _archive(tmp_path / "archive")
+    service = MessageSendService(eric_client_factory=_FakeEricClient, archive=archive)
+    result = service.send(
+        MessageSendRequest(
+            xml_path=xml_path,
+            certificate_path=cert_path,
+            pin_env_var="ELSTER_CERT_PIN",
+            data_type_version="TH11",
+            transfer_mode="test",
+            validate_before_send=True,
+        )
+    )
+
+    assert "archive" in result.timings
+    assert isinstance(result.server_response, ArchivedXml)
+    assert result.eric_response_xml == "<EricAntwort />"
+    assert result.server_response_xml == "<ServerAntwort />"
+    submission = archive.get("et-archived")
+    archive.close()
+    assert submission is not None
+    assert submission.payload == xml_path.read_bytes()
+
+
+def test_transfer_status_reads_ticket_from_archive(tmp_path: Path) -> None:
+    directory = tmp_path / "archive"
+    archive = _archive(directory)
+    archive.append("et-123", b"<Elster />", "<Eric />", "<ServerAntwort />", result_code=0)
+    archive.close()
+
+    runner = CliRunner()
+    found = runner.invoke(cli, ["--archive", str(directory), "transfer", "status", "et-123"])
+    missing = runner.invoke(cli, ["--archive", str(directory), "transfer", "status", "et-404"])
+
+    assert found.exit_code == 0
+    assert "Transfer ticket: et-123" in found.output
+    assert "<ServerAntwort />" in found.output
+    assert missing.exit_code == 1
+    assert "not found in archive" in missing.output
@@ -0,0 +1,105 @@
+"""Tests for response dictionaries and dictionary-compressed archive records."""
+
+from __future__ import annotations
+
+import tracemalloc
+import zlib
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.archive.dictionary import train_dictionary
+from elsterctl.infrastructure.archive.store import SubmissionArchive
+
+_RESPONSE = (
+    '<Elster xmlns="http://www.elster.de/elsterxml/schema/v11"><TransferHeader version="11">'
+    "<TransferTicket>{ticket}</TransferTicket><RC><Rueckgabe><Code>0</Code>"
+    "<Text>Daten wurden erfolgreich angenommen.</Text></Rueckgabe></RC></TransferHeader>"
+    "</Elster>"
+)
+
+
+def _response(number: int) -> bytes:
+    return _RESPONSE.format(ticket=f"et{number:012d}").encode("utf-8")
+
+
+def test_train_dictionary_keeps_shared_fragments() -> None:
+    dictionary = train_dictionary(_response(number) for number in range(20))
+
+    assert b"Daten wurden erfolgreich angenommen." in dictionary.data
+    assert b"et000000000001" not in dictionary.data
+
+
+def test_dictionary_round_trip_beats_plain_compression() -> None:
+    dictionary = train_dictionary(_response(number) for number in range(20))
+    sample = _response(99)
+
+    compressed = dictionary.compress(sample)
+
+    assert dictionary.decompress(compressed) == sample
+    assert len(compressed) < len(zlib.compress(sample, 6))
+
+
+def test_train_dictionary_requires_samples() -> None:
+    with pytest.raises(ValueError, match="without samples"):
+        train_dictionary([])
+
+
+def test_archive_reads_records_written_with_older_dictionaries(tmp_path: Path) -> None:
+    directory = tmp_path / "archive"
+    archive = SubmissionArchive(directory)
+    archive.append("plain", b"<Elster />", "", _response(1).decode())
+    archive.install_dictionary(train_dictionary(_response(number) for number in range(10)))
+    archive.append("first", b"<Elster />", "", _response(2).decode())
+    archive.install_dictionary(
+        train_dictionary([_response(number) + b"<Extra>text</Extra>" for number in range(10)])
+    )
+    archive.append("second", b"<Elster />", "", _response(3).decode())
+    archive.close()
+
+    reopened = SubmissionArchive(directory)
+    assert reopened.dictionary is not None
+    for ticket, number in (("plain", 1), ("first", 2), ("second", 3)):
+        submission = reopened.get(ticket)
+        assert submission is not None
+        assert submission.server_response_xml == _response(number).decode()
+    reopened.close()
+
+
+def test_response_samples_skip_payloads(tmp_path: Path) -> None:
+    archive = SubmissionArchive(tmp_path / "archive", max_segment_bytes=4096)
+    payload = b"<Elster>" + b"A" * (16 * 1024 * 1024) + b"</Elster>"
+    archive.append("plain", payload, "<Eric/>", _response(1).decode())
+    archive.install_dictionary(train_dictionary(_response(number) for number in range(10)))
+    for number in range(2, 5):
+        archive.append(f"et-{number}", payload, "", _response(number).decode())
+
+    tracemalloc.start()
+    samples = archive.response_samples(10)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    archive.close()
+
+    assert sorted(samples) == sorted(
+        [("<Eric/>", _response(1).decode())]
+        + [("", _response(number).decode()) for number in range(2, 5)]
+    )
+    assert peak < len(payload) // 8
+
+
+def test_train_dictionary_command_installs_dictionary(tmp_path: Path) -> None:
+    directory = tmp_path / "archive"
+    archive = SubmissionArchive(directory)
+    for number in range(10):
+        archive.append(f"et-{number}", b"<Elster />", "", _response(number).decode())
+    archive.close()
+
+    result = CliRunner().invoke(cli, ["--archive", str(directory), "transfer", "train-dictionary"])
+
+    assert result.exit_code == 0
+    assert "Installed dictionary" in result.output
+    reopened = SubmissionArchive(directory)
+    assert reopened.dictionary is not None
+    reopened.close()
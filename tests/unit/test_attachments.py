@@ -0,0 +1,82 @@
+"""Tests for streaming attachment embedding."""
+
+from __future__ import annotations
+
+import base64
+from pathlib import Path
+
+import pytest
+
+from elsterctl.application.attachments import (
+    AttachmentError,
+    AttachmentLimits,
+    base64_length,
+    embed_attachments,
+    inspect_attachments,
+)
+
+
+_XML = b"<Elster><Nutzdaten><Nachricht><Betreff>x</Betreff></Nachricht></Nutzdaten></Elster>"
+
+
+def _write_pdf(path: Path, size: int) -> Path:
+    body = bytes(index % 251 for index in range(size - 5))
+    path.write_bytes(b"%PDF-" + body)
+    return path
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_embed_attachments_streams_base64_before_anchor(tmp_path: Path, use_mmap: bool) -> None:
+    pdf_path = _write_pdf(tmp_path / "beleg.pdf", 10_000)
+    attachments = inspect_attachments([pdf_path])
+
+    payload = embed_attachments(_XML, attachments, chunk_size=3 * 7, use_mmap=use_mmap)
+
+    assert payload[-1] == 0
+    text = bytes(payload[:-1])
+    encoded = base64.b64encode(pdf_path.read_bytes())
+    assert text.startswith(b"<Elster><Nutzdaten><Nachricht><Betreff>x</Betreff><Anhaenge>")
+    assert b"<Dateiname>beleg.pdf</Dateiname>" in text
+    assert b"<Dateiinhalt>" + encoded + b"</Dateiinhalt>" in text
+    assert text.endswith(b"</Anhaenge></Nachricht></Nutzdaten></Elster>")
+
+
+def test_embed_attachments_allocates_exact_payload_size(tmp_path: Path) -> None:
+    attachments = inspect_attachments(
+        [_write_pdf(tmp_path / "a.pdf", 6), _write_pdf(tmp_path / "b.pdf", 302)]
+    )
+
+    payload = embed_attachments(_XML, attachments)
+
+    assert payload.count(b"<Anhang>") == 2
+    assert base64_length(302) == 404
+    assert payload.index(0) == len(payload) - 1
+
+
+def test_embed_attachments_requires_anchor(tmp_path: Path) -> None:
+    attachments = inspect_attachments([_write_pdf(tmp_path / "a.pdf", 16)])
+
+    with pytest.raises(AttachmentError, match="not found"):
+        embed_attachments(b"<Elster />", attachments)
+
+
+def test_inspect_attachments_enforces_file_limit(tmp_path: Path) -> None:
+    pdf_path = _write_pdf(tmp_path / "big.pdf", 2048)
+
+    with pytest.raises(AttachmentError, match="exceeds size limit"):
+        inspect_attachments([pdf_path], AttachmentLimits(max_file_bytes=1024))
+
+
+def test_inspect_attachments_enforces_total_limit(tmp_path: Path) -> None:
+    paths = [_write_pdf(tmp_path / f"{index}.pdf", 600) for index in range(2)]
+
+    with pytest.raises(AttachmentError, match="total size limit"):
+        inspect_attachments(paths, AttachmentLimits(max_total_bytes=1000))
+
+
+def test_inspect_attachments_rejects_non_pdf(tmp_path: Path) -> None:
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"plain text")
+
+    with pytest.raises(AttachmentError, match="not a PDF"):
+        inspect_attachments([path])
@@ -0,0 +1,114 @@
+"""Tests for config profiles and their cached compiled form."""
+
+from __future__ import annotations
+
+import json
+import os
+import tomllib
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.cli.config import build_default_map
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.config.profiles import ConfigError, ProfileStore
+
+
+def test_profile_store_round_trips_typed_settings(tmp_path: Path) -> None:
+    store = ProfileStore(tmp_path / "config.toml")
+    store.set("workers", "4")
+    store.set("rate", "2.5", profile="bulk")
+    store.set("force_test_mode", "yes")
+    store.use("bulk")
+
+    document = tomllib.loads((tmp_path / "config.toml").read_text(encoding="utf-8"))
+    assert document["active_profile"] == "bulk"
+    assert document["profiles"]["default"] == {"force_test_mode": True, "workers": 4}
+
+    reloaded = ProfileStore(tmp_path / "config.toml")
+    assert reloaded.get("rate") == 2.5
+    assert reloaded.get("workers", profile="default") == 4
+
+
+def test_profile_store_rejects_unknown_and_invalid_settings(tmp_path: Path) -> None:
+    store = ProfileStore(tmp_path / "config.toml")
+
+    with pytest.raises(ConfigError, match="Unknown setting"):
+        store.set("colour", "blue")
+    with pytest.raises(ConfigError, match="Invalid value for workers"):
+        store.set("workers", "0")
+    with pytest.raises(ConfigError, match="Invalid value for transfer_mode"):
+        store.set("transfer_mode", "staging")
+
+
+def test_profile_store_uses_cache_until_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "config.toml"
+    path.write_text('[profiles.default]\ncertificate = "a.pfx"\n', encoding="utf-8")
+    store = ProfileStore(path)
+    assert store.get("certificate") == "a.pfx"
+
+    cached = json.loads(store.cache_path.read_text(encoding="utf-8"))
+    cached["profiles"]["default"]["certificate"] = "from-cache.pfx"
+    store.cache_path.write_text(json.dumps(cached), encoding="utf-8")
+    assert store.get("certificate") == "from-cache.pfx"
+
+    path.write_text('[profiles.default]\ncertificate = "b.pfx"\n', encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.get("certificate") == "b.pfx"
+
+
+def test_profile_store_reports_invalid_toml(tmp_path: Path) -> None:
+    path = tmp_path / "config.toml"
+    path.write_text("[profiles.default\n", encoding="utf-8")
+
+    with pytest.raises(ConfigError, match="Invalid config file"):
+        ProfileStore(path).load()
+
+
+def test_profile_defaults_yield_to_environment_and_options() -> None:
+    default_map = build_default_map({"transfer_mode": "test", "hersteller_id": "74931"})
+    runner = CliRunner()
+
+    from_profile = runner.invoke(cli, ["show-config"], default_map=default_map)
+    from_env = runner.invoke(
+        cli,
+        ["show-config"],
+        default_map=default_map,
+        env={"ELSTER_HERSTELLER_ID": "11111"},
+    )
+    from_option = runner.invoke(
+        cli, ["--transfer-mode", "prod", "show-config"], default_map=default_map
+    )
+
+    assert "transfer_mode=test" in from_profile.output
+    assert "hersteller_id=74931" in from_profile.output
+    assert "hersteller_id=11111" in from_env.output
+    assert "transfer_mode=prod" in from_option.output
+
+
+def test_build_default_map_targets_batch_throughput_options() -> None:
+    default_map = build_default_map({"workers": 3, "rate": 5.0, "data_type_version": "TH12"})
+
+    assert default_map["message"]["send-batch"] == {
+        "workers": 3,
+        "rate": 5.0,
+        "data_type_version": "TH12",
+    }
+    assert default_map["message"]["send"] == {"data_type_version": "TH12"}
+
+
+def test_config_commands_use_config_file_from_environment(tmp_path: Path) -> None:
+    runner = CliRunner(env={"ELSTERCTL_CONFIG": str(tmp_path / "config.toml")})
+
+    assert runner.invoke(cli, ["config", "set", "queue_size", "8"]).exit_code == 0
+    got = runner.invoke(cli, ["config", "get", "queue_size"])
+    shown = runner.invoke(cli, ["config", "show"])
+    invalid = runner.invoke(cli, ["config", "set", "queue_size", "many"])
+
+    assert got.output.strip() == "8"
+    assert "profile=default" in shown.output
+    assert "queue_size=8" in shown.output
+    assert invalid.exit_code == 1
+    assert "Invalid value for queue_size" in invalid.output
@@ -0,0 +1,179 @@
+"""Tests for the synthetic payload corpus generator."""
+
+from __future__ import annotations
+
+import base64
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.application.corpus import (
+    CorpusError,
+    CorpusSpec,
+    SizeDistribution,
+    generate_corpus,
+    parse_size,
+)
+from elsterctl.cli.root import cli
+
+_NS = {"e": "http://www.elster.de/elsterxml/schema/v11"}
+
+
+def test_corpus_is_reproducible_well_formed_and_exactly_sized() -> None:
+    spec = CorpusSpec(count=8, sizes=SizeDistribution("fixed", 3000), seed=7)
+
+    filings = list(generate_corpus(spec))
+
+    assert filings == list(generate_corpus(spec))
+    data_types = [filing.data_type for filing in filings[:4]]
+    assert data_types == ["sonstige_nachricht", "UStVA", "USt", "ESt"]
+    assert {len(filing.payload) for filing in filings} == {3000}
+    assert all(filing.payload.count(b"\n") == 1 for filing in filings)
+    tickets = set()
+    for filing in filings:
+        root = ET.fromstring(filing.payload)
+        assert root.findtext("e:TransferHeader/e:Testmerker", namespaces=_NS) == "700000004"
+        assert root.findtext("e:TransferHeader/e:DatenArt", namespaces=_NS) == filing.data_type
+        tickets.add(root.findtext(".//e:NutzdatenTicket", namespaces=_NS))
+    assert len(tickets) == 8
+
+
+def test_size_distributions_stay_within_bounds() -> None:
+    uniform = list(generate_corpus(CorpusSpec(count=200, sizes=SizeDistribution("uniform", 4000))))
+    lognormal = list(
+        generate_corpus(
+            CorpusSpec(count=200, sizes=SizeDistribution("lognormal", 4000, 2000, 20000))
+        )
+    )
+
+    assert all(2000 <= len(filing.payload) <= 6000 for filing in uniform)
+    sizes = sorted(len(filing.payload) for filing in lognormal)
+    assert sizes[0] >= 2000 and sizes[-1] <= 20000
+    assert 3000 < sizes[len(sizes) // 2] < 5500
+    assert len(set(sizes)) > 50
+    assert parse_size("4k") == 4096 and parse_size("2MiB") == 2 * 1024 * 1024
+    with pytest.raises(CorpusError):
+        parse_size("4 pages")
+    with pytest.raises(CorpusError):
+        SizeDistribution("uniform", 4000, 5000, 3000)
+
+
+def test_attachments_are_embedded_pdf_documents() -> None:
+    spec = CorpusSpec(
+        count=20,
+        data_types=("sonstige_nachricht",),
+        attachment_ratio=0.5,
+        attachment_size=1000,
+        seed=3,
+    )
+
+    filings = list(generate_corpus(spec))
+
+    with_attachment = [filing for filing in filings if filing.attachments]
+    assert 0 < len(with_attachment) < 20
+    root = ET.fromstring(with_attachment[0].payload)
+    content = root.findtext(".//e:Nachricht/e:Anhaenge/e:Anhang/e:Dateiinhalt", namespaces=_NS)
+    document = base64.b64decode(content)
+    assert len(document) == 1000 and document.startswith(b"%PDF-")
+    with pytest.raises(CorpusError):
+        CorpusSpec(count=1, data_types=("UStVA",), attachment_ratio=0.5)
+
+
+def test_generated_corpus_feeds_send_batch(tmp_path: Path) -> None:
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "--output",
+            "json",
+            "message",
+            "generate-corpus",
+            "--count",
+            "6",
+            "--output-dir",
+            str(tmp_path / "corpus"),
+            "--files-per-dir",
+            "4",
+            "--attachment-ratio",
+            "1",
+            "--attachment-size",
+            "2k",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.output)
+    assert summary["status"] == "ok" and summary["filings"] == 6
+    manifest = tmp_path / "corpus" / "manifest.txt"
+    assert manifest.read_text().splitlines()[4] == "0001/0000004-sonstige_nachricht.xml"
+
+    recording = tmp_path / "run.jsonl"
+    recording.write_text(json.dumps({"result_code": 0}) + "\n", encoding="utf-8")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    result = runner.invoke(
+        cli,
+        [
+            "--output",
+            "json",
+            "--test-transfer-mode",
+            "--replay",
+            str(recording),
+            "--replay-speedup",
+            "1000",
+            "--ledger",
+            str(tmp_path / "ledger.sqlite3"),
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            "--manifest",
+            str(manifest),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert [record["status"] for record in report["results"]] == ["ok"] * 6
+
+
+def test_generate_corpus_streams_one_document_per_line() -> None:
+    result = CliRunner().invoke(
+        cli,
+        [
+            "message",
+            "generate-corpus",
+            "--count",
+            "5",
+            "--stdout",
+            "--data-type",
+            "UStVA",
+            "--size-distribution",
+            "fixed",
+            "--size",
+            "2k",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    lines = result.stdout.splitlines()
+    assert len(lines) == 5
+    assert all(len(line) == 2047 and "<DatenArt>UStVA</DatenArt>" in line for line in lines)
+    assert "Generated 5 filings" in result.stderr
+
+
+def test_generate_corpus_reports_unwritable_output_dir(tmp_path: Path) -> None:
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+
+    result = CliRunner().invoke(
+        cli,
+        ["message", "generate-corpus", "--count", "2", "--output-dir", str(blocker / "corpus")],
+    )
+
+    assert result.exit_code == 1
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+    assert "Error:" in result.output
@@ -0,0 +1,99 @@
+"""Tests for response documents held by reference."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.domain.filings import ArchivedXml, FileXml, InlineXml, XmlRef, XmlSpool
+from elsterctl.infrastructure.archive.store import SubmissionArchive
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+
+
+def test_references_have_no_instance_dict() -> None:
+    references = (InlineXml("<Ok/>"), FileXml("/spool.xml", 0, 5), ArchivedXml(None, "t", "eric"))
+    for reference in references:
+        assert not hasattr(reference, "__dict__")
+        with pytest.raises(AttributeError):
+            reference.unexpected = 1
+    with pytest.raises(TypeError):
+        XmlRef()
+
+
+def test_spool_returns_file_references_and_inlines_small_documents(tmp_path: Path) -> None:
+    large = "<Antwort>" + "ä" * 400 + "</Antwort>"
+
+    with XmlSpool(tmp_path / "spool.xml") as spool:
+        first = spool.add(large)
+        second = spool.add(large.replace("ä", "ö"))
+        small = spool.add("<Ok/>")
+
+        assert spool.add("") is None
+        assert isinstance(first, FileXml)
+        assert isinstance(small, InlineXml)
+        assert second.offset == first.length == len(large.encode("utf-8"))
+        assert first.read() == large
+        assert second.read() == large.replace("ä", "ö")
+        assert small.read() == "<Ok/>"
+        assert spool.spooled_bytes == first.length + second.length
+
+
+def test_temporary_spool_is_removed_on_close() -> None:
+    spool = XmlSpool()
+    path = Path(spool.path)
+    reference = spool.add("<Antwort>" + "x" * 1000 + "</Antwort>")
+    assert path.exists()
+
+    spool.close()
+
+    assert not path.exists()
+    with pytest.raises(OSError):
+        reference.read()
+
+
+def test_archived_reference_reads_responses_from_the_archive(tmp_path: Path) -> None:
+    archive = SubmissionArchive(tmp_path / "archive")
+    archive.append("et-1", b"<Elster/>" * 1000, "<EricAntwort/>", "<ServerAntwort/>")
+
+    assert ArchivedXml(archive, "et-1", "eric").read() == "<EricAntwort/>"
+    assert ArchivedXml(archive, "et-1", "server").read() == "<ServerAntwort/>"
+    assert len(ArchivedXml(archive, "et-1", "server")) == len("<ServerAntwort/>")
+    with pytest.raises(ValueError, match="not in archive"):
+        ArchivedXml(archive, "et-2", "eric").read()
+    with pytest.raises(ValueError, match="Unknown response kind"):
+        ArchivedXml(archive, "et-1", "payload")
+    archive.close()
+
+
+class _LargeResponseEricClient:
+    def send_xml_with_certificate(self, **kwargs):
+        server_xml = "<Antwort>" + "x" * 1000 + "</Antwort>"
+        return EricSubmitResult(0, "ticket", "<EricAntwort/>", server_xml)
+
+
+def test_send_service_spools_responses_as_soon_as_eric_returns(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    request = MessageSendRequest(
+        xml_path=xml_path,
+        certificate_path=cert_path,
+        pin_env_var="ELSTER_CERT_PIN",
+        data_type_version="TH11",
+        transfer_mode="test",
+        validate_before_send=True,
+    )
+
+    with XmlSpool(tmp_path / "spool.xml") as spool:
+        service = MessageSendService(
+            eric_client_factory=_LargeResponseEricClient, response_spool=spool
+        )
+        result = service.send(request)
+
+        assert isinstance(result.eric_response, InlineXml)
+        assert isinstance(result.server_response, FileXml)
+        assert result.server_response_xml.startswith("<Antwort>xxx")
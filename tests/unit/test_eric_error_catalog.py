@@ -0,0 +1,92 @@
+"""Tests for ERiC error classification and text caching."""
+
+from pathlib import Path
+
+import pytest
+
+from elsterctl.infrastructure.eric.client import EricClient
+from elsterctl.infrastructure.eric.error_catalog import (
+    EricErrorCatalog,
+    ErrorClass,
+    classify_result_code,
+)
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.infrastructure.eric.replay import ReplayLibrary, ReplayRecord
+
+
+def test_classify_result_code_groups_codes() -> None:
+    assert classify_result_code(610101260) is ErrorClass.RETRYABLE
+    assert classify_result_code(610001002) is ErrorClass.VALIDATION
+    assert classify_result_code(610301200) is ErrorClass.VALIDATION
+    assert classify_result_code(610201106) is ErrorClass.CERTIFICATE
+    assert classify_result_code(610001001) is ErrorClass.FATAL
+
+
+def test_eric_processing_error_exposes_error_class() -> None:
+    assert EricProcessingError("failed", 610201106).error_class is ErrorClass.CERTIFICATE
+
+
+def test_catalog_resolves_each_code_once() -> None:
+    calls: list[int] = []
+
+    def resolve(result_code: int) -> str | None:
+        calls.append(result_code)
+        return None if result_code == 2 else f"text {result_code}"
+
+    catalog = EricErrorCatalog()
+    for _ in range(500):
+        assert catalog.describe(1, resolve).text == "text 1"
+        assert catalog.describe(2, resolve).text is None
+
+    assert calls == [1, 2]
+    assert catalog.misses == 2
+    assert catalog.hits == 998
+
+
+def test_catalog_evicts_least_recently_used_codes() -> None:
+    catalog = EricErrorCatalog(max_entries=2)
+    resolve = str
+
+    catalog.describe(1, resolve)
+    catalog.describe(2, resolve)
+    catalog.describe(1, resolve)
+    catalog.describe(3, resolve)
+
+    assert len(catalog) == 2
+    misses = catalog.misses
+    catalog.describe(1, resolve)
+    assert catalog.misses == misses
+    catalog.describe(2, resolve)
+    assert catalog.misses == misses + 1
+
+
+def test_catalog_resize_evicts_oldest_entries() -> None:
+    catalog = EricErrorCatalog(max_entries=4)
+    for code in range(4):
+        catalog.describe(code, str)
+
+    catalog.resize(2)
+
+    assert len(catalog) == 2
+    misses = catalog.misses
+    catalog.describe(3, str)
+    assert catalog.misses == misses
+
+
+def test_client_uses_an_explicitly_passed_empty_catalog() -> None:
+    catalog = EricErrorCatalog()
+    library = ReplayLibrary(
+        [ReplayRecord(610101292, "", "", 0.0, error_text="Text")], sleep=lambda seconds: None
+    )
+    client = EricClient(catalog, library=library, plugin_path=b"replay")
+
+    with pytest.raises(EricProcessingError, match="Text"):
+        client.send_xml_with_certificate(
+            xml_payload="<Elster />",
+            data_type_version="TH11",
+            certificate_path=Path("cert.pfx"),
+            certificate_pin="1234",
+            validate_before_send=True,
+        )
+
+    assert len(catalog) == 1
@@ -1,9 +1,41 @@
 """Tests for ERiC error types."""
 
-from elsterctl.infrastructure.eric.errors import EricProcessingError
+import pickle
+from pathlib import Path
+
+import pytest
+
+from elsterctl.infrastructure.eric.errors import EricProcessingError, EricShutdownError
+from elsterctl.infrastructure.eric.replay import ReplayLibrary, ReplayRecord, replay_client_factory
 
 
 def test_eric_processing_error_str_includes_result_code() -> None:
     error = EricProcessingError("ERiC processing failed: Detailed text", 610001226)
 
     assert str(error) == "ERiC processing failed: Detailed text (result_code=610001226)"
+
+
+def test_eric_processing_error_keeps_error_text_when_pickled() -> None:
+    error = EricProcessingError(
+        "ERiC processing failed: Detailed text", 610001226, error_text="Detailed text"
+    )
+
+    assert pickle.loads(pickle.dumps(error)).error_text == "Detailed text"
+
+
+def test_failed_shutdown_after_processing_raises_shutdown_error() -> None:
+    library = ReplayLibrary([ReplayRecord(0, "", "", 0.0)], sleep=lambda seconds: None)
+    client = replay_client_factory(library)()
+    client.shutdown = lambda *args: 610001001
+
+    with pytest.raises(EricShutdownError) as excinfo:
+        client.send_xml_with_certificate(
+            xml_payload="<Elster />",
+            data_type_version="TH11",
+            certificate_path=Path("cert.pfx"),
+            certificate_pin="1234",
+            validate_before_send=True,
+        )
+
+    # Worker processes hand the error back pickled; the type must survive.
+    assert type(pickle.loads(pickle.dumps(excinfo.value))) is EricShutdownError
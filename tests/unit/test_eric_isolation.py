@@ -0,0 +1,145 @@
+"""Tests for crash-isolated native ERiC calls."""
+
+from __future__ import annotations
+
+import ctypes
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from elsterctl.application.message_batch import MessageBatchService
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.infrastructure.eric import preload
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricLibraryLoadError
+from elsterctl.infrastructure.eric.isolation import EricCrashError, IsolatedEricExecutor
+from elsterctl.infrastructure.transport.local import IsolatedTransport
+
+
+class _PayloadClient:
+    """Segfaults on payloads containing CRASH, succeeds otherwise."""
+
+    def send_xml_with_certificate(self, **request) -> EricSubmitResult:
+        if b"CRASH" in bytes(request["xml_payload"]):
+            ctypes.string_at(0)
+        return EricSubmitResult(0, "et-1", "", "")
+
+
+def _payload_client() -> _PayloadClient:
+    return _PayloadClient()
+
+
+class _GatedClient:
+    """Succeeds once the file named by the payload exists."""
+
+    def send_xml_with_certificate(self, **request) -> EricSubmitResult:
+        gate = Path(bytes(request["xml_payload"]).decode())
+        while not gate.exists():
+            time.sleep(0.01)
+        return EricSubmitResult(0, "et-1", "", "")
+
+
+def _gated_client() -> _GatedClient:
+    return _GatedClient()
+
+
+def _request(payload: bytes) -> dict:
+    return {
+        "xml_payload": payload,
+        "data_type_version": "TH11",
+        "certificate_path": Path("cert.pfx"),
+        "certificate_pin": "1234",
+        "validate_before_send": True,
+    }
+
+
+def test_isolated_transport_reports_crash_and_continues() -> None:
+    transport = IsolatedTransport(_payload_client)
+    try:
+        first = transport.send_xml_with_certificate(**_request(b"<Elster />"))
+        with pytest.raises(EricCrashError) as excinfo:
+            transport.send_xml_with_certificate(**_request(b"<Elster>CRASH</Elster>"))
+        second = transport.send_xml_with_certificate(**_request(b"<Elster />"))
+        description = transport.describe()
+    finally:
+        transport.close()
+
+    assert first.transfer_ticket == second.transfer_ticket == "et-1"
+    assert excinfo.value.signal_name == "SIGSEGV"
+    assert description["crashes"] == 1
+    # Three sends plus the spare forked during the last one.
+    assert description["children_started"] == 4
+    assert "SIGSEGV" in description["last_crash"]
+
+
+def test_next_child_is_forked_while_the_current_one_sends(tmp_path: Path) -> None:
+    executor = IsolatedEricExecutor(_gated_client)
+    gate = tmp_path / "gate"
+    results = []
+    sender = threading.Thread(
+        target=lambda: results.append(
+            executor.send_xml_with_certificate(**_request(str(gate).encode()))
+        )
+    )
+    try:
+        sender.start()
+        deadline = time.monotonic() + 30
+        while executor.live_workers() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        live_during_send = executor.live_workers()
+        gate.touch()
+        sender.join(30)
+    finally:
+        gate.touch()
+        executor.close()
+
+    assert live_during_send == 2
+    assert results[0].transfer_ticket == "et-1"
+    assert executor.status().children_started == 2
+
+
+def test_batch_continues_after_crashed_filing(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    requests = []
+    for name, body in (("a", "ok"), ("b", "CRASH"), ("c", "ok")):
+        path = tmp_path / f"{name}.xml"
+        path.write_text(f"<Elster><Testmerker>700000004</Testmerker>{body}</Elster>")
+        requests.append(
+            MessageSendRequest(
+                xml_path=path,
+                certificate_path=cert_path,
+                pin_env_var="ELSTER_CERT_PIN",
+                data_type_version="TH11",
+                transfer_mode="test",
+                validate_before_send=True,
+            )
+        )
+
+    transport = IsolatedTransport(_payload_client)
+    outcomes = []
+    try:
+        report = MessageBatchService(
+            MessageSendService(eric_client_factory=transport.client)
+        ).run(requests, outcomes.append)
+    finally:
+        transport.close()
+
+    assert (report.succeeded, report.failed) == (2, 1)
+    crashed = next(outcome for outcome in outcomes if outcome.error is not None)
+    assert crashed.request.xml_path.name == "b.xml"
+    assert crashed.failed_stage == "eric"
+    assert isinstance(crashed.error, EricCrashError)
+
+
+def test_preloaded_library_is_none_when_eric_cannot_be_loaded(monkeypatch) -> None:
+    def fail():
+        raise EricLibraryLoadError("missing")
+
+    monkeypatch.setattr(preload, "_library", None)
+    monkeypatch.setattr(preload, "load_eric_library", fail)
+
+    assert preload.preloaded_library() is None
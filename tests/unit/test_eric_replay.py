@@ -0,0 +1,228 @@
+"""Tests for replaying recorded ERiC results."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.error_catalog import DEFAULT_ERROR_CATALOG
+from elsterctl.infrastructure.eric.errors import EricLibraryLoadError, EricProcessingError
+from elsterctl.infrastructure.eric.replay import (
+    ReplayLibrary,
+    ReplayRecord,
+    load_recording,
+    replay_client_factory,
+)
+
+_SERVER_XML = (
+    "<Elster><TransferHeader><TransferTicket>{ticket}</TransferTicket></TransferHeader></Elster>"
+)
+
+
+def _write_recording(path: Path, records: list[dict]) -> Path:
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf-8")
+    return path
+
+
+def test_load_recording_reads_results_and_side_files(tmp_path: Path) -> None:
+    (tmp_path / "responses").mkdir()
+    (tmp_path / "responses" / "1.server.xml").write_text(_SERVER_XML.format(ticket="et-2"))
+    recording = _write_recording(
+        tmp_path / "run.jsonl",
+        [
+            {"result_code": 0, "server_response_xml": "<a />", "timings": {"process": 0.4}},
+            {"result_code": 0, "server_response_path": "responses/1.server.xml"},
+            {"result_code": 0, "deduplicated": True},
+            {"operation": "message.send-batch", "succeeded": 2},
+            {
+                "result_code": 610101260,
+                "error": "ERiC processing failed: Keine Antwort (result_code=610101260)",
+                "error_text": "Keine Antwort",
+                "timings": {"process": 0.8},
+            },
+        ],
+    )
+
+    records = load_recording(recording)
+
+    assert [record.result_code for record in records] == [0, 0, 610101260]
+    assert records[1].server_response_xml == _SERVER_XML.format(ticket="et-2")
+    assert records[1].latency_seconds == pytest.approx(0.6)
+    assert records[2].error_text == "Keine Antwort"
+
+
+def test_load_recording_rejects_recording_without_results(tmp_path: Path) -> None:
+    recording = _write_recording(tmp_path / "run.jsonl", [{"operation": "summary"}])
+
+    with pytest.raises(EricLibraryLoadError, match="no results"):
+        load_recording(recording)
+
+
+def test_replayed_client_serves_records_round_robin_with_speedup() -> None:
+    sleeps: list[float] = []
+    library = ReplayLibrary(
+        [
+            ReplayRecord(0, "", _SERVER_XML.format(ticket="et-1"), 2.0),
+            ReplayRecord(610101260, "", "", 1.0, error_text="Keine Antwort"),
+        ],
+        speedup=4.0,
+        sleep=sleeps.append,
+    )
+    client = replay_client_factory(library)()
+
+    def send():
+        return client.send_xml_with_certificate(
+            xml_payload="<Elster />",
+            data_type_version="TH11",
+            certificate_path=Path("cert.pfx"),
+            certificate_pin="1234",
+            validate_before_send=True,
+        )
+
+    first = send()
+    with pytest.raises(EricProcessingError, match="Keine Antwort") as excinfo:
+        send()
+    third = send()
+
+    assert first.transfer_ticket == "et-1"
+    assert excinfo.value.result_code == 610101260
+    assert third.transfer_ticket == "et-1"
+    assert sleeps == [0.5, 0.25, 0.5]
+    assert library.calls == 3
+
+
+def test_replayed_error_texts_stay_out_of_the_shared_catalog() -> None:
+    library = ReplayLibrary(
+        [ReplayRecord(610101292, "", "", 0.0, error_text="Aufgezeichneter Text")],
+        sleep=lambda seconds: None,
+    )
+    client = replay_client_factory(library)()
+
+    with pytest.raises(EricProcessingError, match="Aufgezeichneter Text"):
+        client.send_xml_with_certificate(
+            xml_payload="<Elster />",
+            data_type_version="TH11",
+            certificate_path=Path("cert.pfx"),
+            certificate_pin="1234",
+            validate_before_send=True,
+        )
+
+    assert DEFAULT_ERROR_CATALOG.describe(610101292, lambda code: None).text is None
+
+
+def test_send_batch_runs_end_to_end_against_replay(tmp_path: Path) -> None:
+    recording = _write_recording(
+        tmp_path / "run.jsonl",
+        [{"result_code": 0, "server_response_xml": _SERVER_XML.format(ticket="et-replay")}],
+    )
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_paths = []
+    for number in range(3):
+        xml_path = tmp_path / f"message-{number}.xml"
+        xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+        xml_paths.append(str(xml_path))
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--test-transfer-mode",
+            "--replay",
+            str(recording),
+            "--replay-speedup",
+            "1000",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            *xml_paths,
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Replay mode" in result.output
+    assert result.output.count("transfer ticket: et-replay") == 3
+    assert "Batch completed: 3 succeeded, 0 failed" in result.output
+
+
+def test_replay_leaves_the_real_ledger_and_archive_untouched(tmp_path: Path) -> None:
+    recording = _write_recording(
+        tmp_path / "run.jsonl",
+        [{"result_code": 0, "server_response_xml": _SERVER_XML.format(ticket="et-replay")}],
+    )
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--test-transfer-mode",
+            "--replay",
+            str(recording),
+            "--replay-speedup",
+            "1000",
+            "--ledger",
+            str(tmp_path / "ledger.sqlite3"),
+            "--archive",
+            str(tmp_path / "archive"),
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            str(xml_path),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Batch completed: 1 succeeded, 0 failed" in result.output
+    assert "replaced by temporary ones" in result.output
+    assert not (tmp_path / "ledger.sqlite3").exists()
+    assert not (tmp_path / "archive").exists()
+
+
+def test_replayed_failure_reproduces_the_recorded_error_exactly(tmp_path: Path) -> None:
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+    recording = _write_recording(
+        tmp_path / "source.jsonl",
+        [{"result_code": 610101210, "error_text": "Ungueltige Daten"}],
+    )
+
+    def run(recording: Path) -> dict:
+        result = CliRunner().invoke(
+            cli,
+            [
+                "--output",
+                "jsonl",
+                "--test-transfer-mode",
+                "--replay",
+                str(recording),
+                "--replay-speedup",
+                "1000",
+                "message",
+                "send-batch",
+                "--certificate",
+                str(cert_path),
+                str(xml_path),
+            ],
+            env={"ELSTER_CERT_PIN": "1234"},
+        )
+        (tmp_path / "rerun.jsonl").write_text(result.output, encoding="utf-8")
+        return json.loads(result.output.splitlines()[0])
+
+    first = run(recording)
+    second = run(tmp_path / "rerun.jsonl")
+
+    assert first["error"] == "ERiC processing failed: Ungueltige Daten (result_code=610101210)"
+    assert second["error"] == first["error"]
+    assert second["error_text"] == "Ungueltige Daten"
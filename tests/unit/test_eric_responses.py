@@ -0,0 +1,47 @@
+"""Tests for ERiC and server response parsing."""
+
+from elsterctl.infrastructure.eric.responses import parse_diagnostics, parse_transfer_ticket
+
+_ERIC_RESPONSE = """\
+<EricBearbeiteVorgang xmlns="http://www.elster.de/EricXML/1.1/EricBearbeiteVorgang">
+  <FehlerRegelpruefung>
+    <Nutzdatenticket>1</Nutzdatenticket>
+    <Feldidentifikator>Kz81</Feldidentifikator>
+    <RegelName>UStVA_Betrag</RegelName>
+    <FachlicheFehlerId>100001</FachlicheFehlerId>
+    <Text>Betrag fehlt.</Text>
+  </FehlerRegelpruefung>
+  <Hinweis>
+    <Text>Nur ein Hinweis.</Text>
+  </Hinweis>
+</EricBearbeiteVorgang>
+"""
+
+_SERVER_RESPONSE = """\
+<Elster xmlns="http://www.elster.de/elsterxml/schema/v11">
+  <TransferHeader version="11">
+    <TransferTicket>et123abc</TransferTicket>
+    <RC><Rueckgabe><Code>0</Code><Text>OK</Text></Rueckgabe></RC>
+  </TransferHeader>
+  <DatenTeil><Nutzdatenblock><NutzdatenHeader>
+    <RC><Rueckgabe><Code>571003</Code><Text>Nutzdaten abgelehnt</Text></Rueckgabe></RC>
+  </NutzdatenHeader></Nutzdatenblock></DatenTeil>
+</Elster>
+"""
+
+
+def test_parse_transfer_ticket_reads_transfer_header() -> None:
+    assert parse_transfer_ticket(_SERVER_RESPONSE) == "et123abc"
+    assert parse_transfer_ticket("") is None
+    assert parse_transfer_ticket("<not-xml") is None
+
+
+def test_parse_diagnostics_collects_errors_hints_and_server_codes() -> None:
+    diagnostics = parse_diagnostics(_ERIC_RESPONSE, _SERVER_RESPONSE)
+
+    assert [diagnostic.kind for diagnostic in diagnostics] == ["error", "hint", "server"]
+    assert diagnostics[0].field == "Kz81"
+    assert diagnostics[0].code == "100001"
+    assert diagnostics[0].rule == "UStVA_Betrag"
+    assert diagnostics[2].code == "571003"
+    assert diagnostics[2].text == "Nutzdaten abgelehnt"
@@ -0,0 +1,162 @@
+"""Tests for long-lived ERiC sessions."""
+
+from __future__ import annotations
+
+import ctypes
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.client import EricClient
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.pin.providers import SecretPin
+
+
+class _FakeFunction:
+    def __init__(self, lib: "_FakeEricLib", name: str, implementation) -> None:
+        self.argtypes = None
+        self.restype = None
+        self._lib = lib
+        self._name = name
+        self._implementation = implementation
+
+    def __call__(self, *args):
+        self._lib.calls[self._name] += 1
+        return self._implementation(*args)
+
+
+class _FakeEricLib:
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self.encryption_parameters: list[int] = []
+        self._buffers: dict[int, bytes] = {}
+
+        def get_certificate(handle_pointer, _unused, _path) -> int:
+            handle_pointer.contents.value = 7
+            return 0
+
+        def create_buffer() -> int:
+            buffer_id = len(self._buffers) + 1
+            self._buffers[buffer_id] = b"<Antwort />"
+            return buffer_id
+
+        implementations = {
+            "EricInitialisiere": lambda *args: 0,
+            "EricBearbeiteVorgang": self._process,
+            "EricBeende": lambda *args: 0,
+            "EricGetHandleToCertificate": get_certificate,
+            "EricCloseHandleToCertificate": lambda *args: 0,
+            "EricRueckgabepufferErzeugen": create_buffer,
+            "EricRueckgabepufferInhalt": lambda buffer_id: self._buffers[buffer_id],
+            "EricRueckgabepufferFreigeben": lambda buffer_id: 0,
+            "EricHoleFehlerText": lambda *args: 1,
+        }
+        for name, implementation in implementations.items():
+            setattr(self, name, _FakeFunction(self, name, implementation))
+
+
+    def _process(self, *args) -> int:
+        self.encryption_parameters.append(ctypes.addressof(args[4].contents))
+        return 0
+
+
+@pytest.fixture
+def fake_lib(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> _FakeEricLib:
+    lib_dir = tmp_path / "eric"
+    (lib_dir / "plugins2").mkdir(parents=True)
+    monkeypatch.setenv("ELSTER_ERIC_LIB", str(lib_dir / "libericapi.so"))
+    lib = _FakeEricLib()
+    monkeypatch.setattr("elsterctl.infrastructure.eric.client.load_eric_library", lambda: lib)
+    return lib
+
+
+def _send(
+    client: EricClient,
+    certificate_path: Path,
+    certificate_pin: str | SecretPin = "1234",
+) -> None:
+    client.send_xml_with_certificate(
+        xml_payload="<Elster />",
+        data_type_version="TH11",
+        certificate_path=certificate_path,
+        certificate_pin=certificate_pin,
+        validate_before_send=True,
+    )
+
+
+def test_eric_client_without_session_initializes_per_send(fake_lib: _FakeEricLib) -> None:
+    client = EricClient()
+    _send(client, Path("cert.pfx"))
+    _send(client, Path("cert.pfx"))
+
+    assert fake_lib.calls["EricInitialisiere"] == 2
+    assert fake_lib.calls["EricBeende"] == 2
+    assert fake_lib.calls["EricGetHandleToCertificate"] == 2
+
+
+def test_eric_session_keeps_runtime_and_certificates_open(fake_lib: _FakeEricLib) -> None:
+    session = EricSession()
+    for _ in range(3):
+        _send(session.client(), Path("cert.pfx"))
+
+    status = session.status()
+    assert status.active is True
+    assert status.sends == 3
+    assert status.open_certificates == (Path("cert.pfx"),)
+    assert fake_lib.calls["EricInitialisiere"] == 1
+    assert fake_lib.calls["EricGetHandleToCertificate"] == 1
+    assert fake_lib.calls["EricBeende"] == 0
+
+    session.reset()
+
+    assert session.status().active is False
+    assert session.status().resets == 1
+    assert fake_lib.calls["EricCloseHandleToCertificate"] == 1
+    assert fake_lib.calls["EricBeende"] == 1
+
+    _send(session.client(), Path("cert.pfx"))
+    session.close()
+    assert fake_lib.calls["EricInitialisiere"] == 2
+    assert fake_lib.calls["EricBeende"] == 2
+
+
+def test_eric_session_reuses_encryption_parameters_for_same_pin(
+    fake_lib: _FakeEricLib,
+) -> None:
+    session = EricSession()
+    pin = SecretPin("1234")
+    _send(session.client(), Path("cert.pfx"), pin)
+    _send(session.client(), Path("cert.pfx"), pin)
+    _send(session.client(), Path("cert.pfx"), SecretPin("5678"))
+    session.close()
+
+    first, second, third = fake_lib.encryption_parameters
+    assert first == second
+    assert third != first
+
+
+def test_session_status_command_reports_inactive_session() -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, ["session", "status"])
+
+    assert result.exit_code == 0
+    assert "active=False" in result.output
+
+
+def test_eric_client_counts_native_resources(fake_lib: _FakeEricLib) -> None:
+    session = EricSession()
+    _send(session.client(), Path("cert.pfx"))
+    _send(session.client(), Path("cert.pfx"))
+
+    counters = session.client().resource_counters()
+    assert counters.certificates_opened == 1
+    assert counters.outstanding_buffers == 0
+    assert counters.buffers_created == fake_lib.calls["EricRueckgabepufferErzeugen"]
+
+    session.close()
+    report = session.resource_report()
+    assert report.counters.certificates_closed == 1
+    assert report.leaked is False
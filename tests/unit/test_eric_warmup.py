@@ -0,0 +1,126 @@
+"""Tests for ERiC session warm-up."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.client import EricClient
+from elsterctl.infrastructure.eric.replay import (
+    REPLAY_PLUGIN_PATH,
+    ReplayLibrary,
+    ReplayRecord,
+)
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.eric.warmup import warmup_payload
+
+_SERVER_XML = "<Elster><TransferHeader><TransferTicket>et-1</TransferTicket></TransferHeader></Elster>"
+
+
+def _session(library: ReplayLibrary, **kwargs) -> EricSession:
+    return EricSession(
+        client_factory=lambda: EricClient(library=library, plugin_path=REPLAY_PLUGIN_PATH),
+        **kwargs,
+    )
+
+
+def test_warmup_payload_matches_data_type() -> None:
+    assert b"<DatenArt>UStVA</DatenArt>" in warmup_payload("UStVA_2026")
+    assert b"<DatenArt>sonstige_nachricht</DatenArt>" in warmup_payload("TH11")
+    assert b"<Testmerker>700000004</Testmerker>" in warmup_payload("ESt_2025")
+
+
+def test_session_validates_each_version_once_when_opened() -> None:
+    library = ReplayLibrary([ReplayRecord(0, "", _SERVER_XML, 0.0)])
+    session = _session(library, warmup_versions=("TH11", "UStVA_2026", "TH11"))
+
+    report = session.warm_up()
+
+    assert [version.data_type_version for version in report.versions] == ["TH11", "UStVA_2026"]
+    assert all(version.result_code == 0 for version in report.versions)
+    assert report.total_seconds >= report.initialize_seconds
+    assert library.calls == 2
+    # Warming up opens the session but is not a send.
+    assert session.status().sends == 0
+    assert session.status().warmup is report
+
+    session.client()
+    assert library.calls == 2
+    session.close()
+
+
+def test_warm_up_adds_versions_to_an_open_session() -> None:
+    library = ReplayLibrary([ReplayRecord(0, "", _SERVER_XML, 0.0)])
+    session = _session(library, warmup_versions=("TH11",))
+    session.client()
+
+    report = session.warm_up(["TH11", "UStVA_2026"])
+
+    assert [version.data_type_version for version in report.versions] == ["TH11", "UStVA_2026"]
+    assert session.warmup_versions == ("TH11", "UStVA_2026")
+    assert library.calls == 2
+    session.close()
+
+
+def test_failed_validation_is_reported_not_raised() -> None:
+    library = ReplayLibrary([ReplayRecord(610301200, "<EricAntwort />", "", 0.0)])
+    session = _session(library, warmup_versions=("TH11",))
+
+    report = session.warm_up()
+
+    assert report.versions[0].result_code == 610301200
+    assert session.active
+    session.close()
+
+
+def test_send_batch_warms_up_before_the_batch(tmp_path: Path, monkeypatch) -> None:
+    library = ReplayLibrary([ReplayRecord(0, "", _SERVER_XML, 0.0)])
+    monkeypatch.setattr(
+        "elsterctl.cli.session.EricSession", lambda **kwargs: _session(library, **kwargs)
+    )
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--warmup",
+            "TH11, UStVA_2026",
+            "--transfer-mode",
+            "test",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            "--stats",
+            str(xml_path),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "eric_warmup version=TH11 result_code=0" in result.output
+    assert "eric_warmup version=UStVA_2026 result_code=0" in result.output
+    assert library.calls == 3
+
+
+def test_session_warmup_command_reports_json(monkeypatch) -> None:
+    library = ReplayLibrary([ReplayRecord(0, "", _SERVER_XML, 0.0)])
+    monkeypatch.setattr(
+        "elsterctl.cli.session.EricSession", lambda **kwargs: _session(library, **kwargs)
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        ["--output", "json", "session", "warmup", "--data-type-version", "UStVA_2026"],
+    )
+
+    assert result.exit_code == 0, result.output
+    record = json.loads(result.output)
+    assert record["operation"] == "session.warmup"
+    assert [version["data_type_version"] for version in record["versions"]] == ["UStVA_2026"]
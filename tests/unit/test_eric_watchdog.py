@@ -0,0 +1,140 @@
+"""Tests for the ERiC resource watchdog."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from elsterctl.infrastructure.eric.client import EricResourceCounters
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.eric.watchdog import ResourceWatchdog, WatchdogLimits
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _LeakingClient:
+    """Client whose every send leaks one response buffer."""
+
+    instances: list["_LeakingClient"] = []
+
+    def __init__(self) -> None:
+        self.counters = EricResourceCounters()
+        self.open_certificates: tuple[Path, ...] = ()
+        self.closed = False
+        _LeakingClient.instances.append(self)
+
+    def open(self) -> None:
+        pass
+
+    def preload_error_texts(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def send(self) -> None:
+        self.counters.buffers_created += 2
+        self.counters.buffers_freed += 1
+
+    def resource_counters(self) -> EricResourceCounters:
+        return EricResourceCounters(**vars(self.counters))
+
+
+def test_watchdog_reports_leaked_buffers_and_certificates() -> None:
+    watchdog = ResourceWatchdog(WatchdogLimits(max_leaked_buffers=2, max_leaked_certificates=0))
+    counters = EricResourceCounters(certificates_opened=1, buffers_created=4, buffers_freed=2)
+
+    assert watchdog.recycle_reason(counters, open_certificates=1, sends=1) is None
+
+    counters.buffers_created += 1
+    assert watchdog.recycle_reason(counters, open_certificates=1, sends=1) == (
+        "3 response buffers not freed"
+    )
+    counters.buffers_freed += 1
+    assert watchdog.recycle_reason(counters, open_certificates=0, sends=1) == (
+        "1 certificate handles not closed"
+    )
+
+
+def test_watchdog_recycles_after_max_sends() -> None:
+    watchdog = ResourceWatchdog(WatchdogLimits(max_sends=3))
+    counters = EricResourceCounters()
+
+    assert watchdog.recycle_reason(counters, open_certificates=0, sends=2) is None
+    assert watchdog.recycle_reason(counters, open_certificates=0, sends=3) is not None
+
+
+def test_watchdog_samples_rss_at_most_once_per_interval() -> None:
+    clock = _Clock()
+    samples = iter([100, 300, 200])
+    watchdog = ResourceWatchdog(
+        WatchdogLimits(max_rss_bytes=250, sample_interval_seconds=5.0),
+        rss_reader=lambda: next(samples),
+        clock=clock,
+    )
+    counters = EricResourceCounters()
+
+    assert watchdog.recycle_reason(counters, open_certificates=0, sends=1) is None
+    clock.now = 1.0
+    assert watchdog.recycle_reason(counters, open_certificates=0, sends=1) is None
+    clock.now = 6.0
+    assert watchdog.recycle_reason(counters, open_certificates=0, sends=1) is not None
+
+    report = watchdog.report(counters)
+    assert report.rss_samples == 3
+    assert (report.rss_start_bytes, report.rss_peak_bytes, report.rss_last_bytes) == (
+        100,
+        300,
+        200,
+    )
+
+
+def test_session_recycles_client_that_leaks_buffers() -> None:
+    _LeakingClient.instances.clear()
+    session = EricSession(
+        client_factory=_LeakingClient,
+        watchdog=ResourceWatchdog(
+            WatchdogLimits(max_leaked_buffers=2), rss_reader=lambda: None
+        ),
+    )
+    for _ in range(4):
+        session.client().send()
+
+    first, second = _LeakingClient.instances
+    assert first.closed is True
+    assert second.closed is False
+
+    session.close()
+    report = session.resource_report()
+    assert report.recycles == 1
+    assert report.recycle_reasons == ("3 response buffers not freed",)
+    assert report.counters.buffers_created == 8
+    assert report.leaked_buffers == 4
+    assert report.leaked is True
+
+
+def test_session_does_not_recycle_on_every_send_while_rss_stays_high() -> None:
+    _LeakingClient.instances.clear()
+    rss = [200]
+    watchdog = ResourceWatchdog(
+        WatchdogLimits(max_rss_bytes=100, max_leaked_buffers=None, sample_interval_seconds=0.0),
+        rss_reader=lambda: rss[0],
+    )
+    session = EricSession(client_factory=_LeakingClient, watchdog=watchdog)
+
+    for _ in range(5):
+        session.client()
+    assert len(_LeakingClient.instances) == 2
+
+    # Growing by the headroom again above the last trigger recycles once more.
+    rss[0] = 260
+    session.client()
+    rss[0] = 310
+    session.client()
+    session.client()
+    assert len(_LeakingClient.instances) == 3
@@ -0,0 +1,159 @@
+"""Tests for ERiC worker processes and their recycling policy."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from elsterctl.infrastructure.eric.client import EricClient, EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.infrastructure.eric.replay import REPLAY_PLUGIN_PATH, ReplayLibrary, ReplayRecord
+from elsterctl.infrastructure.eric.worker import (
+    EricWorkerError,
+    RecyclePolicy,
+    RecyclingEricExecutor,
+)
+from elsterctl.infrastructure.pin.providers import SecretPin
+
+_SERVER_XML = "<Elster><TransferHeader><TransferTicket>et-1</TransferTicket></TransferHeader></Elster>"
+
+
+def _replay_client() -> EricClient:
+    """Picklable client factory running the real client stack on replayed results."""
+    library = ReplayLibrary(
+        [
+            ReplayRecord(0, "", _SERVER_XML, 0.0),
+            ReplayRecord(610101260, "<Fehler />", "", 0.0, "Keine Antwort"),
+        ]
+    )
+    return EricClient(library=library, plugin_path=REPLAY_PLUGIN_PATH)
+
+
+def _request(pin: SecretPin | str = "1234") -> dict:
+    return {
+        "xml_payload": b"<Elster />",
+        "data_type_version": "TH11",
+        "certificate_path": Path("cert.pfx"),
+        "certificate_pin": pin,
+        "validate_before_send": True,
+    }
+
+
+class _FakeWorker:
+    def __init__(self, certificate_paths: tuple[Path, ...], *, warm: bool = True) -> None:
+        self.certificate_paths = certificate_paths
+        self.warm = warm
+        self.fail_warmup = False
+        self.started_at = 0.0
+        self.age_seconds = 0.0
+        self.submissions = 0
+        self.rss_bytes: int | None = None
+        self.stopped = False
+        self.pid = id(self)
+
+    def start(self) -> None:
+        pass
+
+    def ready(self, timeout: float | None = 0.0) -> bool:
+        if self.fail_warmup:
+            raise EricWorkerError("warm-up failed")
+        return self.warm or timeout is None
+
+    def send_xml_with_certificate(self, **request) -> EricSubmitResult:
+        self.submissions += 1
+        return EricSubmitResult(0, f"et-{self.pid}-{self.submissions}", "", "")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self.stopped = True
+
+
+def test_recycle_policy_reasons() -> None:
+    worker = _FakeWorker(())
+    worker.submissions, worker.age_seconds, worker.rss_bytes = 10, 30.0, 300 * 1024 * 1024
+
+    assert RecyclePolicy().enabled is False
+    assert RecyclePolicy().reason(worker) is None
+    assert RecyclePolicy(max_submissions=10).reason(worker) == "10 submissions"
+    assert RecyclePolicy(max_age_seconds=20).reason(worker) == "age 0.5 min"
+    assert RecyclePolicy(max_rss_bytes=256 * 1024 * 1024).reason(worker) == "RSS 300 MiB"
+
+
+def test_executor_keeps_old_worker_until_replacement_is_warm() -> None:
+    workers: list[_FakeWorker] = []
+
+    def worker_factory(certificate_paths):
+        worker = _FakeWorker(certificate_paths, warm=not workers)
+        workers.append(worker)
+        return worker
+
+    executor = RecyclingEricExecutor(
+        RecyclePolicy(max_submissions=2), worker_factory=worker_factory
+    )
+    for _ in range(3):
+        executor.send_xml_with_certificate(**_request())
+
+    first, standby = workers
+    assert first.submissions == 3
+    assert standby.certificate_paths == (Path("cert.pfx"),)
+    assert executor.status().recycles == 0
+
+    standby.warm = True
+    executor.send_xml_with_certificate(**_request())
+    executor.close()
+
+    assert standby.submissions == 1
+    assert first.stopped and standby.stopped
+    status = executor.status()
+    assert status.recycles == 1
+    assert status.recycle_reasons == ("2 submissions",)
+
+
+def test_executor_counts_failed_warmups_and_keeps_serving() -> None:
+    workers: list[_FakeWorker] = []
+
+    def worker_factory(certificate_paths):
+        worker = _FakeWorker(certificate_paths)
+        worker.fail_warmup = bool(workers)
+        workers.append(worker)
+        return worker
+
+    executor = RecyclingEricExecutor(
+        RecyclePolicy(max_submissions=1), worker_factory=worker_factory
+    )
+    executor.send_xml_with_certificate(**_request())
+    executor.send_xml_with_certificate(**_request())
+    executor.close()
+
+    assert workers[0].submissions == 2
+    assert executor.status().failed_warmups == 1
+
+
+def test_executor_recycles_real_worker_processes() -> None:
+    executor = RecyclingEricExecutor(RecyclePolicy(max_submissions=2), _replay_client)
+    try:
+        result = executor.send_xml_with_certificate(**_request(SecretPin("1234")))
+        assert result.transfer_ticket == "et-1"
+        with pytest.raises(EricProcessingError) as excinfo:
+            executor.send_xml_with_certificate(**_request())
+        assert excinfo.value.result_code == 610101260
+        assert excinfo.value.eric_response_xml == "<Fehler />"
+
+        first_pid = executor.status().current_pid
+        deadline = time.monotonic() + 60
+        # The old process keeps serving until the replacement is warm.
+        while executor.status().recycles == 0 and time.monotonic() < deadline:
+            with contextlib.suppress(EricProcessingError):
+                executor.send_xml_with_certificate(**_request())
+            time.sleep(0.05)
+        status = executor.status()
+    finally:
+        executor.close()
+
+    assert first_pid != os.getpid()
+    assert status.recycles == 1
+    assert status.current_pid not in (first_pid, None)
+    assert status.workers_started == 2
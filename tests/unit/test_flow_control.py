@@ -0,0 +1,85 @@
+"""Tests for submission rate limiting and adaptive concurrency."""
+
+from __future__ import annotations
+
+import pytest
+
+from elsterctl.application.flow_control import SubmissionThrottle, TokenBucket
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_waits_for_refill() -> None:
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.try_acquire() is False
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_throttle_backs_off_on_congestion_and_recovers() -> None:
+    clock = _FakeClock()
+    throttle = SubmissionThrottle(
+        max_rate=10.0, burst=1, max_concurrency=8, clock=clock, sleep=clock.sleep
+    )
+
+    with pytest.raises(EricProcessingError):
+        with throttle.slot():
+            raise EricProcessingError("ERiC processing failed.", 610101260)
+
+    metrics = throttle.metrics()
+    assert metrics.congestion_signals == 1
+    assert metrics.limit == 4.0
+    assert metrics.rate == pytest.approx(5.0)
+
+    for _ in range(20):
+        with throttle.slot():
+            pass
+
+    recovered = throttle.metrics()
+    assert recovered.successes == 20
+    assert recovered.limit > 4.0
+    assert recovered.rate > 5.0
+    assert recovered.in_flight == 0
+
+
+def test_throttle_ignores_non_congestion_errors() -> None:
+    throttle = SubmissionThrottle(max_concurrency=4)
+
+    with pytest.raises(ValueError):
+        with throttle.slot():
+            raise ValueError("invalid payload")
+
+    metrics = throttle.metrics()
+    assert metrics.limit == 4.0
+    assert metrics.congestion_signals == 0
+    assert metrics.rate is None
+
+
+def test_throttle_cuts_once_per_congestion_episode() -> None:
+    clock = _FakeClock()
+    throttle = SubmissionThrottle(max_concurrency=8, clock=clock, sleep=clock.sleep)
+
+    first = throttle.slot()
+    second = throttle.slot()
+    first.__enter__()
+    second.__enter__()
+    clock.now = 1.0
+    error = EricProcessingError("ERiC processing failed.", 610101263)
+    first.__exit__(EricProcessingError, error, None)
+    second.__exit__(EricProcessingError, error, None)
+
+    assert throttle.metrics().limit == 4.0
+    assert throttle.metrics().congestion_signals == 2
@@ -0,0 +1,190 @@
+"""Tests for submission idempotency keys and the ledger."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from elsterctl.application.idempotency import DuplicateSubmissionError, submission_key
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricProcessingError, EricShutdownError
+from elsterctl.infrastructure.ledger.store import FAILED, PENDING, SUCCEEDED, SubmissionLedger
+
+
+def _ustva(period: str, ticket: str = "1", indent: str = "") -> bytes:
+    return (
+        f"<Elster><TransferHeader><DatenArt>UStVA</DatenArt><Testmerker>700000004</Testmerker>"
+        f"</TransferHeader><Nutzdatenblock><NutzdatenHeader><NutzdatenTicket>{ticket}"
+        f"</NutzdatenTicket></NutzdatenHeader><Nutzdaten>{indent}<Steuerfall>"
+        f"<Jahr>2026</Jahr><Zeitraum>{period}</Zeitraum><Steuernummer>9198011310010</Steuernummer>"
+        f"</Steuerfall></Nutzdaten></Nutzdatenblock></Elster>"
+    ).encode("utf-8")
+
+
+def test_submission_key_ignores_ticket_and_whitespace() -> None:
+    assert submission_key(_ustva("01", ticket="1")) == submission_key(
+        _ustva("01", ticket="2", indent="\n  ")
+    )
+    assert submission_key(_ustva("01")) != submission_key(_ustva("02"))
+
+
+def test_submission_key_uses_content_without_tax_number_or_period() -> None:
+    first = b"<Elster><Nutzdaten><Nachricht><Text>A</Text></Nachricht></Nutzdaten></Elster>"
+    second = b"<Elster><Nutzdaten><Nachricht><Text>B</Text></Nachricht></Nutzdaten></Elster>"
+
+    assert submission_key(first) != submission_key(second)
+
+
+def test_ledger_begin_is_exclusive_until_failed(tmp_path: Path) -> None:
+    ledger = SubmissionLedger(tmp_path / "ledger.sqlite3")
+
+    assert ledger.begin("key", "digest") is True
+    assert ledger.begin("key", "digest") is False
+    assert ledger.lookup("key").status == PENDING
+
+    ledger.fail("key", 610101259)
+    assert ledger.lookup("key").status == FAILED
+    assert ledger.begin("key", "digest") is True
+
+    ledger.complete("key", 0, "ticket")
+    entry = ledger.lookup("key")
+    assert (entry.status, entry.transfer_ticket) == (SUCCEEDED, "ticket")
+    assert ledger.begin("key", "digest") is False
+    assert ledger.begin("key", "digest", force=True) is True
+    ledger.close()
+
+
+class _CountingEricClient:
+    calls = 0
+    error: EricProcessingError | None = None
+
+    def send_xml_with_certificate(self, **kwargs):
+        _ = kwargs
+        _CountingEricClient.calls += 1
+        if _CountingEricClient.error is not None:
+            raise _CountingEricClient.error
+        return EricSubmitResult(0, "ticket-1", "<EricAntwort />", "<ServerAntwort />")
+
+
+def _send(tmp_path: Path, ledger: SubmissionLedger, *, allow_resubmit: bool = False):
+    xml_path = tmp_path / "ustva.xml"
+    xml_path.write_bytes(_ustva("01"))
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    service = MessageSendService(eric_client_factory=_CountingEricClient, ledger=ledger)
+    return service.send(
+        MessageSendRequest(
+            xml_path=xml_path,
+            certificate_path=cert_path,
+            pin_env_var="ELSTER_CERT_PIN",
+            data_type_version="UStVA_2026",
+            transfer_mode="test",
+            validate_before_send=True,
+            allow_resubmit=allow_resubmit,
+        )
+    )
+
+
+def test_message_send_service_skips_already_accepted_filing(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    _CountingEricClient.calls = 0
+    _CountingEricClient.error = None
+    ledger = SubmissionLedger(tmp_path / "ledger.sqlite3")
+
+    first = _send(tmp_path, ledger)
+    second = _send(tmp_path, ledger)
+
+    assert _CountingEricClient.calls == 1
+    assert first.deduplicated is False
+    assert second.deduplicated is True
+    assert second.transfer_ticket == "ticket-1"
+
+    _send(tmp_path, ledger, allow_resubmit=True)
+    assert _CountingEricClient.calls == 2
+
+
+def test_message_send_service_allows_retry_after_processing_error(
+    tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    _CountingEricClient.calls = 0
+    _CountingEricClient.error = EricProcessingError("ERiC processing failed.", 610301200)
+    ledger = SubmissionLedger(tmp_path / "ledger.sqlite3")
+
+    with pytest.raises(EricProcessingError):
+        _send(tmp_path, ledger)
+
+    _CountingEricClient.error = None
+    assert _send(tmp_path, ledger).deduplicated is False
+    assert _CountingEricClient.calls == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        EricProcessingError("ERiC processing failed.", 610101260),
+        EricProcessingError("ERiC processing failed.", 610101263),
+        EricShutdownError("ERiC shutdown failed.", 610001001),
+    ],
+)
+def test_message_send_service_keeps_possibly_sent_filings_pending(
+    tmp_path: Path, monkeypatch, error: EricProcessingError
+) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    _CountingEricClient.calls = 0
+    _CountingEricClient.error = error
+    ledger = SubmissionLedger(tmp_path / "ledger.sqlite3")
+
+    with pytest.raises(EricProcessingError):
+        _send(tmp_path, ledger)
+
+    assert ledger.lookup(submission_key(_ustva("01"))).status == PENDING
+    _CountingEricClient.error = None
+    with pytest.raises(DuplicateSubmissionError, match="outcome is unknown"):
+        _send(tmp_path, ledger)
+    assert _CountingEricClient.calls == 1
+
+
+def test_message_send_service_refuses_unknown_outcome(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    ledger = SubmissionLedger(tmp_path / "ledger.sqlite3")
+    ledger.begin(submission_key(_ustva("01")), "digest")
+
+    with pytest.raises(DuplicateSubmissionError, match="outcome is unknown"):
+        _send(tmp_path, ledger)
+
+
+def test_attachments_are_part_of_the_submission_key(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    _CountingEricClient.calls = 0
+    _CountingEricClient.error = None
+    xml_path = tmp_path / "nachricht.xml"
+    xml_path.write_text(
+        "<Elster><TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>"
+        "<Nutzdaten><Nachricht><Text>Belege</Text></Nachricht></Nutzdaten></Elster>"
+    )
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    service = MessageSendService(
+        eric_client_factory=_CountingEricClient,
+        ledger=SubmissionLedger(tmp_path / "ledger.sqlite3"),
+    )
+    results = []
+    for name in ("januar.pdf", "februar.pdf"):
+        pdf_path = tmp_path / name
+        pdf_path.write_bytes(b"%PDF-1.7 " + name.encode())
+        request = MessageSendRequest(
+            xml_path=xml_path,
+            certificate_path=cert_path,
+            pin_env_var="ELSTER_CERT_PIN",
+            data_type_version="SonstigeNachrichten_21",
+            transfer_mode="test",
+            validate_before_send=True,
+            attachment_paths=(pdf_path,),
+        )
+        results.append(service.send(request))
+
+    assert [result.deduplicated for result in results] == [False, False]
+    assert _CountingEricClient.calls == 2
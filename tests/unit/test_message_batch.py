@@ -0,0 +1,283 @@
+"""Tests for pipelined batch message transmission."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from datetime import date
+
+from elsterctl.application.message_batch import (
+    MessageBatchService,
+    read_manifest,
+    read_manifest_entries,
+)
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.application.scheduling import SubmissionScheduler
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.client import EricResourceCounters, EricSubmitResult
+from elsterctl.infrastructure.eric.session import EricSession
+
+
+class _FakeEricClient:
+    sent: list[bytes] = []
+
+    def open(self) -> None:
+        pass
+
+    def preload_error_texts(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    open_certificates = ()
+
+    def resource_counters(self) -> EricResourceCounters:
+        return EricResourceCounters()
+
+    def send_xml_with_certificate(self, **kwargs):
+        _FakeEricClient.sent.append(bytes(kwargs["xml_payload"]))
+        return EricSubmitResult(0, "ticket", "<EricAntwort />", "<ServerAntwort />")
+
+
+def _write_messages(tmp_path: Path, count: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"message-{index}.xml"
+        path.write_text(f"<TransferHeader><Testmerker>700000004</Testmerker>{index}</TransferHeader>")
+        paths.append(path)
+    return paths
+
+
+def _request(xml_path: Path, cert_path: Path, **hints) -> MessageSendRequest:
+    return MessageSendRequest(
+        xml_path=xml_path,
+        certificate_path=cert_path,
+        pin_env_var="ELSTER_CERT_PIN",
+        data_type_version="TH11",
+        transfer_mode="test",
+        validate_before_send=True,
+        **hints,
+    )
+
+
+def test_message_batch_service_reports_outcomes_and_stage_stats(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    paths = _write_messages(tmp_path, 3)
+    paths.append(tmp_path / "missing.xml")
+    _FakeEricClient.sent = []
+
+    outcomes = []
+    service = MessageBatchService(MessageSendService(eric_client_factory=_FakeEricClient))
+    report = service.run((_request(path, cert_path) for path in paths), outcomes.append)
+
+    assert report.succeeded == 3
+    assert report.failed == 1
+    assert len(_FakeEricClient.sent) == 3
+    failed = [outcome for outcome in outcomes if outcome.error is not None]
+    assert failed[0].failed_stage == "reader"
+    assert [stage.name for stage in report.stages] == ["reader", "preparer", "eric", "writer"]
+    assert report.stages[2].processed == 3
+
+
+def test_read_manifest_resolves_relative_paths(tmp_path: Path) -> None:
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# comment\n\na.xml\n/abs/b.xml\n")
+
+    assert read_manifest(manifest) == [tmp_path / "a.xml", Path("/abs/b.xml")]
+
+
+def test_read_manifest_entries_parses_scheduling_hints(tmp_path: Path) -> None:
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(
+        "ustva.xml priority=urgent deadline=2026-11-10\nnote with space.xml\n"
+    )
+
+    urgent, plain = read_manifest_entries(manifest)
+
+    assert urgent.path == tmp_path / "ustva.xml"
+    assert (urgent.priority_class, urgent.deadline) == ("urgent", date(2026, 11, 10))
+    assert plain.path == tmp_path / "note with space.xml"
+    assert plain.priority_class is None
+
+
+def test_message_batch_service_sends_urgent_filings_first(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    paths = _write_messages(tmp_path, 4)
+    _FakeEricClient.sent = []
+
+    requests = [
+        _request(paths[0], cert_path, priority_class="bulk"),
+        _request(paths[1], cert_path),
+        _request(paths[2], cert_path, priority_class="urgent", deadline=date(2026, 11, 10)),
+        _request(paths[3], cert_path, priority_class="urgent", deadline=date(2026, 10, 12)),
+    ]
+    outcomes = []
+    service = MessageBatchService(
+        MessageSendService(eric_client_factory=_FakeEricClient),
+        scheduler=SubmissionScheduler(),
+    )
+    report = service.run(requests, outcomes.append)
+
+    assert [outcome.index for outcome in outcomes] == [3, 2, 1, 0]
+    assert [latency.priority_class for latency in report.priority_classes] == [
+        "urgent",
+        "normal",
+        "bulk",
+    ]
+    assert report.priority_classes[0].completed == 2
+
+
+def test_message_send_batch_cli_prints_outcomes(tmp_path: Path, monkeypatch) -> None:
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    paths = _write_messages(tmp_path, 2)
+
+    monkeypatch.setattr(
+        "elsterctl.cli.session.EricSession",
+        lambda **kwargs: EricSession(client_factory=_FakeEricClient, **kwargs),
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "--transfer-mode",
+            "test",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            "--stats",
+            *map(str, paths),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "ERiC result code: 0" in result.output
+    assert "stage=eric processed=2" in result.output
+    assert "Batch completed: 2 succeeded, 0 failed" in result.output
+
+
+class _VerboseEricClient(_FakeEricClient):
+    def send_xml_with_certificate(self, **kwargs):
+        payload = bytes(kwargs["xml_payload"]).decode()
+        return EricSubmitResult(0, "ticket", "", f"<ServerAntwort>{payload * 20}</ServerAntwort>")
+
+
+def test_message_send_batch_json_reports_spooled_responses(tmp_path: Path, monkeypatch) -> None:
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    paths = _write_messages(tmp_path, 3)
+
+    monkeypatch.setattr(
+        "elsterctl.cli.session.EricSession",
+        lambda **kwargs: EricSession(client_factory=_VerboseEricClient, **kwargs),
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--output",
+            "json",
+            "--transfer-mode",
+            "test",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            *map(str, paths),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    results = sorted(json.loads(result.output)["results"], key=lambda record: record["index"])
+    for path, record in zip(paths, results):
+        assert record["server_response_xml"] == (
+            f"<ServerAntwort>{path.read_text() * 20}</ServerAntwort>"
+        )
+        assert "eric_response_xml" not in record
+
+
+def test_message_send_batch_stamps_headers_for_test_mode(tmp_path: Path, monkeypatch) -> None:
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_path = tmp_path / "production.xml"
+    xml_path.write_text("<Elster><TransferHeader><Vorgang>send-Auth</Vorgang></TransferHeader></Elster>")
+    _FakeEricClient.sent = []
+
+    monkeypatch.setattr(
+        "elsterctl.cli.session.EricSession",
+        lambda **kwargs: EricSession(client_factory=_FakeEricClient, **kwargs),
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--transfer-mode",
+            "test",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            "--stamp-header",
+            str(xml_path),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    assert b"<Vorgang>send-Auth</Vorgang><Testmerker>700000004</Testmerker>" in (
+        _FakeEricClient.sent[0]
+    )
+
+
+class _TimedEricClient(_FakeEricClient):
+    def send_xml_with_certificate(self, **kwargs):
+        return EricSubmitResult(0, "ticket", "", "", timings={"process": 0.25})
+
+
+def test_message_send_batch_reports_progress_with_native_latency(
+    tmp_path: Path, monkeypatch
+) -> None:
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    paths = _write_messages(tmp_path, 3)
+
+    monkeypatch.setattr(
+        "elsterctl.cli.session.EricSession",
+        lambda **kwargs: EricSession(client_factory=_TimedEricClient, **kwargs),
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--output",
+            "jsonl",
+            "--transfer-mode",
+            "test",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            "--progress",
+            "json",
+            *map(str, paths),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    final = json.loads(result.stderr.splitlines()[-1])
+    assert (final["completed"], final["failed"], final["total"]) == (3, 0, 3)
+    assert final["latency_p95_seconds"] == 0.25
+
@@ -63,7 +63,7 @@ def test_message_send_uses_test_transfer_mode_from_global_flag(
 
     def _fake_send(self, request):
         _ = (self, request)
-        return MessageSendResult(0, "ticket-123", "", "")
+        return MessageSendResult(0, "ticket-123", None, None)
 
     monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
 
@@ -96,7 +96,7 @@ def test_message_send_uses_parameter_precedence_over_test_flag(
 
     def _fake_send(self, request):
         _ = (self, request)
-        return MessageSendResult(0, "ticket-123", "", "")
+        return MessageSendResult(0, "ticket-123", None, None)
 
     monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
 
@@ -164,7 +164,7 @@ def test_message_send_uses_global_certificate_option(
     def _fake_send(self, request):
         _ = self
         assert request.certificate_path == cert_path
-        return MessageSendResult(0, "ticket-123", "", "")
+        return MessageSendResult(0, "ticket-123", None, None)
 
     monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
 
@@ -199,7 +199,7 @@ def test_message_send_uses_default_certificate_from_env(
     def _fake_send(self, request):
         _ = self
         assert request.certificate_path == cert_path
-        return MessageSendResult(0, "ticket-123", "", "")
+        return MessageSendResult(0, "ticket-123", None, None)
 
     monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
 
@@ -233,7 +233,7 @@ def test_message_send_uses_default_data_type_version_from_env(
     def _fake_send(self, request):
         _ = self
         assert request.data_type_version == "ESt_2020"
-        return MessageSendResult(0, "ticket-123", "", "")
+        return MessageSendResult(0, "ticket-123", None, None)
 
     monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
 
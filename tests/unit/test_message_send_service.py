@@ -100,3 +100,34 @@ def test_message_send_service_maps_eric_result(tmp_path: Path, monkeypatch) -> N
     assert result.transfer_ticket == "transfer-ticket"
     assert "EricAntwort" in result.eric_response_xml
     assert "ServerAntwort" in result.server_response_xml
+
+
+def test_message_send_service_embeds_attachments(tmp_path: Path, monkeypatch) -> None:
+    xml_path = _write_file(
+        tmp_path / "message.xml",
+        "<Elster><TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>"
+        "<Nachricht><Betreff>x</Betreff></Nachricht></Elster>",
+    )
+    cert_path = _write_file(tmp_path / "cert.pfx", "dummy")
+    pdf_path = tmp_path / "beleg.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7 test")
+
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+
+    fake_client = _FakeEricClient()
+    service = MessageSendService(eric_client_factory=lambda: fake_client)
+    request = MessageSendRequest(
+        xml_path=xml_path,
+        certificate_path=cert_path,
+        pin_env_var="ELSTER_CERT_PIN",
+        data_type_version="TH11",
+        transfer_mode="test",
+        validate_before_send=False,
+        attachment_paths=(pdf_path,),
+    )
+
+    service.send(request)
+
+    payload = fake_client.last_kwargs["xml_payload"]
+    assert isinstance(payload, bytearray)
+    assert b"<Dateiname>beleg.pdf</Dateiname>" in payload
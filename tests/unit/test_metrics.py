@@ -0,0 +1,197 @@
+"""Tests for the metrics registry, its exposition and the recorded metrics."""
+
+from __future__ import annotations
+
+import math
+import urllib.request
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.application.message_batch import MessageBatchService
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.infrastructure.metrics.exposition import (
+    CONTENT_TYPE,
+    MetricsFileWriter,
+    MetricsServer,
+)
+from elsterctl.infrastructure.metrics.instruments import (
+    ERIC_PHASE_SECONDS,
+    LIVE_WORKERS,
+    QUEUE_DEPTH,
+    SUBMISSIONS,
+    hit_ratio,
+)
+from elsterctl.infrastructure.metrics.registry import MetricsRegistry
+
+
+def test_render_counter_gauge_and_histogram() -> None:
+    registry = MetricsRegistry()
+    sends = registry.counter("sends_total", "Sends.", ("result_code",))
+    sends.labels(0).inc()
+    sends.labels(result_code="0").inc(2)
+    sends.labels('quote"back\\slash').inc()
+    registry.gauge("depth", "Queue depth.").set(3)
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 7.0):
+        latency.observe(value)
+
+    text = registry.render()
+
+    assert text.splitlines() == [
+        "# HELP depth Queue depth.",
+        "# TYPE depth gauge",
+        "depth 3",
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 7.65",
+        "latency_seconds_count 4",
+        "# HELP sends_total Sends.",
+        "# TYPE sends_total counter",
+        'sends_total{result_code="0"} 3',
+        'sends_total{result_code="quote\\"back\\\\slash"} 1',
+    ]
+
+
+def test_registry_returns_existing_metric_and_rejects_conflicts() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("sends_total", "Sends.", ("result_code",))
+
+    assert registry.counter("sends_total", "Sends.", ("result_code",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("sends_total", "Sends.", ("result_code",))
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.labels(0).inc(-1)
+
+
+def test_gauge_callbacks_are_read_at_scrape_time_and_may_fail() -> None:
+    registry = MetricsRegistry()
+    gauge = registry.gauge("workers", "Workers.", ("pool",))
+    values = [1]
+    gauge.labels("eric").set_function(lambda: values[-1])
+    gauge.labels("broken").set_function(lambda: 1 / 0)
+    values.append(4)
+
+    assert registry.render().splitlines()[2:] == ['workers{pool="eric"} 4']
+    assert math.isnan(hit_ratio(0, 0))
+    assert hit_ratio(3, 1) == 0.75
+
+
+def test_server_serves_text_format_on_an_ephemeral_port() -> None:
+    registry = MetricsRegistry()
+    registry.counter("sends_total", "Sends.").inc()
+    server = MetricsServer(0, registry=registry).start()
+    try:
+        host, port = server.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.close()
+
+    assert content_type == CONTENT_TYPE
+    assert "sends_total 1" in body
+
+
+def test_file_writer_replaces_file_on_close(tmp_path: Path) -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("sends_total", "Sends.")
+    path = tmp_path / "metrics" / "elsterctl.prom"
+    writer = MetricsFileWriter(path, interval_seconds=60, registry=registry).start()
+    assert "sends_total 0" in path.read_text()
+
+    counter.inc()
+    writer.close()
+
+    assert "sends_total 1" in path.read_text()
+    assert [entry.name for entry in path.parent.iterdir()] == ["elsterctl.prom"]
+
+
+class _Client:
+    result_code = 0
+
+    def send_xml_with_certificate(self, **kwargs) -> EricSubmitResult:
+        if self.result_code:
+            raise EricProcessingError("rejected", self.result_code)
+        return EricSubmitResult(0, "ticket", "", "", timings={"process": 0.02, "total": 0.03})
+
+
+def _request(tmp_path: Path) -> MessageSendRequest:
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<Elster><Testmerker>700000004</Testmerker></Elster>")
+    return MessageSendRequest(
+        xml_path=xml_path,
+        certificate_path=cert_path,
+        pin_env_var="ELSTER_CERT_PIN",
+        data_type_version="TH11",
+        transfer_mode="test",
+        validate_before_send=False,
+    )
+
+
+def test_send_service_records_result_codes_and_phases(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    request = _request(tmp_path)
+    client = _Client()
+    service = MessageSendService(eric_client_factory=lambda: client)
+    accepted = SUBMISSIONS.labels(0).value
+    rejected = SUBMISSIONS.labels(610301200).value
+    processed = ERIC_PHASE_SECONDS.labels("process").snapshot()[0]
+
+    service.send(request)
+    client.result_code = 610301200
+    with pytest.raises(EricProcessingError):
+        service.send(request)
+
+    assert SUBMISSIONS.labels(0).value == accepted + 1
+    assert SUBMISSIONS.labels(610301200).value == rejected + 1
+    assert sum(ERIC_PHASE_SECONDS.labels("process").snapshot()[0]) == sum(processed) + 1
+
+
+def test_batch_service_exposes_queue_depth_and_pipeline_workers() -> None:
+    service = MessageBatchService(MessageSendService(eric_client_factory=_Client))
+    service.run([], lambda outcome: None)
+
+    assert QUEUE_DEPTH.labels("eric").value == 0
+    assert LIVE_WORKERS.labels("pipeline").value == 0
+
+
+def test_batch_service_stops_reporting_a_finished_pipeline(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    service = MessageBatchService(MessageSendService(eric_client_factory=_Client))
+    workers_while_running = []
+
+    service.run(
+        [_request(tmp_path)],
+        lambda outcome: workers_while_running.append(LIVE_WORKERS.labels("pipeline").value),
+    )
+
+    assert workers_while_running[0] > 0
+    # Without a callback the gauges fall back to their set value.
+    QUEUE_DEPTH.labels("eric").set(7)
+    LIVE_WORKERS.labels("pipeline").set(3)
+    assert QUEUE_DEPTH.labels("eric").value == 7
+    assert LIVE_WORKERS.labels("pipeline").value == 3
+    QUEUE_DEPTH.labels("eric").set(0)
+    LIVE_WORKERS.labels("pipeline").set(0)
+
+
+def test_metrics_file_option_writes_on_exit(tmp_path: Path) -> None:
+    path = tmp_path / "elsterctl.prom"
+
+    result = CliRunner().invoke(cli, ["--metrics-file", str(path), "session", "metrics"])
+
+    assert result.exit_code == 0, result.output
+    assert "# TYPE elsterctl_submissions_total counter" in result.output
+    assert 'elsterctl_cache_hit_ratio{cache="error_texts"}' in path.read_text()
@@ -0,0 +1,118 @@
+"""Tests for structured CLI output."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from elsterctl.application.message_send import MessageSendResult
+from elsterctl.cli.root import cli
+from elsterctl.domain.filings import InlineXml
+from elsterctl.shared.output import OutputSink
+
+
+def test_output_sink_writes_response_side_files(tmp_path: Path) -> None:
+    sink = OutputSink("jsonl", response_dir=tmp_path / "responses")
+
+    fields = sink.response_fields("a b/c", "<EricAntwort />", "")
+
+    assert set(fields) == {"eric_response_path"}
+    side_file = Path(fields["eric_response_path"])
+    assert side_file.name == "000001-a_b_c.eric.xml"
+    assert side_file.read_text(encoding="utf-8") == "<EricAntwort />"
+
+
+def test_output_sink_never_overwrites_side_files_of_an_earlier_run(tmp_path: Path) -> None:
+    earlier = OutputSink("jsonl", response_dir=tmp_path)
+    earlier.response_fields("a", "<E1 />", "<S1 />")
+    earlier.response_fields("a", "", "<S2 />")
+
+    fields = OutputSink("jsonl", response_dir=tmp_path).response_fields("a", "<E3 />", "<S3 />")
+
+    assert Path(fields["eric_response_path"]).name == "000003-a.eric.xml"
+    assert Path(fields["server_response_path"]).name == "000003-a.server.xml"
+    assert (tmp_path / "000001-a.eric.xml").read_text(encoding="utf-8") == "<E1 />"
+    assert (tmp_path / "000002-a.server.xml").read_text(encoding="utf-8") == "<S2 />"
+    assert not (tmp_path / "000002-a.eric.xml").exists()
+
+
+def test_output_sink_inlines_responses_without_response_dir() -> None:
+    fields = OutputSink("json").response_fields("x", "<E />", "<S />")
+
+    assert fields == {"eric_response_xml": "<E />", "server_response_xml": "<S />"}
+
+
+def test_message_send_emits_jsonl_record(monkeypatch, tmp_path: Path) -> None:
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+
+    def _fake_send(self, request):
+        _ = (self, request)
+        return MessageSendResult(
+            0, "ticket-123", InlineXml("<EricAntwort />"), None, {"process": 0.5}
+        )
+
+    monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "--output",
+            "jsonl",
+            "--test-transfer-mode",
+            "message",
+            "send",
+            "--xml",
+            str(xml_path),
+            "--certificate",
+            str(cert_path),
+        ],
+    )
+
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["operation"] == "message.send"
+    assert record["status"] == "ok"
+    assert record["transfer_ticket"] == "ticket-123"
+    assert record["timings"] == {"process": 0.5}
+    assert record["diagnostics"] == []
+    assert record["eric_response_xml"] == "<EricAntwort />"
+
+
+def test_message_send_emits_error_record(monkeypatch, tmp_path: Path) -> None:
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader />")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+
+    def _fake_send(self, request):
+        _ = (self, request)
+        raise ValueError("invalid request")
+
+    monkeypatch.setattr("elsterctl.application.message_send.MessageSendService.send", _fake_send)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["--output", "json", "message", "send", "--xml", str(xml_path), "--certificate", str(cert_path)],
+    )
+
+    assert result.exit_code == 1
+    record = json.loads(result.stdout)
+    assert record["status"] == "error"
+    assert record["error"] == "invalid request"
+
+
+def test_show_config_honours_global_jsonl_output() -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--output", "jsonl", "show-config"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output)["transfer_mode"] == "prod"
@@ -0,0 +1,213 @@
+"""Tests for certificate PIN providers and the session PIN cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from elsterctl.application.message_send import MessageSendRequest, MessageSendService
+from elsterctl.infrastructure.eric.client import EricSubmitResult
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.infrastructure.pin.providers import (
+    ChainPinProvider,
+    EnvPinProvider,
+    FilePinProvider,
+    LocalPinStore,
+    PinCache,
+    PinError,
+    PinProvider,
+    PromptPinProvider,
+    SecretPin,
+)
+
+
+class _CountingProvider(PinProvider):
+    hint = "counting"
+
+    def __init__(self, value: str | None) -> None:
+        self.value = value
+        self.calls = 0
+
+    def resolve(self, certificate_path: Path) -> SecretPin | None:
+        self.calls += 1
+        return SecretPin(self.value) if self.value else None
+
+
+def test_secret_pin_is_nul_terminated_and_wipeable() -> None:
+    source = bytearray(b"1234")
+    pin = SecretPin(source)
+
+    assert source == bytearray(4)
+    assert pin.c_pointer().value == b"1234"
+    assert repr(pin) == "SecretPin(****)"
+
+    pin.wipe()
+
+    assert pin.wiped
+    assert pin.c_pointer().value == b""
+
+
+def test_file_pin_provider_reads_first_line_of_private_file(tmp_path: Path) -> None:
+    pin_file = tmp_path / "pin"
+    pin_file.write_bytes(b"4711\nignored\n")
+    pin_file.chmod(0o600)
+
+    pin = FilePinProvider(pin_file).resolve(Path("cert.pfx"))
+
+    assert pin is not None and pin.reveal() == "4711"
+    assert FilePinProvider(tmp_path / "missing").resolve(Path("cert.pfx")) is None
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_file_pin_provider_refuses_readable_file(tmp_path: Path) -> None:
+    pin_file = tmp_path / "pin"
+    pin_file.write_text("4711")
+    pin_file.chmod(0o644)
+
+    with pytest.raises(PinError, match="chmod 600"):
+        FilePinProvider(pin_file).resolve(Path("cert.pfx"))
+
+
+def test_local_pin_store_keeps_pins_per_certificate(tmp_path: Path) -> None:
+    store = LocalPinStore(tmp_path / "pins.json")
+    store.store(tmp_path / "a.pfx", "1111")
+    store.store(tmp_path / "b.pfx", "2222")
+
+    pin = store.resolve(tmp_path / "b.pfx")
+    assert pin is not None and pin.reveal() == "2222"
+    assert oct((tmp_path / "pins.json").stat().st_mode & 0o777) == oct(0o600)
+    assert store.forget(tmp_path / "a.pfx") is True
+    assert store.resolve(tmp_path / "a.pfx") is None
+
+
+def test_prompt_pin_provider_only_prompts_interactively() -> None:
+    prompts: list[str] = []
+
+    def prompt(text: str) -> str:
+        prompts.append(text)
+        return "9999"
+
+    silent = PromptPinProvider(prompt=prompt, is_interactive=lambda: False)
+    interactive = PromptPinProvider(prompt=prompt, is_interactive=lambda: True)
+
+    assert silent.resolve(Path("cert.pfx")) is None
+    pin = interactive.resolve(Path("cert.pfx"))
+    assert pin is not None and pin.reveal() == "9999"
+    assert prompts == ["PIN for cert.pfx: "]
+
+
+def test_chain_pin_provider_uses_first_known_pin(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ELSTER_CERT_PIN", raising=False)
+    fallback = _CountingProvider("5555")
+    chain = ChainPinProvider([EnvPinProvider("ELSTER_CERT_PIN"), fallback])
+
+    pin = chain.resolve(Path("cert.pfx"))
+
+    assert pin is not None and pin.reveal() == "5555"
+    assert chain.hint == "Export environment variable: ELSTER_CERT_PIN; counting"
+
+
+def test_pin_cache_resolves_once_per_certificate_and_wipes_on_clear() -> None:
+    cache = PinCache()
+    provider = _CountingProvider("1234")
+
+    first = cache.resolve(Path("a.pfx"), provider)
+    second = cache.resolve(Path("a.pfx"), provider)
+    cache.resolve(Path("b.pfx"), provider)
+
+    assert first is second
+    assert provider.calls == 2
+    cache.clear()
+    assert first.wiped
+    assert len(cache) == 0
+
+
+class _FakeEricClient:
+    pins: list[SecretPin] = []
+
+    def send_xml_with_certificate(self, **kwargs):
+        self.pins.append(kwargs["certificate_pin"])
+        return EricSubmitResult(0, "ticket", "", "")
+
+
+def _request(tmp_path: Path) -> MessageSendRequest:
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    return MessageSendRequest(
+        xml_path=xml_path,
+        certificate_path=cert_path,
+        pin_env_var="ELSTER_CERT_PIN",
+        data_type_version="TH11",
+        transfer_mode="test",
+        validate_before_send=True,
+    )
+
+
+def test_message_send_service_reuses_cached_pin(tmp_path: Path) -> None:
+    _FakeEricClient.pins = []
+    provider = _CountingProvider("1234")
+    service = MessageSendService(
+        eric_client_factory=_FakeEricClient,
+        pin_provider=provider,
+        pin_cache=PinCache(),
+    )
+    request = _request(tmp_path)
+
+    service.send(request)
+    service.send(request)
+
+    assert provider.calls == 1
+    assert _FakeEricClient.pins[0] is _FakeEricClient.pins[1]
+    assert not _FakeEricClient.pins[0].wiped
+
+
+class _RejectingEricClient:
+    pins: list[SecretPin] = []
+
+    def send_xml_with_certificate(self, **kwargs):
+        self.pins.append(kwargs["certificate_pin"])
+        if len(self.pins) == 1:
+            raise EricProcessingError("ERiC processing failed.", 610201016)
+        return EricSubmitResult(0, "ticket", "", "")
+
+
+def test_message_send_service_resolves_pin_again_after_rejection(tmp_path: Path) -> None:
+    _RejectingEricClient.pins = []
+    provider = _CountingProvider("1234")
+    service = MessageSendService(
+        eric_client_factory=_RejectingEricClient,
+        pin_provider=provider,
+        pin_cache=PinCache(),
+    )
+    request = _request(tmp_path)
+
+    with pytest.raises(EricProcessingError):
+        service.send(request)
+    service.send(request)
+    service.send(request)
+
+    assert provider.calls == 2
+    assert _RejectingEricClient.pins[0] is not _RejectingEricClient.pins[1]
+    assert _RejectingEricClient.pins[1] is _RejectingEricClient.pins[2]
+
+
+def test_pin_provider_base_class_cannot_be_instantiated() -> None:
+    with pytest.raises(TypeError, match="resolve"):
+        PinProvider()
+
+
+def test_message_send_service_wipes_uncached_pin_after_submit(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _FakeEricClient.pins = []
+    monkeypatch.setenv("ELSTER_CERT_PIN", "1234")
+    service = MessageSendService(eric_client_factory=_FakeEricClient)
+
+    service.send(_request(tmp_path))
+
+    assert _FakeEricClient.pins[0].wiped
@@ -0,0 +1,84 @@
+"""Tests for the staged batch pipeline."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from elsterctl.application.pipeline import Pipeline, PipelineItem, Stage
+
+
+def test_pipeline_runs_items_through_stages_in_order() -> None:
+    received: list[PipelineItem] = []
+    pipeline = Pipeline(
+        [Stage("double", lambda value: value * 2), Stage("increment", lambda value: value + 1)],
+        Stage("sink", received.append),
+        queue_size=2,
+    )
+
+    stats = pipeline.run(range(5))
+
+    assert [item.value for item in received] == [1, 3, 5, 7, 9]
+    assert [stage.name for stage in stats] == ["double", "increment", "sink"]
+    assert all(stage.processed == 5 for stage in stats)
+    assert all(stage.queue_depth == 0 for stage in stats)
+
+
+def test_pipeline_passes_failed_items_to_sink_and_skips_later_stages() -> None:
+    calls: list[int] = []
+    received: list[PipelineItem] = []
+
+    def fail_on_two(value: int) -> int:
+        if value == 2:
+            raise ValueError("broken")
+        return value
+
+    pipeline = Pipeline(
+        [Stage("check", fail_on_two), Stage("record", lambda value: calls.append(value) or value)],
+        Stage("sink", received.append),
+    )
+
+    stats = pipeline.run(range(4))
+
+    assert calls == [0, 1, 3]
+    failed = [item for item in received if item.error is not None]
+    assert len(failed) == 1
+    assert failed[0].failed_stage == "check"
+    assert stats[0].failed == 1
+
+
+def test_pipeline_overlaps_stages() -> None:
+    second_busy = threading.Event()
+    first_ran_meanwhile = threading.Event()
+
+    def first(value: int) -> int:
+        if value == 1:
+            second_busy.wait(timeout=1)
+            first_ran_meanwhile.set()
+        return value
+
+    def second(value: int) -> int:
+        if value == 0:
+            second_busy.set()
+            first_ran_meanwhile.wait(timeout=1)
+        return value
+
+    Pipeline([Stage("first", first), Stage("second", second)], Stage("sink", lambda item: None)).run(
+        range(2)
+    )
+
+    assert first_ran_meanwhile.is_set()
+
+
+def test_pipeline_reraises_sink_errors() -> None:
+    def sink(item: PipelineItem) -> None:
+        raise RuntimeError("writer failed")
+
+    with pytest.raises(RuntimeError, match="writer failed"):
+        Pipeline([Stage("noop", lambda value: value)], Stage("sink", sink)).run(range(2))
+
+
+def test_pipeline_rejects_invalid_queue_size() -> None:
+    with pytest.raises(ValueError):
+        Pipeline([], Stage("sink", lambda item: None), queue_size=0)
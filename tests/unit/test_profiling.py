@@ -0,0 +1,117 @@
+"""Tests for command profiling and the ERiC call trace."""
+
+from __future__ import annotations
+
+import ctypes
+import json
+import pstats
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.tracing import NativeCallTracer, active_tracer
+from elsterctl.shared.profiling import CommandProfiler
+
+
+class _Function:
+    argtypes: list = []
+    restype = None
+
+    def __init__(self, result) -> None:
+        self._result = result
+
+    def __call__(self, *args):
+        return self._result
+
+
+class _Library:
+    def __init__(self) -> None:
+        self.EricBearbeiteVorgang = _Function(0)
+        self.EricRueckgabepufferInhalt = _Function(b"<EricAntwort />")
+
+
+def test_tracer_records_durations_and_payload_sizes() -> None:
+    library = _Library()
+    tracer = NativeCallTracer()
+    traced = tracer.wrap(library)
+
+    traced.EricBearbeiteVorgang.restype = ctypes.c_int
+    assert traced.EricBearbeiteVorgang(b"<Elster />", ctypes.create_string_buffer(8), None) == 0
+    assert traced.EricRueckgabepufferInhalt(1) == b"<EricAntwort />"
+
+    assert library.EricBearbeiteVorgang.restype is ctypes.c_int
+    with pytest.raises(AttributeError):
+        traced.EricGetHandleToCertificate
+    process, content = tracer.calls
+    assert (process.function, process.result, process.bytes_in) == ("EricBearbeiteVorgang", 0, 18)
+    assert (content.result, content.bytes_out) == (None, 15)
+    assert [summary.calls for summary in tracer.summary()] == [1, 1]
+
+
+def test_profiler_writes_cprofile_and_folded_stacks_with_native_frames(tmp_path: Path) -> None:
+    main_thread = threading.get_ident()
+    profiler = CommandProfiler(
+        tmp_path / "run",
+        interval_seconds=0.001,
+        native_frame=lambda thread_id: "EricBearbeiteVorgang" if thread_id == main_thread else None,
+    ).start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    report = profiler.stop()
+
+    assert report.samples > 0
+    pstats.Stats(str(report.cprofile_path))
+    stacks = dict(line.rsplit(" ", 1) for line in report.folded_path.read_text().splitlines())
+    assert all(int(count) >= 1 for count in stacks.values())
+    assert any(
+        stack.startswith("MainThread;")
+        and "test_profiling:test_profiler_writes" in stack
+        and stack.endswith(";[native] EricBearbeiteVorgang")
+        for stack in stacks
+    )
+
+
+def test_profile_option_traces_replayed_eric_calls(tmp_path: Path) -> None:
+    recording = tmp_path / "run.jsonl"
+    recording.write_text(json.dumps({"result_code": 0}) + "\n", encoding="utf-8")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    xml_path = tmp_path / "message.xml"
+    xml_path.write_text("<TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>")
+    prefix = tmp_path / "profiles" / "send"
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--test-transfer-mode",
+            "--replay",
+            str(recording),
+            "--replay-speedup",
+            "1000",
+            "--profile",
+            str(prefix),
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            str(xml_path),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code == 0, result.output
+    assert active_tracer() is None
+    assert (tmp_path / "profiles" / "send.prof").exists()
+    assert (tmp_path / "profiles" / "send.folded").exists()
+    calls = [
+        json.loads(line)
+        for line in (tmp_path / "profiles" / "send.eric.jsonl").read_text().splitlines()
+    ]
+    process = [call for call in calls if call["function"] == "EricBearbeiteVorgang"]
+    assert process[0]["bytes_in"] > 0
+    assert "profile eric function=EricBearbeiteVorgang calls=1" in result.stderr
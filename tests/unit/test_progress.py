@@ -0,0 +1,125 @@
+"""Tests for live progress reporting."""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.application.progress import (
+    BarRenderer,
+    JsonLinesRenderer,
+    ProgressReporter,
+    ProgressTracker,
+    progress_reporter,
+)
+from elsterctl.cli.root import cli
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_snapshot_computes_rate_latency_and_eta_over_window() -> None:
+    clock = _Clock()
+    tracker = ProgressTracker(100, window_seconds=10.0, clock=clock)
+    for index in range(20):
+        clock.now = index * 1.0
+        tracker.record(index != 3, latency_seconds=0.1 * (index % 5 + 1))
+
+    clock.now = 20.0
+    snapshot = tracker.snapshot()
+
+    assert (snapshot.completed, snapshot.failed, snapshot.done) == (19, 1, 20)
+    # Filings finished at t=10..19 are inside the 10 s window.
+    assert snapshot.rate_per_second == pytest.approx(1.0)
+    assert snapshot.latency_p50_seconds == pytest.approx(0.3)
+    assert snapshot.latency_p95_seconds == pytest.approx(0.5)
+    assert snapshot.eta_seconds == pytest.approx(80.0)
+
+
+def test_snapshot_without_latencies_or_progress() -> None:
+    clock = _Clock()
+    tracker = ProgressTracker(3, clock=clock)
+
+    snapshot = tracker.snapshot()
+
+    assert snapshot.rate_per_second == 0.0
+    assert snapshot.latency_p50_seconds is None
+    assert snapshot.eta_seconds is None
+
+
+def test_reporter_renders_at_most_once_per_interval() -> None:
+    clock = _Clock()
+    stream = io.StringIO()
+    reporter = ProgressReporter(
+        ProgressTracker(10, clock=clock), JsonLinesRenderer(stream), interval_seconds=1.0, clock=clock
+    )
+    for index in range(10):
+        clock.now = index * 0.25
+        reporter.record(True, 0.01)
+    reporter.finish()
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event["completed"] for event in events] == [5, 9, 10]
+    assert events[-1]["eta_seconds"] == 0.0
+
+
+def test_bar_renderer_draws_in_place_and_clears() -> None:
+    stream = io.StringIO()
+    tracker = ProgressTracker(4)
+    tracker.record(True, 0.2)
+    renderer = BarRenderer(stream)
+
+    renderer.render(tracker.snapshot())
+    renderer.clear()
+
+    text = stream.getvalue()
+    assert text.startswith("\r\x1b[K[######------------------] 1/4 ok=1 failed=0")
+    assert "p50=200ms" in text
+    assert text.endswith("\r\x1b[K")
+
+
+def test_auto_mode_uses_json_lines_without_terminal() -> None:
+    stream = io.StringIO()
+    reporter = progress_reporter("auto", 1, stream)
+    reporter.record(False)
+    reporter.finish()
+
+    assert json.loads(stream.getvalue())["failed"] == 1
+
+
+def test_stamp_command_reports_progress_as_json_lines(tmp_path: Path) -> None:
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"filing-{index}.xml"
+        path.write_text("<Elster><TransferHeader><Vorgang>send-Auth</Vorgang></TransferHeader></Elster>")
+        paths.append(path)
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--transfer-mode",
+            "test",
+            "message",
+            "stamp",
+            "--in-place",
+            "--progress",
+            "json",
+            *map(str, paths),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    progress_lines = [
+        json.loads(line) for line in result.stderr.splitlines() if line.startswith("{")
+    ]
+    assert progress_lines[-1]["completed"] == 3
+    assert progress_lines[-1]["total"] == 3
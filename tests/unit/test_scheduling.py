@@ -0,0 +1,104 @@
+"""Tests for deadline and priority scheduling."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from elsterctl.application.scheduling import PriorityClass, SubmissionScheduler, percentile
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_scheduler_orders_by_class_then_deadline_then_arrival() -> None:
+    scheduler: SubmissionScheduler[str] = SubmissionScheduler()
+    scheduler.push("bulk", PriorityClass.BULK)
+    scheduler.push("normal-1")
+    scheduler.push("urgent-late", "urgent", date(2026, 11, 10))
+    scheduler.push("normal-2")
+    scheduler.push("urgent-early", "urgent", date(2026, 10, 12))
+    scheduler.push("urgent-no-deadline", "urgent")
+
+    assert [item.value for item in scheduler.drain()] == [
+        "urgent-early",
+        "urgent-late",
+        "urgent-no-deadline",
+        "normal-1",
+        "normal-2",
+        "bulk",
+    ]
+
+
+def test_scheduler_ages_waiting_items_to_prevent_starvation() -> None:
+    clock = _Clock()
+    scheduler: SubmissionScheduler[str] = SubmissionScheduler(aging_seconds=10.0, clock=clock)
+    scheduler.push("bulk", PriorityClass.BULK)
+
+    clock.now = 15.0
+    scheduler.push("urgent-1", PriorityClass.URGENT)
+    assert scheduler.pop().value == "urgent-1"
+
+    clock.now = 21.0
+    scheduler.push("urgent-2", PriorityClass.URGENT)
+    # Waited two aging periods: as urgent as new urgent items, and older.
+    assert scheduler.pop().value == "bulk"
+    assert scheduler.pop().value == "urgent-2"
+
+
+def test_scheduler_keeps_class_order_for_a_backlog_queued_up_front() -> None:
+    clock = _Clock()
+    scheduler: SubmissionScheduler[str] = SubmissionScheduler(aging_seconds=60.0, clock=clock)
+    for number in range(300):
+        scheduler.push(f"bulk{number}", PriorityClass.BULK)
+        scheduler.push(f"normal{number}", PriorityClass.NORMAL)
+        scheduler.push(f"urgent{number}", PriorityClass.URGENT)
+
+    popped = []
+    while scheduler:
+        # Long into the batch, waiting alone must not flatten the classes.
+        clock.now += 1.0
+        popped.append(scheduler.pop().value)
+
+    assert popped[:300] == [f"urgent{number}" for number in range(300)]
+    assert popped[300:600] == [f"normal{number}" for number in range(300)]
+    assert popped[600:] == [f"bulk{number}" for number in range(300)]
+
+
+def test_scheduler_reports_latency_per_class() -> None:
+    clock = _Clock()
+    scheduler: SubmissionScheduler[str] = SubmissionScheduler(clock=clock)
+    items = [scheduler.push("bulk", "bulk"), scheduler.push("urgent", "urgent")]
+    for step, _ in enumerate(items, start=1):
+        item = scheduler.pop()
+        clock.now = step * 2.0
+        scheduler.dispatched(item)
+        clock.now += 1.0
+        scheduler.complete(item)
+
+    urgent, bulk = scheduler.latency_by_class()
+    assert (urgent.priority_class, urgent.wait_p95_seconds, urgent.latency_p95_seconds) == (
+        "urgent",
+        2.0,
+        3.0,
+    )
+    assert (bulk.priority_class, bulk.wait_max_seconds, bulk.completed) == ("bulk", 4.0, 1)
+
+
+def test_scheduler_rejects_unknown_priority_class() -> None:
+    with pytest.raises(ValueError):
+        SubmissionScheduler().push("x", "later")
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 21)]
+
+    assert percentile(values, 0.5) == 10.0
+    assert percentile(values, 0.95) == 19.0
+    assert percentile([3.0], 0.95) == 3.0
@@ -0,0 +1,195 @@
+"""Tests for sharded batches and merging their results."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.application.sharding import (
+    ShardSpec,
+    filing_key,
+    merge_results,
+    parse_shard,
+    shard_of,
+)
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.ledger.store import FAILED, PENDING, SUCCEEDED, SubmissionLedger
+
+
+def test_shards_partition_keys_disjointly_and_evenly() -> None:
+    keys = [f"outbox/filing-{number}.xml" for number in range(4000)]
+    shards = [ShardSpec(index, 4) for index in range(1, 5)]
+
+    owners = [[shard for shard in shards if shard.contains(key)] for key in keys]
+
+    assert all(len(owner) == 1 for owner in owners)
+    sizes = Counter(str(owner[0]) for owner in owners)
+    assert min(sizes.values()) > 900
+    # BLAKE2b, not the per-process salted hash(): fixed across runs and hosts.
+    assert shard_of("outbox/filing-0.xml", 4) == shard_of("outbox/filing-0.xml", 4)
+    assert [shard_of(key, 1) for key in keys[:3]] == [1, 1, 1]
+
+
+def test_parse_shard_and_filing_key() -> None:
+    assert parse_shard("2/8") == ShardSpec(2, 8)
+    for text in ("0/2", "3/2", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(text)
+    assert filing_key(Path("/srv/run/outbox/a.xml"), Path("/srv/run")) == "outbox/a.xml"
+    assert filing_key(Path("/other/a.xml"), Path("/srv/run")) == "/other/a.xml"
+
+
+def test_ledger_merge_never_loosens_a_refusal(tmp_path: Path) -> None:
+    merged = SubmissionLedger(tmp_path / "merged.sqlite3")
+    merged.begin("accepted", "d")
+    merged.fail("accepted", 610101200)
+    merged.begin("unknown", "d")
+    merged.fail("unknown", None)
+    shard = SubmissionLedger(tmp_path / "shard.sqlite3")
+    shard.begin("accepted", "d")
+    shard.complete("accepted", 0, "et-1")
+    shard.begin("unknown", "d")
+    shard.begin("new", "d")
+    shard.fail("new", 1)
+    shard.close()
+
+    assert merged.merge(tmp_path / "shard.sqlite3") == 3
+    assert merged.merge(tmp_path / "shard.sqlite3") == 0
+    assert merged.lookup("accepted").status == SUCCEEDED
+    assert merged.lookup("accepted").transfer_ticket == "et-1"
+    assert merged.lookup("unknown").status == PENDING
+    assert merged.lookup("new").status == FAILED
+    with pytest.raises(ValueError):
+        merged.merge(tmp_path / "missing.sqlite3")
+
+
+def _filing_record(index: int, shard: str, key: str, result_code: int = 0) -> dict:
+    return {
+        "operation": "message.send-batch",
+        "index": index,
+        "status": "ok" if result_code == 0 else "error",
+        "result_code": result_code,
+        "shard": shard,
+        "filing_key": key,
+    }
+
+
+def test_merge_results_reports_duplicates_and_missing_shards(tmp_path: Path) -> None:
+    first = tmp_path / "shard-1.jsonl"
+    records = [
+        _filing_record(2, "1/3", "c.xml"),
+        _filing_record(0, "1/3", "a.xml", result_code=610301200),
+        {"operation": "message.send-batch", "status": "error", "shard": "1/3"},
+    ]
+    first.write_text("\n".join(json.dumps(record) for record in records))
+    second = tmp_path / "shard-2.json"
+    summary = {
+        "operation": "message.send-batch",
+        "shard": "2/3",
+        "results": [_filing_record(2, "2/3", "c.xml")],
+    }
+    second.write_text(json.dumps(summary, indent=2))
+
+    merged = merge_results([first, second])
+
+    assert [record["index"] for record in merged.records] == [0, 2]
+    assert (merged.succeeded, merged.failed) == (1, 1)
+    assert merged.result_codes == {"0": 1, "610301200": 1}
+    assert merged.duplicates == ["c.xml"]
+    assert merged.missing_shards == ["3/3"]
+    assert [(shard.shard, shard.filings) for shard in merged.shards] == [("1/3", 2), ("2/3", 1)]
+
+
+def test_sharded_send_batch_and_merge_cover_every_filing_once(tmp_path: Path) -> None:
+    recording = tmp_path / "run.jsonl"
+    recording.write_text(json.dumps({"result_code": 0}) + "\n", encoding="utf-8")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+    outbox = tmp_path / "outbox"
+    outbox.mkdir()
+    for number in range(8):
+        (outbox / f"filing-{number}.xml").write_text(
+            "<Elster><TransferHeader><Testmerker>700000004</Testmerker></TransferHeader>"
+            f"<DatenTeil><Nutzdaten>{number}</Nutzdaten></DatenTeil></Elster>"
+        )
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("".join(f"outbox/filing-{number}.xml\n" for number in range(8)))
+
+    runner = CliRunner()
+    for index in (1, 2):
+        result = runner.invoke(
+            cli,
+            [
+                "--output",
+                "jsonl",
+                "--test-transfer-mode",
+                "--replay",
+                str(recording),
+                "--replay-speedup",
+                "1000",
+                "message",
+                "send-batch",
+                "--certificate",
+                str(cert_path),
+                "--manifest",
+                str(manifest),
+                "--shard",
+                f"{index}/2",
+            ],
+            env={"ELSTER_CERT_PIN": "1234"},
+        )
+        assert result.exit_code == 0, result.output
+        (tmp_path / f"shard-{index}.jsonl").write_text(result.output)
+        # Replayed runs keep their ledger in a scratch copy, so stand in for
+        # the ledgers the shard hosts would have written.
+        shard_ledger = SubmissionLedger(tmp_path / f"ledger-{index}.sqlite3")
+        for record in map(json.loads, result.output.splitlines()):
+            if "filing_key" not in record:
+                continue
+            key = f"key-{record['filing_key']}"
+            shard_ledger.begin(key, "digest")
+            shard_ledger.complete(key, 0, None)
+        shard_ledger.close()
+
+    result = runner.invoke(
+        cli,
+        [
+            "--output",
+            "json",
+            "--ledger",
+            str(tmp_path / "ledger.sqlite3"),
+            "message",
+            "merge-results",
+            "--shard-ledger",
+            str(tmp_path / "ledger-1.sqlite3"),
+            "--shard-ledger",
+            str(tmp_path / "ledger-2.sqlite3"),
+            "--results-file",
+            str(tmp_path / "merged.jsonl"),
+            str(tmp_path / "shard-1.jsonl"),
+            str(tmp_path / "shard-2.jsonl"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert (report["filings"], report["succeeded"], report["duplicates"]) == (8, 8, [])
+    assert report["missing_shards"] == []
+    assert report["ledger"]["merged_entries"] == 8
+    merged = [json.loads(line) for line in (tmp_path / "merged.jsonl").read_text().splitlines()]
+    assert [record["index"] for record in merged] == list(range(8))
+    assert merged[0]["filing_key"] == "outbox/filing-0.xml"
+
+
+def test_shard_option_rejects_invalid_values(tmp_path: Path) -> None:
+    path = tmp_path / "filing.xml"
+    path.write_text("<TransferHeader />")
+
+    result = CliRunner().invoke(cli, ["message", "stamp", "--in-place", "--shard", "3/2", str(path)])
+
+    assert result.exit_code != 0
+    assert "Invalid shard" in result.output
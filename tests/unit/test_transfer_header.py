@@ -0,0 +1,125 @@
+"""Tests for the streaming TransferHeader rewriter."""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.application.transfer_header import (
+    HeaderRewriteError,
+    HeaderStamp,
+    stamp_payload,
+    stamp_stream,
+)
+from elsterctl.cli.root import cli
+
+_TEST_PAYLOAD = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Elster xmlns="http://www.elster.de/elsterxml/schema/v11">
+    <TransferHeader version="11">
+        <Verfahren>ElsterAnmeldung</Verfahren>
+        <DatenArt>sonstige_nachricht</DatenArt>
+        <Vorgang>send-Auth</Vorgang>
+        <Testmerker>700000004</Testmerker>
+        <HerstellerID>12345</HerstellerID>
+        <DatenLieferant>elsterctl</DatenLieferant>
+    </TransferHeader>
+    <DatenTeil><Nutzdaten><Testmerker>kept</Testmerker></Nutzdaten></DatenTeil>
+</Elster>
+"""
+
+
+def test_strip_and_inject_testmerker_round_trip() -> None:
+    production = stamp_payload(_TEST_PAYLOAD, HeaderStamp(testmerker=""))
+
+    assert b"<Testmerker>700000004</Testmerker>" not in production
+    assert b"<Testmerker>kept</Testmerker>" in production
+    assert stamp_payload(production, HeaderStamp(testmerker="700000004")) == _TEST_PAYLOAD
+
+
+def test_sets_fields_and_escapes_values() -> None:
+    stamped = stamp_payload(
+        _TEST_PAYLOAD, HeaderStamp(hersteller_id="74931", daten_lieferant="Müller & Co")
+    )
+
+    assert b"        <HerstellerID>74931</HerstellerID>\n" in stamped
+    assert "<DatenLieferant>Müller &amp; Co</DatenLieferant>".encode() in stamped
+    assert stamped.count(b"<HerstellerID>") == 1
+
+
+def test_injects_missing_fields_in_schema_order_with_prefix() -> None:
+    payload = b"<e:Elster><e:TransferHeader><e:Verfahren>V</e:Verfahren></e:TransferHeader></e:Elster>"
+
+    stamped = stamp_payload(payload, HeaderStamp("700000004", "74931", "me"))
+
+    assert stamped == (
+        b"<e:Elster><e:TransferHeader><e:Verfahren>V</e:Verfahren>"
+        b"<e:Testmerker>700000004</e:Testmerker><e:HerstellerID>74931</e:HerstellerID>"
+        b"<e:DatenLieferant>me</e:DatenLieferant></e:TransferHeader></e:Elster>"
+    )
+
+
+def test_stream_copies_body_unchanged_in_small_chunks() -> None:
+    body = b"<DatenTeil>" + b"x" * 200_000 + b"</DatenTeil></Elster>"
+    source = io.BytesIO(_TEST_PAYLOAD.split(b"<DatenTeil>")[0] + body)
+    target = io.BytesIO()
+
+    written = stamp_stream(source, target, HeaderStamp(testmerker=""), chunk_size=7)
+
+    assert target.getvalue().endswith(body)
+    assert b"700000004" not in target.getvalue()
+    assert written == len(target.getvalue())
+
+
+def test_payload_without_header_is_rejected() -> None:
+    with pytest.raises(HeaderRewriteError):
+        stamp_payload(b"<Elster><DatenTeil /></Elster>", HeaderStamp(testmerker=""))
+    with pytest.raises(HeaderRewriteError):
+        stamp_stream(io.BytesIO(b"<Elster>"), io.BytesIO(), HeaderStamp(testmerker=""))
+
+
+def test_stamp_command_retargets_files_to_production(tmp_path: Path) -> None:
+    source_dir = tmp_path / "corpus"
+    source_dir.mkdir()
+    paths = []
+    for index in range(3):
+        path = source_dir / f"filing-{index}.xml"
+        path.write_bytes(_TEST_PAYLOAD)
+        paths.append(path)
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--output",
+            "json",
+            "--transfer-mode",
+            "prod",
+            "--hersteller-id",
+            "74931",
+            "message",
+            "stamp",
+            "--output-dir",
+            str(tmp_path / "prod"),
+            *map(str, paths),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["files"] == 3
+    stamped = (tmp_path / "prod" / "filing-0.xml").read_bytes()
+    assert b"<Testmerker>700000004</Testmerker>" not in stamped
+    assert b"<HerstellerID>74931</HerstellerID>" in stamped
+    assert paths[0].read_bytes() == _TEST_PAYLOAD
+
+
+def test_stamp_command_needs_a_destination(tmp_path: Path) -> None:
+    path = tmp_path / "filing.xml"
+    path.write_bytes(_TEST_PAYLOAD)
+
+    result = CliRunner().invoke(cli, ["message", "stamp", str(path)])
+
+    assert result.exit_code != 0
+    assert "--output-dir or --in-place" in result.output
@@ -0,0 +1,168 @@
+"""Tests for ERiC transport backends."""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from elsterctl.cli.root import cli
+from elsterctl.infrastructure.eric.client import EricClient
+from elsterctl.infrastructure.eric.errors import EricProcessingError
+from elsterctl.infrastructure.eric.replay import (
+    REPLAY_PLUGIN_PATH,
+    ReplayLibrary,
+    ReplayRecord,
+    replay_client_factory,
+)
+from elsterctl.infrastructure.eric.session import EricSession
+from elsterctl.infrastructure.pin.providers import SecretPin
+from elsterctl.infrastructure.transport.base import EricTransport, TransportError
+from elsterctl.infrastructure.transport.daemon import EricDaemon, UnixSocketTransport
+from elsterctl.infrastructure.transport.local import InProcessTransport, WorkerProcessTransport
+
+_SERVER_XML = "<Elster><TransferHeader><TransferTicket>et-7</TransferTicket></TransferHeader></Elster>"
+_RECORDS = [
+    ReplayRecord(0, "", _SERVER_XML, 0.0),
+    ReplayRecord(610101260, "<Fehler />", "", 0.0, "Keine Antwort"),
+]
+
+
+def _replay_client() -> EricClient:
+    return EricClient(library=ReplayLibrary(_RECORDS), plugin_path=REPLAY_PLUGIN_PATH)
+
+
+def _request(pin: SecretPin | str = "1234") -> dict:
+    return {
+        "xml_payload": b"<Elster />",
+        "data_type_version": "TH11",
+        "certificate_path": Path("cert.pfx"),
+        "certificate_pin": pin,
+        "validate_before_send": True,
+    }
+
+
+@pytest.fixture
+def daemon(tmp_path: Path):
+    session = EricSession(client_factory=replay_client_factory(ReplayLibrary(_RECORDS)))
+    daemon = EricDaemon(tmp_path / "eric.sock", session)
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join(5)
+    session.close()
+
+
+def test_in_process_transport_uses_session_client() -> None:
+    session = EricSession(client_factory=replay_client_factory(ReplayLibrary(_RECORDS)))
+    transport = InProcessTransport(session)
+
+    result = transport.client().send_xml_with_certificate(**_request())
+
+    assert result.transfer_ticket == "et-7"
+    assert transport.describe() == {"transport": "in-process", "active": True, "sends": 1}
+    session.close()
+
+
+def test_unix_socket_transport_reuses_pooled_connection(daemon: EricDaemon) -> None:
+    transport = UnixSocketTransport(daemon.socket_path, pool_size=2)
+    try:
+        result = transport.send_xml_with_certificate(**_request(SecretPin("1234")))
+        with pytest.raises(EricProcessingError) as excinfo:
+            transport.send_xml_with_certificate(**_request())
+        assert transport.ping()["sends"] == 2
+    finally:
+        transport.close()
+
+    assert result.transfer_ticket == "et-7"
+    assert excinfo.value.result_code == 610101260
+    assert excinfo.value.eric_response_xml == "<Fehler />"
+    assert transport.connects == 1
+    assert daemon.requests == 2
+
+
+def test_daemon_refuses_second_instance_and_cleans_up(daemon: EricDaemon) -> None:
+    socket_path = daemon.socket_path
+    with pytest.raises(TransportError, match="already listening"):
+        EricDaemon(socket_path, EricSession()).start()
+
+    daemon.shutdown()
+
+    assert not socket_path.exists()
+    with pytest.raises(TransportError, match="session serve"):
+        UnixSocketTransport(socket_path).send_xml_with_certificate(**_request())
+
+
+def test_daemon_and_client_refuse_a_socket_directory_open_to_others(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    socket_dir = tmp_path / "shared"
+    socket_dir.mkdir(mode=0o700)
+    socket_dir.chmod(0o755)
+    socket_path = socket_dir / "eric.sock"
+    key_path = socket_dir / "eric.sock.key"
+    key_path.write_bytes(b"planted")
+
+    with pytest.raises(TransportError, match="Refusing"):
+        EricDaemon(socket_path, EricSession()).start()
+    with pytest.raises(TransportError, match="Refusing"):
+        UnixSocketTransport(socket_path).send_xml_with_certificate(**_request())
+
+    socket_dir.chmod(0o700)
+    monkeypatch.setattr("os.getuid", lambda: os.stat(socket_dir).st_uid + 1)
+    with pytest.raises(TransportError, match="Refusing"):
+        UnixSocketTransport(socket_path).send_xml_with_certificate(**_request())
+    assert key_path.read_bytes() == b"planted"
+
+
+def test_worker_process_transport_reports_worker_status() -> None:
+    transport = WorkerProcessTransport(client_factory=_replay_client)
+    try:
+        result = transport.send_xml_with_certificate(**_request())
+        description = transport.describe()
+    finally:
+        transport.close()
+
+    assert result.transfer_ticket == "et-7"
+    assert description["transport"] == "subprocess"
+    assert description["workers_started"] == 1
+
+
+def test_replay_transport_requires_recording(tmp_path: Path) -> None:
+    xml_path = tmp_path / "a.xml"
+    xml_path.write_text("<Elster><Testmerker>700000004</Testmerker></Elster>")
+    cert_path = tmp_path / "cert.pfx"
+    cert_path.write_text("dummy")
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--transport",
+            "replay",
+            "message",
+            "send-batch",
+            "--certificate",
+            str(cert_path),
+            str(xml_path),
+        ],
+        env={"ELSTER_CERT_PIN": "1234"},
+    )
+
+    assert result.exit_code != 0
+    assert "needs a recording" in result.output
+
+
+def test_show_config_reports_transport() -> None:
+    result = CliRunner().invoke(cli, ["--transport", "unix-socket", "show-config"])
+
+    assert "transport=unix-socket" in result.output
+
+
+def test_transport_base_class_cannot_be_instantiated() -> None:
+    with pytest.raises(TypeError, match="send_xml_with_certificate"):
+        EricTransport()